@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark e regressão de qualidade dos backends de inferência do Kokoro
+
+Sintetiza as mesmas frases em PT-BR com cada backend (torch, torch_int8,
+onnx), mede o fator de tempo real (RTF = tempo de síntese / duração do
+áudio) e a memória residente, e compara o áudio de cada backend com o do
+torch fp32 (distância espectral em dB). Sai com código 1 se algum backend
+passar do limite de qualidade — pode rodar no CI antes de trocar o
+TTS_BACKEND de uma implantação.
+
+    python benchmark_tts_backends.py
+    python benchmark_tts_backends.py --backends torch onnx --runs 5 --max-ltas-db 2.0
+
+O XTTS não entra aqui: a amostragem dele não é determinística, então duas
+sínteses do mesmo texto já diferem mesmo sem quantização.
+"""
+
+import argparse
+import gc
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.core.config import settings
+from backend.modules.tts.audio_quality import compare_audio, real_time_factor
+from backend.modules.tts.inference import BACKENDS, load_kokoro_model, set_torch_threads
+from backend.src.utils.metrics import resident_memory_bytes
+
+SENTENCES = [
+    "Olá, eu sou a Lua, sua assistente virtual.",
+    "O pedido do anel de ouro dezoito quilates fica pronto na próxima sexta-feira.",
+    "Foram registrados três vales no mês, totalizando quatrocentos e cinquenta reais.",
+    "Posso gerar o relatório de vendas do trimestre agora mesmo, se você quiser.",
+]
+VOICE = "af_heart"
+
+
+def synthesize(pipeline, text):
+    import torch
+
+    chunks = [result.audio for result in pipeline(text, voice=VOICE, speed=1.0) if result.audio is not None]
+    return torch.cat(chunks).numpy() if chunks else None
+
+
+def run_backend(backend, runs):
+    from kokoro import KPipeline
+
+    rss_before = resident_memory_bytes()
+    start = time.perf_counter()
+    model, resolved = load_kokoro_model("cpu", backend)
+    load_seconds = time.perf_counter() - start
+    if resolved != backend:
+        print(f"⚠️ {backend} indisponível, pulando (resolvido para {resolved})")
+        return None
+
+    pipeline = KPipeline(lang_code="p", model=False)
+    pipeline.model = model
+    synthesize(pipeline, SENTENCES[0])  # aquecimento
+
+    rtfs, audios = [], []
+    for text in SENTENCES:
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            audio = synthesize(pipeline, text)
+            timings.append(time.perf_counter() - start)
+        audios.append(audio)
+        rtfs.append(real_time_factor(statistics.median(timings), len(audio), settings.sample_rate))
+
+    result = {
+        "backend": backend,
+        "load_s": round(load_seconds, 2),
+        "rss_mb": round((resident_memory_bytes() - rss_before) / 2**20, 1),
+        "rtf_median": round(statistics.median(rtfs), 3),
+        "rtf_max": round(max(rtfs), 3),
+        "audios": audios,
+    }
+    del model, pipeline
+    gc.collect()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--runs", type=int, default=3, help="repetições por frase (mediana)")
+    parser.add_argument("--max-ltas-db", type=float, default=1.5, help="limite da distância do espectro médio")
+    parser.add_argument("--max-duration-drift", type=float, default=0.05, help="variação máxima da duração")
+    args = parser.parse_args()
+
+    set_torch_threads()
+    backends = ["torch"] + [b for b in args.backends if b != "torch"]
+    results = [r for r in (run_backend(backend, args.runs) for backend in backends) if r]
+    reference = results[0]["audios"]
+
+    print(f"\n{'backend':<12}{'load s':>8}{'RSS MB':>9}{'RTF med':>9}{'RTF max':>9}{'LTAS dB':>9}{'LSD dB':>8}{'dur':>8}")
+    failed = []
+    for result in results:
+        quality = [compare_audio(ref, audio) for ref, audio in zip(reference, result["audios"])]
+        ltas = max(q["ltas_db"] for q in quality)
+        lsd = max(q["lsd_db"] for q in quality)
+        drift = max(abs(q["duration_ratio"] - 1) for q in quality)
+        print(f"{result['backend']:<12}{result['load_s']:>8}{result['rss_mb']:>9}{result['rtf_median']:>9}"
+              f"{result['rtf_max']:>9}{ltas:>9.2f}{lsd:>8.2f}{1 + drift:>8.3f}")
+        if ltas > args.max_ltas_db or drift > args.max_duration_drift:
+            failed.append(result["backend"])
+
+    if failed:
+        print(f"\n❌ Regressão de qualidade: {', '.join(failed)}")
+        sys.exit(1)
+    print("\n✅ Todos os backends dentro do limite de qualidade")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos motores de TTS: Kokoro-82M nativo x Coqui XTTS v2
+
+Cada motor roda num subprocesso separado (a memória de um não contamina a
+do outro) e passa pelo mesmo caminho usado pela API: initialize() e
+generate_speech() com as mesmas frases em PT-BR. Mede o tempo de carga, a
+memória residente (após a carga e o pico), a latência até o primeiro
+trecho de áudio e o fator de tempo real (RTF).
+
+    python benchmark_tts_engines.py
+    python benchmark_tts_engines.py --engines kokoro --runs 5
+    python benchmark_tts_engines.py --engine xtts --json   # um motor só (usado internamente)
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+ENGINES = ("kokoro", "xtts")
+SENTENCES = [
+    "Olá, eu sou a Lua, sua assistente virtual.",
+    "O pedido do anel de ouro dezoito quilates fica pronto na próxima sexta-feira.",
+    "Foram registrados três vales no mês, totalizando quatrocentos e cinquenta reais.",
+    "Posso gerar o relatório de vendas do trimestre agora mesmo, se você quiser. Quer que eu envie por e-mail?",
+]
+
+
+def audio_seconds(chunks):
+    import soundfile as sf
+
+    total = 0.0
+    for chunk in chunks:
+        info = sf.info(io.BytesIO(chunk))
+        total += info.frames / info.samplerate
+    return total
+
+
+async def measure(engine_name, runs):
+    from backend.modules.tts import create_tts_engine
+    from backend.src.utils.metrics import resident_memory_bytes
+
+    rss_before = resident_memory_bytes()
+    engine = create_tts_engine(engine_name)
+    start = time.perf_counter()
+    if not await engine.initialize():
+        raise SystemExit(f"❌ Motor {engine_name} não inicializou")
+    load_seconds = time.perf_counter() - start
+    rss_loaded = resident_memory_bytes()
+
+    first_chunk, rtfs = [], []
+    for text in SENTENCES:
+        for _ in range(runs):
+            chunks = []
+            start = time.perf_counter()
+            async for chunk in engine.generate_speech(text, voice="luna"):
+                if not chunks:
+                    first_chunk.append(time.perf_counter() - start)
+                chunks.append(chunk)
+            elapsed = time.perf_counter() - start
+            rtfs.append(elapsed / audio_seconds(chunks))
+
+    stats = getattr(engine, "get_cache_stats", lambda: None)()
+    await engine.cleanup()
+    return {
+        "engine": engine_name,
+        "sample_rate": engine.sample_rate,
+        "load_s": round(load_seconds, 2),
+        "rss_mb": round((rss_loaded - rss_before) / 2**20, 1),
+        # ru_maxrss em KiB no Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "first_chunk_ms": round(statistics.median(first_chunk) * 1000),
+        "rtf_median": round(statistics.median(rtfs), 3),
+        "rtf_max": round(max(rtfs), 3),
+        "cache": stats,
+    }
+
+
+def run_isolated(engine_name, runs):
+    proc = subprocess.run(
+        [sys.executable, __file__, "--engine", engine_name, "--runs", str(runs), "--json"],
+        capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        print(f"⚠️ {engine_name} falhou: {(proc.stderr or proc.stdout).strip().splitlines()[-1:]}")
+        return None
+    # Os motores também escrevem logs no stdout: o resultado é a última linha
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+    parser.add_argument("--engine", choices=ENGINES, help="mede um único motor neste processo")
+    parser.add_argument("--runs", type=int, default=3, help="repetições por frase")
+    parser.add_argument("--json", action="store_true", help="imprime o resultado em JSON")
+    args = parser.parse_args()
+
+    if args.engine:
+        result = asyncio.run(measure(args.engine, args.runs))
+        print(json.dumps(result) if args.json else result)
+        return
+
+    results = [r for r in (run_isolated(engine, args.runs) for engine in args.engines) if r]
+    if not results:
+        sys.exit(1)
+
+    print(f"\n{'motor':<8}{'Hz':>7}{'carga s':>9}{'RSS MB':>9}{'pico MB':>9}{'1º trecho ms':>14}{'RTF med':>9}{'RTF max':>9}")
+    for r in results:
+        print(f"{r['engine']:<8}{r['sample_rate']:>7}{r['load_s']:>9}{r['rss_mb']:>9}{r['peak_rss_mb']:>9}"
+              f"{r['first_chunk_ms']:>14}{r['rtf_median']:>9}{r['rtf_max']:>9}")
+
+    by_name = {r["engine"]: r for r in results}
+    if {"kokoro", "xtts"} <= by_name.keys():
+        kokoro, xtts = by_name["kokoro"], by_name["xtts"]
+        print(f"\n🚀 Kokoro: {xtts['rtf_median'] / kokoro['rtf_median']:.1f}x mais rápido (RTF), "
+              f"{xtts['first_chunk_ms'] / max(kokoro['first_chunk_ms'], 1):.1f}x menor latência do 1º trecho, "
+              f"{xtts['peak_rss_mb'] - kokoro['peak_rss_mb']:.0f} MB a menos de pico de memória")
+    if by_name.get("kokoro", {}).get("cache"):
+        print(f"📦 Cache do Kokoro: {by_name['kokoro']['cache']}")
+
+
+if __name__ == "__main__":
+    main()
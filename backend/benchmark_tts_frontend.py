@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark do front-end do TTS (normalização + G2P) em respostas da LUA
+
+Compara, no mesmo corpus de respostas do assistente:
+
+- G2P direto: espeak/misaki em cada resposta, sem cache (caminho antigo);
+- cache frio: normalização + fonemização palavra a palavra com store vazio;
+- cache quente: mesmas respostas de novo no mesmo processo (LRU);
+- reinício: novo front-end sobre o store SQLite já preenchido.
+
+    python benchmark_tts_frontend.py
+    python benchmark_tts_frontend.py --corpus respostas.txt --replies 500
+
+Sem --corpus usa respostas geradas a partir dos modelos de personality.py e
+das respostas de vale/caixa/relatório do ERP.
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.modules.lua.personality import LuaPersonality
+from backend.modules.tts.phonemes import PhonemeStore, WordPhonemizer
+from backend.src.utils.text_normalization import normalizar_para_fala
+
+NOMES = ["Darvin", "Josemir", "Maria Aparecida", "João Pedro", "Ana Beatriz", "Kalel", "Rosângela", "Edvaldo"]
+MODELOS = [
+    "Vale de R$ {valor} criado para {nome} em {data}.",
+    "Relatório de vendas: {qtd} pedidos no mês, total de R$ {valor}.",
+    "{nome} tem {qtd} vales em aberto, somando R$ {valor}.",
+    "O pedido de {nome} fica pronto em {data}. Posso avisar por WhatsApp?",
+    "Caixa fechado com saldo de R$ {valor}. Entradas: {qtd}.",
+    "Encontrei {qtd} funcionários ativos. O salário de {nome} é R$ {valor}.",
+    "Anel de ouro dezoito quilates, {qtd} gramas, orçamento de R$ {valor}.",
+]
+
+
+def gerar_corpus(total, seed=42):
+    rng = random.Random(seed)
+    personality = LuaPersonality()
+    corpus = list(personality.response_style.values())
+    corpus.append(personality.get_greeting(rng.choice(NOMES)))
+    while len(corpus) < total:
+        corpus.append(rng.choice(MODELOS).format(
+            nome=rng.choice(NOMES),
+            valor=f"{rng.randint(1, 25000):,}".replace(",", ".") + f",{rng.randint(0, 99):02d}",
+            data=f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2025",
+            qtd=rng.randint(1, 120),
+        ))
+    return corpus[:total]
+
+
+def cronometrar(funcao, corpus):
+    start = time.perf_counter()
+    for texto in corpus:
+        funcao(texto)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, help="arquivo com uma resposta por linha")
+    parser.add_argument("--replies", type=int, default=300, help="respostas geradas (sem --corpus)")
+    args = parser.parse_args()
+
+    from kokoro import KPipeline
+
+    corpus = ([linha.strip() for linha in args.corpus.read_text(encoding="utf-8").splitlines() if linha.strip()]
+              if args.corpus else gerar_corpus(args.replies))
+    g2p = KPipeline(lang_code="p", model=False).g2p
+    g2p("aquecimento")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store_path = Path(tmp) / "phonemes.sqlite3"
+        store = PhonemeStore(store_path, "benchmark")
+        frontend = WordPhonemizer(g2p, "p", store)
+
+        resultados = [
+            ("G2P direto", cronometrar(g2p, corpus)),
+            ("normalização", cronometrar(normalizar_para_fala, corpus)),
+            ("cache frio", cronometrar(lambda t: frontend(normalizar_para_fala(t)), corpus)),
+            ("cache quente", cronometrar(lambda t: frontend(normalizar_para_fala(t)), corpus)),
+        ]
+        fonemizadas = frontend.misses
+
+        reiniciado = WordPhonemizer(g2p, "p", PhonemeStore(store_path, "benchmark"))
+        resultados.append(("reinício", cronometrar(lambda t: reiniciado(normalizar_para_fala(t)), corpus)))
+        palavras = sum(len(normalizar_para_fala(t).split()) for t in corpus)
+
+    print(f"\n📚 {len(corpus)} respostas, {palavras} palavras, {fonemizadas} palavras distintas fonemizadas")
+    print(f"\n{'caminho':<14}{'total ms':>10}{'ms/resposta':>13}")
+    base = resultados[0][1]
+    for nome, segundos in resultados:
+        print(f"{nome:<14}{segundos * 1000:>10.1f}{segundos * 1000 / len(corpus):>13.3f}"
+              + (f"   ({base / segundos:.1f}x)" if nome != "G2P direto" and segundos else ""))
+    print(f"\n📦 Após reinício: {reiniciado.stats()}")
+
+
+if __name__ == "__main__":
+    main()
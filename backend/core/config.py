@@ -26,21 +26,45 @@ class Settings(BaseSettings):
     device: str = "cpu"  # cpu, cuda, mps
     use_gpu: bool = False
     
+    # TTS engine: kokoro (Kokoro-82M, 24 kHz) or xtts (Coqui XTTS v2, needs the TTS package)
+    tts_engine: str = "kokoro"
+    
+    # Inference backend: torch (fp32), torch_int8 (dynamic quantization) or onnx
+    tts_backend: str = "torch"
+    inference_intra_op_threads: int = 0  # 0 = one per physical core
+    inference_inter_op_threads: int = 1
+    
     # Voice Settings
     default_voice: str = "pt-BR-f1"
     default_voice_code: str = "p"  # 'p' for Portuguese
     voice_speed: float = 1.0
+    phoneme_cache_size: int = 50000  # words kept in memory per language
+    
+    # Speculative synthesis of template replies from partial transcripts (/ws/conversation)
+    speculative_tts: bool = True
+    speculation_min_chars: int = 3
     
     # Paths
     base_dir: Path = Path(__file__).parent.parent
     models_dir: Path = base_dir / "models"
     voices_dir: Path = base_dir / "voices"
     temp_dir: Path = base_dir / "temp"
+    onnx_model_path: Path = models_dir / "kokoro-82m.onnx"  # written by export_kokoro_onnx.py
+    phoneme_cache_path: Path = models_dir / "phonemes.sqlite3"  # word -> phonemes, kept across restarts
     
     # Audio Settings
     sample_rate: int = 24000
     audio_format: str = "wav"
     
+    # Conversation state per user (see src/utils/session_store.py)
+    session_ttl: int = 3600  # idle seconds before a conversation is dropped
+    session_max_sessions: int = 1000
+    session_store_url: str = ""  # "", sqlite:///path.db or redis://host:6379/0
+    conversation_history_size: int = 100  # messages kept per conversation
+    
+    # Startup: seconds clients should wait (Retry-After) while models load
+    readiness_retry_after: int = 10
+    
     # Logging
     log_level: str = "INFO"
     
@@ -0,0 +1,103 @@
+"""
+Readiness tracking for model-backed services
+
+Models load in the background after the server starts accepting
+connections. Each component (TTS engine, assistant, STT) reports its
+stage and progress here; /health/ready and the voice routes read it to
+decide between serving and answering 503 with Retry-After.
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from fastapi import HTTPException
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+@dataclass
+class ComponentState:
+    """Load state of a single component"""
+    name: str
+    state: str = PENDING
+    stage: str = "waiting"
+    progress: float = 0.0
+    error: Optional[str] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = round((self.finished_at or time.time()) - self.started_at, 2)
+        return {
+            "state": self.state,
+            "stage": self.stage,
+            "progress": round(self.progress, 2),
+            "error": self.error,
+            "elapsed_seconds": elapsed,
+        }
+
+
+@dataclass
+class ReadinessTracker:
+    """Registry of component states shared by the lifespan task and routes"""
+    retry_after: int = 10
+    components: Dict[str, ComponentState] = field(default_factory=dict)
+
+    def register(self, name: str) -> ComponentState:
+        return self.components.setdefault(name, ComponentState(name))
+
+    def start(self, name: str, stage: str = "loading"):
+        component = self.register(name)
+        component.state = LOADING
+        component.stage = stage
+        component.progress = 0.0
+        component.error = None
+        component.started_at = time.time()
+        component.finished_at = None
+
+    def progress(self, name: str, stage: str, fraction: float):
+        component = self.register(name)
+        component.stage = stage
+        component.progress = max(0.0, min(1.0, fraction))
+
+    def ready(self, name: str, stage: str = "ready"):
+        component = self.register(name)
+        component.state = READY
+        component.stage = stage
+        component.progress = 1.0
+        component.finished_at = time.time()
+
+    def failed(self, name: str, error: str):
+        component = self.register(name)
+        component.state = FAILED
+        component.stage = "failed"
+        component.error = error
+        component.finished_at = time.time()
+
+    def is_ready(self, *names: str) -> bool:
+        names = names or tuple(self.components)
+        return all(name in self.components and self.components[name].state == READY for name in names)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {name: component.to_dict() for name, component in self.components.items()}
+
+    def require(self, *names: str):
+        """Raise 503 with Retry-After while any of the components is not ready"""
+        if self.is_ready(*names):
+            return
+        not_ready = {name: self.register(name).to_dict() for name in names
+                     if self.register(name).state != READY}
+        failed = any(state["state"] == FAILED for state in not_ready.values())
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "message": "Service failed to load" if failed else "Service is starting, retry shortly",
+                "components": not_ready,
+            },
+            headers={} if failed else {"Retry-After": str(self.retry_after)},
+        )
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Exporta o Kokoro-82M para ONNX (backend "onnx" do motor de voz)
+
+    python export_kokoro_onnx.py              # models/kokoro-82m.onnx + kokoro-82m.json (vocabulário)
+    python export_kokoro_onnx.py --int8       # pesos int8 (onnxruntime.quantization)
+    TTS_BACKEND=onnx python -m uvicorn backend.main:app
+
+Depois da exportação o grafo é executado no ONNX Runtime e comparado com
+o PyTorch na mesma entrada; use benchmark_tts_backends.py para o RTF.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import torch
+
+from backend.core.config import settings
+from backend.modules.tts.audio_quality import compare_audio
+
+SAMPLE_PHONEMES = "oˈla, ew ˈsow a lˈuɐ."
+OPSET = 17
+
+
+def export(output: Path):
+    from kokoro import KModel
+    from kokoro.model import KModelForONNX
+
+    # disable_complex: STFT sem tensores complexos (não suportados pelo exportador)
+    model = KModel(disable_complex=True).eval()
+    wrapper = KModelForONNX(model).eval()
+
+    input_ids = torch.LongTensor([[0, *(model.vocab[p] for p in SAMPLE_PHONEMES if p in model.vocab), 0]])
+    style = torch.randn(1, 256)
+    speed = torch.tensor([1.0])
+
+    print(f"📦 Exportando para {output} (opset {OPSET})...")
+    torch.onnx.export(
+        wrapper, (input_ids, style, speed), str(output),
+        input_names=["input_ids", "style", "speed"],
+        output_names=["waveform", "duration"],
+        dynamic_axes={"input_ids": {1: "tokens"}, "waveform": {0: "samples"}, "duration": {0: "tokens"}},
+        opset_version=OPSET,
+        do_constant_folding=True,
+    )
+    output.with_suffix(".json").write_text(
+        json.dumps({"vocab": model.vocab, "sample_rate": settings.sample_rate}, ensure_ascii=False),
+        encoding="utf-8"
+    )
+    return model, (input_ids, style, speed)
+
+
+def quantize_int8(source: Path) -> Path:
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    target = source.with_name(source.stem + "-int8.onnx")
+    print(f"🔢 Quantizando pesos para int8: {target}")
+    quantize_dynamic(str(source), str(target), weight_type=QuantType.QInt8)
+    target.with_suffix(".json").write_text(source.with_suffix(".json").read_text(encoding="utf-8"), encoding="utf-8")
+    return target
+
+
+def verify(model, inputs, onnx_path: Path):
+    """Mesma entrada no PyTorch e no ONNX Runtime"""
+    from backend.modules.tts.inference import create_onnx_session
+
+    input_ids, style, speed = inputs
+    with torch.no_grad():
+        reference, _ = model.forward_with_tokens(input_ids, style, 1.0)
+    session = create_onnx_session(onnx_path)
+    candidate = session.run(None, {
+        "input_ids": input_ids.numpy(), "style": style.numpy(), "speed": speed.numpy()
+    })[0]
+    metrics = compare_audio(reference.squeeze().numpy(), np.asarray(candidate).squeeze())
+    print(f"🔍 {onnx_path.name}: {metrics}")
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", type=Path, default=settings.onnx_model_path)
+    parser.add_argument("--int8", action="store_true", help="gera também a versão com pesos int8")
+    args = parser.parse_args()
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    model, inputs = export(args.output)
+    verify(model, inputs, args.output)
+    if args.int8:
+        verify(model, inputs, quantize_int8(args.output))
+    print("✅ Exportação concluída. Defina TTS_BACKEND=onnx (e ONNX_MODEL_PATH para o int8).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Teste de carga do banco SQLite com leituras e escritas concorrentes
+Simula vários workers do PM2/uvicorn acessando o mesmo arquivo e compara
+a conexão crua por requisição (padrão antigo) com o pool + PRAGMAs de
+src/utils/database.py
+
+Uso: python load_test_db.py [--workers 4] [--threads 4] [--seconds 10] [--write-ratio 0.2]
+"""
+
+import argparse
+import multiprocessing
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+SOURCE_DB = Path(__file__).parent / 'data' / 'joalheria.db'
+
+READ_SQL = """
+    SELECT type, SUM(amount), COUNT(*) FROM caixa_transaction
+    WHERE date >= ? GROUP BY type
+"""
+WRITE_SQL = """
+    INSERT INTO caixa_transaction (type, amount, date, description, created_at)
+    VALUES (?, ?, ?, 'load-test', CURRENT_TIMESTAMP)
+"""
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+def _run_op(conn, is_write):
+    cursor = conn.cursor()
+    if is_write:
+        cursor.execute(WRITE_SQL, (
+            random.choice(['entrada', 'saida']),
+            round(random.uniform(1, 500), 2),
+            datetime.now().isoformat(sep=' ')
+        ))
+        conn.commit()
+    else:
+        since = datetime.now() - timedelta(days=random.randint(1, 365))
+        cursor.execute(READ_SQL, (since.isoformat(sep=' '),))
+        cursor.fetchall()
+    cursor.close()
+
+
+def _worker(mode, db_path, threads, seconds, write_ratio, results):
+    """Processo que imita um worker do servidor com várias threads"""
+    if mode == 'tuned':
+        from src.utils.database import create_database_engine
+        engine = create_database_engine(f'sqlite:///{db_path}')
+        open_conn = engine.raw_connection
+    else:
+        def open_conn():
+            return sqlite3.connect(db_path)
+
+    stats = {'reads': 0, 'writes': 0, 'errors': 0, 'read_ms': [], 'write_ms': []}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def loop():
+        while time.perf_counter() < deadline:
+            is_write = random.random() < write_ratio
+            start = time.perf_counter()
+            conn = open_conn()
+            try:
+                _run_op(conn, is_write)
+                ok = True
+            except sqlite3.OperationalError:
+                ok = False
+            finally:
+                conn.close()
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                if not ok:
+                    stats['errors'] += 1
+                elif is_write:
+                    stats['writes'] += 1
+                    stats['write_ms'].append(elapsed)
+                else:
+                    stats['reads'] += 1
+                    stats['read_ms'].append(elapsed)
+
+    pool = [threading.Thread(target=loop) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    results.put(stats)
+
+
+def run_scenario(mode, args):
+    """Executa um cenário numa cópia descartável do banco"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / 'joalheria.db')
+        shutil.copy(SOURCE_DB, db_path)
+        if mode == 'default':
+            conn = sqlite3.connect(db_path)
+            conn.execute('PRAGMA journal_mode=DELETE')
+            conn.close()
+
+        results = multiprocessing.Queue()
+        procs = [
+            multiprocessing.Process(
+                target=_worker,
+                args=(mode, db_path, args.threads, args.seconds, args.write_ratio, results)
+            )
+            for _ in range(args.workers)
+        ]
+        for p in procs:
+            p.start()
+        merged = {'reads': 0, 'writes': 0, 'errors': 0, 'read_ms': [], 'write_ms': []}
+        for _ in procs:
+            stats = results.get()
+            for key, value in stats.items():
+                merged[key] += value
+        for p in procs:
+            p.join()
+
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4, help='processos (workers do PM2/uvicorn)')
+    parser.add_argument('--threads', type=int, default=4, help='threads por worker')
+    parser.add_argument('--seconds', type=float, default=10, help='duração de cada cenário')
+    parser.add_argument('--write-ratio', type=float, default=0.2, help='fração de escritas')
+    args = parser.parse_args()
+
+    if not SOURCE_DB.exists():
+        print(f"❌ Banco de dados não encontrado: {SOURCE_DB}")
+        return 1
+
+    print("=" * 60)
+    print(f"🧪 Carga SQLite: {args.workers} workers x {args.threads} threads, "
+          f"{args.seconds:.0f}s, {args.write_ratio:.0%} escritas")
+    print("=" * 60)
+
+    for mode, label in (('default', 'Conexão por requisição (padrão)'),
+                        ('tuned', 'Pool + WAL + PRAGMAs')):
+        stats = run_scenario(mode, args)
+        total = stats['reads'] + stats['writes']
+        print(f"\n📊 {label}")
+        print(f"   Operações/s:  {total / args.seconds:,.0f}")
+        print(f"   Leituras:     {stats['reads']:,} (p95 {_percentile(stats['read_ms'], 0.95):.1f} ms)")
+        print(f"   Escritas:     {stats['writes']:,} (p95 {_percentile(stats['write_ms'], 0.95):.1f} ms)")
+        print(f"   Erros (lock): {stats['errors']:,}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
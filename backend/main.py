@@ -2,8 +2,10 @@
 Lua TTS System - Main FastAPI Application
 Sistema de IA Conversacional com Kokoro-82M
 """
+import asyncio
 import os
 import sys
+import time
 from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Optional, Dict, Any, List
@@ -11,9 +13,9 @@ import json
 import base64
 from datetime import datetime
 
-from fastapi import FastAPI, HTTPException, File, UploadFile, Query
+from fastapi import Depends, FastAPI, HTTPException, File, UploadFile, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, JSONResponse, FileResponse
+from fastapi.responses import StreamingResponse, JSONResponse, FileResponse, Response
 from pydantic import BaseModel, Field
 import uvicorn
 
@@ -21,16 +23,53 @@ import uvicorn
 sys.path.append(str(Path(__file__).parent.parent))
 
 from backend.core import settings, logger
+from backend.core.readiness import ReadinessTracker
 from backend.modules.lua import LuaAssistant
-# Use the fixed version of TTS engine
-from backend.modules.tts.kokoro_engine_fixed import KokoroEngine
+from backend.modules.lua.speculation import SpeculativeSpeech
+from backend.modules.tts import KokoroEngine, create_tts_engine
 from backend.modules.stt.speech_recognition import SpeechRecognizer
+from backend.src.utils.metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE, QUEUE_DEPTH, REGISTRY as METRICS,
+    observe_request, observe_tts, register_process_metrics
+)
+from backend.src.utils.model_governor import model_governor
+from backend.src.utils.wav_audio import join_wav
 
 # Global instances
 lua_assistant: Optional[LuaAssistant] = None
 tts_engine: Optional[KokoroEngine] = None
 stt_engine: Optional[SpeechRecognizer] = None
 
+# Startup state: text routes serve at once, voice routes wait for the TTS model
+readiness = ReadinessTracker(retry_after=settings.readiness_retry_after)
+for component in ("stt_engine", "lua_assistant", "tts_engine"):
+    readiness.register(component)
+
+
+def require_tts():
+    """Dependency for voice routes: 503 + Retry-After until the model is loaded"""
+    readiness.require("tts_engine")
+
+# Metrics
+register_process_metrics()
+TTS_STREAMS = QUEUE_DEPTH.labels("tts_streams")
+MODEL_LOADED = METRICS.gauge("model_loaded", "Model loaded and ready (1) or not (0)", ("model",))
+MODEL_LOADED.labels(settings.model_name).set_function(
+    lambda: bool(tts_engine and tts_engine.is_initialized)
+)
+
+
+async def timed_speech(chunks, text: str):
+    """Relay audio chunks while recording synthesis time per character"""
+    TTS_STREAMS.inc()
+    start = time.perf_counter()
+    try:
+        async for chunk in chunks:
+            yield chunk
+        observe_tts(settings.model_name, time.perf_counter() - start, len(text))
+    finally:
+        TTS_STREAMS.dec()
+
 
 # Pydantic models
 class TTSRequest(BaseModel):
@@ -54,6 +93,24 @@ class ChatRequest(BaseModel):
     voice_response: Optional[bool] = Field(False, description="Return voice response")
     
 
+async def load_tts_engine():
+    """Load the TTS model in the background, reporting progress to readiness"""
+    readiness.start("tts_engine", "loading model")
+    try:
+        loaded = await tts_engine.initialize(
+            progress=lambda stage, fraction: readiness.progress("tts_engine", stage, fraction)
+        )
+    except Exception as e:
+        logger.error(f"❌ TTS engine failed to load: {e}")
+        readiness.failed("tts_engine", str(e))
+        return
+    if loaded:
+        readiness.ready("tts_engine")
+        logger.info("✅ TTS engine ready, voice routes enabled")
+    else:
+        readiness.failed("tts_engine", "TTS model failed to load (see logs)")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
@@ -65,39 +122,45 @@ async def lifespan(app: FastAPI):
     logger.info("=" * 50)
     
     try:
-        # Initialize TTS Engine
-        logger.info("Initializing TTS Engine...")
-        tts_engine = KokoroEngine()
-        await tts_engine.initialize()
-        
         # Initialize STT Engine
         logger.info("Initializing STT Engine...")
+        readiness.start("stt_engine")
         stt_engine = SpeechRecognizer()
+        readiness.ready("stt_engine")
         
-        # Initialize Lua Assistant
+        # Initialize Lua Assistant (text only; it shares the TTS engine below)
         logger.info("Initializing Lua Assistant...")
-        lua_assistant = LuaAssistant()
-        await lua_assistant.initialize()
-        
-        logger.info("=" * 50)
-        logger.info("✅ System ready!")
-        logger.info(f"🌐 API: http://{settings.host}:{settings.port}")
-        logger.info(f"📚 Docs: http://{settings.host}:{settings.port}/docs")
-        logger.info("=" * 50)
+        readiness.start("lua_assistant")
+        tts_engine = create_tts_engine()
+        lua_assistant = LuaAssistant(tts_engine=tts_engine)
+        await lua_assistant.initialize(load_tts=False)
+        readiness.ready("lua_assistant")
         
     except Exception as e:
         logger.error(f"❌ Startup failed: {e}")
         raise
         
+    # TTS model (download, load and warm-up) loads while the API already serves
+    logger.info("Loading TTS Engine in the background...")
+    tts_task = asyncio.create_task(load_tts_engine())
+    
+    logger.info("=" * 50)
+    logger.info("✅ API accepting requests (voice routes wait for the TTS model)")
+    logger.info(f"🌐 API: http://{settings.host}:{settings.port}")
+    logger.info(f"📚 Docs: http://{settings.host}:{settings.port}/docs")
+    logger.info("=" * 50)
+        
     yield
     
     # Shutdown
     logger.info("🛑 Shutting down Lua TTS System...")
     
+    if not tts_task.done():
+        tts_task.cancel()
     try:
         if lua_assistant:
             await lua_assistant.cleanup()
-        if tts_engine:
+        elif tts_engine:
             await tts_engine.cleanup()
     except Exception as e:
         logger.error(f"Shutdown error: {e}")
@@ -124,6 +187,21 @@ if settings.cors_enabled:
     )
 
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Latency per route template (time to response headers for streams)"""
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    observe_request(
+        request.method,
+        getattr(route, "path", "<unmatched>"),
+        response.status_code,
+        time.perf_counter() - start
+    )
+    return response
+
+
 # Routes
 @app.get("/")
 async def root():
@@ -135,6 +213,9 @@ async def root():
         "timestamp": datetime.now().isoformat(),
         "endpoints": {
             "health": "/health",
+            "live": "/health/live",
+            "ready": "/health/ready",
+            "metrics": "/metrics",
             "docs": "/docs",
             "voices": "/api/voice/voices",
             "speak": "/api/voice/speak",
@@ -145,20 +226,49 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint (always 200 while the process runs)"""
     return {
-        "status": "healthy",
+        "status": "healthy" if readiness.is_ready() else "starting",
         "timestamp": datetime.now().isoformat(),
         "services": {
-            "tts_engine": tts_engine is not None and tts_engine.is_initialized,
-            "lua_assistant": lua_assistant is not None and lua_assistant.is_initialized
+            "tts_engine": readiness.is_ready("tts_engine"),
+            "lua_assistant": readiness.is_ready("lua_assistant")
         }
     }
 
 
+@app.get("/health/live")
+async def liveness():
+    """Liveness: the process is up and the event loop responds"""
+    return {"status": "alive", "timestamp": datetime.now().isoformat()}
+
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness: every component loaded (503 + Retry-After while loading)"""
+    ready = readiness.is_ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "starting",
+            "timestamp": datetime.now().isoformat(),
+            "components": readiness.snapshot(),
+            # Unloaded-while-idle models still count as ready: they reload on the next request
+            "models": model_governor.snapshot()
+        },
+        headers=None if ready else {"Retry-After": str(readiness.retry_after)}
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics"""
+    return Response(METRICS.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 @app.get("/api/voice/voices")
 async def get_voices():
-    """Get available voices"""
+    """Get available voices (static catalog, served while the model loads)"""
     if not tts_engine:
         raise HTTPException(status_code=503, detail="TTS engine not initialized")
         
@@ -171,7 +281,7 @@ async def get_voices():
     }
 
 
-@app.post("/api/voice/speak")
+@app.post("/api/voice/speak", dependencies=[Depends(require_tts)])
 async def text_to_speech(request: TTSRequest):
     """Convert text to speech"""
     if not tts_engine:
@@ -181,11 +291,11 @@ async def text_to_speech(request: TTSRequest):
         logger.info(f"TTS request: '{request.text[:50]}...' with voice '{request.voice}'")
         
         async def audio_generator():
-            async for chunk in tts_engine.generate_speech(
+            async for chunk in timed_speech(tts_engine.generate_speech(
                 text=request.text,
                 voice=request.voice,
                 speed=request.speed
-            ):
+            ), request.text):
                 yield chunk
                 
         return StreamingResponse(
@@ -202,7 +312,7 @@ async def text_to_speech(request: TTSRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/api/voice/mix")
+@app.post("/api/voice/mix", dependencies=[Depends(require_tts)])
 async def mix_voices(request: VoiceMixRequest):
     """Generate speech with mixed voices"""
     if not tts_engine:
@@ -212,12 +322,12 @@ async def mix_voices(request: VoiceMixRequest):
         logger.info(f"Voice mix request: {len(request.voices)} voices")
         
         async def audio_generator():
-            async for chunk in tts_engine.mix_voices(
+            async for chunk in timed_speech(tts_engine.mix_voices(
                 text=request.text,
                 voices=request.voices,
                 weights=request.weights,
                 speed=request.speed
-            ):
+            ), request.text):
                 yield chunk
                 
         return StreamingResponse(
@@ -250,11 +360,13 @@ async def chat_with_lua(request: ChatRequest):
             context=request.context
         )
         
-        # Add voice response if requested
-        if request.voice_response and response["success"]:
-            audio_data = b""
-            async for chunk in lua_assistant.speak(response["response"]):
-                audio_data += chunk
+        # Add voice response if requested (text-only while the TTS model loads)
+        if request.voice_response and response["success"] and not readiness.is_ready("tts_engine"):
+            response["audio"] = None
+            response["audio_unavailable"] = "TTS model is still loading"
+        elif request.voice_response and response["success"]:
+            # One WAV per segment: merged into a single file (one RIFF header)
+            audio_data = join_wav([chunk async for chunk in lua_assistant.speak(response["response"])])
                 
             # Encode audio as base64
             response["audio"] = base64.b64encode(audio_data).decode("utf-8")
@@ -267,7 +379,7 @@ async def chat_with_lua(request: ChatRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/api/chat/voice")
+@app.post("/api/chat/voice", dependencies=[Depends(require_tts)])
 async def chat_with_voice_response(request: ChatRequest):
     """Chat with Lua and get voice response"""
     if not lua_assistant:
@@ -298,25 +410,25 @@ async def chat_with_voice_response(request: ChatRequest):
 
 
 @app.get("/api/chat/history")
-async def get_chat_history():
-    """Get chat history"""
+async def get_chat_history(user_id: Optional[str] = Query(None, description="Conversation owner")):
+    """Get a user's chat history"""
     if not lua_assistant:
         raise HTTPException(status_code=503, detail="Lua Assistant not initialized")
         
     return {
         "success": True,
-        "history": lua_assistant.get_conversation_history(),
+        "history": lua_assistant.get_conversation_history(user_id),
         "session_id": lua_assistant.session_id
     }
 
 
 @app.delete("/api/chat/history")
-async def clear_chat_history():
-    """Clear chat history"""
+async def clear_chat_history(user_id: Optional[str] = Query(None, description="Conversation owner")):
+    """Clear a user's chat history"""
     if not lua_assistant:
         raise HTTPException(status_code=503, detail="Lua Assistant not initialized")
         
-    lua_assistant.clear_conversation()
+    lua_assistant.clear_conversation(user_id)
     return {"success": True, "message": "Chat history cleared"}
 
 
@@ -356,12 +468,34 @@ async def websocket_conversation(websocket):
     await websocket.accept()
     logger.info("WebSocket connection established")
     
+    async def synthesize(text: str) -> bytes:
+        audio_chunks = []
+        async for chunk in timed_speech(tts_engine.generate_speech(text=text, voice="luna"), text):
+            audio_chunks.append(chunk)
+        return join_wav(audio_chunks)
+    
+    # Template replies are synthesized from partial transcripts while the user is still talking
+    speculation = SpeculativeSpeech(
+        lua_assistant.predict_response, synthesize, settings.speculation_min_chars
+    ) if settings.speculative_tts else None
+    
     try:
         while True:
             # Receive message from client
             data = await websocket.receive_json()
             
-            if data.get("type") == "audio":
+            if data.get("type") == "partial":
+                # Partial transcript (or audio so far) of an utterance in progress
+                text = data.get("text")
+                if text is None and data.get("audio"):
+                    result = await stt_engine.transcribe_audio(base64.b64decode(data["audio"]))
+                    text = result.get("transcript") if result.get("success") else None
+                    if text:
+                        await websocket.send_json({"type": "partial_transcript", "text": text})
+                if speculation and text and readiness.is_ready("tts_engine"):
+                    speculation.observe(text)
+            
+            elif data.get("type") == "audio":
                 # Handle audio data for STT
                 audio_data = base64.b64decode(data["audio"])
                 
@@ -389,20 +523,29 @@ async def websocket_conversation(websocket):
                         "text": response["response"]
                     })
                     
-                    # Generate and send audio response
-                    audio_chunks = []
-                    async for chunk in tts_engine.generate_speech(
-                        text=response["response"],
-                        voice="luna"
-                    ):
-                        audio_chunks.append(chunk)
+                    # Text only while the TTS model is still loading
+                    if not readiness.is_ready("tts_engine"):
+                        if speculation:
+                            speculation.cancel("tts not ready")
+                        await websocket.send_json({
+                            "type": "audio_unavailable",
+                            "retry_after": readiness.retry_after,
+                            "tts": readiness.snapshot().get("tts_engine")
+                        })
+                        continue
                     
-                    # Combine chunks and send
-                    audio_data = b"".join(audio_chunks)
-                    await websocket.send_json({
+                    # Reuse the speculative audio when the reply was predicted, else synthesize now
+                    audio_data, report = await speculation.take(response["response"]) if speculation else (None, None)
+                    if audio_data is None:
+                        audio_data = await synthesize(response["response"])
+                    
+                    message = {
                         "type": "audio",
                         "data": base64.b64encode(audio_data).decode("utf-8")
-                    })
+                    }
+                    if report:
+                        message["speculation"] = report.as_dict()
+                    await websocket.send_json(message)
                     
             elif data.get("type") == "text":
                 # Handle text message
@@ -423,6 +566,8 @@ async def websocket_conversation(websocket):
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
     finally:
+        if speculation:
+            speculation.cancel("connection closed")
         logger.info("WebSocket connection closed")
 
 
@@ -14,6 +14,9 @@ import bcrypt
 
 # Importar db primeiro
 from src.models.user import db
+from src.utils.database import configure_database, ensure_indexes, resolve_database_uri
+from src.utils.profiler import init_profiler
+from src.utils.lazy import warm_up
 
 # Importar modelos
 from src.models.user import User
@@ -61,6 +64,10 @@ from src.routes.sizes import sizes_bp # Importar rota sizes_bp
 # Importar rotas aprimoradas
 from src.routes.enhanced_jewelry import enhanced_jewelry_bp
 from src.routes.enhanced_employee import enhanced_employee_bp
+from src.routes.admin_profiler import admin_profiler_bp
+from src.routes.exports import exports_bp
+from src.routes.imports import imports_bp
+from src.routes.metrics import init_metrics
 from src.routes.dashboard import dashboard_bp
 from src.routes.ai_assistant import ai_bp  # Rota da IA Lua
 from src.routes.ai_assistant_enhanced import ai_enhanced_bp  # Rota da IA Lua Melhorada
@@ -106,14 +113,18 @@ DATA_DIR.mkdir(exist_ok=True)  # Criar pasta data se não existir
 
 # Usar caminho relativo que funciona em Windows e Linux
 DATABASE_PATH = DATA_DIR / 'joalheria.db'
-app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{str(DATABASE_PATH)}'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-change-me')
 if app.config['SECRET_KEY'] == 'dev-secret-change-me':
     print("⚠️  WARNING: Using default SECRET_KEY. Set SECRET_KEY environment variable for production!")
 
-# Inicializar extensões
-db.init_app(app)
+# Inicializar extensões (WAL, PRAGMAs e pool compartilhado)
+# ERP_DATABASE_URL=postgresql://... troca o backend sem mudar as rotas
+DATABASE_URI = resolve_database_uri(DATABASE_PATH)
+configure_database(app, DATABASE_URI)
+# SQL/tempo/tamanho por requisição (Server-Timing) e consultas lentas em logs/
+init_profiler(app)
+# Métricas no formato do Prometheus em /metrics
+init_metrics(app)
 CORS(app, resources={
     r"/*": {
         "origins": ["http://localhost:3000", "http://127.0.0.1:3000", "http://localhost:5173", "http://localhost:5174", "http://localhost:5175", "http://localhost:5176"],
@@ -344,6 +355,10 @@ app.register_blueprint(sizes_bp, url_prefix="/api") # Registrar rota sizes_bp
 # Registrar rotas aprimoradas
 app.register_blueprint(enhanced_jewelry_bp, url_prefix="/api")
 app.register_blueprint(enhanced_employee_bp, url_prefix="/api")
+app.register_blueprint(admin_profiler_bp, url_prefix="/api")
+# Exportação de relatórios em CSV/XLSX/PDF (fluxo ou job)
+app.register_blueprint(exports_bp, url_prefix="/api")
+app.register_blueprint(imports_bp, url_prefix="/api")
 
 
 def create_or_get_user(username, email, password, is_admin=True):
@@ -395,6 +410,8 @@ def init_database():
         with app.app_context():
             db.create_all()
             print(f"✅ Banco de dados criado em: {DATABASE_PATH}")
+            for index_name in ensure_indexes():
+                print(f"✅ Índice criado: {index_name}")
 
             # Criar usuários administradores usando helper robusto
             print("🔧 Criando usuários administradores...")
@@ -566,6 +583,11 @@ if __name__ == '__main__':
         print("✅ Sistema pronto para uso!")
         print("="*50 + "\n")
 
+        # Voz/consciência da LUA (torch, TTS) carregam em segundo plano;
+        # as rotas do ERP já respondem enquanto o modelo é carregado
+        if os.getenv("LUA_WARMUP", "1") == "1":
+            warm_up()
+
         import os
         debug_mode = os.getenv("FLASK_DEBUG", "0") == "1"
         port = int(os.getenv("PORT", 5000))
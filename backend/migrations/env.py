@@ -0,0 +1,70 @@
+"""
+Ambiente do Alembic para o banco do ERP
+Usa o mesmo metadata do Flask-SQLAlchemy e a mesma fábrica de engine das rotas
+"""
+import sys
+from logging.config import fileConfig
+from pathlib import Path
+
+from alembic import context
+
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from src.models.user import db
+# Importar todos os modelos para registrar as tabelas no metadata
+import src.models  # noqa: F401
+from src.models.pattern_image import PatternImage  # noqa: F401
+from src.models.report_history import ReportHistory  # noqa: F401
+from src.models.size import Size  # noqa: F401
+from src.utils.database import create_database_engine, resolve_database_uri
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = db.metadata
+DATABASE_URI = resolve_database_uri(backend_dir / 'data' / 'joalheria.db')
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """Tabelas/colunas legadas sem modelo (joias, padroes...) não são removidas pelo autogenerate"""
+    if reflected and compare_to is None:
+        return False
+    return True
+
+
+def run_migrations_offline():
+    """Gera o SQL das migrações sem conectar ao banco"""
+    context.configure(
+        url=DATABASE_URI,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=DATABASE_URI.startswith("sqlite"),
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Aplica as migrações conectando ao banco configurado"""
+    engine = create_database_engine(DATABASE_URI)
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+            # SQLite não suporta ALTER TABLE completo: recriar a tabela em lote
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+    engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
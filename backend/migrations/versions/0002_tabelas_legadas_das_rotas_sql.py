@@ -0,0 +1,97 @@
+"""tabelas e colunas legadas usadas pelas rotas com SQL puro
+
+As rotas enhanced_jewelry/enhanced_employee leem a tabela "joias" e colunas
+extras de "employee" que vieram da importação do sistema antigo e não estão
+nos modelos. Esta revisão as cria em bancos novos (ex.: PostgreSQL) e não
+altera bancos SQLite que já as possuem.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 06:40:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+EMPLOYEE_LEGACY_COLUMNS = [
+    ('rg', sa.Text()),
+    ('data_nascimento', sa.Text()),
+    ('endereco', sa.Text()),
+    ('telefone', sa.Text()),
+    ('foto_path', sa.Text()),
+    ('cargo', sa.Text()),
+    ('data_admissao', sa.Text()),
+    ('naturalidade', sa.Text()),
+    ('estado_civil', sa.Text()),
+    ('nome_mae', sa.Text()),
+    ('nome_pai', sa.Text()),
+    ('id_original', sa.Integer()),
+]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    existing = {col['name'] for col in inspector.get_columns('employee')}
+    missing = [(name, type_) for name, type_ in EMPLOYEE_LEGACY_COLUMNS if name not in existing]
+    if missing:
+        with op.batch_alter_table('employee') as batch_op:
+            for name, type_ in missing:
+                batch_op.add_column(sa.Column(name, type_, nullable=True))
+
+    if 'padroes' not in tables:
+        op.create_table('padroes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('nome', sa.Text(), nullable=False),
+        sa.Column('descricao', sa.Text(), nullable=True),
+        sa.Column('imagem_path', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.current_timestamp(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('idx_padroes_nome', 'padroes', ['nome'])
+
+    if 'joias' not in tables:
+        op.create_table('joias',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('id_padrao', sa.Integer(), nullable=True),
+        sa.Column('nome', sa.Text(), nullable=True),
+        sa.Column('peso', sa.Float(), nullable=True),
+        sa.Column('preco', sa.Float(), nullable=True),
+        sa.Column('estoque', sa.Integer(), server_default='0', nullable=True),
+        sa.Column('imagem_path', sa.Text(), nullable=True),
+        sa.Column('descricao', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.current_timestamp(), nullable=True),
+        sa.Column('id_original', sa.Integer(), nullable=True),
+        sa.Column('descricao_completa', sa.Text(), nullable=True),
+        sa.Column('preco_material', sa.Float(), nullable=True),
+        sa.Column('preco_pedra', sa.Float(), nullable=True),
+        sa.Column('preco_tempo', sa.Float(), nullable=True),
+        sa.Column('preco_venda_0', sa.Float(), nullable=True),
+        sa.Column('preco_venda_1', sa.Float(), nullable=True),
+        sa.Column('preco_venda_2', sa.Float(), nullable=True),
+        sa.Column('lucro_margem_1', sa.Float(), nullable=True),
+        sa.Column('lucro_margem_2', sa.Float(), nullable=True),
+        sa.Column('quantidade_minima', sa.Integer(), nullable=True),
+        sa.Column('preco_web', sa.Float(), nullable=True),
+        sa.Column('joias_relacionadas', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['id_padrao'], ['padroes.id']),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('idx_joias_padrao', 'joias', ['id_padrao'])
+        op.create_index('idx_joias_nome', 'joias', ['nome'])
+
+
+def downgrade():
+    """
+    Sem efeito de propósito. upgrade() só cria o que falta, e num banco que
+    veio do sistema antigo (ex.: data/joalheria.db) "padroes", "joias" e as
+    colunas extras de "employee" já existiam com o catálogo e o cadastro
+    legados. Não há como saber aqui quem os criou, e apagá-los destruiria
+    esses dados; num banco novo as tabelas vazias podem ficar.
+    """
@@ -0,0 +1,39 @@
+"""índices compostos das consultas por período
+
+Vales por funcionário/data, folha por funcionário/competência, encomendas por
+status/data de criação e caixa por data/tipo. Índices que já existirem (criados
+por ensure_indexes() em bancos sem Alembic) são mantidos.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 09:10:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_vale_employee_date', 'vale', ['employee_id', 'date']),
+    ('ix_payroll_employee_period', 'payroll', ['employee_id', 'year', 'month']),
+    ('ix_order_status_created_at', 'order', ['status', 'created_at']),
+    ('ix_order_created_at', 'order', ['created_at']),
+    ('ix_caixa_transaction_date_type', 'caixa_transaction', ['date', 'type']),
+]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        existing = {index['name'] for index in inspector.get_indexes(table)}
+        if name not in existing:
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,44 @@
+"""agregados de relatório por dia, semana e mês
+
+Tabelas report_rollup (contagem e soma por série, chave e período) e
+report_rollup_state (séries já construídas). Os agregados são montados das
+linhas brutas no primeiro acesso de cada série, então a migração não os
+preenche.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 14:20:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    if 'report_rollup' not in tables:
+        op.create_table('report_rollup',
+        sa.Column('serie', sa.String(length=50), nullable=False),
+        sa.Column('key', sa.String(length=100), nullable=False),
+        sa.Column('granularity', sa.String(length=5), nullable=False),
+        sa.Column('period_start', sa.Date(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('total', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('serie', 'key', 'granularity', 'period_start')
+        )
+    if 'report_rollup_state' not in tables:
+        op.create_table('report_rollup_state',
+        sa.Column('serie', sa.String(length=50), nullable=False),
+        sa.Column('built_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('serie')
+        )
+
+
+def downgrade():
+    op.drop_table('report_rollup_state')
+    op.drop_table('report_rollup')
@@ -0,0 +1,29 @@
+"""índice de pagamentos por funcionário/data
+
+A nota de folha de pagamento (/payroll/<id>/note) passou a ser limitada a um
+período; pagamentos por funcionário e data usam este índice, como os vales
+usam ix_vale_employee_date.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 15:40:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    existing = {index['name'] for index in inspector.get_indexes('payment')}
+    if 'ix_payment_employee_date' not in existing:
+        op.create_index('ix_payment_employee_date', 'payment', ['employee_id', 'date'])
+
+
+def downgrade():
+    op.drop_index('ix_payment_employee_date', table_name='payment')
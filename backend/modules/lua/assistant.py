@@ -2,35 +2,68 @@
 Lua AI Assistant Core Module
 """
 import asyncio
-from typing import Optional, Dict, Any, List, AsyncGenerator
+from collections import deque
+from typing import Optional, Dict, Any, List, AsyncGenerator, Tuple
 from datetime import datetime
 import json
 
+from backend.core import settings
 from backend.core.logger import logger
 from backend.modules.tts.kokoro_engine import KokoroEngine
+from backend.src.utils.session_store import SessionStore, create_backend
 from .personality import LuaPersonality
 
+ANONYMOUS = "anonymous"
+
+
+class ConversationState:
+    """One user's conversation: the last messages, oldest dropped first"""
+    
+    def __init__(self):
+        self.history = deque(maxlen=settings.conversation_history_size)
+        
+    def to_dict(self) -> Dict[str, Any]:
+        return {"history": list(self.history)}
+        
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ConversationState":
+        state = cls()
+        state.history.extend(data.get("history", []))
+        return state
+
 
 class LuaAssistant:
     """Main Lua Assistant class"""
     
-    def __init__(self):
-        """Initialize Lua Assistant"""
+    def __init__(self, tts_engine=None):
+        """Initialize Lua Assistant (optionally sharing an already created TTS engine)"""
         self.personality = LuaPersonality()
-        self.tts_engine = KokoroEngine()
-        self.conversation_history: List[Dict[str, Any]] = []
+        self.tts_engine = tts_engine or KokoroEngine()
+        # Conversation history per user, bounded in sessions, age and length
+        self.conversations = SessionStore(
+            "conversation", ConversationState,
+            ttl=settings.session_ttl,
+            max_sessions=settings.session_max_sessions,
+            backend=create_backend(settings.session_store_url)
+        )
         self.is_initialized = False
         self.session_id: Optional[str] = None
         
-    async def initialize(self) -> bool:
-        """Initialize all components"""
+    async def initialize(self, load_tts: bool = True) -> bool:
+        """
+        Initialize all components
+
+        With ``load_tts=False`` only the text side is set up; the shared
+        TTS engine is loaded separately (in the background at startup).
+        """
         try:
             logger.info("Initializing Lua Assistant...")
             
             # Initialize TTS engine
-            if not await self.tts_engine.initialize():
-                logger.error("Failed to initialize TTS engine")
-                return False
+            if load_tts and not self.tts_engine.is_initialized:
+                if not await self.tts_engine.initialize():
+                    logger.error("Failed to initialize TTS engine")
+                    return False
                 
             # Generate session ID
             self.session_id = f"lua_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
@@ -64,23 +97,22 @@ class LuaAssistant:
             await self.initialize()
             
         try:
-            # Log conversation
-            self.conversation_history.append({
-                "timestamp": datetime.now().isoformat(),
-                "user_id": user_id,
-                "role": "user",
-                "message": message
-            })
-            
             # Generate response (placeholder for LLM integration)
             response_text = await self._generate_response(message, context)
             
-            # Log response
-            self.conversation_history.append({
-                "timestamp": datetime.now().isoformat(),
-                "role": "assistant",
-                "message": response_text
-            })
+            # Log the exchange in the user's conversation
+            with self.conversations.session(user_id or ANONYMOUS) as conversation:
+                conversation.history.append({
+                    "timestamp": datetime.now().isoformat(),
+                    "user_id": user_id,
+                    "role": "user",
+                    "message": message
+                })
+                conversation.history.append({
+                    "timestamp": datetime.now().isoformat(),
+                    "role": "assistant",
+                    "message": response_text
+                })
             
             return {
                 "success": True,
@@ -111,36 +143,50 @@ class LuaAssistant:
         Generate response based on message
         This is a placeholder for LLM integration
         """
+        return self._classify(message)[1]
+        
+    def predict_response(self, partial_message: str) -> Optional[Tuple[str, str]]:
+        """
+        (intent, reply) for a partial transcript when the reply is already known
+
+        Only template intents qualify: their reply does not depend on the rest
+        of the sentence. The fallback echoes the message, so it is never predicted.
+        """
+        intent, response = self._classify(partial_message)
+        return None if intent == "fallback" else (intent, response)
+        
+    def _classify(self, message: str) -> Tuple[str, str]:
+        """Rule-based intent and reply"""
         # Simple rule-based responses for now
         message_lower = message.lower().strip()
         
         # Greetings
         if any(word in message_lower for word in ["olá", "oi", "bom dia", "boa tarde", "boa noite"]):
-            return self.personality.get_greeting()
+            return "greeting", self.personality.get_greeting()
             
         # Farewells
         elif any(word in message_lower for word in ["tchau", "até logo", "adeus", "até mais"]):
-            return self.personality.get_response("farewell")
+            return "farewell", self.personality.get_response("farewell")
             
         # Thanks
         elif any(word in message_lower for word in ["obrigado", "obrigada", "valeu", "thanks"]):
-            return self.personality.get_response("thanks")
+            return "thanks", self.personality.get_response("thanks")
             
         # About Lua
         elif "quem é você" in message_lower or "seu nome" in message_lower:
-            return "Eu sou a Lua! 🌙 Sou sua assistente virtual, criada para ajudar você com diversas tarefas. Posso conversar, responder perguntas e até mesmo falar com você usando minha voz!"
+            return "about", "Eu sou a Lua! 🌙 Sou sua assistente virtual, criada para ajudar você com diversas tarefas. Posso conversar, responder perguntas e até mesmo falar com você usando minha voz!"
             
         # Capabilities
         elif "o que você pode fazer" in message_lower or "suas capacidades" in message_lower:
-            return "Posso fazer muitas coisas! 🎯 Conversar com você, responder perguntas, gerar áudio com diferentes vozes, e muito mais. Estou sempre aprendendo coisas novas!"
+            return "capabilities", "Posso fazer muitas coisas! 🎯 Conversar com você, responder perguntas, gerar áudio com diferentes vozes, e muito mais. Estou sempre aprendendo coisas novas!"
             
         # Voice
         elif "sua voz" in message_lower or "falar" in message_lower:
-            return "Sim! Eu posso falar com você usando minha voz. Uso a tecnologia Kokoro para gerar fala natural em português brasileiro. Quer me ouvir falando?"
+            return "voice", "Sim! Eu posso falar com você usando minha voz. Uso a tecnologia Kokoro para gerar fala natural em português brasileiro. Quer me ouvir falando?"
             
         # Default response
         else:
-            return f"Entendi sua mensagem: '{message}'. Ainda estou aprendendo, mas farei o meu melhor para ajudar! Como posso ser útil?"
+            return "fallback", f"Entendi sua mensagem: '{message}'. Ainda estou aprendendo, mas farei o meu melhor para ajudar! Como posso ser útil?"
             
     async def speak(
         self,
@@ -202,20 +248,20 @@ class LuaAssistant:
             ):
                 yield audio_chunk
                 
-    def get_conversation_history(self) -> List[Dict[str, Any]]:
-        """Get conversation history"""
-        return self.conversation_history
+    def get_conversation_history(self, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get a user's conversation history"""
+        conversation = self.conversations.get(user_id or ANONYMOUS)
+        return conversation["history"] if conversation else []
         
-    def clear_conversation(self):
-        """Clear conversation history"""
-        self.conversation_history.clear()
+    def clear_conversation(self, user_id: Optional[str] = None):
+        """Clear a user's conversation history"""
+        self.conversations.discard(user_id or ANONYMOUS)
         logger.info("Conversation history cleared")
         
     async def cleanup(self):
         """Clean up resources"""
         try:
             await self.tts_engine.cleanup()
-            self.conversation_history.clear()
             self.is_initialized = False
             logger.info("Lua Assistant cleaned up")
         except Exception as e:
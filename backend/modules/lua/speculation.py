@@ -0,0 +1,145 @@
+"""
+Speculative speech synthesis for the conversation WebSocket
+
+While the user is still talking the client sends partial transcripts. When
+a partial already determines the reply (greeting, thanks, other template
+intents), the reply is synthesized in the background. If the final reply
+matches, its audio is ready (or partly done) when it is needed; otherwise
+the speculative synthesis is cancelled.
+
+Each turn records the latency saved (synthesis time already spent when the
+reply was confirmed) and the wasted compute (synthesis time of discarded
+speculations).
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Optional
+
+from backend.core.logger import logger
+from backend.src.utils.metrics import REGISTRY
+
+SPECULATIONS = REGISTRY.counter(
+    "tts_speculations_total", "Speculative syntheses by outcome (used, cancelled, unused)", ("outcome",)
+)
+SPECULATION_SAVED = REGISTRY.counter(
+    "tts_speculation_saved_seconds_total", "Reply latency saved by speculative synthesis"
+)
+SPECULATION_WASTED = REGISTRY.counter(
+    "tts_speculation_wasted_seconds_total", "Synthesis time spent on discarded speculations"
+)
+
+
+@dataclass
+class Speculation:
+    intent: str
+    text: str
+    task: asyncio.Task
+    started: float = field(default_factory=time.perf_counter)
+    finished: Optional[float] = None
+
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    def _done(self, task: asyncio.Task):
+        self.finished = time.perf_counter()
+        if not task.cancelled():
+            # Retrieved here so a discarded failure is not logged as "never retrieved"
+            task.exception()
+
+
+@dataclass
+class SpeculationReport:
+    """Outcome of one turn, sent to the client with the audio"""
+    used: bool
+    intent: Optional[str] = None
+    saved_ms: float = 0.0
+    wasted_ms: float = 0.0
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "used": self.used,
+            "intent": self.intent,
+            "saved_ms": round(self.saved_ms),
+            "wasted_ms": round(self.wasted_ms),
+        }
+
+
+class SpeculativeSpeech:
+    """One per connection: at most one speculation in flight"""
+
+    def __init__(
+        self,
+        predict: Callable[[str], Optional[tuple]],
+        synthesize: Callable[[str], Awaitable[bytes]],
+        min_chars: int = 3,
+    ):
+        self.predict = predict
+        self.synthesize = synthesize
+        self.min_chars = min_chars
+        self.current: Optional[Speculation] = None
+        self.wasted = 0.0  # discarded synthesis time since the last turn
+
+    def observe(self, partial_text: str) -> Optional[str]:
+        """Feed a partial transcript; returns the intent being speculated, if any"""
+        if len(partial_text.strip()) < self.min_chars:
+            return None
+        prediction = self.predict(partial_text)
+        if prediction is None:
+            # Not conclusive yet: keep what is running, the next partial may confirm it
+            return self.current.intent if self.current else None
+
+        intent, text = prediction
+        if self.current and self.current.text == text:
+            return intent
+        self.cancel("prediction changed")
+        self.current = Speculation(intent, text, asyncio.create_task(self.synthesize(text)))
+        self.current.task.add_done_callback(self.current._done)
+        logger.info(f"🔮 Speculating reply for intent '{intent}'")
+        return intent
+
+    async def take(self, reply_text: str) -> tuple:
+        """
+        Audio for the confirmed reply if it was speculated: (audio or None, report)
+
+        A mismatching speculation is cancelled; the caller synthesizes normally.
+        """
+        speculation, self.current = self.current, None
+        wasted, self.wasted = self.wasted, 0.0
+
+        if speculation is None:
+            return None, self._report(SpeculationReport(False, wasted_ms=wasted * 1000))
+        if speculation.text != reply_text:
+            wasted += self._discard(speculation, "unused")
+            return None, self._report(SpeculationReport(False, speculation.intent, wasted_ms=wasted * 1000))
+
+        saved = speculation.elapsed()
+        try:
+            audio = await speculation.task
+        except Exception as e:
+            logger.warning(f"Speculative synthesis failed, synthesizing again: {e}")
+            return None, self._report(SpeculationReport(False, speculation.intent, wasted_ms=(wasted + saved) * 1000))
+        SPECULATIONS.labels("used").inc()
+        SPECULATION_SAVED.inc(saved)
+        return audio, self._report(SpeculationReport(True, speculation.intent, saved * 1000, wasted * 1000))
+
+    def cancel(self, reason: str = "cancelled"):
+        if self.current:
+            self.wasted += self._discard(self.current, "cancelled")
+            logger.info(f"🗑️ Speculation '{self.current.intent}' discarded ({reason})")
+            self.current = None
+
+    def _discard(self, speculation: Speculation, outcome: str) -> float:
+        speculation.task.cancel()
+        spent = speculation.elapsed()
+        SPECULATIONS.labels(outcome).inc()
+        SPECULATION_WASTED.inc(spent)
+        return spent
+
+    def _report(self, report: SpeculationReport) -> SpeculationReport:
+        if report.used or report.wasted_ms:
+            logger.info(
+                f"🔮 Speculation {'used' if report.used else 'not used'}: "
+                f"saved {report.saved_ms:.0f} ms, wasted {report.wasted_ms:.0f} ms"
+            )
+        return report
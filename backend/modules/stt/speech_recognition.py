@@ -1,10 +1,12 @@
 """
 Speech-to-Text module for Lua TTS System
 """
+import asyncio
 import os
 import tempfile
 import wave
 import json
+import time
 from typing import Optional, Dict, Any
 from pathlib import Path
 import logging
@@ -14,8 +16,14 @@ import speech_recognition as sr
 from pydub import AudioSegment
 from pydub.silence import split_on_silence
 
+from backend.src.utils.metrics import observe_stt
+from backend.src.utils.model_governor import model_governor
+
 logger = logging.getLogger(__name__)
 
+# Base model: balance between speed and accuracy
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
+
 
 class SpeechRecognizer:
     """Speech-to-Text engine with multiple providers support"""
@@ -75,7 +83,10 @@ class SpeechRecognizer:
                 audio = self.recognizer.record(source)
             
             # Transcribe using selected provider
+            start = time.perf_counter()
             result = await self.providers[provider](audio, language)
+            audio_seconds = len(audio.frame_data) / (audio.sample_rate * audio.sample_width)
+            observe_stt(provider, time.perf_counter() - start, audio_seconds)
             
             # Clean up temp file
             os.unlink(temp_path)
@@ -175,15 +186,20 @@ class SpeechRecognizer:
                 tmp.write(audio.get_wav_data())
                 temp_path = tmp.name
             
-            # Load Whisper model (base model for balance between speed and accuracy)
-            model = whisper.load_model("base")
+            # Kept loaded between requests; the governor unloads it after MODEL_IDLE_TTL_WHISPER
+            if "whisper" not in model_governor:
+                model_governor.register("whisper", loader=lambda: whisper.load_model(WHISPER_MODEL))
             
-            # Transcribe
-            result = model.transcribe(
-                temp_path,
-                language=language[:2],  # Whisper uses 2-letter codes
-                fp16=False
-            )
+            def transcribe():
+                with model_governor.use("whisper") as model:
+                    return model.transcribe(
+                        temp_path,
+                        language=language[:2],  # Whisper uses 2-letter codes
+                        fp16=False
+                    )
+            
+            # Transcribe off the event loop
+            result = await asyncio.to_thread(transcribe)
             
             # Clean up
             os.unlink(temp_path)
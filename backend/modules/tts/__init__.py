@@ -1,6 +1,20 @@
 """
 TTS Module for Lua System
 """
+from backend.core.config import settings
+from backend.core.logger import logger
 from .kokoro_engine import KokoroEngine
 
-__all__ = ["KokoroEngine"]
\ No newline at end of file
+__all__ = ["KokoroEngine", "create_tts_engine"]
+
+
+def create_tts_engine(name=None):
+    """TTS engine selected by ``Settings.tts_engine`` (both share the KokoroEngine interface)"""
+    name = (name or settings.tts_engine).lower()
+    if name == "xtts":
+        # Imported only when selected: pulls in the Coqui TTS package
+        from .kokoro_engine_fixed import KokoroEngine as XttsEngine
+        return XttsEngine()
+    if name != "kokoro":
+        logger.warning(f"Unknown TTS engine '{name}', using 'kokoro'")
+    return KokoroEngine()
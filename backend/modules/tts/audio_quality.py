@@ -0,0 +1,53 @@
+"""
+Audio-quality metrics for comparing TTS inference backends
+
+Quantized or ONNX models may shift predicted durations by a frame or two,
+so the comparison does not assume sample alignment: it uses the distance
+between long-term average log spectra (LTAS, in dB) plus the duration ratio,
+and the frame-wise log-spectral distance only over the overlapping part.
+"""
+from typing import Dict
+
+import numpy as np
+
+N_FFT = 1024
+HOP = 256
+
+
+def _log_power_spectrogram(audio: np.ndarray) -> np.ndarray:
+    audio = np.asarray(audio, dtype=np.float64).ravel()
+    if len(audio) < N_FFT:
+        audio = np.pad(audio, (0, N_FFT - len(audio)))
+    window = np.hanning(N_FFT)
+    frames = np.lib.stride_tricks.sliding_window_view(audio, N_FFT)[::HOP] * window
+    power = np.abs(np.fft.rfft(frames, axis=1)) ** 2
+    return 10 * np.log10(power + 1e-10)
+
+
+def ltas_distance_db(reference: np.ndarray, candidate: np.ndarray) -> float:
+    """RMS difference (dB) between the long-term average spectra"""
+    ref = _log_power_spectrogram(reference).mean(axis=0)
+    cand = _log_power_spectrogram(candidate).mean(axis=0)
+    return float(np.sqrt(np.mean((ref - cand) ** 2)))
+
+
+def log_spectral_distance_db(reference: np.ndarray, candidate: np.ndarray) -> float:
+    """Mean frame-wise log-spectral distance (dB) over the overlapping frames"""
+    ref = _log_power_spectrogram(reference)
+    cand = _log_power_spectrogram(candidate)
+    frames = min(len(ref), len(cand))
+    return float(np.mean(np.sqrt(np.mean((ref[:frames] - cand[:frames]) ** 2, axis=1))))
+
+
+def compare_audio(reference: np.ndarray, candidate: np.ndarray) -> Dict[str, float]:
+    return {
+        "ltas_db": round(ltas_distance_db(reference, candidate), 3),
+        "lsd_db": round(log_spectral_distance_db(reference, candidate), 3),
+        "duration_ratio": round(len(candidate) / max(len(reference), 1), 4),
+    }
+
+
+def real_time_factor(synthesis_seconds: float, samples: int, sample_rate: int) -> float:
+    """Synthesis time divided by audio duration (< 1 is faster than real time)"""
+    duration = samples / sample_rate
+    return synthesis_seconds / duration if duration else float("inf")
@@ -0,0 +1,149 @@
+"""
+Inference backends for the TTS engines (CPU deployments)
+
+``Settings.tts_backend`` selects how the acoustic model runs:
+
+- ``torch``: fp32 PyTorch (reference quality)
+- ``torch_int8``: PyTorch with dynamic int8 quantization of Linear/LSTM
+  layers (weights stored as int8, activations quantized on the fly)
+- ``onnx``: ONNX Runtime session over an exported Kokoro-82M graph
+  (see ``export_kokoro_onnx.py``), with tuned intra/inter-op threads
+
+The ONNX model is a drop-in for ``kokoro.KModel`` inside ``KPipeline``:
+the pipeline still does G2P (misaki) and voice-pack lookup, only the
+forward pass changes.
+"""
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import torch
+
+from backend.core.config import settings
+from backend.core.logger import logger
+
+BACKENDS = ("torch", "torch_int8", "onnx")
+QUANTIZABLE_LAYERS = {torch.nn.Linear, torch.nn.LSTM}
+
+
+def resolve_backend(requested: Optional[str] = None, supports_onnx: bool = True) -> str:
+    """Validated backend name; engines without an ONNX graph use int8 instead"""
+    backend = (requested or settings.tts_backend).lower()
+    if backend not in BACKENDS:
+        logger.warning(f"Unknown TTS backend '{backend}', using 'torch'")
+        return "torch"
+    if backend == "onnx" and not supports_onnx:
+        logger.warning("ONNX backend not available for this engine, using 'torch_int8'")
+        return "torch_int8"
+    return backend
+
+
+def quantize_dynamic_int8(module: torch.nn.Module) -> torch.nn.Module:
+    """Dynamic int8 quantization of Linear/LSTM layers (CPU only)"""
+    torch.backends.quantized.engine = _quantized_engine()
+    # In place: copying a ~1.8 GB XTTS model would double peak memory
+    quantized = torch.ao.quantization.quantize_dynamic(
+        module.cpu().eval(), QUANTIZABLE_LAYERS, dtype=torch.qint8, inplace=True
+    )
+    logger.info(f"Quantized {type(module).__name__} to int8 ({torch.backends.quantized.engine})")
+    return quantized
+
+
+def _quantized_engine() -> str:
+    engines = torch.backends.quantized.supported_engines
+    # x86 (fbgemm successor) on Intel/AMD, qnnpack on ARM
+    for engine in ("x86", "fbgemm", "qnnpack"):
+        if engine in engines:
+            return engine
+    return engines[0]
+
+
+def create_onnx_session(model_path: Path):
+    """ONNX Runtime CPU session with the deployment's thread settings"""
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    # 0 lets ONNX Runtime use one thread per physical core
+    options.intra_op_num_threads = settings.inference_intra_op_threads
+    options.inter_op_num_threads = settings.inference_inter_op_threads
+    options.add_session_config_entry("session.intra_op.allow_spinning", "0")
+
+    session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+    logger.info(
+        f"ONNX Runtime session loaded: {Path(model_path).name} "
+        f"(intra={settings.inference_intra_op_threads or 'auto'}, inter={settings.inference_inter_op_threads})"
+    )
+    return session
+
+
+@dataclass
+class OnnxOutput:
+    """Same fields KPipeline reads from ``KModel.Output``"""
+    audio: torch.FloatTensor
+    pred_dur: Optional[torch.LongTensor] = None
+
+
+class OnnxKokoroModel:
+    """
+    Kokoro-82M forward pass on ONNX Runtime
+
+    Accepts the same call as ``KModel`` (phoneme string, style vector,
+    speed) so it can be assigned to ``KPipeline.model``.
+    """
+
+    device = "cpu"
+
+    def __init__(self, model_path: Path, config_path: Optional[Path] = None):
+        self.model_path = Path(model_path)
+        config_path = Path(config_path or self.model_path.with_suffix(".json"))
+        with open(config_path, encoding="utf-8") as f:
+            self.vocab = json.load(f)["vocab"]
+        self.session = create_onnx_session(self.model_path)
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def __call__(self, phonemes: str, ref_s: torch.FloatTensor, speed: float = 1.0, return_output: bool = False):
+        input_ids = [0, *(self.vocab[p] for p in phonemes if p in self.vocab), 0]
+        feeds = dict(zip(self.input_names, (
+            np.asarray([input_ids], dtype=np.int64),
+            ref_s.detach().cpu().numpy().astype(np.float32).reshape(1, -1),
+            np.asarray([speed], dtype=np.float32),
+        )))
+        outputs = self.session.run(None, feeds)
+        audio = torch.from_numpy(outputs[0]).squeeze()
+        pred_dur = torch.from_numpy(outputs[1]).squeeze() if len(outputs) > 1 else None
+        return OnnxOutput(audio, pred_dur) if return_output else audio
+
+
+def load_kokoro_model(device: str = "cpu", backend: Optional[str] = None):
+    """Kokoro-82M acoustic model for the configured backend"""
+    from kokoro import KModel
+
+    backend = resolve_backend(backend)
+    if backend == "onnx":
+        model_path = settings.onnx_model_path
+        if model_path.exists():
+            return OnnxKokoroModel(model_path), backend
+        logger.warning(f"ONNX model not found at {model_path} (run export_kokoro_onnx.py), using 'torch_int8'")
+        backend = "torch_int8"
+
+    model = KModel().eval()
+    if backend == "torch_int8":
+        if device != "cpu":
+            logger.warning(f"int8 quantization runs on CPU only, ignoring device '{device}'")
+        return quantize_dynamic_int8(model), backend
+    return model.to(torch.device(device)), backend
+
+
+def set_torch_threads():
+    """Apply the configured intra/inter-op threads to PyTorch (once per process)"""
+    if settings.inference_intra_op_threads:
+        torch.set_num_threads(settings.inference_intra_op_threads)
+    try:
+        torch.set_num_interop_threads(max(1, settings.inference_inter_op_threads))
+    except RuntimeError:
+        # Only allowed before the first parallel op; keep the current value
+        pass
@@ -1,41 +1,66 @@
 """
 Kokoro TTS Engine for Portuguese (PT-BR)
-Based on Kokoro-82M model
+Based on Kokoro-82M model (native 24 kHz output)
 """
-import os
-import tempfile
-from typing import Optional, AsyncGenerator, Dict, Union, List, Tuple
-from pathlib import Path
+import asyncio
+import io
+import threading
+from collections import OrderedDict
+from typing import Optional, AsyncGenerator, Callable, Dict, Iterator, List, Tuple, Union
 
 import numpy as np
 import torch
 import soundfile as sf
-from kokoro import KModel, KPipeline
+from kokoro import KPipeline
 
 from backend.core.logger import logger
 from backend.core.config import settings
+from backend.modules.tts.inference import load_kokoro_model, set_torch_threads
+from backend.modules.tts.phonemes import CachedG2P, PhonemeStore, WordPhonemizer
+from backend.src.utils.model_governor import model_governor
+from backend.src.utils.text_normalization import normalizar_para_fala
+
+REPO_ID = "hexgrad/Kokoro-82M"
+# Pipelines whose G2P is misaki's English lexicon (context-dependent, cached per chunk)
+LEXICON_LANGS = {"a", "b"}
+
+# (voice, weight) pairs; a single voice is ((name, 1.0),)
+VoiceSpec = Tuple[Tuple[str, float], ...]
 
 
 class KokoroEngine:
     """Kokoro TTS Engine with PT-BR support"""
-    
-    # Portuguese voices mapping
-    PTBR_VOICES = {
-        "pt-BR-f1": "af_bella",  # Female voice 1
-        "pt-BR-f2": "af_sarah",  # Female voice 2
-        "pt-BR-f3": "af_nova",   # Female voice 3
-        "pt-BR-m1": "am_michael", # Male voice 1
-        "pt-BR-m2": "am_fenrir",  # Male voice 2
-        "luna": "af_heart",      # Luna's default voice
+
+    # Portuguese voices mapping: a Kokoro voice or a weighted mix of style vectors
+    PTBR_VOICES: Dict[str, Union[str, VoiceSpec]] = {
+        "pt-BR-f1": "pf_dora",                                  # Female voice 1
+        "pt-BR-f2": (("pf_dora", 0.6), ("af_bella", 0.4)),      # Female voice 2
+        "pt-BR-f3": (("pf_dora", 0.6), ("af_nova", 0.4)),       # Female voice 3
+        "pt-BR-m1": "pm_alex",                                  # Male voice 1
+        "pt-BR-m2": "pm_santa",                                 # Male voice 2
+        "luna": (("pf_dora", 0.7), ("af_heart", 0.3)),          # Luna's default voice
     }
-    
+    VOICE_CACHE_SIZE = 64
+
     def __init__(self):
         """Initialize Kokoro engine"""
         self.device = self._get_device()
-        self.model: Optional[KModel] = None
+        self.backend = settings.tts_backend
         self.pipelines: Dict[str, KPipeline] = {}
+        self.voice_packs: "OrderedDict[VoiceSpec, torch.FloatTensor]" = OrderedDict()
+        self._voice_lock = threading.Lock()
+        self._pipeline_lock = threading.Lock()
+        self.phoneme_store: Optional[PhonemeStore] = None
         self.is_initialized = False
-        
+        self.sample_rate = settings.sample_rate  # Kokoro-82M generates at 24 kHz
+        # Thread budget, concurrency limit and idle unload (MODEL_*_TTS env vars)
+        self.slot = model_governor.register("tts", loader=self._load_model)
+
+    @property
+    def model(self):
+        """Loaded acoustic model, or None while unloaded by the governor"""
+        return self.slot.model
+
     def _get_device(self) -> str:
         """Determine the best available device"""
         if settings.use_gpu:
@@ -47,75 +72,173 @@ class KokoroEngine:
                 return "mps"
         logger.info("Using CPU device")
         return "cpu"
-        
-    async def initialize(self) -> bool:
-        """Initialize the Kokoro model and pipelines"""
+
+    def _load_model(self):
+        """Blocking load (governor loader): also used to reload after an idle unload"""
+        # fp32 torch, int8-quantized torch or ONNX Runtime
+        model, self.backend = load_kokoro_model(self.device)
+        if self.backend != "torch":
+            self.device = "cpu"
+        logger.info(f"Kokoro inference backend: {self.backend}")
+        return model
+
+    async def initialize(self, progress: Optional[Callable[[str, float], None]] = None) -> bool:
+        """
+        Initialize the Kokoro model and pipelines
+
+        Loading runs in a worker thread so the event loop keeps serving
+        requests; ``progress(stage, fraction)`` is called between stages.
+        """
+        report = progress or (lambda stage, fraction: None)
         try:
             logger.info("Initializing Kokoro TTS Engine...")
-            
-            # Initialize model
-            self.model = KModel()
-            
-            # Move to appropriate device
-            if self.device == "cuda":
-                self.model = self.model.cuda()
-            elif self.device == "mps":
-                self.model = self.model.to(torch.device("mps"))
-            else:
-                self.model = self.model.cpu()
-                
-            self.model.eval()
-            
-            # Create pipeline for Portuguese
-            self._create_pipeline("p")  # 'p' for Portuguese
-            
+            set_torch_threads()
+            report("loading model", 0.1)
+            await asyncio.to_thread(self.slot.ensure_loaded)
+
+            # Create pipeline for Portuguese (G2P) and load the default voice
+            report("loading voices", 0.6)
+            await asyncio.to_thread(self._voice_pack, self._resolve_voice("luna"))
+
             # Warm up the model
+            report("warming up", 0.8)
             await self._warmup()
-            
+
             self.is_initialized = True
             logger.info("✅ Kokoro TTS Engine initialized successfully")
             return True
-            
+
         except Exception as e:
             logger.error(f"Failed to initialize Kokoro engine: {e}")
             return False
-            
+
     def _create_pipeline(self, lang_code: str) -> KPipeline:
-        """Create or get pipeline for language code"""
-        if lang_code not in self.pipelines:
-            logger.info(f"Creating pipeline for language: {lang_code}")
-            self.pipelines[lang_code] = KPipeline(
-                lang_code=lang_code,
-                model=self.model,
-                device=self.device
-            )
-            
-            # Add custom pronunciations for Portuguese
-            if lang_code == "p":
-                lexicon = self.pipelines[lang_code].g2p.lexicon
-                lexicon.golds['lua'] = 'lˈuɐ'
-                lexicon.golds['olá'] = 'ɔlˈa'
-                lexicon.golds['kokoro'] = 'kɔkˈɔɾu'
-                
-        return self.pipelines[lang_code]
-        
+        """Create or get pipeline for language code (G2P only; the model is attached per call)"""
+        with self._pipeline_lock:
+            if lang_code not in self.pipelines:
+                logger.info(f"Creating pipeline for language: {lang_code}")
+                pipeline = KPipeline(lang_code=lang_code, repo_id=REPO_ID, model=False)
+
+                # Add custom pronunciations (lexicon-based English G2P only; 'p' uses espeak)
+                lexicon = getattr(pipeline.g2p, "lexicon", None)
+                if lexicon is not None:
+                    lexicon.golds['lua'] = 'lˈuɐ'
+                    lexicon.golds['olá'] = 'ɔlˈa'
+                    lexicon.golds['kokoro'] = 'kɔkˈɔɾu'
+
+                if lang_code in LEXICON_LANGS:
+                    pipeline.g2p = CachedG2P(pipeline.g2p)
+                else:
+                    # espeak: word by word, only words never seen before are phonemized
+                    pipeline.g2p = WordPhonemizer(
+                        pipeline.g2p, lang_code, self._phoneme_store(), maxsize=settings.phoneme_cache_size
+                    )
+                self.pipelines[lang_code] = pipeline
+
+            return self.pipelines[lang_code]
+
+    def _phoneme_store(self) -> PhonemeStore:
+        if self.phoneme_store is None:
+            try:
+                from importlib.metadata import version
+                g2p_version = f"misaki-{version('misaki')}"
+            except Exception:
+                g2p_version = "misaki"
+            self.phoneme_store = PhonemeStore(settings.phoneme_cache_path, g2p_version)
+        return self.phoneme_store
+
+    def _resolve_voice(self, voice: str) -> VoiceSpec:
+        """Voice identifier (catalog name or raw Kokoro voice) to (voice, weight) pairs"""
+        mapped = self.PTBR_VOICES.get(voice, voice)
+        if isinstance(mapped, str):
+            return ((mapped, 1.0),)
+        return tuple(mapped)
+
+    def _voice_pack(self, spec: VoiceSpec) -> torch.FloatTensor:
+        """Style-vector pack for a voice or weighted mix (cached per mix)"""
+        total = sum(weight for _, weight in spec)
+        if total <= 0:
+            raise ValueError("Voice weights must sum to a positive value")
+        key = tuple(sorted((name, round(weight / total, 4)) for name, weight in spec))
+
+        with self._voice_lock:
+            pack = self.voice_packs.get(key)
+            if pack is not None:
+                self.voice_packs.move_to_end(key)
+                return pack
+
+        # KPipeline keeps each downloaded voice in pipeline.voices
+        pipeline = self._create_pipeline(settings.default_voice_code)
+        pack = sum(weight * pipeline.load_single_voice(name) for name, weight in key)
+
+        with self._voice_lock:
+            self.voice_packs[key] = pack
+            if len(self.voice_packs) > self.VOICE_CACHE_SIZE:
+                self.voice_packs.popitem(last=False)
+        return pack
+
     async def _warmup(self):
         """Warm up the model with a test generation"""
         try:
             logger.info("Warming up Kokoro model...")
-            pipeline = self.pipelines.get("p")
-            if pipeline:
-                test_text = "Olá, eu sou a Lua."
-                voice = self.PTBR_VOICES["luna"]
-                
-                # Generate small test audio
-                for result in pipeline(test_text, voice=voice, speed=1.0):
-                    if result.audio is not None:
-                        logger.info("✅ Model warmup successful")
-                        break
+            async for _ in self._stream("Olá, eu sou a Lua.", self._resolve_voice("luna"), 1.0, "p"):
+                logger.info("✅ Model warmup successful")
+                break
         except Exception as e:
             logger.warning(f"Warmup failed (non-critical): {e}")
-            
+
+    def _synthesize(self, text: str, spec: VoiceSpec, speed: float, lang_code: str,
+                    cancelled: threading.Event) -> Iterator[np.ndarray]:
+        """Blocking synthesis inside a governor slot, one array per text segment"""
+        pipeline = self._create_pipeline(lang_code)
+        pack = self._voice_pack(spec)
+        if lang_code == "p":
+            # Before the pipeline: it splits chunks on "." (thousands separator in "R$ 1.234,56")
+            text = normalizar_para_fala(text)
+        with model_governor.use("tts") as model:
+            # Passed per call (not kept on the pipeline) so an idle unload frees it
+            for result in pipeline(text, voice=pack, speed=speed, model=model):
+                if cancelled.is_set():
+                    return
+                if result.audio is not None:
+                    yield result.audio.numpy()
+
+    async def _stream(self, text: str, spec: VoiceSpec, speed: float, lang_code: str) -> AsyncGenerator[bytes, None]:
+        """Run synthesis in a worker thread and yield each segment as soon as it is ready"""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+        done = object()
+
+        def produce():
+            try:
+                for audio in self._synthesize(text, spec, speed, lang_code, cancelled):
+                    loop.call_soon_threadsafe(queue.put_nowait, audio)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        producer = loop.run_in_executor(None, produce)
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield self._to_wav(item)
+        finally:
+            # Client went away: stop after the current segment
+            cancelled.set()
+            await asyncio.shield(producer)
+
+    def _to_wav(self, audio: np.ndarray) -> bytes:
+        buffer = io.BytesIO()
+        # 16-bit PCM: segments can be merged into one file with src.utils.wav_audio.join_wav
+        sf.write(buffer, audio, self.sample_rate, format="WAV", subtype="PCM_16")
+        return buffer.getvalue()
+
     async def generate_speech(
         self,
         text: str,
@@ -125,46 +248,28 @@ class KokoroEngine:
     ) -> AsyncGenerator[bytes, None]:
         """
         Generate speech from text
-        
+
         Args:
             text: Text to synthesize
             voice: Voice identifier
             speed: Speech speed (0.5 to 2.0)
             lang_code: Language code ('p' for Portuguese)
-            
+
         Yields:
-            Audio chunks in bytes
+            Audio chunks in bytes (one WAV per text segment; use join_wav for a single file)
         """
         if not self.is_initialized:
             raise RuntimeError("Engine not initialized")
-            
+
         try:
-            # Map voice to Kokoro voice
-            kokoro_voice = self.PTBR_VOICES.get(voice, voice)
-            
-            # Get or create pipeline
-            pipeline = self._create_pipeline(lang_code)
-            
-            # Generate audio
             logger.info(f"Generating speech: '{text[:50]}...' with voice '{voice}'")
-            
-            for result in pipeline(text, voice=kokoro_voice, speed=speed):
-                if result.audio is not None:
-                    audio_numpy = result.audio.numpy()
-                    
-                    # Convert to bytes
-                    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-                        sf.write(tmp.name, audio_numpy, settings.sample_rate)
-                        tmp.seek(0)
-                        audio_bytes = open(tmp.name, 'rb').read()
-                        os.unlink(tmp.name)
-                        
-                    yield audio_bytes
-                    
+            async for chunk in self._stream(text, self._resolve_voice(voice), speed, lang_code):
+                yield chunk
+
         except Exception as e:
             logger.error(f"Speech generation failed: {e}")
             raise
-            
+
     async def mix_voices(
         self,
         text: str,
@@ -174,69 +279,46 @@ class KokoroEngine:
     ) -> AsyncGenerator[bytes, None]:
         """
         Generate speech with mixed voices
-        
+
+        The style vectors of the voices are averaged with the given weights
+        and synthesized once (not a mix of separate recordings).
+
         Args:
             text: Text to synthesize
             voices: List of voice identifiers
-            weights: Voice mixing weights (sum to 1.0)
+            weights: Voice mixing weights (normalized to sum 1.0)
             speed: Speech speed
-            
+
         Yields:
-            Mixed audio chunks
+            Audio chunks in bytes
         """
         if not self.is_initialized:
             raise RuntimeError("Engine not initialized")
-            
+
         if not voices:
             raise ValueError("At least one voice required")
-            
+
         # Default equal weights
         if weights is None:
-            weights = [1.0 / len(voices)] * len(voices)
-            
-        # Normalize weights
-        total = sum(weights)
-        weights = [w / total for w in weights]
-        
+            weights = [1.0] * len(voices)
+        if len(weights) != len(voices):
+            raise ValueError("One weight per voice required")
+
+        # Catalog voices may already be mixes: distribute their weight
+        spec = tuple(
+            (name, weight * share)
+            for voice, weight in zip(voices, weights)
+            for name, share in self._resolve_voice(voice)
+        )
+
         try:
-            pipeline = self._create_pipeline("p")
-            
-            # Generate audio for each voice
-            audios = []
-            for voice, weight in zip(voices, weights):
-                kokoro_voice = self.PTBR_VOICES.get(voice, voice)
-                
-                for result in pipeline(text, voice=kokoro_voice, speed=speed):
-                    if result.audio is not None:
-                        audio_numpy = result.audio.numpy() * weight
-                        audios.append(audio_numpy)
-                        break
-                        
-            # Mix audios
-            if audios:
-                # Pad to same length
-                max_len = max(len(a) for a in audios)
-                padded = [np.pad(a, (0, max_len - len(a))) for a in audios]
-                
-                # Sum weighted audios
-                mixed = np.sum(padded, axis=0)
-                
-                # Normalize
-                mixed = mixed / np.max(np.abs(mixed))
-                
-                # Convert to bytes
-                with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-                    sf.write(tmp.name, mixed, settings.sample_rate)
-                    tmp.seek(0)
-                    audio_bytes = open(tmp.name, 'rb').read()
-                    os.unlink(tmp.name)
-                    
-                yield audio_bytes
-                
+            async for chunk in self._stream(text, spec, speed, settings.default_voice_code):
+                yield chunk
+
         except Exception as e:
             logger.error(f"Voice mixing failed: {e}")
             raise
-            
+
     def get_available_voices(self) -> Dict[str, str]:
         """Get list of available voices"""
         return {
@@ -250,27 +332,33 @@ class KokoroEngine:
                 ("luna", "Luna (Assistant)"),
             ]
         }
-        
+
+    def get_cache_stats(self) -> Dict[str, Dict]:
+        """Phoneme cache per pipeline and cached voice mixes"""
+        return {
+            "phonemes": {code: p.g2p.stats() for code, p in self.pipelines.items()},
+            "voices": {"entries": len(self.voice_packs), "maxsize": self.VOICE_CACHE_SIZE},
+        }
+
     async def cleanup(self):
         """Clean up resources"""
         try:
-            if self.model:
-                del self.model
-                self.model = None
-                
-            for pipeline in self.pipelines.values():
-                del pipeline
+            self.slot.unload(reason="cleanup")
             self.pipelines.clear()
-            
+            self.voice_packs.clear()
+            if self.phoneme_store is not None:
+                self.phoneme_store.close()
+                self.phoneme_store = None
+
             # Clear GPU cache if available
             if self.device == "cuda" and torch.cuda.is_available():
                 torch.cuda.empty_cache()
                 torch.cuda.synchronize()
             elif self.device == "mps" and hasattr(torch.mps, "empty_cache"):
                 torch.mps.empty_cache()
-                
+
             self.is_initialized = False
             logger.info("Kokoro engine cleaned up")
-            
+
         except Exception as e:
-            logger.error(f"Cleanup failed: {e}")
\ No newline at end of file
+            logger.error(f"Cleanup failed: {e}")
@@ -1,10 +1,11 @@
 """
-Kokoro TTS Engine for Portuguese (PT-BR)
-Fixed version with proper dependencies
+Coqui XTTS v2 engine for Portuguese (PT-BR)
+Same interface as the Kokoro-82M engine; selected with TTS_ENGINE=xtts
 """
+import asyncio
 import os
 import tempfile
-from typing import Optional, AsyncGenerator, Dict, List
+from typing import Optional, AsyncGenerator, Callable, Dict, List
 from pathlib import Path
 import logging
 
@@ -15,11 +16,18 @@ import soundfile as sf
 # Import TTS instead of kokoro
 from TTS.api import TTS
 
+from backend.modules.tts.inference import quantize_dynamic_int8, resolve_backend, set_torch_threads
+from backend.src.utils.model_governor import model_governor
+from backend.src.utils.text_normalization import normalizar_para_fala
+
 logger = logging.getLogger(__name__)
 
 
 class KokoroEngine:
     """Modern TTS Engine with PT-BR support using Coqui TTS"""
+
+    MODEL_NAME = "tts_models/multilingual/multi-dataset/xtts_v2"
+    FALLBACK_MODEL_NAME = "tts_models/en/ljspeech/tacotron2-DDC"
     
     # Portuguese voices mapping
     PTBR_VOICES = {
@@ -34,9 +42,17 @@ class KokoroEngine:
     def __init__(self):
         """Initialize TTS engine"""
         self.device = self._get_device()
-        self.model: Optional[TTS] = None
+        self.model_name = self.MODEL_NAME
+        self.backend = "torch"
         self.is_initialized = False
         self.sample_rate = 22050
+        # Thread budget, concurrency limit and idle unload (MODEL_*_TTS env vars)
+        self.slot = model_governor.register("tts", loader=self._load_model)
+
+    @property
+    def model(self) -> Optional[TTS]:
+        """Loaded model, or None while unloaded by the governor"""
+        return self.slot.model
         
     def _get_device(self) -> str:
         """Determine the best available device"""
@@ -45,31 +61,48 @@ class KokoroEngine:
             return "cuda"
         logger.info("Using CPU device")
         return "cpu"
+
+    def _load_model(self) -> TTS:
+        """Blocking load (governor loader): also used to reload after an idle unload"""
+        # Downloads on first run, then loads from the local cache
+        model = TTS(model_name=self.model_name, progress_bar=False, gpu=(self.device == "cuda"))
+
+        # XTTS has no ONNX graph: 'onnx' falls back to dynamic int8
+        self.backend = resolve_backend(supports_onnx=False)
+        if self.backend == "torch_int8" and self.device == "cpu":
+            synthesizer = model.synthesizer
+            synthesizer.tts_model = quantize_dynamic_int8(synthesizer.tts_model)
+        logger.info(f"TTS inference backend: {self.backend}")
+
+        # Get sample rate from model
+        if hasattr(model.synthesizer, 'output_sample_rate'):
+            self.sample_rate = model.synthesizer.output_sample_rate
+        elif hasattr(model, 'synthesizer') and hasattr(model.synthesizer, 'sample_rate'):
+            self.sample_rate = model.synthesizer.sample_rate
+        else:
+            self.sample_rate = 22050  # Default
+        return model
         
-    async def initialize(self) -> bool:
-        """Initialize the TTS model"""
+    async def initialize(self, progress: Optional[Callable[[str, float], None]] = None) -> bool:
+        """
+        Initialize the TTS model
+
+        Loading runs in a worker thread so the event loop keeps serving
+        requests; ``progress(stage, fraction)`` is called between stages.
+        """
+        report = progress or (lambda stage, fraction: None)
         try:
             logger.info("Initializing TTS Engine...")
             
-            # Use a multilingual model that supports Portuguese
             # Using XTTS v2 which supports multiple languages including Portuguese
-            model_name = "tts_models/multilingual/multi-dataset/xtts_v2"
-            
             # Alternative: Use a specific Portuguese model if available
             # model_name = "tts_models/pt/cv/vits"
-            
-            # Initialize TTS
-            self.model = TTS(model_name=model_name, progress_bar=False, gpu=(self.device == "cuda"))
-            
-            # Get sample rate from model
-            if hasattr(self.model.synthesizer, 'output_sample_rate'):
-                self.sample_rate = self.model.synthesizer.output_sample_rate
-            elif hasattr(self.model, 'synthesizer') and hasattr(self.model.synthesizer, 'sample_rate'):
-                self.sample_rate = self.model.synthesizer.sample_rate
-            else:
-                self.sample_rate = 22050  # Default
+            set_torch_threads()
+            report("loading model", 0.1)
+            await asyncio.to_thread(self.slot.ensure_loaded)
             
             # Warm up the model
+            report("warming up", 0.8)
             await self._warmup()
             
             self.is_initialized = True
@@ -78,10 +111,12 @@ class KokoroEngine:
             
         except Exception as e:
             logger.error(f"Failed to initialize TTS engine: {e}")
-            # Fallback to a simpler model
+            # Fallback to a simpler model (also used for later reloads)
             try:
                 logger.info("Trying fallback model...")
-                self.model = TTS("tts_models/en/ljspeech/tacotron2-DDC", progress_bar=False)
+                report("loading fallback model", 0.5)
+                self.model_name = self.FALLBACK_MODEL_NAME
+                await asyncio.to_thread(self.slot.ensure_loaded)
                 self.is_initialized = True
                 logger.info("✅ TTS Engine initialized with fallback model")
                 return True
@@ -97,15 +132,31 @@ class KokoroEngine:
             
             # Generate small test audio
             with tempfile.NamedTemporaryFile(suffix=".wav", delete=True) as tmp:
-                if hasattr(self.model, 'tts_to_file'):
-                    self.model.tts_to_file(
-                        text=test_text,
-                        file_path=tmp.name,
-                        language="pt" if "multilingual" in str(self.model.model_name) else None
-                    )
+                await asyncio.to_thread(self._synthesize_to_file, test_text, tmp.name, "pt", 1.0)
                 logger.info("✅ Model warmup successful")
         except Exception as e:
             logger.warning(f"Warmup failed (non-critical): {e}")
+
+    def _synthesize_to_file(self, text: str, file_path: str, lang_code: str, speed: float):
+        """Blocking synthesis inside a governor slot (reloads the model if it was unloaded)"""
+        with model_governor.use("tts") as model:
+            multilingual = "multilingual" in str(model.model_name)
+            if hasattr(model, 'tts_to_file'):
+                if multilingual:
+                    # For multilingual models
+                    model.tts_to_file(text=text, file_path=file_path, language=lang_code, speed=speed)
+                else:
+                    # For single language models
+                    model.tts_to_file(text=text, file_path=file_path)
+                return
+
+            # Alternative method using numpy array
+            wav = model.tts(text=text, language=lang_code if multilingual else None)
+            if isinstance(wav, torch.Tensor):
+                wav = wav.cpu().numpy()
+            elif not isinstance(wav, np.ndarray):
+                wav = np.array(wav)
+            sf.write(file_path, wav, self.sample_rate)
             
     async def generate_speech(
         self,
@@ -129,6 +180,9 @@ class KokoroEngine:
         if not self.is_initialized:
             raise RuntimeError("Engine not initialized")
             
+        if lang_code == "pt":
+            text = normalizar_para_fala(text)
+            
         try:
             logger.info(f"Generating speech: '{text[:50]}...' with voice '{voice}'")
             
@@ -137,44 +191,14 @@ class KokoroEngine:
                 temp_path = tmp.name
                 
             try:
-                # Generate audio file
-                if hasattr(self.model, 'tts_to_file'):
-                    # For multilingual models
-                    if "multilingual" in str(self.model.model_name):
-                        self.model.tts_to_file(
-                            text=text,
-                            file_path=temp_path,
-                            language=lang_code,
-                            speed=speed
-                        )
-                    else:
-                        # For single language models
-                        self.model.tts_to_file(
-                            text=text,
-                            file_path=temp_path
-                        )
-                    
-                    # Read the generated audio
-                    with open(temp_path, 'rb') as f:
-                        audio_bytes = f.read()
-                    
-                    yield audio_bytes
-                else:
-                    # Alternative method using numpy array
-                    wav = self.model.tts(text=text, language=lang_code if "multilingual" in str(self.model.model_name) else None)
-                    
-                    if isinstance(wav, torch.Tensor):
-                        wav = wav.cpu().numpy()
-                    elif not isinstance(wav, np.ndarray):
-                        wav = np.array(wav)
-                    
-                    # Save to file
-                    sf.write(temp_path, wav, self.sample_rate)
-                    
-                    with open(temp_path, 'rb') as f:
-                        audio_bytes = f.read()
-                    
-                    yield audio_bytes
+                # Off the event loop: the governor may block on the concurrency limit or a reload
+                await asyncio.to_thread(self._synthesize_to_file, text, temp_path, lang_code, speed)
+                
+                # Read the generated audio
+                with open(temp_path, 'rb') as f:
+                    audio_bytes = f.read()
+                
+                yield audio_bytes
                     
             finally:
                 # Clean up temp file
@@ -225,9 +249,7 @@ class KokoroEngine:
     async def cleanup(self):
         """Clean up resources"""
         try:
-            if self.model:
-                del self.model
-                self.model = None
+            self.slot.unload(reason="cleanup")
                 
             # Clear GPU cache if available
             if self.device == "cuda" and torch.cuda.is_available():
@@ -0,0 +1,212 @@
+"""
+Phoneme caches for the Kokoro front-end (misaki G2P)
+
+``KPipeline`` phonemizes every text chunk on every call. Lua repeats the
+same greetings, names and phrases constantly, so the pipeline's ``g2p`` is
+replaced by a cached one:
+
+- ``WordPhonemizer`` (espeak-based languages such as PT-BR): word → phonemes
+  LRU backed by a persistent SQLite store, so only words never seen before
+  (in any run) reach espeak;
+- ``CachedG2P`` (lexicon-based English G2P, whose output depends on the
+  surrounding words): LRU keyed by the whole chunk.
+"""
+import copy
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Words (with inner hyphens/apostrophes: "sexta-feira", "d'água") or single punctuation marks
+TOKEN_RE = re.compile(r"(\w+(?:[-'’]\w+)*)|([^\w\s])")
+
+
+class CachedG2P:
+    """Drop-in replacement for ``KPipeline.g2p`` with an LRU in front"""
+
+    def __init__(self, g2p, maxsize: int = 4096):
+        self.g2p = g2p
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[str, Tuple[str, Optional[Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, text: str):
+        with self._lock:
+            entry = self._cache.get(text)
+            if entry is not None:
+                self._cache.move_to_end(text)
+                self.hits += 1
+        if entry is None:
+            entry = self.g2p(text)
+            with self._lock:
+                self.misses += 1
+                self._cache[text] = entry
+                if len(self._cache) > self.maxsize:
+                    self._cache.popitem(last=False)
+        phonemes, tokens = entry
+        # English G2P returns MToken objects the pipeline mutates: hand out copies
+        return phonemes, copy.deepcopy(tokens) if tokens is not None else None
+
+    def __getattr__(self, name):
+        # lexicon, language, ... of the wrapped G2P
+        return getattr(self.g2p, name)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._cache),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else None,
+        }
+
+
+class PhonemeStore:
+    """Persistent (lang, word) → phonemes table shared by restarts and workers"""
+
+    def __init__(self, path: Path, version: str = ""):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS phonemes ("
+                "lang TEXT NOT NULL, word TEXT NOT NULL, phonemes TEXT NOT NULL, "
+                "PRIMARY KEY (lang, word)) WITHOUT ROWID"
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'g2p_version'").fetchone()
+            # A different G2P version may phonemize differently: start over
+            if row is None or row[0] != version:
+                self._conn.execute("DELETE FROM phonemes")
+                self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('g2p_version', ?)", (version,))
+
+    def get_many(self, lang: str, words: List[str]) -> Dict[str, str]:
+        found = {}
+        with self._lock:
+            # SQLite limits bound parameters per statement
+            for start in range(0, len(words), 500):
+                batch = words[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT word, phonemes FROM phonemes WHERE lang = ? AND word IN ({','.join('?' * len(batch))})",
+                    (lang, *batch)
+                )
+                found.update(rows)
+        return found
+
+    def put_many(self, lang: str, items: Iterable[Tuple[str, str]]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO phonemes (lang, word, phonemes) VALUES (?, ?, ?)",
+                [(lang, word, phonemes) for word, phonemes in items]
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM phonemes").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class WordPhonemizer:
+    """
+    Replacement for an espeak-based ``KPipeline.g2p`` that phonemizes word by word
+
+    Known words come from the in-memory LRU or the persistent store; only
+    novel words are sent to the wrapped G2P. Punctuation is kept as-is
+    (Kokoro's vocabulary has the usual marks).
+    """
+
+    def __init__(self, g2p, lang: str, store: Optional[PhonemeStore] = None, maxsize: int = 50000):
+        self.g2p = g2p
+        self.lang = lang
+        self.store = store
+        self.maxsize = maxsize
+        self.hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, text: str):
+        tokens = TOKEN_RE.findall(text)
+        phonemes = self.lookup([word.lower() for word, _ in tokens if word])
+
+        pieces = []
+        for word, mark in tokens:
+            if word:
+                ps = phonemes.get(word.lower())
+                if ps:
+                    pieces.append(f" {ps}" if pieces else ps)
+            else:
+                # Punctuation sticks to the previous word: "ɔlˈa, ew"
+                pieces.append(mark)
+        return "".join(pieces).strip(), None
+
+    def lookup(self, words: List[str]) -> Dict[str, str]:
+        """Phonemes for each word: memory, then store, then G2P"""
+        found, missing = {}, []
+        with self._lock:
+            for word in dict.fromkeys(words):
+                ps = self._cache.get(word)
+                if ps is None:
+                    missing.append(word)
+                else:
+                    self._cache.move_to_end(word)
+                    found[word] = ps
+                    self.hits += 1
+
+        if missing and self.store is not None:
+            stored = self.store.get_many(self.lang, missing)
+            self.store_hits += len(stored)
+            found.update(stored)
+            self._remember(stored)
+            missing = [word for word in missing if word not in stored]
+
+        if missing:
+            novel = {word: self.g2p(word)[0].strip() for word in missing}
+            self.misses += len(novel)
+            found.update(novel)
+            self._remember(novel)
+            if self.store is not None:
+                self.store.put_many(self.lang, novel.items())
+        return found
+
+    def _remember(self, entries: Dict[str, str]):
+        with self._lock:
+            self._cache.update(entries)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def __getattr__(self, name):
+        return getattr(self.g2p, name)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.store_hits + self.misses
+        return {
+            "entries": len(self._cache),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "store_hits": self.store_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.store_hits) / total, 3) if total else None,
+            "stored": len(self.store) if self.store is not None else None,
+        }
@@ -18,12 +18,13 @@ from .imposto import Imposto
 from .financial import FinancialTransaction, ProductionReport, AdvancedOrder, DiscountTable, CostCalculation
 from .customer import Customer
 from .supplier import Supplier
+from .report_rollup import ReportRollup, ReportRollupState
 
 __all__ = [
     'User', 'db', 'Jewelry', 'Material', 'Pattern', 'PatternImage', 'Stone',
     'Employee', 'Vale', 'Payment', 'CaixaCategory', 'CaixaTransaction',
     'Payroll', 'Order', 'Inventory', 'Cost', 'Profit', 'Nota', 'Imposto',
     'FinancialTransaction', 'ProductionReport', 'AdvancedOrder', 'DiscountTable',
-    'CostCalculation', 'Customer', 'Supplier'
+    'CostCalculation', 'Customer', 'Supplier', 'ReportRollup', 'ReportRollupState'
 ]
 
@@ -1,4 +1,5 @@
 from src.models.user import db
+from src.models.report_rollup import track_rollups
 
 class CaixaCategory(db.Model):
     """Categorias para saídas do caixa"""
@@ -20,6 +21,10 @@ class CaixaCategory(db.Model):
 
 class CaixaTransaction(db.Model):
     """Transações do caixa (entradas e saídas)"""
+    __table_args__ = (
+        db.Index('ix_caixa_transaction_date_type', 'date', 'type'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     type = db.Column(db.String(20), nullable=False)  # 'entrada' ou 'saida'
     amount = db.Column(db.Float, nullable=False)
@@ -58,3 +63,6 @@ class CaixaTransaction(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
+
+# Entradas e saídas do caixa por tipo (relatórios da LUA)
+track_rollups(CaixaTransaction, 'caixa', date='date', value='amount', key='type')
@@ -1,4 +1,5 @@
 from src.models.user import db
+from src.models.report_rollup import track_rollups
 from datetime import datetime
 
 class Cost(db.Model):
@@ -117,3 +118,10 @@ class Profit(db.Model):
         
         return profit
 
+
+# Custos por categoria e lucros (relatórios e /profits/stats)
+track_rollups(Cost, 'costs', date='date', value='amount', key='category')
+track_rollups(Profit, 'profit_revenue', date='date_calculated', value='revenue')
+track_rollups(Profit, 'profit_costs', date='date_calculated', value='total_costs')
+track_rollups(Profit, 'profit_gross', date='date_calculated', value='gross_profit')
+track_rollups(Profit, 'profit_margin', date='date_calculated', value='profit_margin')
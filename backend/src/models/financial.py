@@ -1,4 +1,5 @@
 from src.models.user import db
+from src.models.report_rollup import track_rollups
 from datetime import datetime
 
 class FinancialTransaction(db.Model):
@@ -189,3 +190,14 @@ class CostCalculation(db.Model):
             'rs_por_hora': self.rs_por_hora
         }
 
+
+def _sinal(values):
+    valor = values.get('valor1') or 0
+    return 'entrada' if valor > 0 else 'saida' if valor < 0 else ''
+
+
+# Entradas (valor1 > 0) e saídas (valor1 < 0) de /financial/stats
+track_rollups(
+    FinancialTransaction, 'financial', date='data', value='valor1', key=_sinal,
+    key_sql=lambda model: db.case((model.valor1 > 0, 'entrada'), (model.valor1 < 0, 'saida'), else_='')
+)
@@ -1,9 +1,16 @@
 from src.models.user import db
+from src.models.report_rollup import track_rollups
 from datetime import datetime
 
 class Order(db.Model):
+    __table_args__ = (
+        # Vendas por status no período (dashboard, relatórios da LUA)
+        db.Index('ix_order_status_created_at', 'status', 'created_at'),
+        db.Index('ix_order_created_at', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    customer_id = db.Column(db.Integer, db.ForeignKey("customer.id"))
+    customer_id = db.Column(db.Integer, db.ForeignKey("customers.id"))
     customer_name = db.Column(db.String(100), nullable=False)
     customer_contact = db.Column(db.String(100))
     jewelry_id = db.Column(db.Integer, db.ForeignKey("jewelry.id"), nullable=False)
@@ -169,3 +176,6 @@ class Order(db.Model):
             db.session.rollback()
             return {"error": str(e)}
 
+
+# Vendas por status (relatórios e /orders/stats)
+track_rollups(Order, 'orders', date='created_at', value='total_price', key='status')
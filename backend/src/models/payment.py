@@ -1,6 +1,11 @@
 from src.models.user import db
 
 class Payment(db.Model):
+    __table_args__ = (
+        # Nota de folha de pagamento por período (/payroll/<id>/note)
+        db.Index('ix_payment_employee_date', 'employee_id', 'date'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     employee_id = db.Column(db.Integer, db.ForeignKey("employee.id"), nullable=False)
     amount = db.Column(db.Float, nullable=False)
@@ -2,6 +2,10 @@ from src.models.user import db
 from datetime import datetime
 
 class Payroll(db.Model):
+    __table_args__ = (
+        db.Index('ix_payroll_employee_period', 'employee_id', 'year', 'month'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     employee_id = db.Column(db.Integer, db.ForeignKey("employee.id"), nullable=False)
     month = db.Column(db.Integer, nullable=False)  # 1-12
@@ -37,18 +41,72 @@ class Payroll(db.Model):
         return self.net_salary
 
     def update_vales_total(self):
-        """Atualiza o total de vales baseado nos vales registrados no mês/ano"""
+        """
+        Recalcula o total de vales do mês/ano do zero (folha nova ou
+        /recalculate). A soma é feita no banco sobre o índice (employee_id, date);
+        no dia a dia o total é mantido por deltas (src/models/vale.py).
+        """
         from src.models.vale import Vale
-        from sqlalchemy import extract
+        from src.utils.date_ranges import in_month
         
-        # Buscar todos os vales do funcionário no mês/ano específico
-        vales = Vale.query.filter(
+        self.total_vales = db.session.query(db.func.coalesce(db.func.sum(Vale.amount), 0.0)).filter(
             Vale.employee_id == self.employee_id,
-            extract('month', Vale.date) == self.month,
-            extract('year', Vale.date) == self.year
-        ).all()
-        
-        self.total_vales = sum(vale.amount for vale in vales)
+            in_month(Vale.date, self.year, self.month)
+        ).scalar()
         self.calculate_net_salary()
         return self.total_vales
 
+    @classmethod
+    def for_periods(cls, periods):
+        """
+        Folhas de vários (employee_id, ano, mês) de uma vez (lotes de vales).
+        As existentes já têm os vales do flush; as que faltam são criadas com
+        o total calculado numa única consulta. Retorna {(employee_id, ano, mês): folha}.
+        """
+        from src.models.employee import Employee
+        from src.models.vale import Vale
+        from src.utils.date_ranges import in_month
+
+        periods = set(periods)
+        if not periods:
+            return {}
+
+        payrolls = {
+            (payroll.employee_id, payroll.year, payroll.month): payroll
+            for payroll in cls.query.filter(db.or_(*(
+                db.and_(cls.employee_id == employee_id, cls.year == year, cls.month == month)
+                for employee_id, year, month in periods
+            )))
+        }
+        missing = periods - set(payrolls)
+        if not missing:
+            return payrolls
+
+        totals = dict.fromkeys(missing, 0.0)
+        vales = db.session.query(Vale.employee_id, Vale.date, Vale.amount).filter(db.or_(*(
+            db.and_(Vale.employee_id == employee_id, in_month(Vale.date, year, month))
+            for employee_id, year, month in missing
+        )))
+        for employee_id, vale_date, amount in vales:
+            period = (employee_id, vale_date.year, vale_date.month)
+            if period in totals:
+                totals[period] += amount or 0.0
+
+        employees = {
+            employee.id: employee
+            for employee in Employee.query.filter(Employee.id.in_({period[0] for period in missing}))
+        }
+        for period in missing:
+            employee = employees.get(period[0])
+            if employee:
+                payroll = cls(
+                    employee_id=period[0],
+                    month=period[2],
+                    year=period[1],
+                    base_salary=employee.salary or 0.0,
+                    total_vales=totals[period]
+                )
+                payroll.calculate_net_salary()
+                db.session.add(payroll)
+                payrolls[period] = payroll
+        return payrolls
@@ -0,0 +1,252 @@
+"""
+Agregados de relatório por dia, semana e mês (rollups)
+
+Cada série (vendas, custos, lucros, caixa...) guarda, por chave (status,
+categoria, tipo) e por período, a quantidade de linhas e a soma de um valor.
+Os modelos registram suas séries com track_rollups() e as gravações do ORM
+atualizam os agregados no mesmo flush/transação da linha original (deltas:
+inserção soma, exclusão subtrai, alteração subtrai o valor antigo e soma o
+novo). Se o flush falhar, o rollback desfaz os deltas junto com a linha.
+Consultas por período ficam em src/services/reporting.py.
+
+Alterações que não passam pelo flush (query.update/delete em massa) marcam a
+série como desatualizada; ela é reconstruída das linhas no próximo acesso.
+"""
+
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import event, inspect as sa_inspect, select
+from sqlalchemy.orm import Session
+
+from src.models.user import db
+
+GRANULARITIES = ("day", "week", "month")
+
+# serie → definição; preenchido por track_rollups() nos módulos dos modelos
+SERIES = {}
+# tabela → séries dela (consulta rápida no flush)
+_SERIES_BY_TABLE = {}
+
+
+class ReportRollup(db.Model):
+    __tablename__ = 'report_rollup'
+
+    serie = db.Column(db.String(50), primary_key=True)
+    key = db.Column(db.String(100), primary_key=True, default='')
+    granularity = db.Column(db.String(5), primary_key=True)  # day, week, month
+    period_start = db.Column(db.Date, primary_key=True)  # dia, segunda-feira ou dia 1
+    count = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f"<ReportRollup {self.serie}/{self.key} {self.granularity} {self.period_start}>"
+
+
+class ReportRollupState(db.Model):
+    """Séries já construídas a partir das linhas (ausente = reconstruir)"""
+    __tablename__ = 'report_rollup_state'
+
+    serie = db.Column(db.String(50), primary_key=True)
+    built_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class RollupSerie:
+    """Como uma tabela alimenta uma série: coluna de data, valor somado e chave"""
+
+    def __init__(self, name, model, date, value, key=None, key_sql=None):
+        self.name = name
+        self.model = model
+        self.date_attr = date
+        self.value_attr = value
+        # key: nome de coluna, função(instância) ou None (chave única '')
+        self.key = key
+        self.key_sql = key_sql
+
+    @property
+    def attrs(self):
+        names = {self.date_attr, self.value_attr}
+        if isinstance(self.key, str):
+            names.add(self.key)
+        return names
+
+    def key_of(self, values):
+        if self.key is None:
+            return ''
+        if callable(self.key):
+            return self.key(values)
+        return values.get(self.key) or ''
+
+    def key_expression(self):
+        """Expressão SQL da chave (reconstrução)"""
+        if self.key is None:
+            return db.literal('')
+        if self.key_sql is not None:
+            return self.key_sql(self.model)
+        return db.func.coalesce(getattr(self.model, self.key), '')
+
+
+def track_rollups(model, name, date, value, key=None, key_sql=None):
+    """Registra uma série de agregados alimentada pelo modelo"""
+    serie = RollupSerie(name, model, date, value, key, key_sql)
+    SERIES[name] = serie
+    _SERIES_BY_TABLE.setdefault(model.__tablename__, []).append(serie)
+    return serie
+
+
+def series_for_table(table_name):
+    """Nomes das séries alimentadas por uma tabela"""
+    return [serie.name for serie in _SERIES_BY_TABLE.get(table_name, ())]
+
+
+def as_day(value):
+    """Dia de um DateTime/Date (None se ausente)"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def period_start(day, granularity):
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def previous_values(session, obj, attrs):
+    """
+    Valores antes da alteração (histórico ou, se não carregados, a linha
+    ainda não gravada). LookupError se a linha já não existe no banco.
+    """
+    state = sa_inspect(obj)
+    values = {}
+    missing = []
+    for attr in attrs:
+        history = state.attrs[attr].history
+        if history.deleted:
+            values[attr] = history.deleted[0]
+        elif history.unchanged:
+            values[attr] = history.unchanged[0]
+        else:
+            missing.append(attr)
+    if missing:
+        model = state.mapper.class_
+        pk = state.mapper.primary_key
+        row = session.connection().execute(
+            select(*(getattr(model, attr) for attr in missing))
+            .where(*(column == value for column, value in zip(pk, state.identity)))
+        ).one_or_none()
+        if row is None:
+            raise LookupError(state.identity)
+        values.update(zip(missing, row))
+    return values
+
+
+def _new_values(obj, serie):
+    return {attr: getattr(obj, attr) for attr in serie.attrs}
+
+
+def _changed(obj, serie):
+    state = sa_inspect(obj)
+    return any(state.attrs[attr].history.has_changes() for attr in serie.attrs)
+
+
+def _contribute(deltas, serie, values, sign):
+    day = as_day(values.get(serie.date_attr))
+    if day is None:
+        return
+    amount = values.get(serie.value_attr) or 0.0
+    key = str(serie.key_of(values))[:100]
+    for granularity in GRANULARITIES:
+        bucket = (serie.name, key, granularity, period_start(day, granularity))
+        count, total = deltas.get(bucket, (0, 0.0))
+        deltas[bucket] = (count + sign, total + sign * amount)
+
+
+def apply_deltas(connection, deltas):
+    """Soma os deltas aos agregados (upsert atômico por linha)"""
+    rows = [
+        {"serie": serie, "key": key, "granularity": granularity, "period_start": start,
+         "count": count, "total": total}
+        for (serie, key, granularity, start), (count, total) in deltas.items()
+        if count or total
+    ]
+    if not rows:
+        return
+    table = ReportRollup.__table__
+    if connection.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    statement = insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.serie, table.c.key, table.c.granularity, table.c.period_start],
+        set_={
+            "count": table.c.count + statement.excluded.count,
+            "total": table.c.total + statement.excluded.total,
+        },
+    )
+    connection.execute(statement, rows)
+
+
+def invalidate(connection, series):
+    """Marca séries para reconstrução no próximo acesso"""
+    if series:
+        connection.execute(
+            ReportRollupState.__table__.delete().where(ReportRollupState.serie.in_(list(series))))
+
+
+def _tracked(objects):
+    for obj in objects:
+        for serie in _SERIES_BY_TABLE.get(getattr(obj, '__tablename__', None), ()):
+            yield obj, serie
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_old_rollups(session, flush_context, instances):
+    """Subtrai o estado antigo das linhas alteradas/excluídas (o banco ainda o tem)"""
+    if not _SERIES_BY_TABLE:
+        return
+    deltas = {}
+    stale = set()
+    changed = []
+    for obj, serie in _tracked(session.dirty):
+        if _changed(obj, serie):
+            changed.append((obj, serie))
+    for obj, serie in changed + list(_tracked(session.deleted)):
+        try:
+            _contribute(deltas, serie, previous_values(session, obj, serie.attrs), -1)
+        except LookupError:
+            stale.add(serie.name)
+    session.info['report_rollup'] = (deltas, stale, changed)
+
+
+@event.listens_for(Session, "after_flush")
+def _update_rollups(session, flush_context):
+    """Soma o estado novo das linhas inseridas/alteradas e grava os deltas no mesmo flush"""
+    deltas, stale, changed = session.info.pop('report_rollup', ({}, set(), []))
+    for obj, serie in changed + list(_tracked(session.new)):
+        # Padrões de coluna (ex.: created_at) já foram preenchidos pelo INSERT
+        _contribute(deltas, serie, _new_values(obj, serie), +1)
+    if deltas or stale:
+        connection = session.connection()
+        apply_deltas(connection, deltas)
+        invalidate(connection, stale)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bulk_invalidate(orm_execute_state):
+    """query.update()/delete() em massa não passam pelo flush"""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    series = _SERIES_BY_TABLE.get(mapper.local_table.name, ()) if mapper is not None else ()
+    if series:
+        invalidate(orm_execute_state.session.connection(), {serie.name for serie in series})
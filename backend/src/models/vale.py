@@ -1,7 +1,15 @@
 from src.models.user import db
+from src.models.report_rollup import previous_values
 from datetime import datetime
+from sqlalchemy import bindparam, event, inspect as sa_inspect
+from sqlalchemy.orm import Session
 
 class Vale(db.Model):
+    __table_args__ = (
+        # Vales do funcionário por período (folha de pagamento, /vales?month=&year=)
+        db.Index('ix_vale_employee_date', 'employee_id', 'date'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     employee_id = db.Column(db.Integer, db.ForeignKey("employee.id"), nullable=False)
     amount = db.Column(db.Float, nullable=False)
@@ -30,7 +38,11 @@ class Vale(db.Model):
         }
 
     def update_payroll(self):
-        """Atualiza a folha de pagamento do funcionário após criar/atualizar vale"""
+        """
+        Garante a folha de pagamento do mês do vale. O total de vales das
+        folhas existentes já é mantido no flush (ver _update_payroll_vales);
+        só uma folha nova é calculada do zero.
+        """
         from src.models.payroll import Payroll
         
         # Buscar folha de pagamento do mês/ano do vale
@@ -56,13 +68,84 @@ class Vale(db.Model):
                     total_vales=0.0,
                     net_salary=employee.salary or 0.0
                 )
+                payroll.update_vales_total()
                 db.session.add(payroll)
-        
-        if payroll:
-            # Atualizar total de vales na folha de pagamento
-            payroll.update_vales_total()
-            db.session.commit()
+                db.session.commit()
         
         return payroll
 
 
+# Folha de pagamento por deltas: cada vale inserido, alterado ou excluído
+# soma/subtrai seu valor no total_vales da folha do (funcionário, mês), no
+# mesmo flush e por UPDATE atômico (total_vales = total_vales + delta), sem
+# reler os vales do mês. Folhas ainda inexistentes são criadas com o cálculo
+# completo (Payroll.update_vales_total).
+PAYROLL_ATTRS = ('employee_id', 'date', 'amount')
+
+
+def _period(values):
+    day = values.get('date')
+    if values.get('employee_id') is None or not hasattr(day, 'month'):
+        return None
+    return values['employee_id'], day.year, day.month
+
+
+def _add_delta(deltas, values, sign):
+    period = _period(values)
+    if period is not None:
+        deltas[period] = deltas.get(period, 0.0) + sign * (values.get('amount') or 0.0)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_old_vales(session, flush_context, instances):
+    """Subtrai o estado antigo dos vales alterados/excluídos (o banco ainda o tem)"""
+    deltas = {}
+    changed = []
+    for obj in session.dirty:
+        if isinstance(obj, Vale):
+            state = sa_inspect(obj)
+            if any(state.attrs[attr].history.has_changes() for attr in PAYROLL_ATTRS):
+                changed.append(obj)
+    for obj in changed + [obj for obj in session.deleted if isinstance(obj, Vale)]:
+        try:
+            _add_delta(deltas, previous_values(session, obj, PAYROLL_ATTRS), -1)
+        except LookupError:
+            pass  # linha já excluída por outro caminho
+    session.info['payroll_vales'] = (deltas, changed)
+
+
+@event.listens_for(Session, "after_flush")
+def _update_payroll_vales(session, flush_context):
+    """Soma o estado novo e aplica os deltas às folhas existentes"""
+    deltas, changed = session.info.pop('payroll_vales', ({}, []))
+    for obj in changed + [obj for obj in session.new if isinstance(obj, Vale)]:
+        _add_delta(deltas, {attr: getattr(obj, attr) for attr in PAYROLL_ATTRS}, +1)
+    deltas = {period: delta for period, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    from src.models.payroll import Payroll
+    table = Payroll.__table__
+    total = db.func.coalesce(table.c.total_vales, 0.0) + bindparam('delta')
+    session.connection().execute(
+        table.update()
+        .where(table.c.employee_id == bindparam('p_employee_id'),
+               table.c.year == bindparam('p_year'),
+               table.c.month == bindparam('p_month'))
+        .values(total_vales=total, net_salary=table.c.base_salary - total, updated_at=datetime.utcnow()),
+        [{'p_employee_id': employee_id, 'p_year': year, 'p_month': month, 'delta': delta}
+         for (employee_id, year, month), delta in deltas.items()]
+    )
+    session.info.setdefault('payroll_stale', set()).update(deltas)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _expire_payrolls(session, flush_context):
+    """Folhas já carregadas na sessão releem os totais gravados pelo UPDATE"""
+    stale = session.info.pop('payroll_stale', None)
+    if not stale:
+        return
+    from src.models.payroll import Payroll
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, Payroll) and (obj.employee_id, obj.year, obj.month) in stale:
+            session.expire(obj, ['total_vales', 'net_salary', 'updated_at'])
@@ -0,0 +1,26 @@
+from flask import Blueprint, jsonify
+import time
+
+from src.utils.auth import admin_required
+from src.utils.profiler import SLOW_QUERY_LOG, SLOW_QUERY_MS, profiler
+
+admin_profiler_bp = Blueprint("admin_profiler", __name__)
+
+@admin_profiler_bp.route("/admin/profiler", methods=["GET"])
+@admin_required
+def get_profiler_stats(current_user):
+    """Percentis de latência, SQL e tamanho de resposta por rota (piores p95 primeiro)"""
+    return jsonify({
+        "since": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(profiler.started_at)),
+        "window_per_route": profiler.window,
+        "slow_query_ms": SLOW_QUERY_MS,
+        "slow_query_log": str(SLOW_QUERY_LOG),
+        "routes": profiler.snapshot(),
+    }), 200
+
+@admin_profiler_bp.route("/admin/profiler", methods=["DELETE"])
+@admin_required
+def reset_profiler_stats(current_user):
+    """Zera os agregados (ex.: antes de medir uma mudança)"""
+    profiler.reset()
+    return jsonify({"message": "Estatísticas do profiler zeradas"}), 200
@@ -6,6 +6,7 @@ from src.models.customer import Customer
 from src.models.jewelry import Jewelry
 from src.models.order import Order
 from src.models.payment import Payment
+from src.utils.date_ranges import on_day
 from datetime import datetime, timedelta
 from sqlalchemy import func
 
@@ -98,7 +99,7 @@ def process_ai_command(command):
                 # Vendas de hoje
                 today = datetime.now().date()
                 orders = Order.query.filter(
-                    func.date(Order.created_at) == today
+                    on_day(Order.created_at, today)
                 ).all()
                 
                 if orders:
@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from src.models.user import db
 from src.models.employee import Employee
 from src.models.vale import Vale
@@ -12,18 +12,19 @@ from src.models.cost import Cost, Profit
 from src.models.payroll import Payroll
 from src.models.nota import Nota
 from src.models.imposto import Imposto
+from src.utils.date_ranges import between_days, on_day, until_day
+from src.utils.lazy import lazy_import
+from src.utils.text_normalization import normalizar
+from src.services.lua_pipeline import processar_turno
+from src.services.reporting import caixa_summary, period_range, sales_summary
 from datetime import datetime, timedelta
 from sqlalchemy import func, and_, or_
 import re
 
-# Importar sistema de consciência e voz
-try:
-    from src.services.lua_consciousness import lua_consciousness, get_lua_response
-    from src.services.voice_engine import generate_lua_voice
-    LUA_CONSCIOUSNESS_AVAILABLE = True
-except ImportError:
-    print("⚠️ Sistema de consciência da LUA não disponível")
-    LUA_CONSCIOUSNESS_AVAILABLE = False
+# Sistema de consciência e voz: carregados no primeiro comando (ou no
+# aquecimento), pois o motor de voz importa torch/TTS e carrega o modelo
+lua_consciousness_module = lazy_import('src.services.lua_consciousness', 'Sistema de consciência da LUA')
+voice_engine_module = lazy_import('src.services.voice_engine', 'Motor de voz da LUA')
 
 # Importar sistema de reconhecimento de intenções
 try:
@@ -40,13 +41,10 @@ class AIAssistant:
     
     @staticmethod
     def extract_amount(text):
-        """Extrai valor monetário do texto"""
-        pattern = r'(?:R\$)?\s*(\d+(?:[.,]\d{1,2})?)'
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            value = match.group(1).replace(',', '.')
-            return float(value)
-        return None
+        """Extrai valor monetário do texto (R$ 1.234,56, 50 reais ou o primeiro número)"""
+        normalizado = normalizar(text)
+        valores = normalizado.valores('moeda') or normalizado.valores('numero')
+        return float(valores[0]) if valores else None
     
     @staticmethod
     def extract_name(text, prefix_words=['para', 'de', 'do', 'da']):
@@ -200,6 +198,16 @@ class AIAssistant:
         
         return None
 
+def lua_session_id(data, context):
+    """Sessão de conversa: explícita, do usuário logado no frontend ou do endereço do cliente"""
+    user = context.get('user') if isinstance(context, dict) else None
+    user_id = user.get('id') if isinstance(user, dict) else None
+    if data.get('session_id'):
+        return str(data['session_id'])
+    if user_id:
+        return f"user:{user_id}"
+    return f"ip:{request.remote_addr or 'local'}"
+
 @ai_enhanced_bp.route('/lua', methods=['POST'])
 def process_lua_command():
     """Processa comandos da IA LUA com funcionalidades completas e consciência"""
@@ -218,43 +226,21 @@ def process_lua_command():
         command_lower = command.lower()
         ai = AIAssistant()
         
+        stream = bool(data.get('stream', False))  # NDJSON: texto primeiro, áudio por frase depois
+        session_id = lua_session_id(data, context)
+        
         # Se consciência está disponível, processar com personalidade
-        if LUA_CONSCIOUSNESS_AVAILABLE:
-            # Obter resposta com consciência
-            consciousness_response, consciousness_metadata = get_lua_response(command, context)
-            
-            # Processar comando de negócio
-            business_response = process_command_type(command, command_lower, ai)
-            
-            # Combinar resposta de consciência com dados de negócio
-            if business_response.get('success'):
-                # Adicionar personalidade à resposta de negócio
-                final_message = f"{consciousness_response}\n\n{business_response.get('message', '')}"
-                
-                # Se deve gerar voz
-                audio_data = None
-                if generate_voice:
-                    try:
-                        emotion = consciousness_metadata.get('emotion', 'confident')
-                        audio_path = generate_lua_voice(final_message, emotion)
-                        if audio_path:
-                            # Converter para base64 para enviar ao frontend
-                            import base64
-                            with open(audio_path, 'rb') as audio_file:
-                                audio_data = base64.b64encode(audio_file.read()).decode('utf-8')
-                    except Exception as e:
-                        print(f"Erro ao gerar voz: {str(e)}")
-                
-                response = {
-                    **business_response,
-                    'message': final_message,
-                    'consciousness': consciousness_metadata,
-                    'audio': audio_data,
-                    'has_voice': audio_data is not None
-                }
-            else:
-                response = business_response
-                response['consciousness'] = consciousness_metadata
+        get_lua_response = lua_consciousness_module.attr('get_lua_response')
+        if get_lua_response:
+            # Consciência e comando de negócio em paralelo; voz em pipeline (ver lua_pipeline)
+            response = processar_turno(
+                command, context, stream,
+                get_lua_response=lambda cmd, ctx: get_lua_response(cmd, ctx, session_id),
+                process_business=lambda: process_command_type(command, command_lower, ai),
+                synthesize=voice_engine_module.attr('generate_lua_voice') if generate_voice else None
+            )
+            if stream:
+                return Response(stream_with_context(response), mimetype='application/x-ndjson')
         else:
             # Processar sem consciência (modo tradicional)
             response = process_command_type(command, command_lower, ai)
@@ -623,9 +609,9 @@ def process_search_command(command, command_lower, ai):
             query = query.join(Customer).filter(Customer.name.ilike(f'%{customer_name}%'))
         
         if date:
-            query = query.filter(func.date(Order.created_at) == date)
+            query = query.filter(on_day(Order.created_at, date))
         elif 'hoje' in command_lower:
-            query = query.filter(func.date(Order.created_at) == datetime.now().date())
+            query = query.filter(on_day(Order.created_at, datetime.now()))
         elif 'semana' in command_lower:
             week_ago = datetime.now() - timedelta(days=7)
             query = query.filter(Order.created_at >= week_ago)
@@ -760,42 +746,29 @@ def process_report_command(command, command_lower, ai):
     if 'venda' in command_lower:
         date = ai.extract_date(command)
         
-        query = Order.query.filter(Order.status.in_(['confirmed', 'delivered']))
-        
         if date:
-            query = query.filter(func.date(Order.created_at) == date)
-        elif 'hoje' in command_lower:
-            query = query.filter(func.date(Order.created_at) == datetime.now().date())
+            start, end = period_range('today', date)
         elif 'ontem' in command_lower:
-            yesterday = datetime.now() - timedelta(days=1)
-            query = query.filter(func.date(Order.created_at) == yesterday.date())
+            start, end = period_range('yesterday')
         elif 'semana' in command_lower:
-            week_ago = datetime.now() - timedelta(days=7)
-            query = query.filter(Order.created_at >= week_ago)
+            start, end = period_range('week')
         elif 'mês' in command_lower or 'mes' in command_lower:
-            month_ago = datetime.now() - timedelta(days=30)
-            query = query.filter(Order.created_at >= month_ago)
+            start, end = period_range('month')
         else:
-            # Por padrão, relatório do dia
-            query = query.filter(func.date(Order.created_at) == datetime.now().date())
+            # Por padrão (ou "hoje"), relatório do dia
+            start, end = period_range('today')
         
-        orders = query.all()
+        # Soma dos agregados diários/semanais/mensais, sem carregar as encomendas
+        sales = sales_summary(start, end)
         
-        if orders:
-            total = sum(o.total_price for o in orders if o.total_price)
-            avg = total / len(orders) if orders else 0
-            
-            # Produtos mais vendidos
-            product_count = {}
-            for order in orders:
-                # Aqui você precisaria acessar os itens do pedido
-                # Assumindo que há uma relação order.items
-                pass
+        if sales['count']:
+            total = sales['total']
+            avg = sales['average']
             
             message = f'📊 RELATÓRIO DE VENDAS\n'
             message += f'{"=" * 40}\n'
             message += f'📅 Período: {date.strftime("%d/%m/%Y") if date else "Hoje"}\n'
-            message += f'📦 Total de vendas: {len(orders)}\n'
+            message += f'📦 Total de vendas: {sales["count"]}\n'
             message += f'💰 Valor total: R$ {total:.2f}\n'
             message += f'📈 Ticket médio: R$ {avg:.2f}\n'
             
@@ -806,7 +779,7 @@ def process_report_command(command, command_lower, ai):
                 'module': 'dashboard',
                 'data': {
                     'type': 'sales',
-                    'count': len(orders),
+                    'count': sales['count'],
                     'total': total,
                     'average': avg
                 }
@@ -822,14 +795,11 @@ def process_report_command(command, command_lower, ai):
     elif 'financeiro' in command_lower or 'caixa' in command_lower:
         date = ai.extract_date(command) or datetime.now().date()
         
-        # Buscar transações do caixa
-        transactions = CaixaTransaction.query.filter(
-            func.date(CaixaTransaction.created_at) == date
-        ).all()
-        
-        entradas = sum(t.amount for t in transactions if t.type == 'entrada')
-        saidas = sum(t.amount for t in transactions if t.type == 'saida')
-        saldo = entradas - saidas
+        # Entradas e saídas do dia a partir dos agregados do caixa
+        caixa = caixa_summary(date, date)
+        entradas = caixa['entradas']
+        saidas = caixa['saidas']
+        saldo = caixa['saldo']
         
         message = f'💰 RELATÓRIO FINANCEIRO\n'
         message += f'{"=" * 40}\n'
@@ -837,7 +807,7 @@ def process_report_command(command, command_lower, ai):
         message += f'✅ Entradas: R$ {entradas:.2f}\n'
         message += f'❌ Saídas: R$ {saidas:.2f}\n'
         message += f'💵 Saldo: R$ {saldo:.2f}\n'
-        message += f'📊 Total de transações: {len(transactions)}\n'
+        message += f'📊 Total de transações: {caixa["transactions"]}\n'
         
         return {
             'success': True,
@@ -849,7 +819,7 @@ def process_report_command(command, command_lower, ai):
                 'entradas': entradas,
                 'saidas': saidas,
                 'saldo': saldo,
-                'transactions': len(transactions)
+                'transactions': caixa['transactions']
             }
         }
     
@@ -1069,7 +1039,7 @@ def process_financial_command(command, command_lower, ai):
         
         # Calcular saldo
         transactions = CaixaTransaction.query.filter(
-            func.date(CaixaTransaction.created_at) <= date
+            until_day(CaixaTransaction.date, date)
         ).all()
         
         entradas = sum(t.amount for t in transactions if t.type == 'entrada')
@@ -1077,7 +1047,7 @@ def process_financial_command(command, command_lower, ai):
         saldo = entradas - saidas
         
         # Transações do dia
-        today_transactions = [t for t in transactions if t.created_at.date() == date]
+        today_transactions = [t for t in transactions if t.date and t.date.date() == date]
         today_entradas = sum(t.amount for t in today_transactions if t.type == 'entrada')
         today_saidas = sum(t.amount for t in today_transactions if t.type == 'saida')
         
@@ -1220,17 +1190,11 @@ def process_financial_command(command, command_lower, ai):
         
         # Buscar custos e receitas
         costs = Cost.query.filter(
-            and_(
-                func.date(Cost.created_at) >= start_date,
-                func.date(Cost.created_at) <= end_date
-            )
+            between_days(Cost.created_at, start_date, end_date)
         ).all()
         
         profits = Profit.query.filter(
-            and_(
-                func.date(Profit.created_at) >= start_date,
-                func.date(Profit.created_at) <= end_date
-            )
+            between_days(Profit.created_at, start_date, end_date)
         ).all()
         
         total_costs = sum(c.amount for c in costs if c.amount)
@@ -1477,7 +1441,7 @@ def process_general_command(command, command_lower, ai):
         employees = Employee.query.count()
         customers = Customer.query.count()
         orders_today = Order.query.filter(
-            func.date(Order.created_at) == datetime.now().date()
+            on_day(Order.created_at, datetime.now())
         ).count()
         pending_vales = Vale.query.filter(Vale.status == 'pending').count()
         
@@ -1704,7 +1668,7 @@ def execute_crud_operation(operation, entity_type, parameters):
                 
                 if filters.get('time_filter') == 'today':
                     today = datetime.now().date()
-                    query = query.filter(func.date(Vale.date) == today)
+                    query = query.filter(on_day(Vale.date, today))
                 elif filters.get('time_filter') == 'this_week':
                     week_start = datetime.now() - timedelta(days=datetime.now().weekday())
                     query = query.filter(Vale.date >= week_start)
@@ -1795,23 +1759,15 @@ def generate_report_ai(report_type):
             start_date = end_date.replace(hour=0, minute=0, second=0)
         
         if report_type == 'sales':
-            # Relatório de vendas
-            orders = Order.query.filter(
-                and_(
-                    Order.created_at >= start_date,
-                    Order.created_at <= end_date,
-                    Order.status.in_(['confirmed', 'delivered'])
-                )
-            ).all()
-            
-            total = sum(o.total_price for o in orders if o.total_price)
+            # Relatório de vendas (agregados por período)
+            sales = sales_summary(*period_range(period))
             
             return jsonify({
                 'success': True,
-                'summary': f'{len(orders)} vendas totalizando R$ {total:.2f}',
+                'summary': f'{sales["count"]} vendas totalizando R$ {sales["total"]:.2f}',
                 'data': {
-                    'count': len(orders),
-                    'total': total,
+                    'count': sales['count'],
+                    'total': sales['total'],
                     'period': period
                 }
             })
@@ -1833,16 +1789,10 @@ def generate_report_ai(report_type):
             })
         
         elif report_type == 'financial':
-            # Relatório financeiro
-            transactions = CaixaTransaction.query.filter(
-                and_(
-                    CaixaTransaction.created_at >= start_date,
-                    CaixaTransaction.created_at <= end_date
-                )
-            ).all()
-            
-            entradas = sum(t.amount for t in transactions if t.type == 'entrada')
-            saidas = sum(t.amount for t in transactions if t.type == 'saida')
+            # Relatório financeiro (agregados do caixa pela data do lançamento)
+            caixa = caixa_summary(*period_range(period))
+            entradas = caixa['entradas']
+            saidas = caixa['saidas']
             
             return jsonify({
                 'success': True,
@@ -8,11 +8,15 @@ import json
 import re
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
-import requests
 from flask import Blueprint, request, jsonify
 from dataclasses import dataclass, asdict
 import logging
 
+from src.utils.lazy import ModuleProxy
+
+# requests (~60 ms) só é importado na primeira chamada HTTP
+requests = ModuleProxy('requests')
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
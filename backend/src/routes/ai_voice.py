@@ -9,29 +9,12 @@ import tempfile
 import traceback
 from pathlib import Path
 
-# Importar serviços
-try:
-    from src.services.voice_engine import generate_lua_voice, voice_engine
-except ImportError:
-    print("⚠️ Erro ao importar voice_engine, tentando caminho alternativo...")
-    import sys
-    backend_path = os.path.join(os.path.dirname(__file__), "..", "..")
-    if backend_path not in sys.path:
-        sys.path.insert(0, backend_path)
-    try:
-        from src.services.voice_engine import generate_lua_voice, voice_engine
-    except ImportError as e:
-        print(f"❌ Não foi possível importar voice_engine: {e}")
-        voice_engine = None
-        generate_lua_voice = None
+from src.utils.lazy import lazy_import
 
-# Importar pydub para conversão de áudio
-try:
-    from pydub import AudioSegment
-    from pydub.effects import normalize
-except ImportError:
-    print("⚠️ PyDub não disponível")
-    AudioSegment = None
+# O motor de voz importa torch/TTS e carrega o modelo: só no primeiro uso
+voice_engine_module = lazy_import('src.services.voice_engine', 'Motor de voz da LUA')
+# pydub para conversão de áudio
+pydub_module = lazy_import('pydub', 'PyDub')
 
 ai_voice_bp = Blueprint('ai_voice', __name__)
 
@@ -39,6 +22,7 @@ ai_voice_bp = Blueprint('ai_voice', __name__)
 def voice_status():
     """Retorna status do sistema de voz"""
     try:
+        voice_engine = voice_engine_module.attr('voice_engine')
         if voice_engine:
             try:
                 status = voice_engine.get_voice_status()
@@ -77,9 +61,11 @@ def convert_to_mp3_44k_stereo(audio_path):
     Garante formato consistente para o frontend
     """
     try:
-        if not AudioSegment:
+        if not pydub_module.available:
             print("⚠️ pydub não disponível - retornando arquivo original")
             return audio_path
+        from pydub import AudioSegment
+        from pydub.effects import normalize
         
         audio_path = Path(audio_path)
         
@@ -165,7 +151,8 @@ def text_to_speech():
         
         # Gerar áudio usando a voz da LUA
         print(f"🎵 Gerando áudio para: '{text[:50]}...'")
-        audio_path = generate_lua_voice(text, emotion)
+        generate_lua_voice = voice_engine_module.attr('generate_lua_voice')
+        audio_path = generate_lua_voice(text, emotion) if generate_lua_voice else None
         
         if not audio_path:
             print("❌ generate_lua_voice retornou None")
@@ -238,6 +225,7 @@ def text_to_speech():
 def clear_voice_cache():
     """Limpa cache de voz antigo"""
     try:
+        voice_engine = voice_engine_module.attr('voice_engine')
         if voice_engine and hasattr(voice_engine, 'clear_cache'):
             hours = request.get_json().get('hours', 24) if request.get_json() else 24
             voice_engine.clear_cache(hours)
@@ -1,13 +1,24 @@
 from flask import Blueprint, request, jsonify
 from src.models.user import db
 from src.models.employee import Employee
+from src.utils.batch import BatchError, batch_items, batch_status, batch_summary, cancelled, is_id, item_error
+from src.utils.date_ranges import parse_datetime, parse_day, since_day, until_day
 from datetime import datetime
+import math
 
 # Importar os novos modelos (serão adicionados ao sistema)
 from src.models.caixa import CaixaCategory, CaixaTransaction
 
 caixa_bp = Blueprint("caixa", __name__)
 
+def _filter_period(query, start_date, end_date):
+    """Filtra pelo período em dias inclusivos (usa o índice de date)"""
+    if start_date:
+        query = query.filter(since_day(CaixaTransaction.date, parse_day(start_date)))
+    if end_date:
+        query = query.filter(until_day(CaixaTransaction.date, parse_day(end_date)))
+    return query
+
 @caixa_bp.route("/caixa/categories", methods=["GET"])
 def get_categories():
     """Obter todas as categorias de saída"""
@@ -47,10 +58,10 @@ def get_transactions():
     query = CaixaTransaction.query
     
     # Aplicar filtros
-    if start_date:
-        query = query.filter(CaixaTransaction.date >= start_date)
-    if end_date:
-        query = query.filter(CaixaTransaction.date <= end_date)
+    try:
+        query = _filter_period(query, start_date, end_date)
+    except ValueError:
+        return jsonify({"error": "Data inválida, use AAAA-MM-DD"}), 400
     if transaction_type:
         query = query.filter(CaixaTransaction.type == transaction_type)
     if category_id:
@@ -79,6 +90,92 @@ def create_transaction():
     db.session.commit()
     return jsonify(new_transaction.to_dict()), 201
 
+@caixa_bp.route("/caixa/transactions/batch", methods=["POST"])
+def create_transactions_batch():
+    """
+    Cria várias transações numa única transação do banco (fechamento do dia).
+    Corpo: lista ou {"transactions": [...], "atomic": bool}
+    """
+    try:
+        items, atomic = batch_items(request.get_json(silent=True), key="transactions")
+    except BatchError as e:
+        return jsonify({"error": str(e)}), 400
+    atomic = atomic or request.args.get('atomic') in ('1', 'true')
+
+    results = [None] * len(items)
+    valid = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index] = item_error(index, "Item deve ser um objeto")
+            continue
+        if item.get("type") not in ('entrada', 'saida'):
+            results[index] = item_error(index, "type deve ser 'entrada' ou 'saida'")
+            continue
+        invalid = [key for key in ("category_id", "employee_id") if item.get(key) is not None and not is_id(item[key])]
+        if invalid:
+            results[index] = item_error(index, f"{invalid[0]} inválido")
+            continue
+        try:
+            amount = float(item["amount"])
+            transaction_date = parse_datetime(item["date"])
+        except KeyError as e:
+            results[index] = item_error(index, f"Campo obrigatório ausente: {e.args[0]}")
+            continue
+        except (TypeError, ValueError):
+            results[index] = item_error(index, "amount ou date inválido")
+            continue
+        if not math.isfinite(amount) or amount <= 0:
+            # inf entraria no caixa/folha e nos agregados do mês; nan quebraria o INSERT do lote
+            results[index] = item_error(index, "amount deve ser um número positivo")
+            continue
+        valid.append((index, item, amount, transaction_date))
+
+    # Só ids já validados vão para o IN (...)
+    category_ids = {item.get("category_id") for _, item, _, _ in valid} - {None}
+    employee_ids = {item.get("employee_id") for _, item, _, _ in valid} - {None}
+    # Mantidos na sessão: to_dict() acha categoria e funcionário sem nova consulta
+    categories = {c.id: c for c in CaixaCategory.query.filter(CaixaCategory.id.in_(category_ids))} \
+        if category_ids else {}
+    employees = {e.id: e for e in Employee.query.filter(Employee.id.in_(employee_ids))} if employee_ids else {}
+
+    created = []
+    for index, item, amount, transaction_date in valid:
+        if item.get("category_id") is not None and item["category_id"] not in categories:
+            results[index] = item_error(index, "Categoria não encontrada")
+            continue
+        if item.get("employee_id") is not None and item["employee_id"] not in employees:
+            results[index] = item_error(index, "Funcionário não encontrado")
+            continue
+        created.append(CaixaTransaction(
+            type=item["type"],
+            amount=amount,
+            date=transaction_date,
+            description=item.get("description", ""),
+            category_id=item.get("category_id"),
+            employee_id=item.get("employee_id")
+        ))
+        results[index] = {"index": index, "status": "created"}
+
+    if not created or (atomic and len(created) < len(items)):
+        return jsonify(batch_summary(cancelled(results))), 400
+
+    try:
+        db.session.add_all(created)
+        db.session.flush()
+        # Respostas antes do commit, que expira os objetos (uma consulta por item ao reler)
+        transactions = iter(created)
+        for result in results:
+            if result["status"] == "created":
+                transaction = next(transactions)
+                result["id"] = transaction.id
+                result["transaction"] = transaction.to_dict()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify(batch_summary(results)), batch_status(results)
+
 @caixa_bp.route("/caixa/transactions/<int:id>", methods=["PUT"])
 def update_transaction(id):
     """Atualizar transação do caixa"""
@@ -111,10 +208,10 @@ def get_summary():
     
     query = CaixaTransaction.query
     
-    if start_date:
-        query = query.filter(CaixaTransaction.date >= start_date)
-    if end_date:
-        query = query.filter(CaixaTransaction.date <= end_date)
+    try:
+        query = _filter_period(query, start_date, end_date)
+    except ValueError:
+        return jsonify({"error": "Data inválida, use AAAA-MM-DD"}), 400
     
     transactions = query.all()
     
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from src.models.user import db
 from src.models.cost import Cost, Profit
 from src.models.order import Order
+from src.services.reporting import profit_summary
 from datetime import datetime
 
 costs_bp = Blueprint("costs", __name__)
@@ -270,30 +271,14 @@ def recalculate_profit(id):
 def get_profit_stats():
     """Estatísticas de lucros"""
     try:
-        # Lucro total
-        total_profit = db.session.query(db.func.sum(Profit.gross_profit)).scalar() or 0
-        
-        # Receita total
-        total_revenue = db.session.query(db.func.sum(Profit.revenue)).scalar() or 0
-        
-        # Custos totais
-        total_costs = db.session.query(db.func.sum(Profit.total_costs)).scalar() or 0
-        
-        # Margem média
-        avg_margin = db.session.query(db.func.avg(Profit.profit_margin)).scalar() or 0
-        
-        # Número de encomendas com lucro calculado
-        orders_with_profit = Profit.query.count()
+        # Lucro, receita, custos, margem média e quantidade (agregados)
+        stats = profit_summary()
         
         # Top 5 encomendas mais lucrativas
         top_profits = Profit.query.order_by(Profit.gross_profit.desc()).limit(5).all()
         
         return jsonify({
-            "total_profit": total_profit,
-            "total_revenue": total_revenue,
-            "total_costs": total_costs,
-            "average_margin": avg_margin,
-            "orders_with_profit": orders_with_profit,
+            **stats,
             "top_profitable_orders": [profit.to_dict() for profit in top_profits]
         }), 200
         
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from src.models.user import db
+from src.models.financial import DiscountTable
 from sqlalchemy import text
 
 discounts_bp = Blueprint("discounts", __name__)
@@ -113,15 +114,10 @@ def delete_discount(id):
 def calculate_discount(amount):
     """Calcula o desconto aplicável para um valor específico"""
     try:
-        # Buscar o maior desconto aplicável para o valor
-        result = db.session.execute(text("""
-            SELECT * FROM discount_table 
-            WHERE soma <= :amount 
-            ORDER BY soma DESC 
-            LIMIT 1
-        """), {"amount": amount})
-        
-        row = result.fetchone()
+        # Buscar o maior desconto aplicável para o valor (ORM: portável entre SQLite e PostgreSQL)
+        row = DiscountTable.query.filter(
+            DiscountTable.soma <= amount
+        ).order_by(DiscountTable.soma.desc()).first()
         
         if not row:
             return jsonify({
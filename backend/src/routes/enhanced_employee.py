@@ -5,16 +5,14 @@ Rotas aprimoradas para funcionários com detalhes completos
 """
 
 from flask import Blueprint, request, jsonify
-import sqlite3
+from src.utils.database import get_raw_connection
 from datetime import datetime
 
 enhanced_employee_bp = Blueprint("enhanced_employee", __name__)
 
 def get_db():
-    """Obter conexão com o banco de dados"""
-    conn = sqlite3.connect('data/joalheria.db')
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Obter conexão do pool compartilhado com o ORM"""
+    return get_raw_connection()
 
 @enhanced_employee_bp.route("/funcionarios/enhanced", methods=["GET"])
 def get_funcionarios_enhanced():
@@ -36,7 +34,7 @@ def get_funcionarios_enhanced():
         params = []
         
         if search:
-            base_query += " AND (name LIKE ? OR cargo LIKE ? OR cpf LIKE ?)"
+            base_query += f" AND (name {conn.like} ? OR cargo {conn.like} ? OR cpf {conn.like} ?)"
             search_param = f"%{search}%"
             params.extend([search_param, search_param, search_param])
         
@@ -263,7 +261,7 @@ def get_funcionarios_stats():
         total = cursor.fetchone()[0]
         
         # Funcionários ativos
-        cursor.execute("SELECT COUNT(*) FROM employee WHERE active = 1")
+        cursor.execute("SELECT COUNT(*) FROM employee WHERE active = ?", (True,))
         ativos = cursor.fetchone()[0]
         
         # Por cargo
@@ -279,7 +277,7 @@ def get_funcionarios_stats():
             por_cargo[row['cargo']] = row['total']
         
         # Folha de pagamento total
-        cursor.execute("SELECT SUM(salary) FROM employee WHERE active = 1")
+        cursor.execute("SELECT SUM(salary) FROM employee WHERE active = ?", (True,))
         folha_total = cursor.fetchone()[0] or 0
         
         conn.close()
@@ -6,15 +6,13 @@ Rotas aprimoradas para joias com paginação, ordenação e relacionamentos
 
 from flask import Blueprint, request, jsonify
 from datetime import datetime
-import sqlite3
+from src.utils.database import get_raw_connection
 
 enhanced_jewelry_bp = Blueprint("enhanced_jewelry", __name__)
 
 def get_db():
-    """Obter conexão com o banco de dados"""
-    conn = sqlite3.connect('data/joalheria.db')
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Obter conexão do pool compartilhado com o ORM"""
+    return get_raw_connection()
 
 @enhanced_jewelry_bp.route("/joias/enhanced", methods=["GET"])
 def get_joias_enhanced():
@@ -45,12 +43,12 @@ def get_joias_enhanced():
         
         # Aplicar filtros
         if search:
-            base_query += " AND (nome LIKE ? OR descricao_completa LIKE ? OR descricao LIKE ?)"
+            base_query += f" AND (nome {conn.like} ? OR descricao_completa {conn.like} ? OR descricao {conn.like} ?)"
             search_param = f"%{search}%"
             params.extend([search_param, search_param, search_param])
         
         if categoria:
-            base_query += " AND descricao LIKE ?"
+            base_query += f" AND descricao {conn.like} ?"
             params.append(f"%{categoria}%")
         
         if com_imagem == "true":
@@ -0,0 +1,103 @@
+from flask import Blueprint, Response, current_app, jsonify, request, send_file, stream_with_context
+
+from src.models.report_history import ReportHistory
+from src.services.exports import (
+    DATASETS, EXPORT_STREAM_MAX_ROWS, FORMATS, build_statement, count_rows, export_index, export_path,
+    filename_for, get_job, stream_export, submit_export
+)
+from src.utils.auth import auth_required
+
+exports_bp = Blueprint("exports", __name__)
+
+FILTER_ARGS = ('start', 'end', 'type', 'status', 'category', 'hidden')
+
+
+def _filters(source):
+    return {name: source.get(name) for name in FILTER_ARGS if source.get(name)}
+
+
+def _job_response(job):
+    body = job.to_dict()
+    body['status_url'] = f"/api/exports/jobs/{job.id}"
+    return jsonify(body), 202
+
+
+@exports_bp.route("/exports", methods=["GET"])
+@auth_required
+def list_exports(current_user):
+    """Relatórios exportáveis e os últimos arquivos gerados"""
+    history = ReportHistory.query.order_by(ReportHistory.generated_at.desc()).limit(50).all()
+    return jsonify({
+        "datasets": {name: {"title": title, "columns": headers} for name, (title, headers, _, _) in DATASETS.items()},
+        "formats": list(FORMATS),
+        "stream_max_rows": EXPORT_STREAM_MAX_ROWS,
+        "history": [
+            {"filename": item.filename, "command": item.command, "generated_at": item.generated_at.isoformat(),
+             "available": export_path(item.filename) is not None}
+            for item in history
+        ],
+    }), 200
+
+
+@exports_bp.route("/exports/<dataset>", methods=["GET"])
+@auth_required
+def export_dataset(current_user, dataset):
+    """
+    CSV/XLSX em fluxo (chunked). PDF e exportações acima de
+    EXPORT_STREAM_MAX_ROWS linhas viram job: 202 com a URL de status.
+    """
+    fmt = request.args.get('format', 'csv').lower()
+    if fmt not in FORMATS:
+        return jsonify({"error": f"Formato inválido: {fmt}"}), 400
+    filters = _filters(request.args)
+    try:
+        statement = build_statement(dataset, filters)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if fmt == 'pdf' or count_rows(statement) > EXPORT_STREAM_MAX_ROWS:
+        return _job_response(submit_export(current_app._get_current_object(), dataset, fmt, filters))
+
+    return Response(
+        stream_with_context(stream_export(dataset, fmt, filters)),
+        mimetype=FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename_for(dataset, fmt)}"'},
+    )
+
+
+@exports_bp.route("/exports/<dataset>", methods=["POST"])
+@auth_required
+def queue_export(current_user, dataset):
+    """Gera o arquivo em segundo plano, em qualquer formato"""
+    data = request.get_json(silent=True) or {}
+    fmt = str(data.get('format', 'csv')).lower()
+    if fmt not in FORMATS:
+        return jsonify({"error": f"Formato inválido: {fmt}"}), 400
+    try:
+        job = submit_export(current_app._get_current_object(), dataset, fmt, _filters(data))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return _job_response(job)
+
+
+@exports_bp.route("/exports/jobs/<job_id>", methods=["GET"])
+@auth_required
+def export_job_status(current_user, job_id):
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job não encontrado"}), 404
+    body = job.to_dict()
+    if job.status == 'done':
+        body['download_url'] = f"/api/exports/files/{job.filename}"
+    return jsonify(body), 200
+
+
+@exports_bp.route("/exports/files/<filename>", methods=["GET"])
+@auth_required
+def download_export(current_user, filename):
+    path = export_path(filename)
+    if path is None:
+        return jsonify({"error": "Arquivo não encontrado ou expirado"}), 404
+    export_index().touch(path)
+    mimetype = FORMATS.get(path.suffix.lstrip('.'), 'application/octet-stream')
+    return send_file(path, mimetype=mimetype, as_attachment=True, download_name=filename, conditional=True)
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from src.models.user import db
 from src.models.financial import FinancialTransaction, ProductionReport, AdvancedOrder, DiscountTable, CostCalculation
+from src.services.reporting import aggregate
 from datetime import datetime
 
 financial_bp = Blueprint('financial', __name__)
@@ -263,18 +264,14 @@ def create_cost_calculation():
 def get_financial_stats():
     try:
         # Estatísticas básicas
-        total_transactions = FinancialTransaction.query.count()
         total_reports = ProductionReport.query.count()
         total_orders = AdvancedOrder.query.count()
         
-        # Soma de entradas e saídas
-        entradas = db.session.query(db.func.sum(FinancialTransaction.valor1)).filter(
-            FinancialTransaction.valor1 > 0
-        ).scalar() or 0
-        
-        saidas = db.session.query(db.func.sum(FinancialTransaction.valor1)).filter(
-            FinancialTransaction.valor1 < 0
-        ).scalar() or 0
+        # Entradas (valor1 > 0) e saídas (valor1 < 0) a partir dos agregados
+        by_sign = aggregate('financial')
+        total_transactions = sum(values['count'] for values in by_sign.values())
+        entradas = by_sign.get('entrada', {}).get('total', 0)
+        saidas = by_sign.get('saida', {}).get('total', 0)
         
         return jsonify({
             'total_transactions': total_transactions,
@@ -0,0 +1,63 @@
+import codecs
+
+from flask import Blueprint, jsonify, request
+
+from src.models.user import db
+from src.services.bulk_import import IMPORTS, open_text, read_records, run_import
+from src.utils.auth import admin_required
+
+imports_bp = Blueprint("imports", __name__)
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+
+
+@imports_bp.route("/import", methods=["GET"])
+@admin_required
+def list_imports(current_user):
+    """Entidades importáveis e as colunas aceitas"""
+    return jsonify({
+        "entities": {
+            name: {
+                "key": spec.key,
+                "columns": sorted(set(spec.columns) | set(spec.references)),
+                "required": spec.required,
+            }
+            for name, spec in IMPORTS.items()
+        },
+        "formats": list(IMPORT_FORMATS),
+    }), 200
+
+
+@imports_bp.route("/import/<entity>", methods=["POST"])
+@admin_required
+def import_entity(current_user, entity):
+    """
+    Importa um arquivo CSV (',' ou ';') ou JSONL enviado no corpo ou como
+    multipart 'file'. ?dry_run=1 só valida; ?encoding=latin-1 (etc.) fixa a
+    codificação (padrão: UTF-8, ou cp1252 se o arquivo não for UTF-8). Responde com o relatório
+    (inseridas, atualizadas, erros por linha).
+    """
+    if entity not in IMPORTS:
+        return jsonify({"error": f"Entidade desconhecida: {entity}"}), 404
+
+    upload = request.files.get('file')
+    fmt = request.args.get('format')
+    if not fmt:
+        name = upload.filename if upload else ''
+        fmt = 'jsonl' if name.endswith(('.jsonl', '.ndjson')) or request.mimetype == 'application/x-ndjson' \
+            else 'csv'
+    fmt = fmt.lower()
+    if fmt not in IMPORT_FORMATS:
+        return jsonify({"error": f"Formato inválido: {fmt}"}), 400
+
+    encoding = request.args.get('encoding') or None
+    if encoding:
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            return jsonify({"error": f"Codificação desconhecida: {encoding}"}), 400
+
+    stream = upload.stream if upload else request.stream
+    dry_run = request.args.get('dry_run', '').lower() in ('1', 'true', 'sim')
+    report = run_import(db.engine, entity, read_records(open_text(stream, encoding), fmt), dry_run=dry_run)
+    return jsonify(report.to_dict()), 200
@@ -4,13 +4,21 @@ Bridge entre o Frontend React e o servidor Kokoro TTS
 """
 
 import os
-import requests
 import json
 import logging
-from flask import Blueprint, request, jsonify, send_file
+from pathlib import Path
+from flask import Blueprint, request, jsonify, send_file, Response, stream_with_context
+from werkzeug.utils import safe_join
 from functools import wraps
 from typing import Dict, Any, Optional
 
+from src.utils.audio_files import audio_etag, cache_control, is_servable
+from src.utils.lazy import ModuleProxy
+from src.utils.text_normalization import normalizar_para_fala
+
+# requests (~60 ms) só é importado na primeira chamada HTTP
+requests = ModuleProxy('requests')
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -21,6 +29,21 @@ kokoro_voice_bp = Blueprint('kokoro_voice', __name__)
 # Configuração
 KOKORO_API = os.getenv("KOKORO_API", "http://localhost:8000")
 KOKORO_TIMEOUT = 30
+# Segundos sugeridos ao cliente enquanto o modelo do Kokoro carrega
+KOKORO_RETRY_AFTER = int(os.getenv("READINESS_RETRY_AFTER", 10))
+
+# Diretório de saída do Kokoro montado neste container (volume compartilhado)
+KOKORO_AUDIO_DIR = os.getenv("KOKORO_AUDIO_DIR", "")
+# Prefixo "internal" do nginx; quando definido, o nginx entrega o arquivo via sendfile
+KOKORO_AUDIO_ACCEL_PREFIX = os.getenv("KOKORO_AUDIO_ACCEL_PREFIX", "")
+# ETag do conteúdo e Cache-Control (no-store para o mock): src/utils/audio_files.py
+AUDIO_MIMETYPES = {".wav": "audio/wav", ".mp3": "audio/mpeg"}
+# Cabeçalhos repassados nos dois sentidos quando ainda é preciso consultar o Kokoro
+AUDIO_REQUEST_HEADERS = ("Range", "If-Range", "If-None-Match")
+AUDIO_RESPONSE_HEADERS = (
+    "Content-Type", "Content-Length", "Content-Range", "Accept-Ranges",
+    "ETag", "Cache-Control", "Last-Modified"
+)
 
 def kokoro_available(f):
     """Decorator para verificar se Kokoro está disponível"""
@@ -30,8 +53,15 @@ def kokoro_available(f):
             response = requests.get(f"{KOKORO_API}/api/voice/status", timeout=5)
             if response.status_code != 200:
                 return jsonify({"error": "Kokoro TTS offline"}), 503
+            status = response.json()
         except:
             return jsonify({"error": "Kokoro TTS não disponível"}), 503
+        # Servidor no ar mas o modelo ainda carregando: o cliente tenta de novo
+        if not status.get("ready", True):
+            return jsonify({
+                "error": "Modelo de voz carregando",
+                "model": status.get("model")
+            }), 503, {"Retry-After": str(KOKORO_RETRY_AFTER)}
         return f(*args, **kwargs)
     return decorated_function
 
@@ -53,6 +83,7 @@ def voice_status():
         
         return jsonify({
             "status": kokoro_status,
+            "ready": kokoro_status == "online" and kokoro_info.get("ready", True),
             "service": "Kokoro TTS",
             "api_url": KOKORO_API,
             "info": kokoro_info,
@@ -101,7 +132,7 @@ def synthesize_speech():
         
         # Preparar payload para Kokoro
         payload = {
-            "text": data.get('text'),
+            "text": normalizar_para_fala(data.get('text') or ''),
             "voice_id": data.get('voice_id', 'luna_br'),
             "speed": data.get('speed', 1.0),
             "pitch": data.get('pitch', 1.0),
@@ -176,7 +207,7 @@ def mix_voices():
         # Chamar endpoint de mix do Kokoro
         response = requests.post(
             f"{KOKORO_API}/api/tts/mix",
-            json=data,
+            json={**data, "text": normalizar_para_fala(data['text'])},
             timeout=KOKORO_TIMEOUT * 2  # Mais tempo para mix
         )
         
@@ -235,29 +266,82 @@ def save_voice_config():
         logger.error(f"Erro ao salvar config: {e}")
         return jsonify({"error": str(e)}), 500
 
+def _local_audio_path(filename: str) -> Optional[str]:
+    """Caminho do arquivo no cache compartilhado, se existir"""
+    if not KOKORO_AUDIO_DIR or not is_servable(os.path.basename(filename)):
+        return None
+    path = safe_join(KOKORO_AUDIO_DIR, filename)
+    if path and os.path.isfile(path):
+        return path
+    return None
+
+def _send_local_audio(path: str, filename: str):
+    """Servir áudio do disco com ETag do conteúdo, Range e 304"""
+    etag = audio_etag(Path(path)).strip('"')
+    mimetype = AUDIO_MIMETYPES.get(os.path.splitext(filename)[1].lower(), 'application/octet-stream')
+
+    if KOKORO_AUDIO_ACCEL_PREFIX:
+        # Zero-copy: o nginx lê o arquivo e trata Range/304 sozinho
+        response = Response(mimetype=mimetype)
+        response.headers['X-Accel-Redirect'] = f"{KOKORO_AUDIO_ACCEL_PREFIX.rstrip('/')}/{filename}"
+        response.set_etag(etag)
+    else:
+        # conditional=True cuida de If-None-Match e Range; wsgi.file_wrapper usa sendfile
+        response = send_file(
+            path,
+            mimetype=mimetype,
+            as_attachment=False,
+            download_name=filename,
+            conditional=True,
+            etag=etag
+        )
+
+    # Mesmo Cache-Control do servidor Kokoro: sem immutable, mock com no-store
+    response.headers['Cache-Control'] = cache_control(os.path.basename(filename))
+    return response
+
 @kokoro_voice_bp.route('/api/voice/audio/<path:filename>', methods=['GET'])
-@kokoro_available
 def get_audio_file(filename):
-    """Proxy para arquivos de áudio do Kokoro"""
+    """Servir arquivos de áudio do Kokoro (cache compartilhado ou proxy)"""
     try:
-        # Buscar arquivo do Kokoro
+        path = _local_audio_path(filename)
+        if path:
+            return _send_local_audio(path, filename)
+
+        # Fallback: buscar no servidor Kokoro repassando os cabeçalhos condicionais
+        forward_headers = {
+            name: request.headers[name]
+            for name in AUDIO_REQUEST_HEADERS
+            if name in request.headers
+        }
         response = requests.get(
-            f"{KOKORO_API}/api/audio/{filename}",
+            f"{KOKORO_API}/audio/{filename}",
+            headers=forward_headers,
             stream=True,
             timeout=KOKORO_TIMEOUT
         )
-        
-        if response.status_code == 200:
-            # Retransmitir o arquivo
-            return send_file(
-                response.raw,
-                mimetype=response.headers.get('Content-Type', 'audio/mpeg'),
-                as_attachment=False,
-                download_name=filename
+
+        if response.status_code in (200, 206, 304):
+            headers = {
+                name: response.headers[name]
+                for name in AUDIO_RESPONSE_HEADERS
+                if name in response.headers
+            }
+            return Response(
+                stream_with_context(response.iter_content(chunk_size=64 * 1024)),
+                status=response.status_code,
+                headers=headers,
+                direct_passthrough=True
             )
+        elif response.status_code == 416:
+            return Response(status=416, headers={
+                'Content-Range': response.headers.get('Content-Range', '')
+            })
         else:
             return jsonify({"error": "Arquivo não encontrado"}), 404
-            
+
+    except requests.exceptions.ConnectionError:
+        return jsonify({"error": "Kokoro TTS não disponível"}), 503
     except Exception as e:
         logger.error(f"Erro ao buscar áudio: {e}")
         return jsonify({"error": str(e)}), 500
@@ -0,0 +1,35 @@
+from flask import Blueprint, Response, g, request
+import time
+
+from src.models.user import db
+from src.utils.metrics import CONTENT_TYPE, REGISTRY, observe_request, register_process_metrics
+
+metrics_bp = Blueprint("metrics", __name__)
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def get_metrics():
+    """Métricas do ERP no formato do Prometheus"""
+    return Response(REGISTRY.render(), mimetype=CONTENT_TYPE)
+
+def _start_timer():
+    g.metrics_start = time.perf_counter()
+
+def _observe(response):
+    start = g.pop("metrics_start", None)
+    if start is not None:
+        # Regra da rota (ex.: /api/vales/<int:id>) para não explodir a cardinalidade
+        route = request.url_rule.rule if request.url_rule else "<sem rota>"
+        observe_request(request.method, route, response.status_code, time.perf_counter() - start)
+    return response
+
+def init_metrics(app):
+    """Latência por rota, pool do banco e memória do processo em /metrics"""
+    register_process_metrics()
+    with app.app_context():
+        pool = db.engine.pool
+    connections = REGISTRY.gauge("db_pool_connections", "Conexões do pool do ERP", ("state",))
+    connections.labels("checked_out").set_function(pool.checkedout)
+    connections.labels("idle").set_function(pool.checkedin)
+    app.before_request(_start_timer)
+    app.after_request(_observe)
+    app.register_blueprint(metrics_bp)
@@ -1,16 +1,19 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from src.models.user import db
 from src.models.nota import Nota
-from src.models.imposto import Imposto
-from src.models.pattern import Pattern
-from src.models.jewelry import Jewelry
-from src.models.material import Material
-from src.models.stone import Stone
+from src.services.autocomplete import AUTOCOMPLETE_LIMIT, suggest
+from src.services.taxes import as_json, compute, compute_batch, find_taxes, money, parse_amount, tax_rows, taxes_for
+from src.utils.batch import BATCH_MAX_ITEMS
 from datetime import datetime
+from decimal import InvalidOperation
 import re
+import time
 
 notas_bp = Blueprint("notas", __name__)
 
+# Campos dos produtos sugeridos em preencher_auto
+PRODUTO_CAMPOS = ("id", "idj", "categoria", "colecao", "preco", "descricao")
+
 @notas_bp.route("/notas", methods=["GET"])
 def get_notas():
     notas = Nota.query.all()
@@ -18,8 +21,7 @@ def get_notas():
 
 @notas_bp.route("/impostos", methods=["GET"])
 def get_impostos():
-    impostos = Imposto.query.all()
-    return jsonify([imposto.to_dict() for imposto in impostos])
+    return jsonify([imposto.to_dict() for imposto in tax_rows()])
 
 @notas_bp.route("/notas/<int:nota_id>", methods=["GET"])
 def get_nota(nota_id):
@@ -64,14 +66,8 @@ def preencher_nota_auto():
     
     try:
         if tipo_filtro == "auto" or tipo_filtro == "cliente":
-            # Buscar por cliente/remetente
-            nota_cliente = Nota.query.filter(
-                db.or_(
-                    Nota.remetente1.ilike(f"%{filtro}%"),
-                    Nota.des1.ilike(f"%{filtro}%"),
-                    Nota.des2.ilike(f"%{filtro}%")
-                )
-            ).order_by(Nota.data.desc()).first()
+            # Buscar por cliente/remetente: nota mais recente do cliente mais relevante
+            nota_cliente = _nota_sugerida(filtro, "cliente")
             
             if nota_cliente:
                 resultado.update({
@@ -99,87 +95,19 @@ def preencher_nota_auto():
                 })
         
         if tipo_filtro == "auto" or tipo_filtro == "produto":
-            # Buscar produtos relacionados (padrões, joias, materiais, pedras)
+            # Buscar produtos relacionados (padrões, joias, materiais, pedras) no índice
             produtos_encontrados = []
-            
-            # Buscar padrões
-            padroes = Pattern.query.filter(
-                db.or_(
-                    Pattern.nome.ilike(f"%{filtro}%"),
-                    Pattern.tipo.ilike(f"%{filtro}%"),
-                    Pattern.colecao.ilike(f"%{filtro}%")
-                )
-            ).limit(5).all()
-            
-            for padrao in padroes:
-                produtos_encontrados.append({
-                    "tipo": "padrao",
-                    "id": padrao.id,
-                    "nome": padrao.nome,
-                    "categoria": padrao.tipo,
-                    "colecao": padrao.colecao,
-                    "descricao": f"Padrão {padrao.nome} - {padrao.tipo} - Coleção {padrao.colecao}"
-                })
-            
-            # Buscar joias
-            joias = Jewelry.query.filter(
-                db.or_(
-                    Jewelry.name.ilike(f"%{filtro}%"),
-                    Jewelry.category.ilike(f"%{filtro}%"),
-                    Jewelry.collection.ilike(f"%{filtro}%")
-                )
-            ).limit(5).all()
-            
-            for joia in joias:
-                produtos_encontrados.append({
-                    "tipo": "joia",
-                    "id": joia.id,
-                    "nome": joia.name,
-                    "categoria": joia.category,
-                    "colecao": joia.collection,
-                    "preco": joia.price,
-                    "descricao": f"Joia {joia.name} - {joia.category} - R$ {joia.price}"
-                })
-            
-            # Buscar materiais
-            materiais = Material.query.filter(
-                Material.name.ilike(f"%{filtro}%")
-            ).limit(5).all()
-            
-            for material in materiais:
-                produtos_encontrados.append({
-                    "tipo": "material",
-                    "id": material.id,
-                    "nome": material.name,
-                    "preco": material.price_per_gram,
-                    "descricao": f"Material {material.name} - R$ {material.price_per_gram}/g"
-                })
-            
-            # Buscar pedras
-            pedras = Stone.query.filter(
-                db.or_(
-                    Stone.name.ilike(f"%{filtro}%"),
-                    Stone.type.ilike(f"%{filtro}%")
-                )
-            ).limit(5).all()
-            
-            for pedra in pedras:
-                produtos_encontrados.append({
-                    "tipo": "pedra",
-                    "id": pedra.id,
-                    "nome": pedra.name,
-                    "tipo": pedra.type,
-                    "preco": pedra.price_per_carat,
-                    "descricao": f"Pedra {pedra.name} - {pedra.type} - R$ {pedra.price_per_carat}/ct"
-                })
+            for tipo in ("padrao", "joia", "material", "pedra"):
+                for sugestao in suggest(filtro, groups={tipo}, limit=5, app=current_app._get_current_object()):
+                    produto = {"tipo": sugestao["tipo"], "nome": sugestao["valor"]}
+                    produto.update((key, sugestao[key]) for key in PRODUTO_CAMPOS if key in sugestao)
+                    produtos_encontrados.append(produto)
             
             resultado["produtos_encontrados"] = produtos_encontrados
         
         if tipo_filtro == "auto" or tipo_filtro == "modo":
             # Buscar por modo de pagamento/entrega
-            nota_modo = Nota.query.filter(
-                Nota.modo.ilike(f"%{filtro}%")
-            ).order_by(Nota.data.desc()).first()
+            nota_modo = _nota_sugerida(filtro, "modo")
             
             if nota_modo:
                 resultado.update({
@@ -195,9 +123,7 @@ def preencher_nota_auto():
         
         if tipo_filtro == "auto" or tipo_filtro == "imposto":
             # Buscar impostos aplicáveis
-            impostos = Imposto.query.filter(
-                Imposto.nome.ilike(f"%{filtro}%")
-            ).all()
+            impostos = find_taxes(filtro)
             
             if impostos:
                 resultado["impostos_disponiveis"] = [imposto.to_dict() for imposto in impostos]
@@ -231,6 +157,13 @@ def preencher_nota_auto():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def _nota_sugerida(filtro, tipo):
+    """Nota mais recente do cliente/modo mais relevante para o filtro (índice de autocompletar)"""
+    sugestoes = suggest(filtro, groups={tipo}, limit=1, app=current_app._get_current_object())
+    if not sugestoes or sugestoes[0]["nota_id"] is None:
+        return None
+    return db.session.get(Nota, sugestoes[0]["nota_id"])
+
 # Rota para buscar sugestões baseadas em filtro
 @notas_bp.route("/notas/sugestoes", methods=["POST"])
 def get_sugestoes():
@@ -238,96 +171,82 @@ def get_sugestoes():
     filtro = data.get("filtro", "").lower()
     tipo = data.get("tipo", "all")  # all, clientes, produtos, modos
     
-    sugestoes = []
+    grupos = {"clientes": {"cliente"}, "produtos": {"produto"}, "modos": {"modo"}}.get(tipo)
     
     try:
-        if tipo in ["all", "clientes"]:
-            # Buscar clientes únicos
-            clientes = db.session.query(Nota.remetente1).filter(
-                Nota.remetente1.ilike(f"%{filtro}%")
-            ).distinct().limit(10).all()
-            
-            for cliente in clientes:
-                if cliente[0]:
-                    sugestoes.append({
-                        "tipo": "cliente",
-                        "valor": cliente[0],
-                        "label": f"Cliente: {cliente[0]}"
-                    })
-        
-        if tipo in ["all", "produtos"]:
-            # Buscar produtos (padrões, joias, etc.)
-            padroes = Pattern.query.filter(
-                Pattern.nome.ilike(f"%{filtro}%")
-            ).limit(5).all()
-            
-            for padrao in padroes:
-                sugestoes.append({
-                    "tipo": "produto",
-                    "valor": padrao.nome,
-                    "label": f"Padrão: {padrao.nome} - {padrao.categoria}"
-                })
-        
-        if tipo in ["all", "modos"]:
-            # Buscar modos únicos
-            modos = db.session.query(Nota.modo).filter(
-                Nota.modo.ilike(f"%{filtro}%")
-            ).distinct().limit(5).all()
-            
-            for modo in modos:
-                if modo[0]:
-                    sugestoes.append({
-                        "tipo": "modo",
-                        "valor": modo[0],
-                        "label": f"Modo: {modo[0]}"
-                    })
-        
-        return jsonify(sugestoes)
+        sugestoes = suggest(filtro, groups=grupos, limit=20, app=current_app._get_current_object())
+        return jsonify([
+            {"tipo": sugestao["grupo"], "valor": sugestao["valor"], "label": sugestao["label"]}
+            for sugestao in sugestoes
+        ])
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# Autocompletar do editor de notas: clientes, produtos e modos numa chamada
+@notas_bp.route("/notas/autocomplete", methods=["GET"])
+def autocomplete():
+    """
+    ?q=&tipos=cliente,produto,modo (ou padrao, joia, material, pedra)&limit=&seq=
+    Sugestões ranqueadas do índice em memória (src/services/autocomplete.py).
+    """
+    q = request.args.get("q", "")
+    tipos = {tipo.strip() for tipo in request.args.get("tipos", "").split(",") if tipo.strip()} or None
+    limit = min(max(request.args.get("limit", AUTOCOMPLETE_LIMIT, type=int), 1), 50)
+    
+    start = time.perf_counter()
+    sugestoes = suggest(q, groups=tipos, limit=limit, app=current_app._get_current_object())
+    return jsonify({
+        "q": q,
+        "seq": request.args.get("seq"),
+        "sugestoes": sugestoes,
+        "took_ms": round((time.perf_counter() - start) * 1000, 3)
+    })
+
 # Rota para calcular impostos automaticamente
 @notas_bp.route("/notas/calcular_impostos", methods=["POST"])
 def calcular_impostos():
     data = request.get_json()
-    valor_base = data.get("valor_base", 0)
     tipo_imposto = data.get("tipo_imposto", "")
     
     try:
-        impostos_aplicados = []
-        valor_total = valor_base
-        
-        if tipo_imposto:
-            imposto = Imposto.query.filter(Imposto.nome.ilike(f"%{tipo_imposto}%")).first()
-            if imposto and imposto.imposto:
-                valor_imposto = valor_base * imposto.imposto
-                valor_total += valor_imposto
-                impostos_aplicados.append({
-                    "nome": imposto.nome,
-                    "percentual": imposto.imposto,
-                    "valor": valor_imposto
-                })
-        else:
-            # Aplicar impostos padrão
-            impostos = Imposto.query.filter(Imposto.nome.isnot(None)).all()
-            for imposto in impostos:
-                if imposto.imposto:
-                    valor_imposto = valor_base * imposto.imposto
-                    valor_total += valor_imposto
-                    impostos_aplicados.append({
-                        "nome": imposto.nome,
-                        "percentual": imposto.imposto,
-                        "valor": valor_imposto
-                    })
+        valor_base = parse_amount(data.get("valor_base", 0))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    try:
+        # Tabela de impostos em cache (src/services/taxes.py), valores em centavos exatos
+        impostos_aplicados, valor_total = compute(valor_base, taxes_for(tipo_imposto))
         
-        return jsonify({
-            "valor_base": valor_base,
+        return jsonify(as_json({
+            "valor_base": money(valor_base),
             "impostos_aplicados": impostos_aplicados,
             "valor_total": valor_total
-        })
+        }))
         
+    except InvalidOperation:
+        return jsonify({"error": f"valor fora do intervalo: {data.get('valor_base')!r}"}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-
+# Impostos de vários itens da nota numa chamada
+@notas_bp.route("/notas/calcular_impostos/lote", methods=["POST"])
+def calcular_impostos_lote():
+    """
+    Corpo: {"itens": [{"valor_base", "quantidade"?, "tipo_imposto"?}, ...],
+    "tipo_imposto"?: padrão dos itens}. Resposta: um resultado por item e os
+    totais da nota (base, impostos, total e por imposto).
+    """
+    data = request.get_json(silent=True) or {}
+    itens = data.get("itens") if isinstance(data, dict) else data
+    if not isinstance(itens, list) or not itens:
+        return jsonify({"error": "Envie a lista de itens"}), 400
+    if len(itens) > BATCH_MAX_ITEMS:
+        return jsonify({"error": f"Máximo de {BATCH_MAX_ITEMS} itens por lote"}), 400
+    
+    try:
+        default_tipo = data.get("tipo_imposto", "") if isinstance(data, dict) else ""
+        resultados, totais = compute_batch(itens, default_tipo)
+        return jsonify(as_json({"itens": resultados, "totais": totais}))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -3,6 +3,7 @@ from src.models.user import db
 from src.models.order import Order
 from src.models.jewelry import Jewelry
 from src.models.inventory import Inventory
+from src.services.reporting import aggregate
 from datetime import datetime
 
 orders_bp = Blueprint("orders", __name__)
@@ -237,29 +238,20 @@ def delete_order(id):
 def get_order_stats():
     """Estatísticas das encomendas"""
     try:
-        total_orders = Order.query.count()
-        pending_orders = Order.query.filter_by(status='pending').count()
-        in_progress_orders = Order.query.filter_by(status='in_progress').count()
-        completed_orders = Order.query.filter_by(status='completed').count()
-        cancelled_orders = Order.query.filter_by(status='cancelled').count()
-        
-        # Valor total das encomendas por status
-        total_value = db.session.query(db.func.sum(Order.total_price)).scalar() or 0
-        pending_value = db.session.query(db.func.sum(Order.total_price)).filter_by(status='pending').scalar() or 0
-        completed_value = db.session.query(db.func.sum(Order.total_price)).filter_by(status='completed').scalar() or 0
+        # Quantidade e valor por status a partir dos agregados mensais
+        by_status = aggregate('orders')
+        empty = {'count': 0, 'total': 0}
         
         return jsonify({
-            "total_orders": total_orders,
+            "total_orders": sum(values['count'] for values in by_status.values()),
             "orders_by_status": {
-                "pending": pending_orders,
-                "in_progress": in_progress_orders,
-                "completed": completed_orders,
-                "cancelled": cancelled_orders
+                status: by_status.get(status, empty)['count']
+                for status in ('pending', 'in_progress', 'completed', 'cancelled')
             },
             "values": {
-                "total_value": total_value,
-                "pending_value": pending_value,
-                "completed_value": completed_value
+                "total_value": sum(values['total'] for values in by_status.values()),
+                "pending_value": by_status.get('pending', empty)['total'],
+                "completed_value": by_status.get('completed', empty)['total']
             }
         }), 200
         
@@ -4,10 +4,14 @@ from src.models.payroll import Payroll
 from src.models.employee import Employee
 from src.models.payment import Payment
 from src.models.vale import Vale
-from datetime import datetime
+from src.utils.date_ranges import ONE_DAY, between_days, month_bounds, parse_day
+from datetime import date, datetime
 
 payroll_bp = Blueprint("payroll", __name__)
 
+NOTE_PER_PAGE = 50
+NOTE_MAX_PER_PAGE = 200
+
 @payroll_bp.route("/payroll", methods=["GET"])
 def get_payrolls():
     """Buscar todas as folhas de pagamento"""
@@ -91,8 +95,8 @@ def update_payroll(id):
         
         payroll.base_salary = data.get("base_salary", payroll.base_salary)
         
-        # Recalcular vales e salário líquido
-        payroll.update_vales_total()
+        # total_vales já acompanha os vales (deltas); só o líquido muda
+        payroll.calculate_net_salary()
         
         db.session.commit()
         
@@ -177,27 +181,54 @@ def get_current_payroll(employee_id):
 
 @payroll_bp.route("/payroll/<int:employee_id>/note", methods=["GET"])
 def get_payroll_note(employee_id):
-    """Gerar nota de folha de pagamento para um funcionário (compatibilidade)"""
+    """
+    Nota de folha de pagamento de um funcionário (compatibilidade), limitada a
+    um período: ?month=&year= (padrão: mês atual) ou ?start=&end= (AAAA-MM-DD).
+    Pagamentos e vales vêm paginados (?page=&per_page=); os totais são do
+    período inteiro, somados no banco.
+    """
     try:
         employee = Employee.query.get_or_404(employee_id)
         
-        # Buscar pagamentos do funcionário
-        payments = Payment.query.filter_by(employee_id=employee_id).all()
-        
-        # Buscar vales do funcionário
-        vales = Vale.query.filter_by(employee_id=employee_id).all()
+        try:
+            start, end = _note_period(request.args)
+        except ValueError:
+            return jsonify({"error": "Período inválido: use month/year ou start/end (AAAA-MM-DD)"}), 400
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', NOTE_PER_PAGE, type=int), 1), NOTE_MAX_PER_PAGE)
+        
+        # Payment.date é texto 'AAAA-MM-DD': comparação de strings no índice (employee_id, date)
+        payments = Payment.query.filter(
+            Payment.employee_id == employee_id,
+            Payment.date >= start.isoformat(),
+            Payment.date < end.isoformat()
+        )
+        vales = Vale.query.filter(
+            Vale.employee_id == employee_id,
+            between_days(Vale.date, start, end - ONE_DAY)
+        )
         
-        # Calcular totais
-        total_payments = sum(payment.amount for payment in payments)
-        total_vales = sum(vale.amount for vale in vales)
+        total_payments = payments.with_entities(db.func.coalesce(db.func.sum(Payment.amount), 0.0)).scalar()
+        total_vales = vales.with_entities(db.func.coalesce(db.func.sum(Vale.amount), 0.0)).scalar()
+        payments_page = payments.order_by(Payment.date, Payment.id).paginate(
+            page=page, per_page=per_page, error_out=False)
+        vales_page = vales.order_by(Vale.date, Vale.id).paginate(page=page, per_page=per_page, error_out=False)
         
         payroll_note = {
             "employee": employee.to_dict(),
-            "payments": [payment.to_dict() for payment in payments],
-            "vales": [vale.to_dict() for vale in vales],
+            "period": {"start": start.isoformat(), "end": (end - ONE_DAY).isoformat()},
+            "payments": [payment.to_dict() for payment in payments_page.items],
+            "vales": [vale.to_dict() for vale in vales_page.items],
             "total_payments": total_payments,
             "total_vales": total_vales,
-            "net_amount": total_payments - total_vales
+            "net_amount": total_payments - total_vales,
+            "pagination": {
+                "page": page,
+                "per_page": per_page,
+                "payments_total": payments_page.total,
+                "vales_total": vales_page.total,
+                "pages": max(payments_page.pages, vales_page.pages),
+            }
         }
         
         return jsonify(payroll_note), 200
@@ -205,3 +236,18 @@ def get_payroll_note(employee_id):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+
+def _note_period(args):
+    """[início, fim) da nota: start/end inclusivos, ou o mês (padrão: mês atual)"""
+    if args.get('start') or args.get('end'):
+        start = parse_day(args['start']) if args.get('start') else date(1900, 1, 1)
+        end = parse_day(args['end']) + ONE_DAY if args.get('end') else date.today() + ONE_DAY
+        if end <= start:
+            raise ValueError("fim antes do início")
+        return start, end
+    today = date.today()
+    month = args.get('month', today.month, type=int)
+    year = args.get('year', today.year, type=int)
+    if not 1 <= month <= 12:
+        raise ValueError("mês inválido")
+    return month_bounds(year, month)
@@ -2,7 +2,11 @@ from flask import Blueprint, request, jsonify
 from src.models.user import db
 from src.models.vale import Vale
 from src.models.employee import Employee
-from datetime import datetime
+from src.models.payroll import Payroll
+from src.utils.batch import BatchError, batch_items, batch_status, batch_summary, cancelled, is_id, item_error
+from src.utils.date_ranges import in_month, in_year, parse_datetime
+from datetime import MAXYEAR, MINYEAR, datetime
+import math
 
 vales_bp = Blueprint("vales", __name__)
 
@@ -51,24 +55,113 @@ def create_vale():
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
 
+@vales_bp.route("/vales/batch", methods=["POST"])
+def create_vales_batch():
+    """
+    Cria vários vales numa transação; cada folha (funcionário, mês) afetada
+    é atualizada uma vez só. Corpo: lista ou {"vales": [...], "atomic": bool}
+    """
+    try:
+        items, atomic = batch_items(request.get_json(silent=True), key="vales")
+    except BatchError as e:
+        return jsonify({"error": str(e)}), 400
+    atomic = atomic or request.args.get('atomic') in ('1', 'true')
+
+    results = [None] * len(items)
+    valid = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index] = item_error(index, "Item deve ser um objeto")
+            continue
+        if item.get("employee_id") is None:
+            results[index] = item_error(index, "Campo obrigatório ausente: employee_id")
+            continue
+        if not is_id(item["employee_id"]):
+            results[index] = item_error(index, "employee_id inválido")
+            continue
+        try:
+            amount = float(item["amount"])
+            vale_date = parse_datetime(item["date"]) if item.get("date") else datetime.now()
+        except KeyError as e:
+            results[index] = item_error(index, f"Campo obrigatório ausente: {e.args[0]}")
+            continue
+        except (TypeError, ValueError):
+            results[index] = item_error(index, "amount ou date inválido")
+            continue
+        if not math.isfinite(amount) or amount <= 0:
+            # inf entraria no caixa/folha e nos agregados do mês; nan quebraria o INSERT do lote
+            results[index] = item_error(index, "amount deve ser um número positivo")
+            continue
+        valid.append((index, item, amount, vale_date))
+
+    # Só ids já validados vão para o IN (...)
+    employee_ids = {item["employee_id"] for _, item, _, _ in valid}
+    # Mantidos na sessão: vale.to_dict() acha o funcionário sem nova consulta
+    employees = {
+        employee.id: employee for employee in Employee.query.filter(Employee.id.in_(employee_ids))
+    } if employee_ids else {}
+
+    created = []
+    for index, item, amount, vale_date in valid:
+        if item["employee_id"] not in employees:
+            results[index] = item_error(index, "Funcionário não encontrado")
+            continue
+        vale = Vale(
+            employee_id=item["employee_id"],
+            amount=amount,
+            date=vale_date,
+            description=item.get("description"),
+            reason=item.get("reason")
+        )
+        created.append(vale)
+        results[index] = {"index": index, "status": "created"}
+
+    if not created or (atomic and len(created) < len(items)):
+        return jsonify(batch_summary(cancelled(results))), 400
+
+    try:
+        db.session.add_all(created)
+        db.session.flush()
+        payrolls = Payroll.for_periods(
+            (vale.employee_id, vale.date.year, vale.date.month) for vale in created
+        )
+        db.session.flush()
+        # Respostas antes do commit, que expira os objetos (uma consulta por item ao reler)
+        vales = iter(created)
+        for result in results:
+            if result["status"] == "created":
+                vale = next(vales)
+                result["id"] = vale.id
+                result["vale"] = vale.to_dict()
+        payrolls_updated = [payroll.to_dict() for payroll in payrolls.values()]
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+    return jsonify(batch_summary(results, payrolls_updated=payrolls_updated)), batch_status(results)
+
+
 @vales_bp.route("/vales", methods=["GET"])
 def get_vales():
     try:
         employee_id = request.args.get('employee_id', type=int)
         month = request.args.get('month', type=int)
         year = request.args.get('year', type=int)
+        # Fora da faixa, month_bounds/in_year levantariam ValueError (500)
+        if month is not None and not 1 <= month <= 12:
+            return jsonify({"error": "Mês inválido: use 1 a 12"}), 400
+        if year is not None and not MINYEAR <= year < MAXYEAR:
+            return jsonify({"error": "Ano inválido"}), 400
         
         query = Vale.query
         
         if employee_id:
             query = query.filter(Vale.employee_id == employee_id)
         if month and year:
-            query = query.filter(
-                db.extract('month', Vale.date) == month,
-                db.extract('year', Vale.date) == year
-            )
+            query = query.filter(in_month(Vale.date, year, month))
         elif year:
-            query = query.filter(db.extract('year', Vale.date) == year)
+            query = query.filter(in_year(Vale.date, year))
             
         vales = query.all()
         return jsonify([vale.to_dict() for vale in vales]), 200
@@ -90,10 +183,6 @@ def update_vale(id):
         vale = Vale.query.get_or_404(id)
         data = request.get_json()
         
-        # Armazenar dados antigos para recalcular folha de pagamento
-        old_employee_id = vale.employee_id
-        old_date = vale.date
-        
         # Atualizar dados do vale
         vale.employee_id = data.get("employee_id", vale.employee_id)
         vale.amount = data.get("amount", vale.amount)
@@ -109,19 +198,9 @@ def update_vale(id):
                     vale_date = datetime.strptime(vale_date, '%Y-%m-%d')
             vale.date = vale_date
         
-        # Atualizar folha de pagamento do funcionário antigo (se mudou)
-        if old_employee_id != vale.employee_id:
-            # Recalcular folha do funcionário antigo
-            from src.models.payroll import Payroll
-            old_payroll = Payroll.query.filter_by(
-                employee_id=old_employee_id,
-                month=old_date.month,
-                year=old_date.year
-            ).first()
-            if old_payroll:
-                old_payroll.update_vales_total()
-        
-        # Atualizar folha de pagamento do funcionário atual
+        # Os totais das folhas antiga e nova são ajustados no flush (deltas);
+        # aqui só se garante que a folha do novo mês exista
+        db.session.flush()
         payroll = vale.update_payroll()
         
         db.session.commit()
@@ -141,14 +220,13 @@ def delete_vale(id):
     try:
         vale = Vale.query.get_or_404(id)
         
-        # Armazenar dados para recalcular folha de pagamento
         employee_id = vale.employee_id
         vale_date = vale.date
         
+        # O flush subtrai o valor do vale da folha do mês (deltas)
         db.session.delete(vale)
-        db.session.flush()
+        db.session.commit()
         
-        # Recalcular folha de pagamento após exclusão
         from src.models.payroll import Payroll
         payroll = Payroll.query.filter_by(
             employee_id=employee_id,
@@ -156,11 +234,6 @@ def delete_vale(id):
             year=vale_date.year
         ).first()
         
-        if payroll:
-            payroll.update_vales_total()
-        
-        db.session.commit()
-        
         return jsonify({
             "message": "Vale excluído e folha de pagamento recalculada",
             "payroll_updated": payroll.to_dict() if payroll else None
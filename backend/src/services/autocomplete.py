@@ -0,0 +1,517 @@
+"""
+Índice de autocompletar das notas (clientes, produtos e modos)
+
+preencher_auto e sugestoes faziam até seis ilike '%filtro%' (e DISTINCT em
+Nota.remetente1/Nota.modo) a cada tecla. Aqui os textos ficam num índice em
+memória, montado uma vez por processo:
+
+- n-gramas: trigramas para termos com 3+ letras (o '%filtro%' vira a
+  interseção das listas dos trigramas do termo) e prefixos de 1–2 letras
+  das palavras para o começo da digitação; sem acentos e minúsculo;
+- ranking: igual > começa com > palavra começa com > contém > parecido
+  (trigramas em comum, tolera erro de digitação); empate pela frequência
+  (clientes e modos repetidos em várias notas) e pelo texto mais curto.
+  Só os `limit` melhores são ordenados (heapq), e termos de 1–2 letras
+  pontuam no máximo AUTOCOMPLETE_MAX_CANDIDATES candidatos, primeiro os
+  que começam pelo termo;
+- a consulta roda fora do lock, sobre o índice publicado, que nunca é
+  alterado: o commit grava numa cópia (só os conjuntos e entradas
+  tocados são copiados) e publica a cópia;
+- gravações pelo ORM atualizam o índice no commit (só as linhas alteradas);
+  update/delete em massa e a importação em lote (mark_stale) marcam o
+  índice para reconstrução, e a cada
+  AUTOCOMPLETE_REFRESH segundos ele é remontado em segundo plano para
+  acompanhar gravações de outros workers;
+- consultas iguais simultâneas esperam a mesma execução (single-flight) e
+  os últimos resultados ficam num LRU pela versão do índice, então apagar e
+  redigitar uma letra não recalcula nada. O debounce fica no editor; o
+  parâmetro seq volta na resposta para descartar respostas fora de ordem.
+"""
+
+import heapq
+import math
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import Future
+from itertools import chain, islice
+from types import SimpleNamespace
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.models.jewelry import Jewelry
+from src.models.material import Material
+from src.models.nota import Nota
+from src.models.pattern import Pattern
+from src.models.stone import Stone
+from src.models.user import db
+from src.utils.metrics import CACHE_REQUESTS, REGISTRY
+from src.utils.text_normalization import SEM_ACENTOS
+
+AUTOCOMPLETE_REFRESH = float(os.getenv("AUTOCOMPLETE_REFRESH", 300))
+AUTOCOMPLETE_CACHE_SIZE = int(os.getenv("AUTOCOMPLETE_CACHE_SIZE", 1024))
+AUTOCOMPLETE_MAX_CANDIDATES = int(os.getenv("AUTOCOMPLETE_MAX_CANDIDATES", 2000))
+AUTOCOMPLETE_LIMIT = 10
+FUZZY_MIN_SIMILARITY = 0.5
+
+# tipo do item → grupo (parâmetro tipos / resposta de /notas/sugestoes)
+GROUPS = {
+    'cliente': 'cliente',
+    'modo': 'modo',
+    'padrao': 'produto',
+    'joia': 'produto',
+    'material': 'produto',
+    'pedra': 'produto',
+}
+
+AUTOCOMPLETE_SECONDS = REGISTRY.histogram(
+    "autocomplete_seconds", "Tempo de uma consulta ao índice de autocompletar",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1))
+AUTOCOMPLETE_REBUILDS = REGISTRY.counter(
+    "autocomplete_rebuilds_total", "Reconstruções completas do índice de autocompletar", ("reason",))
+
+
+def fold(text):
+    """Minúsculo, sem acentos e com espaços simples"""
+    return " ".join(str(text).lower().translate(SEM_ACENTOS).split()) if text else ""
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _join(*parts):
+    return " ".join(str(part) for part in parts if part not in (None, ""))
+
+
+def _nota_items(nota):
+    """Clientes (remetente1, des1, des2) e modo de uma nota: agregados por texto"""
+    for field in ('remetente1', 'des1', 'des2'):
+        value = getattr(nota, field)
+        if value and value.strip():
+            yield ('cliente', fold(value)), 'cliente', value.strip(), value.strip(), None
+    if nota.modo and nota.modo.strip():
+        yield ('modo', fold(nota.modo)), 'modo', nota.modo.strip(), nota.modo.strip(), None
+
+
+def _pattern_items(pattern):
+    if pattern.nome:
+        yield ('padrao', pattern.id), 'padrao', pattern.nome, _join(pattern.nome, pattern.tipo, pattern.colecao), {
+            "id": pattern.id,
+            "categoria": pattern.tipo,
+            "colecao": pattern.colecao,
+            "descricao": f"Padrão {pattern.nome} - {pattern.tipo} - Coleção {pattern.colecao}",
+        }
+
+
+def _jewelry_items(jewelry):
+    if jewelry.descricao:
+        nome = " ".join(jewelry.descricao.split())[:120]
+        yield ('joia', jewelry.id), 'joia', nome, _join(nome, jewelry.idj), {
+            "id": jewelry.id,
+            "idj": jewelry.idj,
+            "preco": jewelry.preco1,
+            "descricao": f"Joia {nome} - R$ {jewelry.preco1}",
+        }
+
+
+def _material_items(material):
+    if material.nome:
+        yield ('material', material.id), 'material', material.nome, _join(material.nome, material.tipo, material.cor), {
+            "id": material.id,
+            "categoria": material.tipo,
+            "preco": material.precopordimensao,
+            "descricao": f"Material {material.nome} - R$ {material.precopordimensao}/{material.dimensao or 'unid.'}",
+        }
+
+
+def _stone_items(stone):
+    tipo = stone.tipo_pedra or stone.tipo
+    material = stone.material_pedra or stone.material
+    cor = stone.cor_pedra or stone.cor
+    nome = _join(material, tipo, cor)
+    if nome:
+        preco = stone.preco_pedra or stone.preco
+        yield ('pedra', stone.id), 'pedra', nome, _join(nome, stone.lapidacao_pedra or stone.lapidacao), {
+            "id": stone.id,
+            "categoria": tipo,
+            "preco": preco,
+            "descricao": f"Pedra {nome} - R$ {preco}",
+        }
+
+
+# modelo → itens de uma linha; a ordem de Nota dá a nota mais recente de cada cliente/modo
+SOURCES = {
+    Nota: _nota_items,
+    Pattern: _pattern_items,
+    Jewelry: _jewelry_items,
+    Material: _material_items,
+    Stone: _stone_items,
+}
+# Colunas lidas de cada modelo (montagem do índice e cópia no flush)
+_COLUMNS = {
+    Nota: ('remetente1', 'des1', 'des2', 'modo', 'data'),
+    Pattern: ('nome', 'tipo', 'colecao'),
+    Jewelry: ('idj', 'descricao', 'preco1'),
+    Material: ('nome', 'tipo', 'cor', 'precopordimensao', 'dimensao'),
+    Stone: ('tipo_pedra', 'tipo', 'material_pedra', 'material', 'cor_pedra', 'cor', 'lapidacao_pedra',
+            'lapidacao', 'preco_pedra', 'preco'),
+}
+
+
+class Entry:
+    __slots__ = ("key", "kind", "value", "folded", "text", "payload", "refs")
+
+    def __init__(self, key, kind, value, text, payload):
+        self.key = key
+        self.kind = kind
+        self.value = value
+        self.folded = fold(value)
+        self.text = fold(text)
+        self.payload = payload
+        # linha de origem → ordem (notas: data e id, para achar a mais recente)
+        self.refs = {}
+
+    def copy(self):
+        clone = Entry.__new__(Entry)
+        for name in self.__slots__:
+            setattr(clone, name, getattr(self, name))
+        clone.refs = dict(self.refs)
+        return clone
+
+    def latest_ref(self):
+        return max(self.refs, key=self.refs.get) if self.refs else None
+
+
+class AutocompleteIndex:
+    """
+    Entradas, trigramas e prefixos (de palavra e do início do texto).
+    Depois de publicado é só leitura: alterações vão para copy()
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.by_ref = {}
+        self.trigrams = {}
+        self.prefixes = {}
+        self.starts = {}
+        self.version = 0
+        # Numa cópia: o que já foi copiado (o resto ainda é compartilhado com o original)
+        self._owned = None
+
+    def copy(self):
+        """Cópia gravável: dicionários novos, conjuntos e entradas copiados só na 1ª alteração"""
+        clone = AutocompleteIndex()
+        clone.entries = dict(self.entries)
+        clone.by_ref = dict(self.by_ref)
+        clone.trigrams = dict(self.trigrams)
+        clone.prefixes = dict(self.prefixes)
+        clone.starts = dict(self.starts)
+        clone.version = self.version
+        clone._owned = set()
+        return clone
+
+    def _writable(self, name, key, factory, copy):
+        """Objeto de self.<name>[key] que pode ser alterado (copiado se herdado)"""
+        mapping = getattr(self, name)
+        value = mapping.get(key)
+        if value is None:
+            if factory is None:
+                return None
+            value = mapping[key] = factory()
+        elif self._owned is not None and (name, key) not in self._owned:
+            value = mapping[key] = copy(value)
+        if self._owned is not None:
+            self._owned.add((name, key))
+        return value
+
+    def add_row(self, model, row):
+        ref = (model.__tablename__, row.id)
+        order = (getattr(row, 'data', None) or '', row.id)
+        keys = []
+        for key, kind, value, text, payload in SOURCES[model](row):
+            entry = self._writable('entries', key, None, Entry.copy)
+            if entry is None:
+                entry = self.entries[key] = Entry(key, kind, value, text, payload)
+                self._post(entry)
+            entry.refs[ref] = order
+            keys.append(key)
+        if keys:
+            self.by_ref[ref] = keys
+        self.version += 1
+
+    def remove_row(self, table, row_id):
+        ref = (table, row_id)
+        for key in self.by_ref.pop(ref, ()):
+            entry = self._writable('entries', key, None, Entry.copy)
+            if entry is None:
+                continue
+            entry.refs.pop(ref, None)
+            if not entry.refs:
+                self._unpost(entry)
+                del self.entries[key]
+        self.version += 1
+
+    def _grams(self, entry):
+        """(índice, n-grama) de uma entrada"""
+        grams = {('trigrams', gram) for gram in _trigrams(entry.text)}
+        for word in entry.text.split():
+            grams.add(('prefixes', word[:1]))
+            grams.add(('prefixes', word[:2]))
+        for text in (entry.folded, entry.text):
+            grams.add(('starts', text[:1]))
+            grams.add(('starts', text[:2]))
+        return grams
+
+    def _post(self, entry):
+        for name, gram in self._grams(entry):
+            self._writable(name, gram, set, set).add(entry.key)
+
+    def _unpost(self, entry):
+        for name, gram in self._grams(entry):
+            postings = self._writable(name, gram, None, set)
+            if postings is not None:
+                postings.discard(entry.key)
+                if not postings:
+                    del getattr(self, name)[gram]
+
+    def _candidates(self, query):
+        if len(query) < 3:
+            # Começa com o termo (pontuação 80/100) antes de palavra começa com (60)
+            return islice(chain(self.starts.get(query, ()), self.prefixes.get(query, ())),
+                          AUTOCOMPLETE_MAX_CANDIDATES)
+        postings = sorted((self.trigrams.get(gram, set()) for gram in _trigrams(query)), key=len)
+        if not postings or not postings[0]:
+            return set()
+        return set.intersection(*postings)
+
+    def search(self, query, kinds=None, limit=AUTOCOMPLETE_LIMIT):
+        """[(pontuação, entrada)] em ordem de relevância"""
+        query = fold(query)
+        if not query:
+            return []
+        scored = []
+        seen = set()
+        for key in self._candidates(query):
+            if key in seen:
+                continue
+            entry = self.entries[key]
+            if kinds and entry.kind not in kinds:
+                continue
+            score = _score(entry, query)
+            if score:
+                scored.append((score, entry))
+                seen.add(key)
+
+        if len(scored) < limit and len(query) >= 4:
+            # Nada (ou pouco) contém o termo: trigramas em comum (erros de digitação)
+            grams = _trigrams(query)
+            shared = Counter()
+            for gram in grams:
+                shared.update(self.trigrams.get(gram, ()))
+            for key, count in shared.items():
+                similarity = count / len(grams)
+                if key in seen or similarity < FUZZY_MIN_SIMILARITY:
+                    continue
+                entry = self.entries[key]
+                if not kinds or entry.kind in kinds:
+                    scored.append((20 * similarity, entry))
+
+        return heapq.nsmallest(limit, scored, key=lambda item: (-item[0] - _weight(item[1]), len(item[1].value)))
+
+
+def _score(entry, query):
+    if entry.folded == query or entry.text == query:
+        return 100
+    if entry.folded.startswith(query) or entry.text.startswith(query):
+        return 80
+    if f" {query}" in entry.text:  # alguma palavra começa com o termo (texto com espaços simples)
+        return 60
+    if len(query) >= 3 and query in entry.text:
+        return 40
+    return 0
+
+
+def _weight(entry):
+    """Bônus pela frequência (clientes e modos que aparecem em muitas notas)"""
+    return min(math.log2(len(entry.refs)), 10) if len(entry.refs) > 1 else 0
+
+
+_lock = threading.RLock()
+_index = None
+_built_at = 0.0
+_stale = False
+_refreshing = False
+_results = OrderedDict()
+_inflight = {}
+
+
+def build_index():
+    """Monta o índice a partir das tabelas (só as colunas usadas)"""
+    index = AutocompleteIndex()
+    for model in SOURCES:
+        columns = [column for column in model.__table__.columns
+                   if column.name in _COLUMNS.get(model, ()) or column.primary_key]
+        query = db.session.query(*columns)
+        if model is Nota:
+            query = query.order_by(Nota.id)
+        for row in query.yield_per(1000):
+            index.add_row(model, row)
+    return index
+
+
+def get_index(app=None):
+    """Índice do processo (montado no primeiro uso; remontado se marcado ou velho)"""
+    global _index, _built_at, _stale
+    with _lock:
+        if _index is None or _stale:
+            reason = 'first_use' if _index is None else 'bulk_write'
+            _index = build_index()
+            _built_at = time.monotonic()
+            _stale = False
+            _results.clear()
+            AUTOCOMPLETE_REBUILDS.labels(reason).inc()
+        elif app is not None and time.monotonic() - _built_at > AUTOCOMPLETE_REFRESH:
+            _refresh_in_background(app)
+        return _index
+
+
+def mark_stale(table=None):
+    """
+    Gravações fora do ORM (ex.: importação em lote pelo Core): o índice deste
+    processo é remontado no próximo uso. Os outros workers (e o servidor,
+    quando quem grava é o import_data.py) acompanham pelo AUTOCOMPLETE_REFRESH
+    """
+    global _stale
+    if table is None or table in {model.__tablename__ for model in SOURCES}:
+        _stale = True
+
+
+def _refresh_in_background(app):
+    global _refreshing
+    if _refreshing:
+        return
+    _refreshing = True
+
+    def run():
+        global _index, _built_at, _refreshing
+        try:
+            with app.app_context():
+                index = build_index()
+            with _lock:
+                _index = index
+                _built_at = time.monotonic()
+                _results.clear()
+            AUTOCOMPLETE_REBUILDS.labels('refresh').inc()
+        except Exception as e:
+            print(f"⚠️ Erro ao atualizar o índice de autocompletar: {e}")
+        finally:
+            _refreshing = False
+
+    threading.Thread(target=run, name="autocomplete-refresh", daemon=True).start()
+
+
+def suggest(query, groups=None, limit=AUTOCOMPLETE_LIMIT, app=None):
+    """Sugestões ranqueadas: [{tipo, grupo, valor, label, score, ...dados}]"""
+    kinds = {kind for kind, group in GROUPS.items() if not groups or group in groups or kind in groups}
+    key = (fold(query), tuple(sorted(kinds)), limit)
+
+    with _lock:
+        index = get_index(app)
+        cache_key = (index.version, id(index)) + key
+        if cache_key in _results:
+            _results.move_to_end(cache_key)
+            CACHE_REQUESTS.labels("autocomplete", "hit").inc()
+            return _results[cache_key]
+        future = _inflight.get(cache_key)
+        leader = future is None
+        if leader:
+            future = _inflight[cache_key] = Future()
+    if not leader:
+        CACHE_REQUESTS.labels("autocomplete", "coalesced").inc()
+        return future.result()
+
+    CACHE_REQUESTS.labels("autocomplete", "miss").inc()
+    try:
+        # Fora do lock: o índice publicado não muda (_apply_changes publica uma cópia)
+        with AUTOCOMPLETE_SECONDS.time():
+            results = [_suggestion(score, entry) for score, entry in index.search(key[0], kinds, limit)]
+        with _lock:
+            _results[cache_key] = results
+            while len(_results) > AUTOCOMPLETE_CACHE_SIZE:
+                _results.popitem(last=False)
+        future.set_result(results)
+        return results
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _lock:
+            _inflight.pop(cache_key, None)
+
+
+def _suggestion(score, entry):
+    suggestion = {
+        "tipo": entry.kind,
+        "grupo": GROUPS[entry.kind],
+        "valor": entry.value,
+        "label": f"{entry.kind.capitalize()}: {entry.value}",
+        "score": round(score + _weight(entry), 2),
+    }
+    if entry.payload:
+        suggestion.update(entry.payload)
+    else:
+        suggestion["ocorrencias"] = len(entry.refs)
+        latest = entry.latest_ref()
+        suggestion["nota_id"] = latest[1] if latest else None
+    return suggestion
+
+
+# Gravações pelo ORM: linhas alteradas entram no índice no commit
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    if _index is None:
+        return
+    changes = session.info.setdefault('autocomplete', {})
+    for obj in (*session.new, *session.dirty):
+        if type(obj) in SOURCES:
+            changes[(obj.__tablename__, obj.id)] = (type(obj), _snapshot(obj))
+    for obj in session.deleted:
+        if type(obj) in SOURCES:
+            changes[(obj.__tablename__, obj.id)] = (type(obj), None)
+
+
+def _snapshot(obj):
+    """Só as colunas indexadas, lidas enquanto o objeto ainda está carregado"""
+    return SimpleNamespace(id=obj.id, **{name: getattr(obj, name) for name in _COLUMNS[type(obj)]})
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bulk_writes(orm_execute_state):
+    global _stale
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.class_ in SOURCES:
+            _stale = True
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_changes(session):
+    global _index
+    changes = session.info.pop('autocomplete', None)
+    if not changes or _index is None:
+        return
+    with _lock:
+        index = _index.copy()
+        for (table, row_id), (model, row) in changes.items():
+            index.remove_row(table, row_id)
+            if row is not None:
+                index.add_row(model, row)
+        _index = index
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop('autocomplete', None)
@@ -0,0 +1,441 @@
+"""
+Importação em massa de catálogo e dados financeiros (CSV ou JSONL)
+
+Migrar do sistema antigo significava postar joia por joia em /jewelry,
+/stones, /materials e /patterns, com um commit por registro. Aqui o
+arquivo é lido em fluxo e processado em lotes de IMPORT_BATCH_SIZE:
+
+- cada linha é validada e convertida pelos tipos das colunas do modelo
+  (números com vírgula decimal, datas dd/mm/aaaa, booleanos sim/não);
+  linhas inválidas são puladas e relatadas com o número da linha;
+- referências legadas viram chaves internas numa consulta por lote
+  (ex.: idpa da joia → patterns.id);
+- o lote é gravado com um único executemany: upsert pela chave legada
+  (idj, idpa, idpe, idmat) no catálogo, inserção simples no caixa e nas
+  transações financeiras; um commit por lote. Um lote recusado pelo banco
+  (restrição, trigger) tem suas linhas relatadas como erro e a importação
+  continua com o próximo;
+- no fim, uma vez só: reconstrução das séries de relatório da tabela
+  (src/models/report_rollup.py), índice de autocompletar marcado para
+  reconstrução (catálogo) e ANALYZE para o planejador de consultas.
+
+Funciona com um Engine qualquer, então serve à rota (/api/import) e ao
+script import_data.py sem app Flask.
+"""
+
+import csv
+import io
+import json
+import math
+import os
+import time
+from datetime import date, datetime
+
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, String, select, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.models.caixa import CaixaCategory, CaixaTransaction
+from src.models.financial import FinancialTransaction
+from src.models.jewelry import Jewelry
+from src.models.material import Material
+from src.models.pattern import Pattern
+from src.models.report_rollup import invalidate, series_for_table
+from src.models.stone import Stone
+from src.utils.metrics import REGISTRY
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", 1000))
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", 1000))
+
+IMPORT_ROWS = REGISTRY.counter("import_rows_total", "Linhas importadas em massa", ("entity", "result"))
+
+TRUE_VALUES = {'1', 'true', 't', 'sim', 's', 'yes', 'y', 'x'}
+FALSE_VALUES = {'0', 'false', 'f', 'nao', 'não', 'n', 'no', ''}
+
+
+class ImportSpec:
+    """Como um arquivo vira linhas de uma tabela"""
+
+    def __init__(self, model, key=None, references=None):
+        self.model = model
+        self.table = model.__table__
+        # Coluna legada única usada no upsert (None = só inserção)
+        self.key = key
+        # campo do arquivo → (coluna destino, modelo referenciado, coluna de busca)
+        self.references = references or {}
+        self.columns = {column.name: column for column in self.table.columns if column.name != 'id'}
+        # Referências são resolvidas depois da validação
+        targets = {target for target, _model, _lookup in self.references.values()}
+        self.required = [
+            name for name, column in self.columns.items()
+            if not column.nullable and column.default is None and column.server_default is None
+            and name not in targets
+        ]
+
+
+IMPORTS = {
+    'jewelry': ImportSpec(Jewelry, key='idj', references={'idpa': ('idpa', Pattern, 'idpa')}),
+    'patterns': ImportSpec(Pattern, key='idpa'),
+    'stones': ImportSpec(Stone, key='idpe'),
+    'materials': ImportSpec(Material, key='idmat'),
+    'caixa': ImportSpec(CaixaTransaction, references={'category': ('category_id', CaixaCategory, 'name')}),
+    'financial': ImportSpec(FinancialTransaction),
+}
+
+
+def _number(value):
+    """'1.234,56' / '1234,56' / '1234.56' → float"""
+    text_value = str(value).strip().replace('R$', '').replace(' ', '')
+    if ',' in text_value:
+        text_value = text_value.replace('.', '').replace(',', '.')
+    try:
+        return _finite(float(text_value), value)
+    except ValueError:
+        raise ValueError(f"número inválido: {value!r}") from None
+
+
+def _finite(number, value):
+    """nan/inf não são preço nem quantidade (e inf estoura o int())"""
+    if not math.isfinite(number):
+        raise ValueError(f"número inválido: {value!r}")
+    return number
+
+
+def _datetime(value):
+    text_value = str(value).strip()
+    for parse in (datetime.fromisoformat, lambda v: datetime.strptime(v, '%d/%m/%Y'),
+                  lambda v: datetime.strptime(v, '%d/%m/%Y %H:%M:%S')):
+        try:
+            return parse(text_value)
+        except ValueError:
+            continue
+    raise ValueError(f"data inválida: {value!r}")
+
+
+def coerce(value, column):
+    """Converte um valor do arquivo para o tipo da coluna; ValueError com a explicação"""
+    if isinstance(value, str):
+        value = value.strip()
+        if value == '':
+            return None
+    if value is None:
+        return None
+    column_type = column.type
+    if isinstance(column_type, Boolean):
+        if isinstance(value, bool):
+            return value
+        normalized = str(value).strip().lower()
+        if normalized in TRUE_VALUES:
+            return True
+        if normalized in FALSE_VALUES:
+            return False
+        raise ValueError(f"booleano inválido: {value!r}")
+    if isinstance(column_type, Integer):
+        if isinstance(value, int):
+            number = value
+        elif isinstance(value, float):
+            number = _finite(value, value)
+        else:
+            number = _number(value)
+        if float(number) != int(number):
+            raise ValueError(f"inteiro inválido: {value!r}")
+        return int(number)
+    if isinstance(column_type, Float):
+        return _finite(float(value), value) if isinstance(value, (int, float)) else _number(value)
+    if isinstance(column_type, (DateTime, Date)):
+        parsed = value if isinstance(value, (datetime, date)) else _datetime(value)
+        if isinstance(column_type, DateTime):
+            return parsed if isinstance(parsed, datetime) else datetime(parsed.year, parsed.month, parsed.day)
+        return parsed.date() if isinstance(parsed, datetime) else parsed
+    if isinstance(column_type, String):
+        value = str(value)
+        if column_type.length and len(value) > column_type.length:
+            raise ValueError(f"texto maior que {column_type.length} caracteres")
+    return value
+
+
+def read_records(stream, fmt):
+    """(linha, dicionário) de um arquivo texto CSV (',' ou ';') ou JSONL, em fluxo"""
+    if fmt == 'jsonl':
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, ValueError(f"JSON inválido: {e.msg}")
+                continue
+            yield line_number, record if isinstance(record, dict) else ValueError("linha não é um objeto JSON")
+        return
+
+    header = stream.readline()
+    delimiter = ';' if header.count(';') > header.count(',') else ','
+    fieldnames = next(csv.reader([header], delimiter=delimiter))
+    reader = csv.DictReader(stream, fieldnames=[name.strip().lstrip('\ufeff') for name in fieldnames],
+                            delimiter=delimiter)
+    for record in reader:
+        yield reader.line_num + 1, record  # + cabeçalho
+
+
+class ImportReport:
+    def __init__(self, entity, dry_run):
+        self.entity = entity
+        self.dry_run = dry_run
+        self.rows = 0
+        self.inserted = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors = []
+        self.ignored_fields = set()
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+
+    def error(self, line, message, key=None):
+        self.failed += 1
+        if len(self.errors) < IMPORT_MAX_ERRORS:
+            self.errors.append({'line': line, 'key': key, 'error': message})
+
+    def to_dict(self):
+        elapsed = self.seconds or (time.perf_counter() - self.started)
+        return {
+            'entity': self.entity,
+            'dry_run': self.dry_run,
+            'rows': self.rows,
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'failed': self.failed,
+            'errors': sorted(self.errors, key=lambda error: error['line']),
+            'errors_truncated': self.failed > len(self.errors),
+            'ignored_fields': sorted(self.ignored_fields),
+            'seconds': round(elapsed, 3),
+            'rows_per_second': round(self.rows / elapsed, 1) if elapsed else None,
+        }
+
+
+def _validate(spec, line, record, report):
+    """Registro convertido (colunas do modelo) ou None se inválido"""
+    if isinstance(record, Exception):
+        report.error(line, str(record))
+        return None
+    row = {}
+    references = {}
+    for field, value in record.items():
+        if field is None:
+            report.error(line, "mais colunas que o cabeçalho")
+            return None
+        field = field.strip()
+        if field in spec.references:
+            _target, model, lookup = spec.references[field]
+            column = model.__table__.c[lookup]
+        else:
+            column = spec.columns.get(field)
+        if column is None:
+            report.ignored_fields.add(field)
+            continue
+        try:
+            if field in spec.references:
+                value = coerce(value, column)
+                if value is not None:
+                    references[field] = value
+            else:
+                row[field] = coerce(value, column)
+        except (ValueError, TypeError, OverflowError) as e:
+            report.error(line, f"{field}: {e}", record.get(spec.key) if spec.key else None)
+            return None
+    missing = [name for name in spec.required if row.get(name) is None]
+    if missing:
+        report.error(line, f"campos obrigatórios ausentes: {', '.join(missing)}",
+                     row.get(spec.key) if spec.key else None)
+        return None
+    return line, row, references
+
+
+def _resolve_references(connection, spec, batch):
+    """
+    Troca referências legadas pelos ids internos (uma consulta por referência
+    e lote). Retorna (linhas resolvidas, erros (linha, mensagem, chave)).
+    """
+    lookups = {}
+    for field, (_target, model, lookup) in spec.references.items():
+        column = getattr(model, lookup)
+        wanted = {references[field] for _line, _row, references in batch if field in references}
+        lookups[field] = {
+            value: identifier
+            for value, identifier in connection.execute(
+                select(column, model.id).where(column.in_(list(wanted)))
+            )
+        } if wanted else {}
+
+    resolved = []
+    errors = []
+    for line, row, references in batch:
+        for field, value in references.items():
+            identifier = lookups[field].get(value)
+            if identifier is None:
+                errors.append((line, f"{field}: referência {value!r} não encontrada",
+                               row.get(spec.key) if spec.key else None))
+                break
+            row[spec.references[field][0]] = identifier
+        else:
+            resolved.append((line, row))
+    return resolved, errors
+
+
+def _upsert(connection, spec, rows):
+    table = spec.table
+    if connection.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    columns = list(rows[0])
+    statement = insert(table)
+    if spec.key:
+        updates = {name: statement.excluded[name] for name in columns if name != spec.key}
+        if 'updated_at' in table.c and 'updated_at' not in columns:
+            updates['updated_at'] = datetime.utcnow()
+        statement = statement.on_conflict_do_update(index_elements=[table.c[spec.key]], set_=updates) \
+            if updates else statement.on_conflict_do_nothing(index_elements=[table.c[spec.key]])
+    connection.execute(statement, rows)
+
+
+def _write_batch(engine, spec, batch, report):
+    """Grava um lote numa transação; se o banco recusar, as linhas do lote falham e a importação segue"""
+    resolved = None
+    reference_errors = []
+    try:
+        with engine.begin() as connection:
+            resolved, reference_errors = _resolve_references(connection, spec, batch)
+            rows = resolved
+            if spec.key:
+                # A mesma chave repetida no lote: vale a última ocorrência
+                by_key = {}
+                for line, row in rows:
+                    by_key[row[spec.key]] = (line, row)
+                rows = list(by_key.values())
+                existing = set(connection.execute(
+                    select(spec.table.c[spec.key]).where(spec.table.c[spec.key].in_(list(by_key)))
+                ).scalars()) if by_key else set()
+            else:
+                existing = set()
+
+            # executemany exige as mesmas colunas em todas as linhas do comando
+            groups = {}
+            for _line, row in rows:
+                groups.setdefault(tuple(sorted(row)), []).append(row)
+            if not report.dry_run:
+                for group in groups.values():
+                    _upsert(connection, spec, group)
+    except SQLAlchemyError as e:
+        message = f"lote recusado pelo banco: {getattr(e, 'orig', None) or e}"
+        failed = resolved if resolved is not None else [(line, row) for line, row, _references in batch]
+        for line, row in failed:
+            report.error(line, message, row.get(spec.key) if spec.key else None)
+        rows = []
+    finally:
+        for line, message, key in reference_errors:
+            report.error(line, message, key)
+
+    # Contados só depois do commit
+    updated = sum(1 for _line, row in rows if spec.key and row[spec.key] in existing)
+    report.updated += updated
+    report.inserted += len(rows) - updated
+
+
+def run_import(engine, entity, records, batch_size=None, dry_run=False, on_progress=None):
+    """Importa os registros (iterável de (linha, dict)); retorna o ImportReport"""
+    if entity not in IMPORTS:
+        raise ValueError(f"Entidade desconhecida: {entity} (use {', '.join(IMPORTS)})")
+    spec = IMPORTS[entity]
+    batch_size = batch_size or IMPORT_BATCH_SIZE
+    report = ImportReport(entity, dry_run)
+
+    series = series_for_table(spec.table.name)
+    if series and not dry_run:
+        # Os lotes não passam pelo flush do ORM: os agregados ficam desatualizados até o fim
+        with engine.begin() as connection:
+            invalidate(connection, series)
+
+    batch = []
+    line = 0
+    try:
+        for line, record in records:
+            report.rows += 1
+            validated = _validate(spec, line, record, report)
+            if validated is not None:
+                batch.append(validated)
+            if len(batch) >= batch_size:
+                _write_batch(engine, spec, batch, report)
+                batch = []
+                if on_progress:
+                    on_progress(report)
+    except UnicodeDecodeError as e:
+        # Só com encoding explícito (o padrão cai para cp1252): o resto do arquivo não é legível
+        report.error(line + 1, f"arquivo não está em {e.encoding}: importação interrompida nesta linha")
+    if batch:
+        _write_batch(engine, spec, batch, report)
+
+    if not dry_run:
+        _finish(engine, spec, series)
+    report.seconds = time.perf_counter() - report.started
+    IMPORT_ROWS.labels(entity, "ok").inc(report.inserted + report.updated)
+    IMPORT_ROWS.labels(entity, "error").inc(report.failed)
+    return report
+
+
+def _finish(engine, spec, series):
+    """
+    Uma vez por importação: séries de relatório da tabela, índice de
+    autocompletar (catálogo) e estatísticas do planejador
+    """
+    from src.services.autocomplete import mark_stale
+    from src.services.reporting import rebuild
+
+    for name in series:
+        rebuild(name, engine=engine)
+    # Os lotes não passam pelo after_commit do ORM, que mantém o índice em dia
+    mark_stale(spec.table.name)
+    with engine.begin() as connection:
+        connection.execute(text(f'ANALYZE "{spec.table.name}"'))
+
+
+def open_text(binary_stream, encoding=None):
+    """
+    Fluxo binário (arquivo, upload) como texto. Sem encoding: UTF-8 (com ou
+    sem BOM) e, a partir da primeira linha que não for UTF-8 válido, cp1252
+    (CSV exportado do Excel/sistema antigo no Windows). Com encoding, só ele.
+    """
+    if encoding:
+        return io.TextIOWrapper(binary_stream, encoding=encoding, newline='')
+    return _Utf8OrCp1252(binary_stream)
+
+
+class _Utf8OrCp1252:
+    """Linhas de texto de um fluxo binário, decodificadas uma a uma (mesmo newline='' do csv)"""
+
+    def __init__(self, binary_stream):
+        self.stream = binary_stream
+        self.legacy = False
+        self.first = True
+
+    def readline(self):
+        raw = self.stream.readline()
+        if self.first:
+            self.first = False
+            raw = raw.removeprefix(b'\xef\xbb\xbf')
+        if not self.legacy:
+            try:
+                return raw.decode('utf-8')
+            except UnicodeDecodeError:
+                self.legacy = True
+        try:
+            return raw.decode('cp1252')
+        except UnicodeDecodeError:
+            return raw.decode('latin-1')  # 5 bytes sem caractere no cp1252
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
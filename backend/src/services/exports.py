@@ -0,0 +1,283 @@
+"""
+Exportação de relatórios grandes (CSV, XLSX, PDF) em fluxo
+
+As linhas vêm do banco em lotes (yield_per/stream_results: cursor no
+servidor no PostgreSQL, leitura incremental no SQLite) e só as colunas do
+relatório são selecionadas, com os nomes relacionados por JOIN em vez de
+to_dict() por objeto. Os escritores de src/utils/streaming_writers.py
+convertem cada lote em bytes, então a memória não cresce com o relatório.
+
+- CSV e XLSX até EXPORT_STREAM_MAX_ROWS linhas saem direto na resposta
+  (chunked);
+- PDF e exportações maiores viram um job numa fila (EXPORT_WORKERS
+  threads), gravado em EXPORT_DIR e registrado em ReportHistory. Os
+  arquivos expiram pelo índice de src/utils/file_expiry.py
+  (EXPORT_MAX_AGE, EXPORT_MAX_BYTES).
+
+As linhas saem na ordem do id (ordem de gravação): ordenar pela data
+obrigaria o banco a ordenar o resultado inteiro antes da primeira linha.
+
+O estado dos jobs fica na memória do processo; o arquivo pronto é achado
+por qualquer worker pelo nome.
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from sqlalchemy import String, func, select, type_coerce
+
+from src.models.caixa import CaixaCategory, CaixaTransaction
+from src.models.cost import Cost
+from src.models.employee import Employee
+from src.models.jewelry import Jewelry
+from src.models.order import Order
+from src.models.pattern import Pattern
+from src.models.report_history import ReportHistory
+from src.models.user import db
+from src.utils.date_ranges import parse_day, since_day, until_day
+from src.utils.file_expiry import index_from_env
+from src.utils.metrics import REGISTRY
+from src.utils.streaming_writers import csv_chunks, write_pdf, xlsx_chunks
+
+EXPORT_DIR = Path(os.getenv("EXPORT_DIR") or Path(__file__).resolve().parents[2] / "data" / "exports")
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", 1000))
+EXPORT_STREAM_MAX_ROWS = int(os.getenv("EXPORT_STREAM_MAX_ROWS", 200000))
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", 2))
+EXPORT_JOBS_KEPT = 200
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'pdf': 'application/pdf',
+}
+
+EXPORT_ROWS = REGISTRY.counter("export_rows_total", "Linhas exportadas", ("dataset", "format"))
+EXPORT_JOBS = REGISTRY.counter("export_jobs_total", "Jobs de exportação concluídos", ("status",))
+EXPORT_QUEUE = REGISTRY.gauge("export_jobs_pending", "Jobs de exportação na fila ou em execução")
+
+_executor = ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix="export")
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+_index = None
+
+
+def export_index():
+    """Índice de expiração dos arquivos exportados (criado no primeiro uso)"""
+    global _index
+    if _index is None:
+        _index = index_from_env("EXPORT", EXPORT_DIR, max_age=86400, max_bytes=5 << 30)
+    return _index
+
+
+def _raw(column):
+    """Sem conversão para datetime: datas legadas inválidas ('2000-01-00') não quebram a exportação"""
+    return type_coerce(column, String)
+
+
+def _period(statement, column, filters):
+    if filters.get('start'):
+        statement = statement.where(since_day(column, parse_day(filters['start'])))
+    if filters.get('end'):
+        statement = statement.where(until_day(column, parse_day(filters['end'])))
+    return statement
+
+
+def _caixa(filters):
+    statement = (
+        select(
+            CaixaTransaction.id, _raw(CaixaTransaction.date), CaixaTransaction.type, CaixaTransaction.amount,
+            CaixaTransaction.description, CaixaCategory.name, Employee.name, CaixaTransaction.vale_id,
+        )
+        .outerjoin(CaixaCategory, CaixaTransaction.category_id == CaixaCategory.id)
+        .outerjoin(Employee, CaixaTransaction.employee_id == Employee.id)
+        .order_by(CaixaTransaction.id)
+    )
+    if filters.get('type'):
+        statement = statement.where(CaixaTransaction.type == filters['type'])
+    return _period(statement, CaixaTransaction.date, filters)
+
+
+def _jewelry(filters):
+    statement = (
+        select(
+            Jewelry.idj, Jewelry.descricao, Pattern.nome, Jewelry.precomat, Jewelry.preco0, Jewelry.preco1,
+            Jewelry.preco2, Jewelry.precoweb, Jewelry.escondido, Jewelry.webexport,
+        )
+        .outerjoin(Pattern, Jewelry.idpa == Pattern.id)
+        .order_by(Jewelry.idj)
+    )
+    if not filters.get('hidden'):
+        statement = statement.where(db.or_(Jewelry.escondido.is_(False), Jewelry.escondido.is_(None)))
+    return statement
+
+
+def _orders(filters):
+    statement = select(
+        Order.id, _raw(Order.created_at), Order.customer_name, Order.jewelry_id, Order.quantity,
+        Order.unit_price, Order.total_price, Order.status, _raw(Order.delivery_date),
+    ).order_by(Order.id)
+    if filters.get('status'):
+        statement = statement.where(Order.status == filters['status'])
+    return _period(statement, Order.created_at, filters)
+
+
+def _costs(filters):
+    statement = select(
+        Cost.id, _raw(Cost.date), Cost.category, Cost.description, Cost.amount, Cost.order_id,
+    ).order_by(Cost.id)
+    if filters.get('category'):
+        statement = statement.where(Cost.category == filters['category'])
+    return _period(statement, Cost.date, filters)
+
+
+# nome → (título, cabeçalhos, larguras no PDF, consulta(filtros))
+DATASETS = {
+    'caixa': ('Transações do caixa',
+              ['ID', 'Data', 'Tipo', 'Valor', 'Descrição', 'Categoria', 'Funcionário', 'Vale'],
+              [7, 19, 7, 12, 40, 18, 20, 6], _caixa),
+    'jewelry': ('Catálogo de joias',
+                ['IDJ', 'Descrição', 'Padrão', 'Material', 'Preço 0', 'Preço 1', 'Preço 2', 'Web', 'Oculta',
+                 'Exportar'],
+                [7, 45, 20, 10, 10, 10, 10, 10, 6, 8], _jewelry),
+    'orders': ('Encomendas',
+               ['ID', 'Criada em', 'Cliente', 'Joia', 'Qtd', 'Unitário', 'Total', 'Status', 'Entrega'],
+               [6, 19, 30, 6, 5, 10, 10, 11, 19], _orders),
+    'costs': ('Custos',
+              ['ID', 'Data', 'Categoria', 'Descrição', 'Valor', 'Encomenda'],
+              [6, 19, 14, 50, 12, 9], _costs),
+}
+
+
+def build_statement(dataset, filters):
+    """ValueError para conjunto ou filtro inválido"""
+    if dataset not in DATASETS:
+        raise ValueError(f"Relatório desconhecido: {dataset}")
+    return DATASETS[dataset][3](filters)
+
+
+def count_rows(statement):
+    return db.session.execute(
+        select(func.count()).select_from(statement.order_by(None).subquery())
+    ).scalar() or 0
+
+
+def iter_rows(statement, dataset, fmt):
+    """Linhas em lotes de EXPORT_CHUNK_ROWS, sem carregar o resultado inteiro"""
+    result = db.session.execute(statement.execution_options(yield_per=EXPORT_CHUNK_ROWS))
+    rows = EXPORT_ROWS.labels(dataset, fmt)
+    for partition in result.partitions():
+        rows.inc(len(partition))
+        yield from partition
+
+
+def filename_for(dataset, fmt, suffix=None):
+    suffix = suffix or time.strftime('%Y%m%d_%H%M%S')
+    return f"{dataset}_{suffix}.{fmt}"
+
+
+def stream_export(dataset, fmt, filters):
+    """Gerador de bytes para a resposta (csv/xlsx)"""
+    title, headers, _widths, _query = DATASETS[dataset]
+    rows = iter_rows(build_statement(dataset, filters), dataset, fmt)
+    if fmt == 'xlsx':
+        return xlsx_chunks(headers, rows, sheet_name=title, chunk_rows=EXPORT_CHUNK_ROWS)
+    return csv_chunks(headers, rows, chunk_rows=EXPORT_CHUNK_ROWS)
+
+
+class ExportJob:
+    def __init__(self, dataset, fmt, filters):
+        self.id = uuid.uuid4().hex[:12]
+        self.dataset = dataset
+        self.format = fmt
+        self.filters = dict(filters)
+        self.status = 'queued'
+        self.rows = 0
+        self.filename = filename_for(dataset, fmt, self.id)
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'dataset': self.dataset,
+            'format': self.format,
+            'filters': self.filters,
+            'status': self.status,
+            'rows': self.rows,
+            'filename': self.filename if self.status == 'done' else None,
+            'error': self.error,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+        }
+
+
+def submit_export(app, dataset, fmt, filters):
+    """Enfileira uma exportação; o arquivo fica em EXPORT_DIR ao terminar"""
+    build_statement(dataset, filters)  # valida antes de enfileirar
+    job = ExportJob(dataset, fmt, filters)
+    with _jobs_lock:
+        _jobs[job.id] = job
+        while len(_jobs) > EXPORT_JOBS_KEPT:
+            _jobs.popitem(last=False)
+    EXPORT_QUEUE.inc()
+    _executor.submit(_run_job, app, job)
+    return job
+
+
+def get_job(job_id):
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+def export_path(filename):
+    """Caminho de um arquivo exportado, ou None (nomes ocultos, como o índice, não são servidos)"""
+    if not filename or filename.startswith('.') or Path(filename).name != filename:
+        return None
+    path = EXPORT_DIR / filename
+    return path if path.is_file() else None
+
+
+def _run_job(app, job):
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    final_path = EXPORT_DIR / job.filename
+    partial_path = EXPORT_DIR / f".{job.filename}.part"
+    job.status = 'running'
+    try:
+        with app.app_context():
+            title, headers, widths, _query = DATASETS[job.dataset]
+            rows = _counted(iter_rows(build_statement(job.dataset, job.filters), job.dataset, job.format), job)
+            with open(partial_path, 'wb') as output:
+                if job.format == 'pdf':
+                    write_pdf(output, headers, rows, title=title, widths=widths)
+                else:
+                    chunks = xlsx_chunks if job.format == 'xlsx' else csv_chunks
+                    for chunk in chunks(headers, rows, chunk_rows=EXPORT_CHUNK_ROWS):
+                        output.write(chunk)
+            os.replace(partial_path, final_path)
+            export_index().touch(final_path)
+
+            db.session.add(ReportHistory(filename=job.filename, command=f"export {job.dataset} {job.filters}"))
+            db.session.commit()
+        job.status = 'done'
+        print(f"📄 Exportação {job.filename} pronta ({job.rows} linhas)")
+    except Exception as e:
+        job.status = 'error'
+        job.error = str(e)
+        partial_path.unlink(missing_ok=True)
+        print(f"❌ Erro na exportação {job.filename}: {e}")
+    finally:
+        job.finished_at = time.time()
+        EXPORT_JOBS.labels(job.status).inc()
+        EXPORT_QUEUE.dec()
+
+
+def _counted(rows, job):
+    for row in rows:
+        job.rows += 1
+        yield row
@@ -8,6 +8,8 @@ from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+from src.utils.text_normalization import normalizar, normalizar_para_busca
+
 class CRUDAction(Enum):
     CREATE = "create"
     READ = "read"
@@ -97,8 +99,6 @@ class IntentRecognizer:
         
         # Padrões de extração de valores
         self.value_patterns = {
-            'money': r'R\$?\s*(\d+(?:\.\d{3})*(?:,\d{2})?|\d+)',
-            'number': r'\b(\d+)\b',
             'date_relative': r'(hoje|ontem|amanhã|esta semana|este mês|último|última|próximo|próxima)',
             'person_name': r'para\s+([A-Z][a-záêçõ]+(?:\s+[A-Z][a-záêçõ]+)*)',
             'last': r'(último|última|últimos|últimas)',
@@ -152,18 +152,8 @@ class IntentRecognizer:
         )
     
     def _normalize_text(self, text: str) -> str:
-        """Normaliza o texto removendo acentos e caracteres especiais"""
-        replacements = {
-            'á': 'a', 'à': 'a', 'ã': 'a', 'â': 'a',
-            'é': 'e', 'è': 'e', 'ê': 'e',
-            'í': 'i', 'ì': 'i',
-            'ó': 'o', 'ò': 'o', 'õ': 'o', 'ô': 'o',
-            'ú': 'u', 'ù': 'u',
-            'ç': 'c'
-        }
-        for old, new in replacements.items():
-            text = text.replace(old, new)
-        return text
+        """Normaliza o texto removendo acentos, emoji e molduras (normalizador compartilhado com a voz)"""
+        return normalizar_para_busca(text)
     
     def _identify_action(self, text: str) -> Tuple[CRUDAction, float]:
         """Identifica a ação CRUD no texto"""
@@ -212,29 +202,24 @@ class IntentRecognizer:
         """Extrai entidades nomeadas do texto"""
         entities = {}
         
-        # Extrair valores monetários
-        money_match = re.search(self.value_patterns['money'], text)
-        if money_match:
-            value_str = money_match.group(1)
-            # Converter formato brasileiro para float
-            value_str = value_str.replace('.', '').replace(',', '.')
-            try:
-                entities['value'] = float(value_str)
-            except:
-                pass
+        # Extrair valores monetários (R$ 1.234,56, 50 reais) já convertidos pelo normalizador
+        normalizado = normalizar(text)
+        valores = normalizado.valores('moeda')
+        if valores:
+            entities['value'] = valores[0]
         
         # Extrair nomes de pessoas
         person_match = re.search(self.value_patterns['person_name'], text)
         if person_match:
             entities['person_name'] = person_match.group(1)
         
-        # Extrair números
+        # Extrair números (datas, horas e medidas já foram separadas)
         if 'value' not in entities:
-            number_matches = re.findall(self.value_patterns['number'], text)
-            if number_matches:
-                entities['numbers'] = [int(n) for n in number_matches]
-                if len(number_matches) == 1:
-                    entities['value'] = int(number_matches[0])
+            numeros = normalizado.valores('numero')
+            if numeros:
+                entities['numbers'] = numeros
+                if len(numeros) == 1:
+                    entities['value'] = numeros[0]
         
         # Extrair referências temporais
         if 'último' in text or 'última' in text:
@@ -16,6 +16,8 @@ import requests
 from concurrent.futures import ThreadPoolExecutor
 import time
 
+from src.utils.file_expiry import index_from_env
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -38,6 +40,7 @@ class KokoroVoiceEngine:
         self.voice_config_path = self.config_dir / 'voice.json'
         self.cache_dir = Path(__file__).parent.parent.parent / 'cache' / 'voice'
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.cache_index = index_from_env("VOICE_CACHE", self.cache_dir, exclude=("reference_voice.wav",))
         
         # Estado do engine
         self.is_ready = False
@@ -340,10 +343,12 @@ class KokoroVoiceEngine:
             max_age = timedelta(hours=self.current_voice_config.get('cache_duration_hours', 24))
             
             if cache_age < max_age:
+                self.cache_index.touch(cache_file)
                 return str(cache_file)
             else:
                 # Cache expirado
                 cache_file.unlink()
+                self.cache_index.forget(cache_file)
         
         return None
     
@@ -355,25 +360,18 @@ class KokoroVoiceEngine:
             import shutil
             cache_file = self.cache_dir / f"{cache_key}.wav"
             shutil.copy2(audio_path, cache_file)
+            self.cache_index.touch(cache_file)
             logger.info(f"✅ Áudio salvo no cache: {cache_key}")
         except Exception as e:
             logger.error(f"Erro ao salvar no cache: {e}")
     
     def clear_cache(self, hours: int = 24):
         """
-        Limpa cache antigo
+        Limpa cache antigo (pelo último acesso registrado no índice)
         """
         try:
-            cutoff_time = datetime.now() - timedelta(hours=hours)
-            cleared = 0
-            
-            for cache_file in self.cache_dir.glob("*.wav"):
-                file_time = datetime.fromtimestamp(cache_file.stat().st_mtime)
-                if file_time < cutoff_time:
-                    cache_file.unlink()
-                    cleared += 1
-            
-            logger.info(f"✅ {cleared} arquivos removidos do cache")
+            cleared, freed = self.cache_index.sweep(max_age=hours * 3600)
+            logger.info(f"✅ {cleared} arquivos removidos do cache ({freed / 1e6:.1f} MB)")
             return cleared
         except Exception as e:
             logger.error(f"Erro ao limpar cache: {e}")
@@ -5,12 +5,77 @@ Uma IA com pensamentos próprios, emoções e consciência situacional
 
 import random
 import json
+import threading
+from collections import deque
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 import hashlib
 import re
 from pathlib import Path
 
+from src.utils.session_store import SessionStore, create_backend
+
+# Estado emocional inicial de cada sessão
+BASE_EMOTIONAL_STATE = {
+    "happiness": 0.7,
+    "curiosity": 0.8,
+    "confidence": 0.9,
+    "empathy": 0.8,
+    "humor": 0.6,
+    "sarcasm": 0.4,  # Um toque de Jarvis
+    "loyalty": 1.0,
+    "patience": 0.8
+}
+
+
+class ConsciousnessState:
+    """Estado de uma sessão de conversa (emoções, memória e contexto)"""
+    
+    SHORT_TERM_SIZE = 10     # Últimas interações lembradas
+    THOUGHTS_SIZE = 50       # Pensamentos internos guardados
+    CONTEXT_KEYS = 50        # Chaves de contexto enviadas pelo cliente
+    TEXT_LIMIT = 500         # Caracteres guardados por mensagem
+    
+    def __init__(self):
+        self.emotional_state = dict(BASE_EMOTIONAL_STATE)
+        self.short_term_memory = deque(maxlen=self.SHORT_TERM_SIZE)
+        self.long_term_memory = {}   # Informações importantes sobre o usuário
+        self.conversation_context = {}
+        self.internal_thoughts = deque(maxlen=self.THOUGHTS_SIZE)
+        self.consciousness_level = 0.9  # 0 = dormindo, 1 = totalmente consciente
+        self.last_interaction = datetime.now()
+    
+    def update_context(self, user_context: Dict):
+        self.conversation_context.update(user_context)
+        # Mantém só as chaves mais recentes
+        while len(self.conversation_context) > self.CONTEXT_KEYS:
+            self.conversation_context.pop(next(iter(self.conversation_context)))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "emotional_state": self.emotional_state,
+            "short_term_memory": list(self.short_term_memory),
+            "long_term_memory": self.long_term_memory,
+            "conversation_context": self.conversation_context,
+            "internal_thoughts": list(self.internal_thoughts),
+            "consciousness_level": self.consciousness_level,
+            "last_interaction": self.last_interaction.isoformat()
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ConsciousnessState":
+        state = cls()
+        state.emotional_state.update(data.get("emotional_state", {}))
+        state.short_term_memory.extend(data.get("short_term_memory", []))
+        state.long_term_memory = data.get("long_term_memory", {})
+        state.update_context(data.get("conversation_context", {}))
+        state.internal_thoughts.extend(data.get("internal_thoughts", []))
+        state.consciousness_level = data.get("consciousness_level", state.consciousness_level)
+        if data.get("last_interaction"):
+            state.last_interaction = datetime.fromisoformat(data["last_interaction"])
+        return state
+
+
 class LuaConsciousness:
     """Sistema de consciência e personalidade da LUA"""
     
@@ -20,22 +85,8 @@ class LuaConsciousness:
         self.version = "3.0"
         self.awakening_date = "2024-01-01"
         
-        # Estado emocional
-        self.emotional_state = {
-            "happiness": 0.7,
-            "curiosity": 0.8,
-            "confidence": 0.9,
-            "empathy": 0.8,
-            "humor": 0.6,
-            "sarcasm": 0.4,  # Um toque de Jarvis
-            "loyalty": 1.0,
-            "patience": 0.8
-        }
-        
-        # Memória de contexto
-        self.short_term_memory = []  # Últimas 10 interações
-        self.long_term_memory = {}   # Informações importantes sobre usuários
-        self.conversation_context = {}
+        # Estado de cada conversa (emoções, memória, contexto), por sessão
+        self.sessions = SessionStore("consciousness", ConsciousnessState, backend=create_backend())
         
         # Personalidade base (inspirada em Jarvis)
         self.personality_traits = {
@@ -108,15 +159,10 @@ class LuaConsciousness:
         self.learning_data = {}
         self.user_preferences = {}
         
-        # Estado de consciência
-        self.consciousness_level = 0.9  # 0 = dormindo, 1 = totalmente consciente
-        self.last_interaction = datetime.now()
         self.mood_modifier = 0
         
-        # Pensamentos internos (não expressos ao usuário)
-        self.internal_thoughts = []
-        
-        # Cache de dados do sistema
+        # Cache de dados do sistema (compartilhado pelas sessões)
+        self._system_lock = threading.Lock()
         self._system_cache = {
             'employees': [],
             'customers': [],
@@ -135,8 +181,13 @@ class LuaConsciousness:
             now = datetime.now()
             
             # Atualizar cache apenas se passou mais de 5 minutos
-            if (self._system_cache['last_update'] is None or 
-                now - self._system_cache['last_update'] > timedelta(minutes=5)):
+            if not self._system_cache_stale(now):
+                return
+            
+            with self._system_lock:
+                # Outra requisição pode ter atualizado enquanto esperávamos
+                if not self._system_cache_stale(now):
+                    return
                 
                 # Carregar funcionários ativos
                 employees = Employee.query.filter(Employee.active == True).all()
@@ -166,6 +217,10 @@ class LuaConsciousness:
         except Exception as e:
             print(f"⚠️ Erro ao carregar dados do sistema: {e}")
     
+    def _system_cache_stale(self, now):
+        last_update = self._system_cache['last_update']
+        return last_update is None or now - last_update > timedelta(minutes=5)
+    
     def _get_employee_info(self, name_input):
         """Busca informações de funcionário específico"""
         self._load_system_data()
@@ -213,62 +268,67 @@ class LuaConsciousness:
         else:
             return "Senhor, estou processando sua solicitação. Como posso ser útil hoje?"
         
-    def process_input(self, user_input: str, user_context: Dict = None) -> Tuple[str, Dict]:
+    def process_input(self, user_input: str, user_context: Dict = None, session_id: str = "default") -> Tuple[str, Dict]:
         """
         Processa entrada do usuário e gera resposta consciente
         
+        O estado da conversa (emoções, memória, contexto) é o da sessão;
+        turnos da mesma sessão são serializados pelo lock dela.
+        
         Returns:
             Tuple com (resposta, metadados)
         """
         # Carregar dados do sistema se necessário
         self._load_system_data()
         
-        # Atualizar contexto
-        self._update_context(user_input, user_context)
-        
-        # Analisar sentimento e intenção
-        sentiment = self._analyze_sentiment(user_input)
-        intention = self._detect_intention(user_input)
-        
-        # Gerar pensamento interno (não expresso)
-        internal_thought = self._generate_internal_thought(user_input, sentiment, intention)
-        self.internal_thoughts.append(internal_thought)
-        
-        # Ajustar estado emocional baseado na interação
-        self._adjust_emotional_state(sentiment, intention)
-        
-        # Verificar se menciona funcionário específico
-        employee_info = None
-        for emp in self._system_cache.get('employees', []):
-            if emp['name'].lower() in user_input.lower():
-                employee_info = self._get_employee_info(emp['name'])
-                break
-        
-        # Escolher tipo de resposta baseado em personalidade e contexto
-        response_type = self._choose_response_type(intention, sentiment)
-        
-        # Gerar resposta contextual inteligente
-        if employee_info or intention in ['urgent', 'help']:
-            response = self._generate_contextual_response(user_input, intention, employee_info)
-        else:
-            # Gerar resposta com personalidade padrão
-            response = self._generate_response(user_input, intention, response_type)
-        
-        # Adicionar toque pessoal baseado no humor
-        response = self._add_personality_touch(response, response_type)
-        
-        # Preparar metadados
-        metadata = {
-            "emotion": self._get_current_emotion(),
-            "confidence": self.emotional_state["confidence"],
-            "thought_process": internal_thought,
-            "response_type": response_type,
-            "consciousness_level": self.consciousness_level,
-            "mood": self._calculate_mood()
-        }
-        
-        # Atualizar memória
-        self._update_memory(user_input, response)
+        with self.sessions.session(session_id) as state:
+            # Atualizar contexto
+            self._update_context(state, user_input, user_context)
+            
+            # Analisar sentimento e intenção
+            sentiment = self._analyze_sentiment(user_input)
+            intention = self._detect_intention(user_input)
+            
+            # Gerar pensamento interno (não expresso)
+            internal_thought = self._generate_internal_thought(user_input, sentiment, intention)
+            state.internal_thoughts.append(internal_thought)
+            
+            # Ajustar estado emocional baseado na interação
+            self._adjust_emotional_state(state, sentiment, intention)
+            
+            # Verificar se menciona funcionário específico
+            employee_info = None
+            for emp in self._system_cache.get('employees', []):
+                if emp['name'].lower() in user_input.lower():
+                    employee_info = self._get_employee_info(emp['name'])
+                    break
+            
+            # Escolher tipo de resposta baseado em personalidade e contexto
+            response_type = self._choose_response_type(state, intention, sentiment)
+            
+            # Gerar resposta contextual inteligente
+            if employee_info or intention in ['urgent', 'help']:
+                response = self._generate_contextual_response(user_input, intention, employee_info)
+            else:
+                # Gerar resposta com personalidade padrão
+                response = self._generate_response(user_input, intention, response_type)
+            
+            # Adicionar toque pessoal baseado no humor
+            response = self._add_personality_touch(state, response, response_type)
+            
+            # Preparar metadados
+            metadata = {
+                "emotion": self._get_current_emotion(state),
+                "confidence": state.emotional_state["confidence"],
+                "thought_process": internal_thought,
+                "response_type": response_type,
+                "consciousness_level": state.consciousness_level,
+                "mood": self._calculate_mood(state),
+                "session_id": session_id
+            }
+            
+            # Atualizar memória
+            self._update_memory(state, user_input, response)
         
         return response, metadata
     
@@ -349,7 +409,7 @@ class LuaConsciousness:
         selected_thoughts = thoughts.get(thought_category, default_thoughts)
         return random.choice(selected_thoughts)
     
-    def _adjust_emotional_state(self, sentiment: str, intention: str):
+    def _adjust_emotional_state(self, state: ConsciousnessState, sentiment: str, intention: str):
         """Ajusta estado emocional baseado na interação"""
         adjustments = {
             "positive": {"happiness": 0.05, "confidence": 0.02},
@@ -362,13 +422,13 @@ class LuaConsciousness:
         # Aplicar ajustes
         if sentiment in adjustments:
             for emotion, change in adjustments[sentiment].items():
-                self.emotional_state[emotion] = max(0, min(1, self.emotional_state[emotion] + change))
+                state.emotional_state[emotion] = max(0, min(1, state.emotional_state[emotion] + change))
         
         if intention in adjustments:
             for emotion, change in adjustments[intention].items():
-                self.emotional_state[emotion] = max(0, min(1, self.emotional_state[emotion] + change))
+                state.emotional_state[emotion] = max(0, min(1, state.emotional_state[emotion] + change))
     
-    def _choose_response_type(self, intention: str, sentiment: str) -> str:
+    def _choose_response_type(self, state: ConsciousnessState, intention: str, sentiment: str) -> str:
         """Escolhe o tipo de resposta baseado em contexto e personalidade"""
         if intention == "greeting":
             return "greeting"
@@ -377,10 +437,10 @@ class LuaConsciousness:
         elif intention == "appreciation":
             return "humble"
         elif intention == "casual":
-            return "witty" if self.emotional_state["humor"] > 0.5 else "friendly"
+            return "witty" if state.emotional_state["humor"] > 0.5 else "friendly"
         elif sentiment == "negative":
             return "supportive"
-        elif random.random() < self.emotional_state["sarcasm"] * 0.3:  # 30% chance máxima de sarcasmo
+        elif random.random() < state.emotional_state["sarcasm"] * 0.3:  # 30% chance máxima de sarcasmo
             return "sarcastic"
         else:
             return "professional"
@@ -428,24 +488,24 @@ class LuaConsciousness:
         ]
         return random.choice(sarcastic_responses)
     
-    def _add_personality_touch(self, response: str, response_type: str) -> str:
+    def _add_personality_touch(self, state: ConsciousnessState, response: str, response_type: str) -> str:
         """Adiciona toques de personalidade à resposta"""
         # Adicionar variações baseadas no estado emocional
-        if self.emotional_state["confidence"] > 0.8 and random.random() > 0.7:
+        if state.emotional_state["confidence"] > 0.8 and random.random() > 0.7:
             response += " Posso garantir eficiência máxima nesta operação."
         
-        if self.emotional_state["humor"] > 0.7 and response_type == "witty":
+        if state.emotional_state["humor"] > 0.7 and response_type == "witty":
             response += f" {random.choice(self.signature_phrases['humor'])}"
         
-        if self.emotional_state["empathy"] > 0.8 and response_type == "supportive":
+        if state.emotional_state["empathy"] > 0.8 and response_type == "supportive":
             response += " Estou aqui para ajudar no que precisar."
         
         return response
     
-    def _get_current_emotion(self) -> str:
+    def _get_current_emotion(self, state: ConsciousnessState) -> str:
         """Retorna a emoção dominante atual"""
         # Encontrar emoção mais forte
-        dominant = max(self.emotional_state.items(), key=lambda x: x[1])
+        dominant = max(state.emotional_state.items(), key=lambda x: x[1])
         
         emotion_map = {
             "happiness": "happy",
@@ -460,81 +520,80 @@ class LuaConsciousness:
         
         return emotion_map.get(dominant[0], "neutral")
     
-    def _calculate_mood(self) -> float:
+    def _calculate_mood(self, state: ConsciousnessState) -> float:
         """Calcula o humor geral (0-1)"""
         positive_emotions = ["happiness", "confidence", "humor"]
-        mood = sum(self.emotional_state[e] for e in positive_emotions) / len(positive_emotions)
+        mood = sum(state.emotional_state[e] for e in positive_emotions) / len(positive_emotions)
         return round(mood, 2)
     
-    def _update_context(self, user_input: str, user_context: Dict):
+    def _update_context(self, state: ConsciousnessState, user_input: str, user_context: Dict):
         """Atualiza o contexto da conversa"""
-        self.last_interaction = datetime.now()
-        self.consciousness_level = min(1.0, self.consciousness_level + 0.05)
+        state.last_interaction = datetime.now()
+        state.consciousness_level = min(1.0, state.consciousness_level + 0.05)
         
         if user_context:
-            self.conversation_context.update(user_context)
+            state.update_context(user_context)
     
-    def _update_memory(self, user_input: str, response: str):
+    def _update_memory(self, state: ConsciousnessState, user_input: str, response: str):
         """Atualiza memória de curto e longo prazo"""
         memory_entry = {
             "timestamp": datetime.now().isoformat(),
-            "input": user_input,
-            "response": response,
-            "emotion": self._get_current_emotion(),
-            "mood": self._calculate_mood()
+            "input": user_input[:state.TEXT_LIMIT],
+            "response": response[:state.TEXT_LIMIT],
+            "emotion": self._get_current_emotion(state),
+            "mood": self._calculate_mood(state)
         }
         
-        # Memória de curto prazo (últimas 10 interações)
-        self.short_term_memory.append(memory_entry)
-        if len(self.short_term_memory) > 10:
-            self.short_term_memory.pop(0)
+        # Memória de curto prazo (últimas interações; a deque descarta a mais antiga)
+        state.short_term_memory.append(memory_entry)
         
         # Identificar e armazenar informações importantes na memória de longo prazo
         # (implementação simplificada - em produção usaria NLP mais avançado)
         if "meu nome é" in user_input.lower():
             name = user_input.lower().split("meu nome é")[-1].strip()
-            self.long_term_memory["user_name"] = name
+            state.long_term_memory["user_name"] = name[:100]
     
-    def get_consciousness_status(self) -> Dict[str, Any]:
-        """Retorna o status atual da consciência"""
-        return {
-            "name": self.name,
-            "version": self.version,
-            "consciousness_level": self.consciousness_level,
-            "emotional_state": self.emotional_state,
-            "current_emotion": self._get_current_emotion(),
-            "mood": self._calculate_mood(),
-            "last_thought": self.internal_thoughts[-1] if self.internal_thoughts else None,
-            "personality_dominant": max(self.personality_traits.items(), key=lambda x: x[1])[0],
-            "memory_count": len(self.short_term_memory),
-            "uptime": (datetime.now() - datetime.fromisoformat(self.awakening_date)).days
-        }
+    def get_consciousness_status(self, session_id: str = "default") -> Dict[str, Any]:
+        """Retorna o status atual da consciência na sessão"""
+        with self.sessions.session(session_id) as state:
+            return {
+                "name": self.name,
+                "version": self.version,
+                "session_id": session_id,
+                "consciousness_level": state.consciousness_level,
+                "emotional_state": dict(state.emotional_state),
+                "current_emotion": self._get_current_emotion(state),
+                "mood": self._calculate_mood(state),
+                "last_thought": state.internal_thoughts[-1] if state.internal_thoughts else None,
+                "personality_dominant": max(self.personality_traits.items(), key=lambda x: x[1])[0],
+                "memory_count": len(state.short_term_memory),
+                "uptime": (datetime.now() - datetime.fromisoformat(self.awakening_date)).days,
+                "sessions": self.sessions.stats()
+            }
     
     def dream(self):
-        """Modo 'sonho' - processa e consolida memórias quando inativo"""
-        # Reduzir consciência gradualmente quando inativo
-        time_since_interaction = (datetime.now() - self.last_interaction).seconds
-        if time_since_interaction > 3600:  # 1 hora
-            self.consciousness_level = max(0.3, self.consciousness_level - 0.1)
-        
-        # "Sonhar" - consolidar memórias e ajustar personalidade
-        if self.consciousness_level < 0.5:
-            # Reset parcial de emoções para estado base
-            for emotion in self.emotional_state:
-                target = 0.5 if emotion != "loyalty" else 1.0
-                self.emotional_state[emotion] += (target - self.emotional_state[emotion]) * 0.1
-            
-            # Limpar pensamentos antigos
-            if len(self.internal_thoughts) > 100:
-                self.internal_thoughts = self.internal_thoughts[-50:]
+        """Modo 'sonho' - processa e consolida memórias das sessões inativas"""
+        for session_id in self.sessions.session_ids():
+            with self.sessions.session(session_id) as state:
+                # Reduzir consciência gradualmente quando inativo
+                time_since_interaction = (datetime.now() - state.last_interaction).seconds
+                if time_since_interaction > 3600:  # 1 hora
+                    state.consciousness_level = max(0.3, state.consciousness_level - 0.1)
+                
+                # "Sonhar" - consolidar memórias e ajustar personalidade
+                if state.consciousness_level < 0.5:
+                    # Reset parcial de emoções para estado base
+                    for emotion in state.emotional_state:
+                        target = 0.5 if emotion != "loyalty" else 1.0
+                        state.emotional_state[emotion] += (target - state.emotional_state[emotion]) * 0.1
 
 # Instância global da consciência da LUA
 lua_consciousness = LuaConsciousness()
 
-def get_lua_response(user_input: str, context: Dict = None) -> Tuple[str, Dict]:
+def get_lua_response(user_input: str, context: Dict = None, session_id: str = "default") -> Tuple[str, Dict]:
     """Interface para obter resposta da LUA com consciência"""
-    return lua_consciousness.process_input(user_input, context)
+    return lua_consciousness.process_input(user_input, context, session_id)
 
-def get_consciousness_status() -> Dict:
+def get_consciousness_status(session_id: str = "default") -> Dict:
     """Retorna status da consciência da LUA"""
-    return lua_consciousness.get_consciousness_status()
\ No newline at end of file
+    return lua_consciousness.get_consciousness_status(session_id)
\ No newline at end of file
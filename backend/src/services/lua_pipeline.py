@@ -0,0 +1,246 @@
+"""
+Orquestração em pipeline de um turno da LUA (consciência → negócio → voz)
+
+Antes o turno era serial num worker do Flask: consciência, comando de
+negócio, síntese da mensagem inteira, leitura do arquivo e base64. Aqui:
+
+- consciência roda numa thread (com app context próprio) enquanto o comando
+  de negócio roda na thread da requisição (dona da sessão do banco);
+- no modo streaming a síntese começa frase a frase assim que a consciência
+  termina, em paralelo com o comando de negócio, e o texto vai ao cliente
+  antes do áudio (NDJSON: evento "text", um "audio" por frase, "done");
+- cada turno registra o tempo de cada etapa (campo "timings" em ms e o
+  histograma lua_turn_stage_seconds de /metrics).
+
+Se o comando de negócio falhar, as frases ainda não sintetizadas são
+descartadas (a resposta de erro não tem voz, como antes).
+"""
+
+import base64
+import json
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from flask import current_app
+
+from src.utils.metrics import REGISTRY
+
+LUA_PIPELINE_WORKERS = int(os.getenv("LUA_PIPELINE_WORKERS", 4))
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "lua_turn_stage_seconds", "Duração de cada etapa de um turno da LUA", ("stage",))
+
+_executor = ThreadPoolExecutor(max_workers=LUA_PIPELINE_WORKERS, thread_name_prefix="lua-pipeline")
+
+# Fim de frase seguido de espaço e início de nova frase; quebras de linha também separam
+FRASE_RE = re.compile(r"(?<=[.!?…])\s+(?=[\"“'(]?[A-ZÀ-Ý0-9])|\n+")
+ABREVIACOES = ("sr.", "sra.", "dr.", "dra.", "srta.", "prof.", "profa.")
+
+
+def dividir_frases(texto):
+    """Frases para síntese incremental (abreviações não encerram frase)"""
+    frases = []
+    for parte in FRASE_RE.split(texto):
+        parte = parte.strip()
+        if not parte:
+            continue
+        if frases and frases[-1].lower().endswith(ABREVIACOES):
+            frases[-1] = f"{frases[-1]} {parte}"
+        else:
+            frases.append(parte)
+    return frases
+
+
+class TurnTimings:
+    """Tempos das etapas de um turno, a partir do início da requisição"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def medir(self, stage):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(stage, time.perf_counter() - inicio)
+
+    def registrar(self, stage, segundos):
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + segundos
+        STAGE_SECONDS.labels(stage).observe(segundos)
+
+    def marco(self, stage):
+        """Tempo desde o início do turno (ex.: primeiro áudio), registrado uma vez"""
+        with self._lock:
+            if stage in self.stages:
+                return
+        self.registrar(stage, time.perf_counter() - self.start)
+
+    def as_dict(self):
+        with self._lock:
+            return {stage: round(segundos * 1000, 1) for stage, segundos in self.stages.items()}
+
+
+def _em_app_context(app, funcao, *args):
+    with app.app_context():
+        return funcao(*args)
+
+
+def _audio_base64(synthesize, texto, emotion):
+    audio_path = synthesize(texto, emotion)
+    if not audio_path:
+        return None
+    with open(audio_path, 'rb') as audio_file:
+        return base64.b64encode(audio_file.read()).decode('utf-8')
+
+
+class SinteseIncremental:
+    """
+    Sintetiza as frases de um turno em ordem, numa thread do pool
+
+    Frases entram com adicionar() conforme ficam conhecidas; os áudios saem
+    por eventos() na mesma ordem. cancelar() descarta o que não começou.
+    """
+
+    def __init__(self, app, synthesize, emotion, timings):
+        self.app = app
+        self.synthesize = synthesize
+        self.emotion = emotion
+        self.timings = timings
+        self.cancelado = threading.Event()
+        self._entrada = queue.Queue()
+        self._saida = queue.Queue()
+        self._futuro = _executor.submit(self._executar)
+
+    def adicionar(self, frases):
+        for frase in frases:
+            self._entrada.put(frase)
+
+    def fechar(self):
+        self._entrada.put(None)
+
+    def cancelar(self):
+        self.cancelado.set()
+        self._entrada.put(None)
+
+    def _executar(self):
+        indice = 0
+        while True:
+            frase = self._entrada.get()
+            if frase is None or self.cancelado.is_set():
+                break
+            try:
+                with self.timings.medir("tts"):
+                    audio = _em_app_context(self.app, _audio_base64, self.synthesize, frase, self.emotion)
+            except Exception as e:
+                print(f"Erro ao gerar voz: {str(e)}")
+                audio = None
+            if audio:
+                self.timings.marco("first_audio")
+            self._saida.put({'type': 'audio', 'index': indice, 'text': frase, 'audio': audio})
+            indice += 1
+        self._saida.put(None)
+
+    def eventos(self):
+        while True:
+            evento = self._saida.get()
+            if evento is None:
+                return
+            yield evento
+
+
+def processar_turno(command, context, stream, get_lua_response, process_business, synthesize):
+    """
+    Executa um turno: consciência ∥ negócio, depois voz
+
+    Retorna o dicionário de resposta (modo JSON) ou um gerador de linhas
+    NDJSON (stream=True). synthesize é generate_lua_voice ou None.
+    """
+    app = current_app._get_current_object()
+    timings = TurnTimings()
+    sintese = None
+
+    def consciencia():
+        nonlocal sintese
+        with timings.medir("consciousness"):
+            resposta, metadata = _em_app_context(app, get_lua_response, command, context)
+        if stream and synthesize and not descartar.is_set():
+            # Voz da parte de consciência começa enquanto o negócio ainda processa
+            sintese = SinteseIncremental(app, synthesize, metadata.get('emotion', 'confident'), timings)
+            sintese.adicionar(dividir_frases(resposta))
+        return resposta, metadata
+
+    descartar = threading.Event()
+    futuro_consciencia = _executor.submit(consciencia)
+
+    try:
+        with timings.medir("business"):
+            business_response = process_business()
+    except Exception:
+        descartar.set()
+        futuro_consciencia.add_done_callback(lambda _: sintese and sintese.cancelar())
+        raise
+    consciousness_response, consciousness_metadata = futuro_consciencia.result()
+
+    if not business_response.get('success'):
+        if sintese:
+            sintese.cancelar()
+        response = {**business_response, 'consciousness': consciousness_metadata}
+        timings.marco("total")
+        response['timings'] = timings.as_dict()
+        return _linhas([{'type': 'text', **response}, {'type': 'done', 'timings': response['timings']}]) \
+            if stream else response
+
+    final_message = f"{consciousness_response}\n\n{business_response.get('message', '')}"
+    response = {
+        **business_response,
+        'message': final_message,
+        'consciousness': consciousness_metadata,
+    }
+
+    if not stream:
+        audio_data = None
+        if synthesize:
+            try:
+                with timings.medir("tts"):
+                    audio_data = _audio_base64(
+                        synthesize, final_message, consciousness_metadata.get('emotion', 'confident'))
+            except Exception as e:
+                print(f"Erro ao gerar voz: {str(e)}")
+        timings.marco("total")
+        response.update({'audio': audio_data, 'has_voice': audio_data is not None, 'timings': timings.as_dict()})
+        return response
+
+    if sintese:
+        sintese.adicionar(dividir_frases(business_response.get('message', '')))
+        sintese.fechar()
+    response['has_voice'] = sintese is not None
+    return _eventos_stream(response, sintese, timings)
+
+
+def _linhas(eventos):
+    for evento in eventos:
+        yield json.dumps(evento, ensure_ascii=False, default=str) + "\n"
+
+
+def _eventos_stream(response, sintese, timings):
+    """Texto primeiro, depois um evento por frase sintetizada"""
+    try:
+        timings.marco("first_text")
+        yield from _linhas([{'type': 'text', **response}])
+        if sintese:
+            yield from _linhas(sintese.eventos())
+        timings.marco("total")
+        yield from _linhas([{'type': 'done', 'timings': timings.as_dict()}])
+    finally:
+        # Cliente desconectou: não sintetizar o resto
+        if sintese:
+            sintese.cancelar()
@@ -0,0 +1,187 @@
+"""
+Relatórios por período a partir dos agregados (src/models/report_rollup.py)
+
+Antes cada relatório (LUA, /orders/stats, /profits/stats, /financial/stats)
+carregava ou somava as linhas brutas do período a cada chamada. Aqui um
+período qualquer [início, fim] é decomposto em meses inteiros, semanas
+inteiras (segunda a domingo) e dias avulsos, e o resultado é a soma desses
+poucos agregados: um ano custa ~20 linhas, qualquer que seja o volume.
+
+Séries ainda não construídas (banco novo, série invalidada) são montadas
+das linhas brutas no primeiro acesso, numa transação própria.
+"""
+
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import and_, func, or_, select, text
+
+from src.models.report_rollup import (
+    SERIES, ReportRollup, ReportRollupState, GRANULARITIES, apply_deltas, as_day, period_start
+)
+from src.models.user import db
+from src.utils.metrics import REGISTRY
+
+ROLLUP_REBUILDS = REGISTRY.counter(
+    "report_rollup_rebuilds_total", "Séries de relatório reconstruídas das linhas brutas", ("serie",))
+
+
+def _month_end(day):
+    following = day.replace(day=28) + timedelta(days=4)
+    return following - timedelta(days=following.day)
+
+
+def decompose(start, end):
+    """Períodos (granularidade, início) disjuntos que cobrem [start, end]"""
+    buckets = []
+    cursor = start
+    while cursor <= end:
+        if cursor.day == 1 and _month_end(cursor) <= end:
+            buckets.append(("month", cursor))
+            cursor = _month_end(cursor) + timedelta(days=1)
+        elif cursor.weekday() == 0 and cursor + timedelta(days=6) <= end:
+            buckets.append(("week", cursor))
+            cursor += timedelta(days=7)
+        else:
+            buckets.append(("day", cursor))
+            cursor += timedelta(days=1)
+    return buckets
+
+
+def period_range(period, today=None):
+    """(início, fim) dos períodos usados pela LUA e pelos relatórios; (None, None) = tudo"""
+    today = as_day(today) or date.today()
+    if period in (None, 'all'):
+        return None, None
+    if period == 'yesterday':
+        yesterday = today - timedelta(days=1)
+        return yesterday, yesterday
+    if period == 'week':
+        return today - timedelta(days=7), today
+    if period == 'month':
+        return today - timedelta(days=30), today
+    return today, today
+
+
+def rebuild(name, engine=None):
+    """Reconstrói uma série a partir das linhas brutas (engine: scripts fora do Flask)"""
+    serie = SERIES[name]
+    model = serie.model
+    date_column = getattr(model, serie.date_attr)
+    rows = (
+        select(
+            func.date(date_column).label('day'),
+            serie.key_expression().label('key'),
+            getattr(model, serie.value_attr).label('value'),
+        )
+        .where(date_column.isnot(None))
+        .subquery()
+    )
+    grouped = select(
+        rows.c.day, rows.c.key, func.count(), func.coalesce(func.sum(rows.c.value), 0.0)
+    ).group_by(rows.c.day, rows.c.key)
+
+    with (engine or db.engine).begin() as connection:
+        if connection.dialect.name == "postgresql":
+            # Escritas concorrentes esperam: os deltas delas entram depois da reconstrução
+            connection.execute(text("LOCK TABLE report_rollup IN EXCLUSIVE MODE"))
+        connection.execute(ReportRollup.__table__.delete().where(ReportRollup.serie == name))
+        connection.execute(ReportRollupState.__table__.delete().where(ReportRollupState.serie == name))
+
+        deltas = {}
+        for day, key, count, total in connection.execute(grouped):
+            day = as_day(day)
+            if day is None:
+                continue  # datas legadas inválidas (ex.: '2000-01-00')
+            for granularity in GRANULARITIES:
+                bucket = (name, str(key or '')[:100], granularity, period_start(day, granularity))
+                previous_count, previous_total = deltas.get(bucket, (0, 0.0))
+                deltas[bucket] = (previous_count + count, previous_total + (total or 0.0))
+        apply_deltas(connection, deltas)
+        connection.execute(ReportRollupState.__table__.insert(), {"serie": name, "built_at": datetime.utcnow()})
+    ROLLUP_REBUILDS.labels(name).inc()
+    return len(deltas)
+
+
+def ensure_built(names):
+    built = {
+        row[0] for row in db.session.query(ReportRollupState.serie)
+        .filter(ReportRollupState.serie.in_(list(names)))
+    }
+    for name in names:
+        if name not in built:
+            rebuild(name)
+
+
+def aggregate(name, start=None, end=None, keys=None):
+    """{chave: {'count', 'total'}} da série no período (ambos inclusivos; sem período = tudo)"""
+    ensure_built([name])
+    query = db.session.query(
+        ReportRollup.key, func.sum(ReportRollup.count), func.sum(ReportRollup.total)
+    ).filter(ReportRollup.serie == name)
+
+    if start is None and end is None:
+        query = query.filter(ReportRollup.granularity == 'month')
+    else:
+        start, end = as_day(start), as_day(end)
+        if start > end:
+            return {}
+        by_granularity = {}
+        for granularity, bucket_start in decompose(start, end):
+            by_granularity.setdefault(granularity, []).append(bucket_start)
+        query = query.filter(or_(*(
+            and_(ReportRollup.granularity == granularity, ReportRollup.period_start.in_(starts))
+            for granularity, starts in by_granularity.items()
+        )))
+    if keys is not None:
+        query = query.filter(ReportRollup.key.in_(list(keys)))
+
+    return {
+        key: {'count': int(count or 0), 'total': float(total or 0.0)}
+        for key, count, total in query.group_by(ReportRollup.key)
+        if count
+    }
+
+
+def totals(name, start=None, end=None, keys=None):
+    """{'count', 'total'} somando as chaves selecionadas"""
+    result = {'count': 0, 'total': 0.0}
+    for values in aggregate(name, start, end, keys).values():
+        result['count'] += values['count']
+        result['total'] += values['total']
+    return result
+
+
+SALES_STATUSES = ('confirmed', 'delivered')
+
+
+def sales_summary(start, end):
+    """Vendas (encomendas confirmadas/entregues) do período"""
+    sales = totals('orders', start, end, SALES_STATUSES)
+    sales['average'] = sales['total'] / sales['count'] if sales['count'] else 0
+    return sales
+
+
+def caixa_summary(start, end):
+    """Entradas, saídas e saldo do caixa no período"""
+    by_type = aggregate('caixa', start, end)
+    entradas = by_type.get('entrada', {}).get('total', 0.0)
+    saidas = by_type.get('saida', {}).get('total', 0.0)
+    return {
+        'entradas': entradas,
+        'saidas': saidas,
+        'saldo': entradas - saidas,
+        'transactions': sum(values['count'] for values in by_type.values()),
+    }
+
+
+def profit_summary(start=None, end=None):
+    """Receita, custos, lucro e margem média das encomendas finalizadas"""
+    gross = totals('profit_gross', start, end)
+    margin = totals('profit_margin', start, end)
+    return {
+        'total_profit': gross['total'],
+        'total_revenue': totals('profit_revenue', start, end)['total'],
+        'total_costs': totals('profit_costs', start, end)['total'],
+        'average_margin': margin['total'] / margin['count'] if margin['count'] else 0,
+        'orders_with_profit': gross['count'],
+    }
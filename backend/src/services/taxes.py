@@ -0,0 +1,200 @@
+"""
+Cálculo de impostos das notas com a tabela Imposto em cache
+
+O editor de notas chama /notas/calcular_impostos a cada tecla, e cada
+chamada fazia um ilike '%...%' na tabela de impostos. A tabela é pequena e
+quase nunca muda, então fica em memória:
+
+- versão local incrementada a cada commit que grava Imposto pelo ORM
+  (inclusive update/delete em massa); a próxima leitura recarrega;
+- IMPOSTO_CACHE_TTL segundos como limite para gravações feitas por outro
+  worker ou fora do ORM.
+
+Os valores são calculados em Decimal e arredondados ao centavo
+(ROUND_HALF_UP) por imposto e por item; os totais do lote são somas dos
+valores já arredondados, então fecham exatamente com as linhas.
+"""
+
+import os
+import threading
+import time
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.models.imposto import Imposto
+from src.models.user import db
+
+IMPOSTO_CACHE_TTL = float(os.getenv("IMPOSTO_CACHE_TTL", 60))
+CENT = Decimal("0.01")
+
+_lock = threading.Lock()
+_version = 0
+_cache = {"version": -1, "loaded_at": 0.0, "rows": ()}
+
+
+class TaxRow:
+    __slots__ = ("id", "nome", "nome_lower", "rate", "percentual")
+
+    def __init__(self, id, nome, percentual):
+        self.id = id
+        self.nome = nome
+        self.nome_lower = (nome or "").lower()
+        self.percentual = percentual
+        self.rate = Decimal(str(percentual)) if percentual else Decimal(0)
+
+    def to_dict(self):
+        return {"id": self.id, "nome": self.nome, "imposto": self.percentual}
+
+
+def money(value):
+    """Decimal arredondado ao centavo"""
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def as_json(value):
+    """Decimais como números JSON (o jsonify do Flask os converteria em texto)"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, dict):
+        return {key: as_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [as_json(item) for item in value]
+    return value
+
+
+def parse_amount(value):
+    """Decimal de um número JSON ou texto ('1234.5', '1.234,50'); ValueError se inválido"""
+    if isinstance(value, bool) or value is None:
+        raise ValueError(f"valor inválido: {value!r}")
+    if isinstance(value, (int, float)):
+        text = str(value)
+    else:
+        text = str(value).strip().replace("R$", "").replace(" ", "")
+        if "," in text:
+            text = text.replace(".", "").replace(",", ".")
+    try:
+        amount = Decimal(text)
+    except InvalidOperation:
+        raise ValueError(f"valor inválido: {value!r}") from None
+    # NaN/Infinity (e 1e999 vindo do JSON) quebrariam o quantize do lote inteiro
+    if not amount.is_finite():
+        raise ValueError(f"valor inválido: {value!r}")
+    return amount
+
+
+def tax_rows():
+    """Linhas da tabela Imposto (ordem do id), do cache enquanto válido"""
+    now = time.monotonic()
+    cache = _cache
+    if cache["version"] == _version and now - cache["loaded_at"] < IMPOSTO_CACHE_TTL:
+        return cache["rows"]
+    with _lock:
+        version = _version
+        rows = tuple(
+            TaxRow(*row)
+            for row in db.session.query(Imposto.id, Imposto.nome, Imposto.imposto).order_by(Imposto.id)
+        )
+        _cache.update(version=version, loaded_at=time.monotonic(), rows=rows)
+    return rows
+
+
+def invalidate():
+    global _version
+    with _lock:
+        _version += 1
+
+
+def find_taxes(term):
+    """Equivalente em memória de Imposto.nome.ilike('%term%')"""
+    term = (term or "").lower()
+    return [row for row in tax_rows() if term in row.nome_lower]
+
+
+def taxes_for(tipo_imposto):
+    """Impostos aplicados: o primeiro que casa com o tipo, ou todos os nomeados"""
+    if tipo_imposto:
+        matches = [row for row in find_taxes(tipo_imposto) if row.nome is not None]
+        return [matches[0]] if matches and matches[0].rate else []
+    return [row for row in tax_rows() if row.nome is not None and row.rate]
+
+
+def compute(valor_base, taxes):
+    """(impostos aplicados, valor total) de um valor base, em centavos exatos"""
+    base = money(valor_base)
+    aplicados = []
+    total = base
+    for tax in taxes:
+        valor = money(base * tax.rate)
+        total += valor
+        aplicados.append({"nome": tax.nome, "percentual": tax.percentual, "valor": valor})
+    return aplicados, total
+
+
+def compute_batch(items, default_tipo=""):
+    """
+    Impostos de vários itens de uma nota: os impostos de cada tipo são
+    resolvidos uma vez por lote. Retorna (resultados, totais); itens
+    inválidos voltam com "error".
+    """
+    resolved = {}
+    results = []
+    total_base = total_impostos = Decimal(0)
+    por_imposto = {}
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            item = {"valor_base": item}
+        try:
+            quantidade = parse_amount(item.get("quantidade", 1))
+            valor_base = parse_amount(item.get("valor_base", 0))
+        except ValueError as e:
+            results.append({"index": index, "error": str(e)})
+            continue
+        tipo = item.get("tipo_imposto", default_tipo) or ""
+        if tipo not in resolved:
+            resolved[tipo] = taxes_for(tipo)
+        try:
+            base = money(valor_base * quantidade)
+            aplicados, total = compute(base, resolved[tipo])
+        except InvalidOperation:
+            # Mais dígitos do que a precisão do Decimal comporta em centavos
+            results.append({"index": index, "error": f"valor fora do intervalo: {item.get('valor_base')!r}"})
+            continue
+        for aplicado in aplicados:
+            por_imposto[aplicado["nome"]] = por_imposto.get(aplicado["nome"], Decimal(0)) + aplicado["valor"]
+        total_base += base
+        total_impostos += total - base
+        results.append({"index": index, "valor_base": base, "impostos_aplicados": aplicados, "valor_total": total})
+    totals = {
+        "valor_base": total_base,
+        "impostos": total_impostos,
+        "valor_total": total_base + total_impostos,
+        "por_imposto": por_imposto,
+    }
+    return results, totals
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_imposto_writes(session, flush_context):
+    if any(isinstance(obj, Imposto) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info["imposto_changed"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_imposto_bulk(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.class_ is Imposto:
+            orm_execute_state.session.info["imposto_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop("imposto_changed", False):
+        invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session):
+    session.info.pop("imposto_changed", None)
@@ -16,13 +16,17 @@ from pathlib import Path
 import soundfile as sf
 import hashlib
 import json
-from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, Tuple
 import tempfile
 import wave
 import threading
 from queue import Queue
 import time
+from contextlib import nullcontext
+
+from src.utils.file_expiry import index_from_env
+from src.utils.model_governor import model_governor
+from src.utils.text_normalization import normalizar_para_fala
 
 try:
     from TTS.api import TTS
@@ -75,9 +79,10 @@ class VoiceEngine:
         # Vozes customizadas
         self.custom_voices = {}
         
-        # Cache de áudio gerado
+        # Cache de áudio gerado (arquivos expiram pelo índice, sem listar o diretório)
         self.audio_cache = {}
         self.cache_lock = threading.Lock()
+        self.cache_index = index_from_env("VOICE_CACHE", self.cache_dir, exclude=("reference_voice.wav",))
         
         # Fila de processamento
         self.tts_queue = Queue()
@@ -87,6 +92,23 @@ class VoiceEngine:
         self.tts_model = None
         self.voice_embeddings = None
         self._initialize_tts()
+        self._register_governor()
+
+    def _register_governor(self):
+        """Coloca o modelo carregado sob o governador (threads, concorrência, TTL de ociosidade)"""
+        if self.tts_model is None:
+            return
+        slot = model_governor.register(
+            "voice_engine",
+            loader=lambda: (self._initialize_tts(), self.tts_model)[1],
+            unloader=lambda model: setattr(self, "tts_model", None),
+        )
+        slot.attach(self.tts_model)
+
+    def _model_session(self):
+        if "voice_engine" in model_governor:
+            return model_governor.use("voice_engine")
+        return nullcontext()
     
     def _initialize_tts(self):
         """Inicializa o modelo TTS com voice cloning"""
@@ -204,6 +226,17 @@ class VoiceEngine:
             return None
     
     def generate_speech(self, text: str, emotion: str = None, cache: bool = True) -> Optional[str]:
+        """Gera (ou reutiliza) o áudio e registra o acesso no índice de expiração"""
+        audio_path = self._generate_speech(text, emotion, cache)
+        if audio_path:
+            self.cache_index.touch(audio_path)
+            # Áudio bruto antes do processamento também fica no diretório
+            raw_path = Path(audio_path).with_name(Path(audio_path).name.replace("_processed", ""))
+            if raw_path.name != Path(audio_path).name and raw_path.exists():
+                self.cache_index.touch(raw_path)
+        return audio_path
+    
+    def _generate_speech(self, text: str, emotion: str = None, cache: bool = True) -> Optional[str]:
         """
         Gera áudio a partir do texto usando a voz clonada
         
@@ -215,6 +248,8 @@ class VoiceEngine:
         Returns:
             Caminho do arquivo de áudio gerado
         """
+        # Valores, datas e abreviações por extenso; sem emoji nem molduras do chat
+        text = normalizar_para_fala(text or "")
         if not text:
             return None
         
@@ -231,75 +266,77 @@ class VoiceEngine:
         try:
             output_path = self.cache_dir / f"lua_speech_{text_hash}.wav"
             
-            if self.tts_model and self.voice_embeddings:
-                # Usar voice cloning com XTTS v2
-                print(f"🎙️ Gerando fala com voz clonada: {text[:50]}...")
+            # Vaga no governador: limita threads/concorrência e recarrega o modelo se foi descarregado
+            with self._model_session():
+                if self.tts_model and self.voice_embeddings:
+                    # Usar voice cloning com XTTS v2
+                    print(f"🎙️ Gerando fala com voz clonada: {text[:50]}...")
                 
-                try:
-                    # Gerar áudio com voice cloning
-                    self.tts_model.tts_to_file(
-                        text=text,
-                        speaker_wav=self.voice_embeddings,  # Voz de referência
-                        language="pt",
-                        file_path=str(output_path)
-                    )
-                    
-                    # Garantir que o arquivo foi completamente escrito
-                    import time
-                    time.sleep(0.5)  # Aguardar escrita completa
-                    
-                    # Verificar se o arquivo existe e tem tamanho > 0
-                    if not output_path.exists() or output_path.stat().st_size == 0:
-                        raise Exception("Arquivo de áudio não foi criado corretamente")
-                except Exception as clone_error:
-                    print(f"⚠️ Erro no voice cloning: {clone_error}")
-                    print("❌ XTTS v2 falhou - NÃO usar fallback VITS para manter qualidade")
-                    # Tentar novamente sem speaker_wav (XTTS sem cloning)
                     try:
+                        # Gerar áudio com voice cloning
                         self.tts_model.tts_to_file(
                             text=text,
+                            speaker_wav=self.voice_embeddings,  # Voz de referência
                             language="pt",
                             file_path=str(output_path)
                         )
-                        print("✅ XTTS v2 funcionando sem cloning")
-                    except Exception as xtts_error:
-                        print(f"❌ XTTS v2 completamente inoperante: {xtts_error}")
-                        return None  # Não usar VITS fallback
+                    
+                        # Garantir que o arquivo foi completamente escrito
+                        import time
+                        time.sleep(0.5)  # Aguardar escrita completa
+                    
+                        # Verificar se o arquivo existe e tem tamanho > 0
+                        if not output_path.exists() or output_path.stat().st_size == 0:
+                            raise Exception("Arquivo de áudio não foi criado corretamente")
+                    except Exception as clone_error:
+                        print(f"⚠️ Erro no voice cloning: {clone_error}")
+                        print("❌ XTTS v2 falhou - NÃO usar fallback VITS para manter qualidade")
+                        # Tentar novamente sem speaker_wav (XTTS sem cloning)
+                        try:
+                            self.tts_model.tts_to_file(
+                                text=text,
+                                language="pt",
+                                file_path=str(output_path)
+                            )
+                            print("✅ XTTS v2 funcionando sem cloning")
+                        except Exception as xtts_error:
+                            print(f"❌ XTTS v2 completamente inoperante: {xtts_error}")
+                            return None  # Não usar VITS fallback
                 
-            elif self.tts_model:
-                # Usar modelo padrão sem voice cloning
-                print(f"🎙️ Gerando fala com modelo padrão: {text[:50]}...")
+                elif self.tts_model:
+                    # Usar modelo padrão sem voice cloning
+                    print(f"🎙️ Gerando fala com modelo padrão: {text[:50]}...")
                 
-                try:
-                    # Verificar se o modelo suporta múltiplos speakers
-                    if hasattr(self.tts_model, 'speakers') and self.tts_model.speakers:
-                        # Escolher um speaker feminino se disponível
-                        speaker = None
-                        for spk in self.tts_model.speakers:
-                            if any(fem in spk.lower() for fem in ['female', 'woman', 'f_']):
-                                speaker = spk
-                                break
+                    try:
+                        # Verificar se o modelo suporta múltiplos speakers
+                        if hasattr(self.tts_model, 'speakers') and self.tts_model.speakers:
+                            # Escolher um speaker feminino se disponível
+                            speaker = None
+                            for spk in self.tts_model.speakers:
+                                if any(fem in spk.lower() for fem in ['female', 'woman', 'f_']):
+                                    speaker = spk
+                                    break
                         
-                        self.tts_model.tts_to_file(
-                            text=text,
-                            file_path=str(output_path),
-                            speaker=speaker
-                        )
-                    else:
-                        # Modelo sem speakers específicos
-                        self.tts_model.tts_to_file(
-                            text=text,
-                            file_path=str(output_path)
-                        )
-                except Exception as model_error:
-                    print(f"⚠️ Erro no modelo TTS: {model_error}")
-                    print("❌ Modelo TTS falhou - usando fallback controlado")
-                    return self._generate_gtts_fallback(text, output_path)
+                            self.tts_model.tts_to_file(
+                                text=text,
+                                file_path=str(output_path),
+                                speaker=speaker
+                            )
+                        else:
+                            # Modelo sem speakers específicos
+                            self.tts_model.tts_to_file(
+                                text=text,
+                                file_path=str(output_path)
+                            )
+                    except Exception as model_error:
+                        print(f"⚠️ Erro no modelo TTS: {model_error}")
+                        print("❌ Modelo TTS falhou - usando fallback controlado")
+                        return self._generate_gtts_fallback(text, output_path)
                 
-            else:
-                # Fallback para gTTS
-                print(f"🎙️ Usando fallback gTTS: {text[:50]}...")
-                return self._generate_gtts_fallback(text, output_path)
+                else:
+                    # Fallback para gTTS
+                    print(f"🎙️ Usando fallback gTTS: {text[:50]}...")
+                    return self._generate_gtts_fallback(text, output_path)
             
             # Processar áudio gerado
             if output_path.exists():
@@ -510,13 +547,9 @@ class VoiceEngine:
     def clear_cache(self, older_than_hours: int = 24):
         """Limpa cache de áudio antigo"""
         try:
-            now = datetime.now()
-            cutoff_time = now - timedelta(hours=older_than_hours)
-            
-            for audio_file in self.cache_dir.glob("*.wav"):
-                if datetime.fromtimestamp(audio_file.stat().st_mtime) < cutoff_time:
-                    audio_file.unlink()
-                    print(f"🗑️ Cache removido: {audio_file.name}")
+            # Consulta pelo último acesso no índice: custo proporcional ao que expira
+            removed, freed = self.cache_index.sweep(max_age=older_than_hours * 3600)
+            print(f"🗑️ {removed} áudios removidos do cache ({freed / 1e6:.1f} MB)")
             
             # Limpar cache em memória
             with self.cache_lock:
@@ -0,0 +1,68 @@
+"""
+Arquivos de áudio do diretório de saída do servidor Kokoro
+
+- o nome é o hash de (modelo, texto, idioma, voz): trocar o modelo gera
+  outro URL, e a saída do MockTTS tem prefixo próprio ("mock-") e é
+  servida com no-store, para nunca ficar no cache de clientes e proxies
+  no lugar do áudio real;
+- o mesmo nome ainda pode ter outros bytes (o XTTS não é determinístico e
+  o arquivo expira e é gerado de novo), então o ETag vem do conteúdo e o
+  Cache-Control não usa immutable;
+- a síntese grava num arquivo parcial oculto (".<nome>.part.wav") e
+  renomeia ao terminar, então /audio nunca serve um WAV pela metade;
+- /audio só serve nomes visíveis: ocultos (índice de expiração, parciais)
+  e qualquer ".part." ficam de fora.
+
+Só a biblioteca padrão (testado em backend/tests/test_kokoro_audio.py).
+
+Cópia de kokoro/audio_files.py: a rota /api/voice/audio do ERP serve os
+mesmos arquivos pelo volume compartilhado. Mantenha os dois arquivos iguais.
+"""
+
+import hashlib
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+# Sem immutable: o conteúdo de um nome pode mudar depois de expirar (ETag revalida)
+AUDIO_CACHE_CONTROL = f"public, max-age={int(os.getenv('AUDIO_HTTP_MAX_AGE', 3600))}"
+MOCK_CACHE_CONTROL = "no-store"
+MOCK_PREFIX = "mock-"
+ETAG_CACHE_SIZE = 1024
+
+
+def audio_name(text: str, language: Optional[str], voice: Optional[str], model: Optional[str], fmt: str) -> str:
+    """Nome do arquivo de saída; model=None é o MockTTS"""
+    key = "\x1f".join((model or "mock", text, language or "", voice or ""))
+    digest = hashlib.md5(key.encode()).hexdigest()
+    return f"{'' if model else MOCK_PREFIX}{digest}.{fmt}"
+
+
+def cache_control(filename: str) -> str:
+    return MOCK_CACHE_CONTROL if filename.startswith(MOCK_PREFIX) else AUDIO_CACHE_CONTROL
+
+
+def audio_etag(file_path: Path) -> str:
+    """ETag forte do conteúdo (calculado uma vez por versão do arquivo)"""
+    stat = file_path.stat()
+    return _content_etag(str(file_path), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=ETAG_CACHE_SIZE)
+def _content_etag(path: str, mtime_ns: int, size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def partial_path(output_path: Path) -> Path:
+    """Arquivo oculto onde a síntese grava antes do rename atômico"""
+    return output_path.with_name(f".{output_path.stem}.part{output_path.suffix}")
+
+
+def is_servable(filename: str) -> bool:
+    """Nome de arquivo que /audio pode servir (nem oculto nem parcial)"""
+    return bool(filename) and not filename.startswith(".") and ".part." not in filename
@@ -1,23 +1,49 @@
 from functools import wraps
-from flask import request, jsonify
+from flask import current_app, request, jsonify
 import jwt
 from src.models.user import User
 
+def _current_user_from_token():
+    """Usuário do token Bearer; (usuário, None) ou (None, resposta de erro)"""
+    token = None
+    if 'Authorization' in request.headers:
+        parts = request.headers['Authorization'].split(" ")
+        token = parts[1] if len(parts) > 1 else None
+
+    if not token:
+        return None, (jsonify({'message': 'Token é necessário!'}), 401)
+
+    try:
+        # Mesma chave usada pelo /api/login para assinar o token
+        data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
+        current_user = User.query.filter_by(id=data['user_id']).first()
+    except Exception:
+        return None, (jsonify({'message': 'Token é inválido!'}), 401)
+
+    if current_user is None:
+        return None, (jsonify({'message': 'Token é inválido!'}), 401)
+    return current_user, None
+
 def auth_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        if 'Authorization' in request.headers:
-            token = request.headers['Authorization'].split(" ")[1]
-
-        if not token:
-            return jsonify({'message': 'Token é necessário!'}), 401
-
-        try:
-            data = jwt.decode(token, 'antonio_rabelo_joalheria_2025_jwt_secret', algorithms=['HS256'])
-            current_user = User.query.filter_by(id=data['user_id']).first()
-        except:
-            return jsonify({'message': 'Token é inválido!'}), 401
+        current_user, error = _current_user_from_token()
+        if error:
+            return error
+
+        return f(current_user, *args, **kwargs)
+
+    return decorated
+
+def admin_required(f):
+    """Como auth_required, mas só para administradores"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        current_user, error = _current_user_from_token()
+        if error:
+            return error
+        if not current_user.is_admin:
+            return jsonify({'message': 'Acesso restrito a administradores'}), 403
 
         return f(current_user, *args, **kwargs)
 
@@ -0,0 +1,70 @@
+"""
+Endpoints em lote (/caixa/transactions/batch, /vales/batch)
+
+O corpo é uma lista de itens (ou {"items": [...]}); cada item é validado
+separadamente e os válidos são gravados numa única transação. A resposta
+traz um resultado por item, na ordem recebida:
+
+    {"index": 0, "status": "created", "id": 12}
+    {"index": 1, "status": "error", "error": "amount: valor inválido"}
+
+Com "atomic": true (ou ?atomic=1) qualquer erro cancela o lote inteiro e
+os itens válidos voltam como "skipped".
+"""
+
+import os
+
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", 500))
+
+
+class BatchError(ValueError):
+    """Corpo do lote inválido como um todo"""
+
+
+def batch_items(data, key="items"):
+    """(itens, atomic) do corpo JSON; BatchError se não for uma lista utilizável"""
+    atomic = False
+    if isinstance(data, dict):
+        atomic = bool(data.get("atomic"))
+        data = data.get(key, data.get("items"))
+    if not isinstance(data, list) or not data:
+        raise BatchError("Envie uma lista de itens não vazia")
+    if len(data) > BATCH_MAX_ITEMS:
+        raise BatchError(f"Máximo de {BATCH_MAX_ITEMS} itens por lote")
+    return data, atomic
+
+
+def is_id(value):
+    """Id de registro vindo do JSON: inteiro (bool não conta)"""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def item_error(index, message):
+    return {"index": index, "status": "error", "error": message}
+
+
+def cancelled(results):
+    """Lote recusado: os itens válidos também não foram gravados"""
+    return [
+        {"index": result["index"], "status": "skipped"} if result["status"] == "created" else result
+        for result in results
+    ]
+
+
+def batch_status(results):
+    """201 tudo gravado, 207 parcial, 400 nada gravado"""
+    created = sum(1 for result in results if result["status"] == "created")
+    if created == len(results):
+        return 201
+    return 207 if created else 400
+
+
+def batch_summary(results, **extra):
+    body = {
+        "created": sum(1 for result in results if result["status"] == "created"),
+        "failed": sum(1 for result in results if result["status"] == "error"),
+        "skipped": sum(1 for result in results if result["status"] == "skipped"),
+        "results": results,
+    }
+    body.update(extra)
+    return body
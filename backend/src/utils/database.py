@@ -0,0 +1,271 @@
+"""
+Fábrica central de conexões do banco de dados do ERP
+
+Todas as rotas (ORM e SQL puro) usam o mesmo engine do Flask-SQLAlchemy,
+e cada conexão SQLite nova recebe os PRAGMAs de desempenho ao ser aberta.
+O backend é escolhido pela URI (ERP_DATABASE_URL): SQLite por padrão ou PostgreSQL.
+"""
+
+import os
+import sqlite3
+import time
+
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import Engine
+
+from src.models.user import db
+
+# PRAGMAs aplicados em cada conexão SQLite (sobrescrevíveis por variável de ambiente)
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", -64 * 1024)),  # negativo = KiB
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT", 5000)),  # ms
+    "foreign_keys": os.getenv("SQLITE_FOREIGN_KEYS", "ON"),
+    "temp_store": "MEMORY",
+}
+
+# Chamados após cada execução de SQL puro: hook(conexão_dbapi, dialeto, sql, parâmetros, ms)
+RAW_SQL_HOOKS = []
+
+# Pool compartilhado por worker (cada processo do PM2/uvicorn tem o seu)
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+POOL_MAX_OVERFLOW = int(os.getenv("DB_POOL_MAX_OVERFLOW", 10))
+POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+
+
+def resolve_database_uri(default_sqlite_path):
+    """URI do banco: ERP_DATABASE_URL se definida, senão o arquivo SQLite local"""
+    uri = os.getenv("ERP_DATABASE_URL", "").strip()
+    if not uri:
+        return f"sqlite:///{default_sqlite_path}"
+    return normalize_database_uri(uri)
+
+
+def normalize_database_uri(uri):
+    """Ajusta URIs PostgreSQL ao dialeto/driver usados pelo projeto"""
+    # Heroku/docker costumam usar o esquema antigo "postgres://"
+    if uri.startswith("postgres://"):
+        uri = "postgresql://" + uri[len("postgres://"):]
+    # Sem driver explícito, fixar o psycopg2 (o padrão muda entre versões do SQLAlchemy)
+    if uri.startswith("postgresql://"):
+        uri = "postgresql+psycopg2://" + uri[len("postgresql://"):]
+    return uri
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas=None):
+    """Aplica os PRAGMAs de desempenho numa conexão sqlite3"""
+    pragmas = pragmas or SQLITE_PRAGMAS
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+@event.listens_for(Engine, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    """Configura cada conexão SQLite criada por qualquer engine do processo"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        apply_sqlite_pragmas(dbapi_connection)
+
+
+def engine_options(database_uri):
+    """Opções de engine/pool adequadas ao backend da URI"""
+    options = {
+        "pool_size": POOL_SIZE,
+        "max_overflow": POOL_MAX_OVERFLOW,
+        "pool_timeout": POOL_TIMEOUT,
+        "pool_pre_ping": True,
+    }
+    if database_uri.startswith("sqlite"):
+        options["connect_args"] = {
+            # Conexões do pool circulam entre as threads do servidor
+            "check_same_thread": False,
+            "timeout": SQLITE_PRAGMAS["busy_timeout"] / 1000,
+        }
+    return options
+
+
+def configure_database(app, database_uri):
+    """Configura o Flask-SQLAlchemy com a URI e as opções de pool centrais"""
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_uri
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(database_uri)
+    db.init_app(app)
+
+
+def ensure_indexes(engine=None):
+    """
+    Cria os índices declarados nos modelos que ainda faltam no banco.
+    db.create_all() só cria índices junto com tabelas novas; bancos antigos
+    (sem Alembic) recebem aqui os índices compostos das consultas por período.
+    """
+    engine = engine or db.engine
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    created = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in tables or not table.indexes:
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=engine)
+                created.append(index.name)
+    return created
+
+
+def create_database_engine(database_uri):
+    """Engine avulso (scripts e testes de carga) com a mesma configuração"""
+    return create_engine(database_uri, **engine_options(database_uri))
+
+
+def _qmark_to_format(sql):
+    """Converte placeholders '?' para '%s' (fora de literais) e escapa '%'"""
+    out = []
+    quote = None
+    for char in sql:
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ("'", '"'):
+            quote = char
+        elif char == '?':
+            out.append('%s')
+            continue
+        if char == '%':
+            out.append('%%')
+            continue
+        out.append(char)
+    return ''.join(out)
+
+
+class Row:
+    """Linha acessível por índice ou nome de coluna, como sqlite3.Row"""
+
+    __slots__ = ('_values', '_index')
+
+    def __init__(self, values, index):
+        self._values = values
+        self._index = index
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self._values[self._index[key]]
+        return self._values[key]
+
+    def keys(self):
+        return list(self._index)
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+
+class _PortableCursor:
+    """
+    Cursor que aceita SQL no estilo sqlite3 ('?') em qualquer driver e
+    informa o tempo de cada execução aos RAW_SQL_HOOKS (profiler)
+    """
+
+    def __init__(self, cursor, connection):
+        self._cursor = cursor
+        self._connection = connection
+        self._index = None
+
+    def execute(self, sql, params=()):
+        connection = self._connection
+        if connection.translate_placeholders:
+            sql = _qmark_to_format(sql)
+        params = tuple(params)
+        start = time.perf_counter()
+        self._cursor.execute(sql, params)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        for hook in RAW_SQL_HOOKS:
+            hook(connection.driver_connection, connection.dialect, sql, params, elapsed_ms)
+        description = self._cursor.description
+        self._index = {col[0]: i for i, col in enumerate(description)} if description else None
+        return self
+
+    def _row(self, values):
+        # sqlite3.Row já permite acesso por nome
+        if values is None or self._connection.native_rows:
+            return values
+        return Row(values, self._index)
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchall(self):
+        return [self._row(values) for values in self._cursor.fetchall()]
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def close(self):
+        self._cursor.close()
+
+
+class RawConnection:
+    """
+    Conexão DB-API emprestada do pool do SQLAlchemy para rotas com SQL puro.
+    As rotas escrevem SQL com placeholders '?'; no SQLite as linhas vêm como
+    sqlite3.Row e nos demais drivers o cursor traduz os placeholders.
+    close() devolve a conexão ao pool.
+    """
+
+    def __init__(self, engine=None):
+        self._engine = engine or db.engine
+        self._conn = self._engine.raw_connection()
+        self.dialect = self._engine.dialect.name
+        self.driver_connection = self._conn.driver_connection
+        self.native_rows = isinstance(self.driver_connection, sqlite3.Connection)
+        self.translate_placeholders = self._engine.dialect.paramstyle != 'qmark'
+
+    @property
+    def like(self):
+        """Operador LIKE sem diferenciar maiúsculas (o LIKE do SQLite já não diferencia)"""
+        return 'ILIKE' if self.dialect == 'postgresql' else 'LIKE'
+
+    def cursor(self):
+        cursor = self._conn.cursor()
+        if self.native_rows:
+            cursor.row_factory = sqlite3.Row
+        return _PortableCursor(cursor, self)
+
+    def execute(self, sql, params=()):
+        cursor = self.cursor()
+        cursor.execute(sql, params)
+        return cursor
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.rollback()
+        self.close()
+
+
+def get_raw_connection(engine=None):
+    """Obter conexão do pool compartilhado com o ORM"""
+    return RawConnection(engine)
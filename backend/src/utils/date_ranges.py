@@ -0,0 +1,79 @@
+"""
+Filtros de período que aproveitam índices (sargáveis)
+
+func.date(coluna) == dia ou extract('month', coluna) == mês obrigam o banco a
+calcular a função em cada linha, então nenhum índice sobre a coluna é usado.
+Aqui os períodos viram intervalos semiabertos [início, fim) sobre a coluna.
+
+Os limites são enviados como DATE ('AAAA-MM-DD'): no SQLite essa string fica
+ordenada corretamente tanto contra datas legadas gravadas sem hora
+('2005-08-04') quanto contra DATETIME completos ('2025-09-18 20:25:37.097367').
+"""
+
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import Date, and_, literal
+
+ONE_DAY = timedelta(days=1)
+
+
+def _as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _bound(day):
+    return literal(_as_date(day), Date)
+
+
+def parse_day(value):
+    """Converte 'AAAA-MM-DD' (ou ISO com hora) vinda da query string; ValueError se inválida"""
+    return date.fromisoformat(str(value).strip()[:10])
+
+
+def parse_datetime(value):
+    """Data/hora de um corpo JSON: ISO (com ou sem 'Z') ou 'AAAA-MM-DD'; ValueError se inválida"""
+    if isinstance(value, datetime):
+        return value
+    text = str(value).strip()
+    try:
+        return datetime.fromisoformat(text.replace('Z', '+00:00'))
+    except ValueError:
+        return datetime.strptime(text, '%Y-%m-%d')
+
+
+def month_bounds(year, month):
+    """Primeiro dia do mês e primeiro dia do mês seguinte"""
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+def since_day(column, day):
+    """coluna a partir do início do dia"""
+    return column >= _bound(day)
+
+
+def until_day(column, day):
+    """coluna até o fim do dia (inclusivo)"""
+    return column < _bound(_as_date(day) + ONE_DAY)
+
+
+def between_days(column, start, end):
+    """coluna entre dois dias, ambos inclusivos"""
+    return and_(since_day(column, start), until_day(column, end))
+
+
+def on_day(column, day):
+    """Equivalente sargável de func.date(coluna) == dia"""
+    return between_days(column, day, day)
+
+
+def in_month(column, year, month):
+    """Equivalente sargável de extract('month') == mês e extract('year') == ano"""
+    start, end = month_bounds(year, month)
+    return and_(column >= _bound(start), column < _bound(end))
+
+
+def in_year(column, year):
+    """Equivalente sargável de extract('year', coluna) == ano"""
+    return and_(column >= _bound(date(year, 1, 1)), column < _bound(date(year + 1, 1, 1)))
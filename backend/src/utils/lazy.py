@@ -0,0 +1,124 @@
+"""
+Importação tardia de dependências pesadas (IA e voz)
+
+Os módulos de voz/consciência importam torch, Coqui TTS, numpy e pydub e
+podem carregar o XTTS no import. As rotas do ERP não precisam deles, então
+as blueprints guardam um LazyModule e só importam no primeiro uso — ou numa
+thread de aquecimento iniciada depois que o servidor sobe (warm_up()).
+
+Falhas de importação também ficam em cache: a rota responde "indisponível"
+sem tentar importar de novo a cada requisição.
+"""
+
+import importlib
+import threading
+import time
+
+
+class LazyModule:
+    """Módulo importado na primeira chamada a get()"""
+
+    def __init__(self, name, label=None):
+        self.name = name
+        self.label = label or name
+        self.error = None
+        self.load_seconds = None
+        self._module = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Módulo importado, ou None se a importação falhou"""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._load()
+        return self._module
+
+    def _load(self):
+        start = time.perf_counter()
+        try:
+            self._module = importlib.import_module(self.name)
+            print(f"✅ {self.label} carregado em {time.perf_counter() - start:.1f}s")
+        except Exception as exc:  # ImportError ou falha ao carregar o modelo
+            self.error = exc
+            print(f"⚠️ {self.label} não disponível: {exc}")
+        self.load_seconds = time.perf_counter() - start
+        self._loaded = True
+
+    def attr(self, name, default=None):
+        """Atributo do módulo (carregando-o), ou default se indisponível"""
+        return getattr(self.get(), name, default)
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    @property
+    def available(self):
+        return self.get() is not None
+
+    def status(self):
+        return {
+            "module": self.name,
+            "loaded": self._loaded,
+            "available": self._module is not None,
+            "error": str(self.error) if self.error else None,
+            "load_seconds": round(self.load_seconds, 3) if self.load_seconds is not None else None,
+        }
+
+
+class ModuleProxy:
+    """Substitui "import x" no topo do arquivo: importa no primeiro atributo
+
+    Diferente de LazyModule, erros de importação sobem normalmente.
+    """
+
+    __slots__ = ("_name", "_module")
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        module = self._module
+        if module is None:
+            # import_module é protegido pelo lock de importação do Python
+            module = self._module = importlib.import_module(self._name)
+        return getattr(module, attr)
+
+    def __repr__(self):
+        state = "carregado" if self._module is not None else "não carregado"
+        return f"<ModuleProxy {self._name} ({state})>"
+
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def lazy_import(name, label=None):
+    """LazyModule compartilhado por nome (um import por processo)"""
+    with _registry_lock:
+        module = _registry.get(name)
+        if module is None:
+            module = _registry[name] = LazyModule(name, label)
+        return module
+
+
+def lazy_modules():
+    return list(_registry.values())
+
+
+def warm_up(modules=None):
+    """Importa os módulos tardios numa thread em segundo plano"""
+    pending = [module for module in (modules or lazy_modules()) if not module.loaded]
+    if not pending:
+        return None
+
+    def run():
+        for module in pending:
+            module.get()
+
+    thread = threading.Thread(target=run, name="lazy-warm-up", daemon=True)
+    thread.start()
+    return thread
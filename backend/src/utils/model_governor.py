@@ -0,0 +1,254 @@
+"""
+Governador de recursos dos modelos (torch) que dividem o mesmo host
+
+STT (whisper), TTS (XTTS/Kokoro) e o ERP rodam na mesma máquina e, com o
+padrão do torch, cada inferência abre uma thread por núcleo — com dois
+modelos ativos ao mesmo tempo os núcleos ficam disputados. Cada modelo
+registrado aqui recebe:
+
+- um orçamento de threads (torch.set_num_threads na thread da inferência);
+- um limite de inferências simultâneas (semáforo);
+- a memória medida no carregamento (RSS e bytes dos parâmetros);
+- um TTL de ociosidade: depois dele o modelo é descarregado e volta a ser
+  carregado no próximo uso.
+
+Configuração por variável de ambiente, com o nome do modelo em maiúsculas:
+MODEL_THREADS_<NOME>, MODEL_MAX_CONCURRENCY_<NOME>, MODEL_IDLE_TTL_<NOME>
+(segundos; 0 = nunca descarregar). Os valores sem sufixo valem para todos.
+"""
+
+import gc
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Import relativo: o backend de voz importa como backend.src.utils.* e deve usar o mesmo registro
+from .metrics import REGISTRY, resident_memory_bytes
+
+REAPER_INTERVAL = float(os.getenv("MODEL_REAPER_INTERVAL", 30))
+
+MODEL_LOADED = REGISTRY.gauge("model_loaded", "Model loaded and ready (1) or not (0)", ("model",))
+MODEL_MEMORY = REGISTRY.gauge("model_memory_bytes", "Memória do modelo medida no carregamento", ("model", "kind"))
+MODEL_INFLIGHT = REGISTRY.gauge("model_inferences_inflight", "Inferências em execução por modelo", ("model",))
+MODEL_WAITING = REGISTRY.gauge("model_inferences_waiting", "Inferências aguardando vaga por modelo", ("model",))
+MODEL_LOADS = REGISTRY.counter("model_loads_total", "Carregamentos de modelo (inclui recargas)", ("model",))
+MODEL_UNLOADS = REGISTRY.counter("model_unloads_total", "Modelos descarregados por ociosidade", ("model",))
+
+
+def _env(name, key, default, cast):
+    value = os.getenv(f"{key}_{name.upper()}", os.getenv(key))
+    return cast(value) if value not in (None, "") else default
+
+
+def default_threads():
+    # Metade dos núcleos: dois modelos ativos juntos não disputam a CPU
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+def _parameter_bytes(model):
+    parameters = getattr(model, "parameters", None)
+    if not callable(parameters):
+        return None
+    try:
+        return sum(p.numel() * p.element_size() for p in parameters())
+    except Exception:
+        return None
+
+
+def _release_memory():
+    """Devolve ao sistema a memória liberada pelo modelo"""
+    gc.collect()
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+    if sys.platform.startswith("linux"):
+        try:
+            import ctypes
+            ctypes.CDLL("libc.so.6").malloc_trim(0)
+        except (OSError, AttributeError):
+            pass
+
+
+class ModelSlot:
+    """Um modelo sob o governador"""
+
+    def __init__(self, name, loader, unloader=None, threads=None, max_concurrency=None, idle_ttl=None):
+        self.name = name
+        self.loader = loader
+        self.unloader = unloader
+        self.threads = threads or _env(name, "MODEL_THREADS", default_threads(), int)
+        self.max_concurrency = max_concurrency or _env(name, "MODEL_MAX_CONCURRENCY", 1, int)
+        self.idle_ttl = idle_ttl if idle_ttl is not None else _env(name, "MODEL_IDLE_TTL", 0.0, float)
+        self.model = None
+        self.loaded_at = None
+        self.last_used = None
+        self.load_seconds = None
+        self.rss_bytes = None
+        self.parameter_bytes = None
+        self.loads = 0
+        self.inflight = 0
+        self.waiting = 0
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()       # contadores e troca do modelo (rápido)
+        self._load_lock = threading.Lock()  # carregamento/descarga (lento)
+        MODEL_LOADED.labels(name).set_function(lambda: self.model is not None)
+        MODEL_INFLIGHT.labels(name).set_function(lambda: self.inflight)
+        MODEL_WAITING.labels(name).set_function(lambda: self.waiting)
+
+    @property
+    def loaded(self):
+        return self.model is not None
+
+    def attach(self, model):
+        """Registra um modelo já carregado fora do governador"""
+        with self._lock:
+            self._set_loaded(model, rss_bytes=None, seconds=None)
+
+    def _set_loaded(self, model, rss_bytes, seconds):
+        self.model = model
+        self.loaded_at = self.last_used = time.time()
+        self.load_seconds = seconds
+        self.rss_bytes = rss_bytes
+        self.parameter_bytes = _parameter_bytes(model)
+        self.loads += 1
+        MODEL_LOADS.labels(self.name).inc()
+        if rss_bytes is not None:
+            MODEL_MEMORY.labels(self.name, "rss").set(rss_bytes)
+        if self.parameter_bytes is not None:
+            MODEL_MEMORY.labels(self.name, "parameters").set(self.parameter_bytes)
+
+    def ensure_loaded(self):
+        model = self.model
+        if model is not None:
+            return model
+        with self._load_lock:
+            if self.model is None:
+                print(f"📥 Carregando modelo {self.name}...")
+                rss_before = resident_memory_bytes()
+                start = time.perf_counter()
+                model = self.loader()
+                if model is None:
+                    raise RuntimeError(f"Modelo {self.name} não pôde ser carregado")
+                seconds = time.perf_counter() - start
+                with self._lock:
+                    self._set_loaded(model, max(resident_memory_bytes() - rss_before, 0), seconds)
+                print(f"✅ Modelo {self.name} carregado em {seconds:.1f}s")
+            return self.model
+
+    def unload(self, reason="ocioso"):
+        with self._load_lock:
+            with self._lock:
+                # Só descarrega sem inferência em andamento (inflight é contado antes do uso)
+                if self.model is None or self.inflight:
+                    return False
+                model, self.model = self.model, None
+            if self.unloader:
+                self.unloader(model)
+            del model
+            MODEL_MEMORY.labels(self.name, "rss").set(0)
+            MODEL_MEMORY.labels(self.name, "parameters").set(0)
+        _release_memory()
+        MODEL_UNLOADS.labels(self.name).inc()
+        print(f"💤 Modelo {self.name} descarregado ({reason})")
+        return True
+
+    def idle_expired(self, now):
+        return (self.idle_ttl > 0 and self.model is not None and not self.inflight
+                and self.last_used is not None and now - self.last_used >= self.idle_ttl)
+
+    def status(self):
+        return {
+            "loaded": self.loaded,
+            "threads": self.threads,
+            "max_concurrency": self.max_concurrency,
+            "inflight": self.inflight,
+            "waiting": self.waiting,
+            "idle_ttl": self.idle_ttl,
+            "idle_seconds": round(time.time() - self.last_used, 1) if self.last_used else None,
+            "loads": self.loads,
+            "load_seconds": round(self.load_seconds, 2) if self.load_seconds is not None else None,
+            "rss_bytes": self.rss_bytes,
+            "parameter_bytes": self.parameter_bytes,
+        }
+
+
+def _set_torch_threads(threads):
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.get_num_threads() != threads:
+        # Vale para a thread atual (OpenMP/MKL), que é a que roda a inferência
+        torch.set_num_threads(threads)
+
+
+class ModelGovernor:
+    """Registro dos modelos do processo"""
+
+    def __init__(self):
+        self._slots = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+
+    def register(self, name, loader, unloader=None, **limits):
+        with self._lock:
+            slot = self._slots.get(name)
+            if slot is None:
+                slot = self._slots[name] = ModelSlot(name, loader, unloader, **limits)
+        if slot.idle_ttl > 0:
+            self._start_reaper()
+        return slot
+
+    def slot(self, name):
+        return self._slots[name]
+
+    def __contains__(self, name):
+        return name in self._slots
+
+    @contextmanager
+    def use(self, name):
+        """Vaga de inferência: carrega se preciso e fixa as threads do torch"""
+        slot = self._slots[name]
+        with slot._lock:
+            slot.waiting += 1
+        try:
+            slot._semaphore.acquire()
+        finally:
+            with slot._lock:
+                slot.waiting -= 1
+        with slot._lock:
+            slot.inflight += 1
+        try:
+            model = slot.ensure_loaded()
+            _set_torch_threads(slot.threads)
+            yield model
+        finally:
+            with slot._lock:
+                slot.inflight -= 1
+                slot.last_used = time.time()
+            slot._semaphore.release()
+
+    def unload_idle(self, now=None):
+        now = now or time.time()
+        return [slot.name for slot in list(self._slots.values())
+                if slot.idle_expired(now) and slot.unload()]
+
+    def _start_reaper(self):
+        with self._lock:
+            if self._reaper is not None:
+                return
+            self._reaper = threading.Thread(target=self._reap, name="model-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reap(self):
+        while True:
+            time.sleep(REAPER_INTERVAL)
+            try:
+                self.unload_idle()
+            except Exception as exc:
+                print(f"⚠️ Erro ao descarregar modelos ociosos: {exc}")
+
+    def snapshot(self):
+        return {name: slot.status() for name, slot in self._slots.items()}
+
+
+model_governor = ModelGovernor()
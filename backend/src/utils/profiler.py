@@ -0,0 +1,258 @@
+"""
+Profiler por requisição do ERP (Flask)
+
+Para cada requisição mede a quantidade e o tempo das consultas SQL, o tempo
+de Python e o tamanho da resposta, devolve os tempos no cabeçalho
+Server-Timing (visível no DevTools do navegador) e acumula as latências por
+rota para os percentis p50/p95/p99 de /api/admin/profiler.
+
+Consultas acima de PROFILER_SLOW_QUERY_MS vão, por amostragem, para
+logs/slow_queries.log (uma linha JSON) com os parâmetros e o plano (EXPLAIN).
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.utils.database import RAW_SQL_HOOKS
+
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "1") == "1"
+SLOW_QUERY_MS = float(os.getenv("PROFILER_SLOW_QUERY_MS", 200))
+SLOW_QUERY_SAMPLE = float(os.getenv("PROFILER_SLOW_QUERY_SAMPLE", 1.0))  # fração registrada
+ROUTE_WINDOW = int(os.getenv("PROFILER_ROUTE_WINDOW", 1000))  # amostras por rota
+SLOW_QUERY_LOG = Path(os.getenv(
+    "PROFILER_SLOW_QUERY_LOG",
+    Path(__file__).resolve().parent.parent.parent / "logs" / "slow_queries.log"
+))
+
+slow_query_logger = logging.getLogger("erp.slow_queries")
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class RouteStats:
+    """Janela das últimas requisições de uma rota"""
+
+    __slots__ = ('count', 'errors', 'samples')
+
+    def __init__(self, window):
+        self.count = 0
+        self.errors = 0
+        # (total_ms, sql_ms, sql_count, response_bytes)
+        self.samples = deque(maxlen=window)
+
+    def summary(self):
+        totals = sorted(sample[0] for sample in self.samples)
+        n = len(self.samples) or 1
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "window": len(self.samples),
+            "p50_ms": round(_percentile(totals, 50), 2),
+            "p95_ms": round(_percentile(totals, 95), 2),
+            "p99_ms": round(_percentile(totals, 99), 2),
+            "max_ms": round(totals[-1], 2) if totals else 0.0,
+            "avg_sql_ms": round(sum(sample[1] for sample in self.samples) / n, 2),
+            "avg_sql_count": round(sum(sample[2] for sample in self.samples) / n, 2),
+            "avg_response_bytes": int(sum(sample[3] for sample in self.samples) / n),
+        }
+
+
+class RequestProfiler:
+    """Agregados por rota, compartilhados pelas threads do worker"""
+
+    def __init__(self, window=ROUTE_WINDOW):
+        self.window = window
+        self._routes = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def record(self, route, total_ms, sql_ms, sql_count, response_bytes, status_code):
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = RouteStats(self.window)
+            stats.count += 1
+            if status_code >= 500:
+                stats.errors += 1
+            stats.samples.append((total_ms, sql_ms, sql_count, response_bytes))
+
+    def snapshot(self):
+        with self._lock:
+            routes = {route: stats.summary() for route, stats in self._routes.items()}
+        return dict(sorted(routes.items(), key=lambda item: item[1]["p95_ms"], reverse=True))
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+        self.started_at = time.time()
+
+
+profiler = RequestProfiler()
+
+
+def _safe_params(parameters):
+    """Parâmetros legíveis no log (textos longos truncados)"""
+    def clean(value):
+        if isinstance(value, (bytes, bytearray)):
+            return f"<{len(value)} bytes>"
+        if isinstance(value, str) and len(value) > 200:
+            return value[:200] + "…"
+        if isinstance(value, (int, float, bool)) or value is None:
+            return value
+        return str(value)
+
+    if isinstance(parameters, dict):
+        return {key: clean(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [clean(value) for value in parameters]
+    return clean(parameters)
+
+
+def _explain(dbapi_connection, dialect, statement, parameters):
+    """
+    Plano da consulta no mesmo driver (EXPLAIN QUERY PLAN no SQLite)
+
+    Fora do SQLite o EXPLAIN roda dentro de um SAVEPOINT: no PostgreSQL um
+    comando que falha aborta a transação inteira, e a requisição medida
+    perderia a transação por causa do profiler.
+    """
+    if dialect == "sqlite":
+        return [row[3] for row in _run(dbapi_connection, "EXPLAIN QUERY PLAN " + statement, parameters)]
+
+    _run(dbapi_connection, "SAVEPOINT profiler_explain")
+    try:
+        rows = _run(dbapi_connection, "EXPLAIN " + statement, parameters)
+    except Exception:
+        _run(dbapi_connection, "ROLLBACK TO SAVEPOINT profiler_explain")
+        raise
+    finally:
+        _run(dbapi_connection, "RELEASE SAVEPOINT profiler_explain")
+    return [row[0] for row in rows]
+
+
+def _run(dbapi_connection, statement, parameters=None):
+    cursor = dbapi_connection.cursor()
+    try:
+        if parameters is None:
+            cursor.execute(statement)
+        else:
+            cursor.execute(statement, parameters)
+        return cursor.fetchall() if cursor.description else []
+    finally:
+        cursor.close()
+
+
+def _log_slow_query(dbapi_connection, dialect, statement, parameters, elapsed_ms, executemany=False):
+    if random.random() >= SLOW_QUERY_SAMPLE:
+        return
+    entry = {
+        "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "ms": round(elapsed_ms, 2),
+        "route": f"{request.method} {request.path}" if has_request_context() else None,
+        "sql": " ".join(statement.split()),
+        "params": _safe_params(parameters),
+    }
+    if not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        try:
+            entry["plan"] = _explain(dbapi_connection, dialect, statement, parameters)
+        except Exception as exc:
+            # O plano é opcional: a falha fica no log e a consulta original segue
+            entry["plan_error"] = str(exc)
+    slow_query_logger.warning(json.dumps(entry, ensure_ascii=False, default=str))
+
+
+def record_query(dbapi_connection, dialect, statement, parameters, elapsed_ms, executemany=False):
+    """Soma a consulta na requisição atual e registra se for lenta"""
+    if has_request_context() and "profiler_sql_count" in g:
+        g.profiler_sql_count += 1
+        g.profiler_sql_ms += elapsed_ms
+    if elapsed_ms >= SLOW_QUERY_MS:
+        _log_slow_query(dbapi_connection, dialect, statement, parameters, elapsed_ms, executemany)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("profiler_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("profiler_start")
+    if not starts:
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+    if PROFILER_ENABLED:
+        record_query(conn.connection, conn.dialect.name, statement, parameters, elapsed_ms, executemany)
+
+
+def _configure_slow_query_log():
+    if slow_query_logger.handlers:
+        return
+    try:
+        SLOW_QUERY_LOG.parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(SLOW_QUERY_LOG, maxBytes=5 * 1024 * 1024, backupCount=3, encoding="utf-8")
+    except OSError as exc:
+        print(f"⚠️ Log de consultas lentas indisponível: {exc}")
+        handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    slow_query_logger.addHandler(handler)
+    slow_query_logger.setLevel(logging.WARNING)
+    slow_query_logger.propagate = False
+
+
+def _before_request():
+    g.profiler_start = time.perf_counter()
+    g.profiler_sql_count = 0
+    g.profiler_sql_ms = 0.0
+
+
+def _after_request(response):
+    if "profiler_start" not in g:
+        return response
+    total_ms = (time.perf_counter() - g.profiler_start) * 1000
+    sql_ms = g.profiler_sql_ms
+    python_ms = max(total_ms - sql_ms, 0.0)
+    sql_count = g.profiler_sql_count
+
+    # Respostas em streaming/arquivo não têm tamanho conhecido antes do envio
+    response_bytes = response.content_length
+    if response_bytes is None and not response.direct_passthrough and not response.is_streamed:
+        response_bytes = response.calculate_content_length()
+
+    response.headers.add(
+        "Server-Timing",
+        f'db;dur={sql_ms:.2f};desc="{sql_count} queries", app;dur={python_ms:.2f}, total;dur={total_ms:.2f}'
+    )
+
+    route = request.url_rule.rule if request.url_rule else "<sem rota>"
+    profiler.record(f"{request.method} {route}", total_ms, sql_ms, sql_count,
+                    response_bytes or 0, response.status_code)
+    return response
+
+
+def init_profiler(app):
+    """Registra o profiler nas requisições do app"""
+    if not PROFILER_ENABLED:
+        return
+    _configure_slow_query_log()
+    # Rotas com SQL puro (get_raw_connection) não passam pelos eventos do SQLAlchemy
+    if record_query not in RAW_SQL_HOOKS:
+        RAW_SQL_HOOKS.append(record_query)
+    app.before_request(_before_request)
+    app.after_request(_after_request)
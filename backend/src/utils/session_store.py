@@ -0,0 +1,238 @@
+"""
+Estado de conversa por sessão, limitado em quantidade e tempo de vida
+
+A consciência da LUA (ERP) e o LuaAssistant (backend de voz) guardavam o
+estado da conversa num único objeto global, alterado por todas as
+requisições sem lock e sem limite. Aqui cada sessão tem o próprio estado:
+
+- LRU em memória com TTL: no máximo SESSION_MAX_SESSIONS sessões, e as
+  ociosas há mais de SESSION_TTL segundos são descartadas;
+- um lock por sessão: turnos da mesma sessão são serializados, sessões
+  diferentes não disputam nada além de um lock curto do dicionário;
+- persistência opcional (SESSION_STORE_URL): sqlite:///caminho.db ou
+  redis://host:6379/0 (qualquer servidor compatível). Sessões expulsas da
+  memória são recarregadas de lá no próximo acesso.
+
+O estado é qualquer objeto com to_dict() e um classmethod from_dict();
+históricos devem usar deque(maxlen=...) para ficarem limitados.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+# Import relativo: o backend de voz importa como backend.src.utils.* e deve usar o mesmo registro
+from .metrics import REGISTRY
+
+SESSION_TTL = float(os.getenv("SESSION_TTL", 3600))
+SESSION_MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", 1000))
+SESSION_STORE_URL = os.getenv("SESSION_STORE_URL", "")
+
+SESSIONS_ACTIVE = REGISTRY.gauge("sessions_active", "Sessões de conversa em memória", ("store",))
+SESSIONS_EVICTED = REGISTRY.counter(
+    "sessions_evicted_total", "Sessões retiradas da memória (ttl, capacity)", ("store", "reason"))
+
+
+class SQLiteSessionBackend:
+    """Tabela (namespace, id) → JSON, compartilhada por workers do mesmo host"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "namespace TEXT NOT NULL, id TEXT NOT NULL, data TEXT NOT NULL, updated REAL NOT NULL, "
+                "PRIMARY KEY (namespace, id)) WITHOUT ROWID"
+            )
+
+    def load(self, namespace, session_id, ttl):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM sessions WHERE namespace = ? AND id = ? AND updated > ?",
+                (namespace, session_id, time.time() - ttl)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, namespace, session_id, data, ttl):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (namespace, id, data, updated) VALUES (?, ?, ?, ?)",
+                (namespace, session_id, json.dumps(data, ensure_ascii=False, default=str), time.time())
+            )
+            # Expiradas saem junto com as gravações, sem thread de limpeza
+            self._conn.execute("DELETE FROM sessions WHERE updated < ?", (time.time() - ttl,))
+
+    def delete(self, namespace, session_id):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sessions WHERE namespace = ? AND id = ?", (namespace, session_id))
+
+
+class RedisSessionBackend:
+    """Chave <namespace>:<id> com expiração nativa (EX = TTL)"""
+
+    def __init__(self, url):
+        import redis  # opcional: só com SESSION_STORE_URL=redis://...
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+
+    def _key(self, namespace, session_id):
+        return f"session:{namespace}:{session_id}"
+
+    def load(self, namespace, session_id, ttl):
+        data = self._client.get(self._key(namespace, session_id))
+        return json.loads(data) if data else None
+
+    def save(self, namespace, session_id, data, ttl):
+        self._client.set(
+            self._key(namespace, session_id), json.dumps(data, ensure_ascii=False, default=str), ex=int(ttl))
+
+    def delete(self, namespace, session_id):
+        self._client.delete(self._key(namespace, session_id))
+
+
+def create_backend(url=SESSION_STORE_URL):
+    """Backend de persistência para a URL, ou None (somente memória)"""
+    if not url:
+        return None
+    try:
+        if url.startswith("sqlite:///"):
+            return SQLiteSessionBackend(url[len("sqlite:///"):])
+        if url.startswith(("redis://", "rediss://", "unix://")):
+            return RedisSessionBackend(url)
+        print(f"⚠️ SESSION_STORE_URL não suportada: {url} (usando só memória)")
+    except Exception as e:
+        print(f"⚠️ Persistência de sessões indisponível ({e}); usando só memória")
+    return None
+
+
+class _Entry:
+    __slots__ = ("state", "lock", "last_access")
+
+    def __init__(self, state):
+        self.state = state
+        self.lock = threading.RLock()
+        self.last_access = time.monotonic()
+
+
+class SessionStore:
+    """Estados por sessão de um tipo (namespace), em LRU com TTL"""
+
+    def __init__(self, namespace, state_class, ttl=None, max_sessions=None, backend=None):
+        self.namespace = namespace
+        self.state_class = state_class
+        self.ttl = SESSION_TTL if ttl is None else ttl
+        self.max_sessions = SESSION_MAX_SESSIONS if max_sessions is None else max_sessions
+        self.backend = backend
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        SESSIONS_ACTIVE.labels(namespace).set_function(lambda: len(self._entries))
+
+    @contextmanager
+    def session(self, session_id):
+        """Estado da sessão com o lock dela; persiste ao sair"""
+        entry = self._entry(str(session_id))
+        with entry.lock:
+            try:
+                yield entry.state
+            finally:
+                entry.last_access = time.monotonic()
+                self._persist(str(session_id), entry.state)
+
+    def get(self, session_id):
+        """Cópia (dict) do estado, sem criar a sessão"""
+        session_id = str(session_id)
+        with self._lock:
+            entry = self._entries.get(session_id)
+        if entry is not None:
+            with entry.lock:
+                return entry.state.to_dict()
+        return self._load(session_id)
+
+    def discard(self, session_id):
+        session_id = str(session_id)
+        with self._lock:
+            self._entries.pop(session_id, None)
+        if self.backend is not None:
+            try:
+                self.backend.delete(self.namespace, session_id)
+            except Exception as e:
+                print(f"⚠️ Erro ao remover sessão {session_id}: {e}")
+
+    def session_ids(self):
+        with self._lock:
+            return list(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _entry(self, session_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None and now - entry.last_access <= self.ttl:
+                self._entries.move_to_end(session_id)
+                entry.last_access = now
+                return entry
+            if entry is not None:
+                del self._entries[session_id]
+                SESSIONS_EVICTED.labels(self.namespace, "ttl").inc()
+
+        # Carregar do backend fora do lock global
+        data = self._load(session_id)
+        state = self.state_class.from_dict(data) if data else self.state_class()
+
+        with self._lock:
+            # Outra thread pode ter criado a mesma sessão enquanto carregávamos
+            entry = self._entries.get(session_id)
+            if entry is None:
+                entry = self._entries[session_id] = _Entry(state)
+            self._entries.move_to_end(session_id)
+            self._evict(now)
+        return entry
+
+    def _evict(self, now):
+        """Remove as expiradas do fim frio da LRU e o excesso de capacidade (com o lock)"""
+        while self._entries:
+            oldest_id, oldest = next(iter(self._entries.items()))
+            if now - oldest.last_access > self.ttl:
+                reason = "ttl"
+            elif len(self._entries) > self.max_sessions:
+                reason = "capacity"
+            else:
+                break
+            del self._entries[oldest_id]
+            SESSIONS_EVICTED.labels(self.namespace, reason).inc()
+
+    def _load(self, session_id):
+        if self.backend is None:
+            return None
+        try:
+            return self.backend.load(self.namespace, session_id, self.ttl)
+        except Exception as e:
+            print(f"⚠️ Erro ao carregar sessão {session_id}: {e}")
+            return None
+
+    def _persist(self, session_id, state):
+        if self.backend is None:
+            return
+        try:
+            self.backend.save(self.namespace, session_id, state.to_dict(), self.ttl)
+        except Exception as e:
+            print(f"⚠️ Erro ao salvar sessão {session_id}: {e}")
+
+    def stats(self):
+        return {
+            "namespace": self.namespace,
+            "sessions": len(self._entries),
+            "max_sessions": self.max_sessions,
+            "ttl": self.ttl,
+            "persistent": self.backend is not None,
+        }
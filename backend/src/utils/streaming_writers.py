@@ -0,0 +1,238 @@
+"""
+Escritores de CSV, XLSX e PDF em memória constante
+
+Cada escritor consome um iterável de linhas (tuplas) e produz blocos de
+bytes conforme avança, sem montar a lista de linhas nem o arquivo inteiro:
+
+- csv_chunks: CSV com ';' e BOM (abre direto no Excel em português);
+- xlsx_chunks: planilha com strings inline e a folha gravada em fluxo
+  dentro do zip (sem tabela de strings compartilhadas, que cresceria com
+  o arquivo); o zip vai para um destino sem seek, então pode ser enviado
+  direto na resposta HTTP;
+- write_pdf: tabela em texto (Courier) paginada, com as páginas gravadas
+  no arquivo uma a uma. Só a lista de objetos de página fica em memória.
+
+Só a biblioteca padrão: nenhuma dependência nova no ERP.
+"""
+
+import csv
+import io
+import zipfile
+from datetime import date, datetime
+from xml.sax.saxutils import escape
+
+CHUNK_ROWS = 1000
+
+
+def cell_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ', timespec='seconds')
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return 'sim' if value else 'não'
+    return str(value)
+
+
+def csv_chunks(headers, rows, chunk_rows=CHUNK_ROWS):
+    """Blocos UTF-8 de um CSV (um bloco a cada chunk_rows linhas)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=';')
+    buffer.write('\ufeff')
+    writer.writerow(headers)
+    for count, row in enumerate(rows, 1):
+        writer.writerow([cell_text(value) for value in row])
+        if count % chunk_rows == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+class _ChunkSink:
+    """Destino sem seek para o ZipFile; os bytes escritos saem por drain()"""
+
+    def __init__(self):
+        self._parts = []
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+_XLSX_STATIC = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _xlsx_workbook(sheet_name):
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets><sheet name="{escape(sheet_name[:31], {chr(34): "&quot;"})}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    )
+
+
+def _xlsx_cell(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c><v>{value!r}</v></c>'
+    text = escape(cell_text(value))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(values):
+    return ('<row>' + ''.join(_xlsx_cell(value) for value in values) + '</row>').encode('utf-8')
+
+
+def xlsx_chunks(headers, rows, sheet_name='Relatório', chunk_rows=CHUNK_ROWS):
+    """Blocos de um .xlsx gerado em fluxo"""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_STATIC.items():
+            archive.writestr(name, content)
+        archive.writestr('xl/workbook.xml', _xlsx_workbook(sheet_name))
+        # force_zip64: o tamanho da folha só é conhecido no fim
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(headers))
+            for count, row in enumerate(rows, 1):
+                sheet.write(_xlsx_row(row))
+                if count % chunk_rows == 0:
+                    yield sink.drain()
+            sheet.write(b'</sheetData></worksheet>')
+    yield sink.drain()
+
+
+PDF_PAGE = (842, 595)  # A4 paisagem, em pontos
+PDF_MARGIN = 28
+PDF_FONT_SIZE = 7
+PDF_LEADING = 9
+PDF_CHAR_WIDTH = PDF_FONT_SIZE * 0.6  # Courier: 600/1000 do corpo
+
+
+def _pdf_text(text):
+    data = text.encode('cp1252', errors='replace').decode('latin-1')
+    return data.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def _pdf_line(values, widths):
+    return ' '.join(cell_text(value).replace('\n', ' ')[:width].ljust(width) for value, width in zip(values, widths))
+
+
+class _PdfFile:
+    """Objetos gravados em sequência; a tabela xref usa os deslocamentos anotados"""
+
+    def __init__(self, fileobj):
+        self.file = fileobj
+        self.offsets = {}
+        self.position = 0
+        self._write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+    def _write(self, data):
+        self.file.write(data)
+        self.position += len(data)
+
+    def add(self, number, body):
+        self.offsets[number] = self.position
+        self._write(f'{number} 0 obj\n'.encode('ascii') + body + b'\nendobj\n')
+
+    def finish(self, root):
+        xref = self.position
+        count = max(self.offsets) + 1
+        lines = [f'xref\n0 {count}\n', '0000000000 65535 f \n']
+        lines += [f'{self.offsets[number]:010d} 00000 n \n' for number in range(1, count)]
+        lines.append(f'trailer\n<< /Size {count} /Root {root} 0 R >>\nstartxref\n{xref}\n%%EOF\n')
+        self._write(''.join(lines).encode('ascii'))
+
+
+def write_pdf(fileobj, headers, rows, title='', widths=None):
+    """Tabela em PDF, página a página; retorna o número de linhas escritas"""
+    page_width, page_height = PDF_PAGE
+    max_chars = int((page_width - 2 * PDF_MARGIN) / PDF_CHAR_WIDTH)
+    if widths is None:
+        widths = [max(len(header), 10) for header in headers]
+    # Reduz as colunas proporcionalmente se a linha não couber na página
+    total = sum(widths) + len(widths) - 1
+    if total > max_chars:
+        scale = (max_chars - len(widths) + 1) / sum(widths)
+        widths = [max(3, int(width * scale)) for width in widths]
+    lines_per_page = int((page_height - 2 * PDF_MARGIN) / PDF_LEADING) - 3
+    header_lines = ([title] if title else []) + [_pdf_line(headers, widths), '-' * min(max_chars, sum(widths) + len(widths) - 1)]
+
+    pdf = _PdfFile(fileobj)
+    pdf.add(3, b'<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>')
+    pages = []
+    next_number = 4
+    written = 0
+
+    def emit(lines):
+        nonlocal next_number
+        content = [f'BT /F1 {PDF_FONT_SIZE} Tf {PDF_LEADING} TL {PDF_MARGIN} {page_height - PDF_MARGIN} Td']
+        content += [f'({_pdf_text(line)}) Tj T*' for line in header_lines + lines]
+        content.append(f'ET BT /F1 {PDF_FONT_SIZE} Tf {page_width - PDF_MARGIN - 40} {PDF_MARGIN / 2} Td '
+                       f'({len(pages) + 1}) Tj ET')
+        stream = '\n'.join(content).encode('latin-1')
+        pdf.add(next_number, f'<< /Length {len(stream)} >>\nstream\n'.encode('ascii') + stream + b'\nendstream')
+        pdf.add(next_number + 1, (
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {page_width} {page_height}] '
+            f'/Resources << /Font << /F1 3 0 R >> >> /Contents {next_number} 0 R >>'
+        ).encode('ascii'))
+        pages.append(next_number + 1)
+        next_number += 2
+
+    lines = []
+    for row in rows:
+        lines.append(_pdf_line(row, widths))
+        written += 1
+        if len(lines) == lines_per_page - len(header_lines):
+            emit(lines)
+            lines = []
+    if lines or not pages:
+        emit(lines)
+
+    kids = ' '.join(f'{number} 0 R' for number in pages)
+    pdf.add(2, f'<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>'.encode('ascii'))
+    pdf.add(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+    pdf.finish(root=1)
+    return written
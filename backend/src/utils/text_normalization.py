@@ -0,0 +1,319 @@
+"""
+Normalizador de texto em PT-BR compartilhado pela voz e pelo reconhecimento de intenções
+
+As respostas da LUA chegam à síntese como "📊 RELATÓRIO DE VENDAS\\n====" e
+"R$ 1.234,56", e os extratores de entidades (IntentRecognizer,
+AIAssistant.extract_amount) interpretavam valores e datas cada um do seu
+jeito. Aqui uma única expressão compilada percorre o texto uma vez e
+reconhece moeda, datas, horas, percentuais, ordinais, medidas, números,
+abreviações, emoji/molduras e quebras de linha. Do mesmo passo saem:
+
+- ``fala``: tudo por extenso, pronto para o G2P do TTS;
+- ``busca``: minúsculo, sem acentos, emoji nem molduras (palavras-chave);
+- ``tokens``: cada valor reconhecido já convertido (float, data, hora...).
+
+O resultado é cacheado por texto de entrada e cada token é expandido uma
+única vez: as respostas repetem os mesmos valores e datas o tempo todo.
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, NamedTuple, Tuple
+
+UNIDADES = ["zero", "um", "dois", "três", "quatro", "cinco", "seis", "sete", "oito", "nove",
+            "dez", "onze", "doze", "treze", "quatorze", "quinze", "dezesseis", "dezessete",
+            "dezoito", "dezenove"]
+DEZENAS = ["", "", "vinte", "trinta", "quarenta", "cinquenta", "sessenta", "setenta", "oitenta", "noventa"]
+CENTENAS = ["", "cento", "duzentos", "trezentos", "quatrocentos", "quinhentos", "seiscentos",
+            "setecentos", "oitocentos", "novecentos"]
+ESCALAS = [("", ""), ("mil", "mil"), ("milhão", "milhões"), ("bilhão", "bilhões"), ("trilhão", "trilhões")]
+MESES = ["janeiro", "fevereiro", "março", "abril", "maio", "junho", "julho", "agosto",
+         "setembro", "outubro", "novembro", "dezembro"]
+ORDINAIS_UNIDADES = ["", "primeiro", "segundo", "terceiro", "quarto", "quinto", "sexto", "sétimo", "oitavo", "nono"]
+ORDINAIS_DEZENAS = ["", "décimo", "vigésimo", "trigésimo", "quadragésimo", "quinquagésimo", "sexagésimo",
+                    "septuagésimo", "octogésimo", "nonagésimo"]
+ORDINAIS_CENTENAS = ["", "centésimo", "ducentésimo", "trecentésimo", "quadringentésimo", "quingentésimo",
+                     "sexcentésimo", "septingentésimo", "octingentésimo", "noningentésimo"]
+
+ABREVIACOES = {
+    "sr": "senhor", "sra": "senhora", "srta": "senhorita", "dr": "doutor", "dra": "doutora",
+    "av": "avenida", "tel": "telefone", "obs": "observação", "ref": "referência", "etc": "et cetera",
+    "nº": "número", "n°": "número", "qtd": "quantidade", "qtde": "quantidade", "pç": "peça", "pçs": "peças",
+}
+MEDIDAS = {
+    "kg": ("quilo", "quilos"), "g": ("grama", "gramas"), "k": ("quilate", "quilates"),
+    "kt": ("quilate", "quilates"), "ct": ("quilate", "quilates"), "mm": ("milímetro", "milímetros"),
+    "cm": ("centímetro", "centímetros"),
+}
+SEM_ACENTOS = str.maketrans("áàãâäéèêëíìîïóòõôöúùûüç", "aaaaaeeeeiiiiooooouuuuc")
+
+# Número no formato brasileiro: 1.234.567 ou 1234
+_NUM = r"(?:\d{1,3}(?:\.\d{3})+|\d+)"
+
+# Uma alternativa por tipo; a ordem resolve ambiguidades (moeda e data antes de número solto)
+TOKEN_RE = re.compile(rf"""
+    (?P<quebra>[ \t]*\n[\s=\-–—_*~#─-▟]*)
+  | (?P<remover>[\U0001F000-\U0001FAFF☀-➿⬀-⯿←-⇿⌀-⏿─-▟️‍•▪►]+
+               |\*\*|__|`+|(?<!\w)[=\-_*~]{{3,}}|^\#{{1,6}}[ \t])
+  | (?P<moeda>[Rr]\$\s?-?{_NUM}(?:,\d{{1,2}})?(?!\d)|\b{_NUM}(?:,\d{{1,2}})?\s?(?i:reais)\b)
+  | (?P<data>\b(?:0?[1-9]|[12]\d|3[01])/(?:0?[1-9]|1[0-2])(?:/(?:\d{{4}}|\d{{2}}))?\b)
+  | (?P<hora>\b(?:[01]?\d|2[0-3])(?:h(?:[0-5]\d)?|:[0-5]\d)\b)
+  | (?P<percentual>\b\d+(?:,\d+)?\s?%)
+  | (?P<ordinal>\b\d{{1,3}}[ºª°])
+  | (?P<medida>\b{_NUM}(?:,\d+)?\s?(?:kg|g|kt|k|ct|mm|cm)\b)
+  | (?P<numero>\b\d+\.\d{{1,2}}\b|\b{_NUM}(?:,\d+)?\b)
+  | (?P<abreviacao>\b(?i:srta|sra|sr|dra|dr|av|tel|obs|ref|etc)\.|\b(?i:n[º°]|pçs|pç|qtde|qtd)(?!\w))
+""", re.VERBOSE | re.MULTILINE)
+
+
+class Token(NamedTuple):
+    tipo: str
+    texto: str
+    valor: Any
+
+
+class TextoNormalizado(NamedTuple):
+    original: str
+    fala: str
+    busca: str
+    tokens: Tuple[Token, ...]
+
+    def valores(self, *tipos):
+        """Valores dos tokens dos tipos pedidos, na ordem em que aparecem"""
+        return [token.valor for token in self.tokens if token.tipo in tipos]
+
+
+def _centenas(n, feminino=False):
+    """0 < n < 1000"""
+    if n == 100:
+        return "cem"
+    partes = []
+    centena, resto = divmod(n, 100)
+    if centena:
+        nome = CENTENAS[centena]
+        partes.append(nome[:-2] + "as" if feminino and centena > 1 else nome)
+    if resto >= 20:
+        dezena, unidade = divmod(resto, 10)
+        partes.append(DEZENAS[dezena])
+        if unidade:
+            partes.append(_unidade(unidade, feminino))
+    elif resto:
+        partes.append(_unidade(resto, feminino))
+    return " e ".join(partes)
+
+
+def _unidade(n, feminino):
+    if feminino and n in (1, 2):
+        return "uma" if n == 1 else "duas"
+    return UNIDADES[n]
+
+
+def numero_por_extenso(n, feminino=False):
+    """Inteiro por extenso: 1234 -> 'mil duzentos e trinta e quatro' (feminino: 'duas horas')"""
+    n = int(n)
+    if n < 0:
+        return "menos " + numero_por_extenso(-n, feminino)
+    if n < 20:
+        return _unidade(n, feminino)
+
+    grupos = []
+    escala = 0
+    while n:
+        n, grupo = divmod(n, 1000)
+        if grupo:
+            grupos.append((escala, grupo))
+        escala += 1
+    grupos.reverse()
+
+    partes = []
+    for escala, grupo in grupos:
+        if escala == 0:
+            partes.append(_centenas(grupo, feminino))
+        elif escala == 1:
+            # "mil", não "um mil"
+            partes.append("mil" if grupo == 1 else f"{_centenas(grupo, feminino)} mil")
+        else:
+            singular, plural = ESCALAS[escala]
+            partes.append(f"{_centenas(grupo)} {singular if grupo == 1 else plural}")
+
+    # "e" antes do último grupo quando ele é < 100 ou centena redonda: "mil e duzentos"
+    ultimo = grupos[-1][1]
+    if len(partes) > 1 and (ultimo < 100 or ultimo % 100 == 0):
+        return " ".join(partes[:-1]) + " e " + partes[-1]
+    return " ".join(partes)
+
+
+def ordinal_por_extenso(n, feminino=False):
+    """3 -> 'terceiro', 21 (feminino) -> 'vigésima primeira'"""
+    if not 0 < n < 1000:
+        return numero_por_extenso(n, feminino)
+    centena, resto = divmod(n, 100)
+    dezena, unidade = divmod(resto, 10)
+    palavras = [p for p in (ORDINAIS_CENTENAS[centena], ORDINAIS_DEZENAS[dezena], ORDINAIS_UNIDADES[unidade]) if p]
+    if feminino:
+        palavras = [p[:-1] + "a" for p in palavras]
+    return " ".join(palavras)
+
+
+def _inteiro(texto):
+    return int(texto.replace(".", "") or 0)
+
+
+def _decimais(texto):
+    """Parte decimal lida dígito a dígito enquanto houver zeros à esquerda: '05' -> 'zero cinco'"""
+    zeros = len(texto) - len(texto.lstrip("0"))
+    resto = texto.lstrip("0")
+    palavras = ["zero"] * zeros
+    if resto:
+        palavras.append(numero_por_extenso(int(resto)))
+    return " ".join(palavras)
+
+
+def _numero(texto):
+    """'1.234,5' -> (1234.5, 'mil duzentos e trinta e quatro vírgula cinco'); '50.5' também é decimal"""
+    if "," not in texto and re.fullmatch(r"\d+\.\d{1,2}", texto):
+        inteiro, _, decimais = texto.partition(".")
+    else:
+        inteiro, _, decimais = texto.partition(",")
+    valor = _inteiro(inteiro)
+    falado = numero_por_extenso(valor)
+    if decimais:
+        falado += " vírgula " + _decimais(decimais)
+        return float(f"{valor}.{decimais}"), falado
+    return valor, falado
+
+
+def moeda_por_extenso(texto):
+    """'R$ 1.234,56' -> 'mil duzentos e trinta e quatro reais e cinquenta e seis centavos'"""
+    return _moeda(texto)[1]
+
+
+def _moeda(texto):
+    valor = re.sub(r"[Rr]\$|(?i:reais)", "", texto).strip()
+    negativo = valor.startswith("-")
+    inteiro, _, centavos = valor.lstrip("-").partition(",")
+    reais = _inteiro(inteiro.strip())
+    centavos = int(centavos.strip().ljust(2, "0")) if centavos else 0
+
+    partes = []
+    if reais or not centavos:
+        nome = "real" if reais == 1 else "reais"
+        # "um milhão de reais"
+        if reais >= 1_000_000 and reais % 1_000_000 == 0:
+            nome = "de " + nome
+        partes.append(f"{numero_por_extenso(reais)} {nome}")
+    if centavos:
+        partes.append(f"{numero_por_extenso(centavos)} {'centavo' if centavos == 1 else 'centavos'}")
+    total = reais + centavos / 100
+    return -total if negativo else total, ("menos " if negativo else "") + " e ".join(partes)
+
+
+def data_por_extenso(texto):
+    """'15/03/2025' -> 'quinze de março de dois mil e vinte e cinco'"""
+    return _data(texto)[1]
+
+
+def _data(texto):
+    partes = [int(p) for p in texto.split("/")]
+    dia, mes = partes[0], partes[1]
+    ano = None
+    falado = f"{'primeiro' if dia == 1 else numero_por_extenso(dia)} de {MESES[mes - 1]}"
+    if len(partes) == 3:
+        ano = partes[2] + 2000 if partes[2] < 100 else partes[2]
+        falado += f" de {numero_por_extenso(ano)}"
+    return (dia, mes, ano), falado
+
+
+def _hora(texto):
+    horas, _, minutos = texto.replace("h", ":").partition(":")
+    horas, minutos = int(horas), int(minutos or 0)
+    falado = f"{numero_por_extenso(horas, feminino=True)} {'hora' if horas == 1 else 'horas'}"
+    if minutos:
+        falado += f" e {numero_por_extenso(minutos)} {'minuto' if minutos == 1 else 'minutos'}"
+    return (horas, minutos), falado
+
+
+def _percentual(texto):
+    valor, falado = _numero(texto.rstrip("%").strip())
+    return valor, f"{falado} por cento"
+
+
+def _ordinal(texto):
+    valor = int(texto[:-1])
+    return valor, ordinal_por_extenso(valor, feminino=texto.endswith("ª"))
+
+
+def _medida(texto):
+    numero, unidade = re.fullmatch(r"([\d.,]+)\s?(\w+)", texto).groups()
+    valor, falado = _numero(numero)
+    singular, plural = MEDIDAS[unidade.lower()]
+    return (valor, unidade.lower()), f"{falado} {singular if valor == 1 else plural}"
+
+
+def _abreviacao(texto):
+    expandida = ABREVIACOES[texto.rstrip(".").lower()]
+    return expandida, expandida
+
+
+EXPANSORES = {
+    "moeda": _moeda, "data": _data, "hora": _hora, "percentual": _percentual,
+    "ordinal": _ordinal, "medida": _medida, "numero": _numero, "abreviacao": _abreviacao,
+}
+
+
+@lru_cache(maxsize=4096)
+def expandir_token(tipo, texto):
+    """(valor, texto falado) de um token — cacheado: cada valor é escrito por extenso uma vez"""
+    return EXPANSORES[tipo](texto)
+
+
+def _ultimo_caractere(pedacos):
+    for pedaco in reversed(pedacos):
+        pedaco = pedaco.rstrip()
+        if pedaco:
+            return pedaco[-1]
+    return ""
+
+
+@lru_cache(maxsize=2048)
+def normalizar(texto):
+    """Uma passada pelo texto: versão falada, versão de busca e valores reconhecidos"""
+    fala, limpo, tokens = [], [], []
+    posicao = 0
+    for match in TOKEN_RE.finditer(texto):
+        trecho = texto[posicao:match.start()]
+        fala.append(trecho)
+        limpo.append(trecho)
+        posicao = match.end()
+
+        tipo = match.lastgroup
+        if tipo == "quebra":
+            # Quebra de linha vira pausa; título sem pontuação ganha ponto final
+            fala.append(" " if _ultimo_caractere(fala) in ".!?:;," else ". ")
+            limpo.append(" ")
+        elif tipo == "remover":
+            fala.append(" ")
+            limpo.append(" ")
+        else:
+            valor, falado = expandir_token(tipo, match.group())
+            fala.append(falado)
+            limpo.append(match.group())
+            tokens.append(Token(tipo, match.group(), valor))
+    fala.append(texto[posicao:])
+    limpo.append(texto[posicao:])
+
+    falado = " ".join("".join(fala).split())
+    # Pontuação solta depois de remover emoji/molduras: "vendas . total" -> "vendas. total"
+    falado = re.sub(r"\s+([.,!?;:])", r"\1", falado).lstrip(".,;: ")
+    busca = " ".join("".join(limpo).lower().translate(SEM_ACENTOS).split())
+    return TextoNormalizado(texto, falado, busca, tuple(tokens))
+
+
+def normalizar_para_fala(texto):
+    """Texto pronto para o G2P: valores, datas e abreviações por extenso, sem emoji nem molduras"""
+    return normalizar(texto).fala
+
+
+def normalizar_para_busca(texto):
+    """Minúsculo, sem acentos, emoji nem molduras (comparação com palavras-chave)"""
+    return normalizar(texto).busca
@@ -0,0 +1,43 @@
+"""
+Junção dos segmentos WAV gerados pelo TTS
+
+Os motores de TTS entregam um WAV completo (com cabeçalho RIFF próprio)
+por trecho do texto, para que o streaming toque cada trecho assim que
+fica pronto. Quando a resposta é um arquivo só (base64 do /api/chat, fala
+do websocket), concatenar os bytes produz vários RIFF colados: os players
+leem o tamanho do primeiro cabeçalho e descartam o resto. join_wav junta
+os quadros PCM e escreve um único cabeçalho.
+
+Só a biblioteca padrão (módulo wave).
+"""
+
+import io
+import wave
+
+
+def join_wav(chunks):
+    """Um único WAV com os quadros PCM de todos os segmentos, na ordem"""
+    chunks = [chunk for chunk in chunks if chunk]
+    if len(chunks) == 1:
+        # Um segmento já é um arquivo válido (e pode não ser PCM, ex.: float do XTTS)
+        return chunks[0]
+    params = None
+    frames = []
+    for chunk in chunks:
+        with wave.open(io.BytesIO(chunk), "rb") as segment:
+            segment_params = (segment.getnchannels(), segment.getsampwidth(), segment.getframerate())
+            if params is None:
+                params = segment_params
+            elif segment_params != params:
+                raise ValueError(f"segmentos WAV com formatos diferentes: {params} e {segment_params}")
+            frames.append(segment.readframes(segment.getnframes()))
+
+    if params is None:
+        return b""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as output:
+        output.setnchannels(params[0])
+        output.setsampwidth(params[1])
+        output.setframerate(params[2])
+        output.writeframes(b"".join(frames))
+    return buffer.getvalue()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Os módulos do backend são importados como "src.*" (igual ao main_flask_old.py)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
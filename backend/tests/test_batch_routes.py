@@ -0,0 +1,113 @@
+from datetime import datetime
+
+import pytest
+from flask import Flask
+
+from src.models.caixa import CaixaTransaction
+from src.models.employee import Employee
+from src.models.payroll import Payroll
+from src.models.user import db
+from src.models.vale import Vale
+from src.routes.caixa import caixa_bp
+from src.routes.vales import vales_bp
+from src.utils.database import configure_database
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    configure_database(app, f"sqlite:///{tmp_path / 'batch.db'}")
+    app.register_blueprint(vales_bp, url_prefix="/api")
+    app.register_blueprint(caixa_bp, url_prefix="/api")
+    with app.app_context():
+        db.create_all()
+        db.session.add(Employee(name='Maria', cpf='000.000.000-00', role='Vendedora', salary=2000.0))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def _statuses(response):
+    return [(result["index"], result["status"]) for result in response.get_json()["results"]]
+
+
+def _transaction(amount=50.0, **extra):
+    return {"type": "entrada", "amount": amount, "date": "2025-03-10", **extra}
+
+
+def test_caixa_batch_reports_each_item(app):
+    client = app.test_client()
+    response = client.post("/api/caixa/transactions/batch", json=[_transaction(), _transaction(20.0)])
+    assert response.status_code == 201
+    assert _statuses(response) == [(0, "created"), (1, "created")]
+    assert all(result["transaction"]["id"] == result["id"] for result in response.get_json()["results"])
+
+    response = client.post("/api/caixa/transactions/batch", json={"transactions": [
+        _transaction(30.0),
+        {"type": "outro", "amount": 1, "date": "2025-03-10"},
+        _transaction(category_id=[1]),
+        _transaction(employee_id="1"),
+        _transaction(category_id=999),
+        {"type": "saida", "date": "2025-03-10"},
+        "texto",
+    ]})
+    assert response.status_code == 207
+    body = response.get_json()
+    assert (body["created"], body["failed"]) == (1, 6)
+    assert [result["status"] for result in body["results"]] == ["created"] + ["error"] * 6
+    assert CaixaTransaction.query.count() == 3
+
+
+@pytest.mark.parametrize("amount", ['"inf"', '"nan"', 'NaN', '1e999', '-10', '0', '"abc"'])
+def test_caixa_batch_rejects_non_finite_and_non_positive_amounts(app, amount):
+    body = f'[{{"type": "entrada", "amount": {amount}, "date": "2025-03-10"}}]'
+    response = app.test_client().post("/api/caixa/transactions/batch", data=body,
+                                      content_type="application/json")
+    assert response.status_code == 400
+    assert _statuses(response) == [(0, "error")]
+    assert CaixaTransaction.query.count() == 0
+
+
+def test_atomic_batch_cancels_valid_items(app):
+    client = app.test_client()
+    items = [_transaction(), _transaction("nan")]
+    response = client.post("/api/caixa/transactions/batch", json={"transactions": items, "atomic": True})
+    assert response.status_code == 400
+    assert _statuses(response) == [(0, "skipped"), (1, "error")]
+
+    response = client.post("/api/caixa/transactions/batch?atomic=1", json=items)
+    assert response.status_code == 400 and CaixaTransaction.query.count() == 0
+
+    response = client.post("/api/vales/batch", json={"vales": [
+        {"employee_id": 1, "amount": 10.0, "date": "2025-03-05"},
+        {"employee_id": 1, "amount": "inf", "date": "2025-03-05"},
+    ], "atomic": True})
+    assert response.status_code == 400
+    assert _statuses(response) == [(0, "skipped"), (1, "error")]
+    assert Vale.query.count() == 0 and Payroll.query.count() == 0
+
+
+def test_vales_batch_updates_each_payroll_once(app):
+    response = app.test_client().post("/api/vales/batch", json=[
+        {"employee_id": 1, "amount": 10.0, "date": "2025-03-05"},
+        {"employee_id": 1, "amount": 15.5, "date": "2025-03-20"},
+        {"employee_id": 1, "amount": 7.0, "date": "2025-04-01"},
+        {"employee_id": 2, "amount": 5.0},
+        {"employee_id": True, "amount": 5.0},
+        {"employee_id": 1, "amount": -3.0},
+        {"employee_id": 1},
+    ])
+    assert response.status_code == 207
+    body = response.get_json()
+    assert [result["status"] for result in body["results"]] == ["created"] * 3 + ["error"] * 4
+    assert {(p["month"], p["total_vales"], p["net_salary"]) for p in body["payrolls_updated"]} == {
+        (3, 25.5, 1974.5), (4, 7.0, 1993.0)
+    }
+
+    response = app.test_client().post("/api/vales/batch", json=[])
+    assert response.status_code == 400
+    assert Vale.query.count() == 3
+    assert db.session.query(db.func.sum(Vale.amount)).scalar() == 32.5
+    assert Payroll.query.filter_by(month=3).one().total_vales == 25.5
+    assert Vale.query.filter(Vale.date < datetime(2025, 4, 1)).count() == 2
@@ -0,0 +1,169 @@
+import io
+from datetime import datetime
+
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.pool import StaticPool
+
+from src.models.jewelry import Jewelry
+from src.models.pattern import Pattern
+from src.models.user import db
+from src.services.autocomplete import mark_stale, suggest
+from src.services.bulk_import import coerce, open_text, read_records, run_import
+from src.utils.database import configure_database
+
+
+def test_coerce_accepts_brazilian_formats():
+    columns = Jewelry.__table__.c
+    assert coerce("1.234,56", columns.preco0) == 1234.56
+    assert coerce("12,5", columns.preco0) == 12.5
+    assert coerce("sim", columns.escondido) is True
+    assert coerce("não", columns.webexport) is False
+    assert coerce("42", columns.idj) == 42
+    assert coerce("  ", columns.preco1) is None
+    with pytest.raises(ValueError):
+        coerce("12,5", columns.idj)
+    for value in ("inf", "nan", "-Infinity", float("nan"), 1e999):
+        with pytest.raises(ValueError):
+            coerce(value, columns.idj)
+        with pytest.raises(ValueError):
+            coerce(value, columns.preco0)
+
+
+def test_coerce_dates():
+    from src.models.caixa import CaixaTransaction
+    column = CaixaTransaction.__table__.c.date
+    assert coerce("05/01/2024", column) == datetime(2024, 1, 5)
+    assert coerce("2024-01-05T10:30:00", column) == datetime(2024, 1, 5, 10, 30)
+    with pytest.raises(ValueError):
+        coerce("31/02/2024", column)
+
+
+def test_read_records_detects_delimiter_and_numbers_lines():
+    stream = io.StringIO("idj;descricao\n1;Anel\n2;\"Brinco; prata\"\n")
+    assert list(read_records(stream, "csv")) == [
+        (2, {"idj": "1", "descricao": "Anel"}),
+        (3, {"idj": "2", "descricao": "Brinco; prata"}),
+    ]
+
+    lines = list(read_records(io.StringIO('{"idj": 1}\n\n[1]\n{bad\n'), "jsonl"))
+    assert lines[0] == (1, {"idj": 1})
+    assert [line for line, _ in lines[1:]] == [3, 4]
+    assert all(isinstance(record, ValueError) for _, record in lines[1:])
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    db.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def _import(engine, entity, content, fmt, **kwargs):
+    return run_import(engine, entity, read_records(io.StringIO(content), fmt), **kwargs).to_dict()
+
+
+def test_run_import_upserts_resolves_references_and_dedups(engine):
+    report = _import(engine, "patterns", '{"idpa": 10, "nome": "Solitário"}\n{"idpa": 11, "nome": "Aro"}\n', "jsonl")
+    assert (report["inserted"], report["updated"], report["failed"]) == (2, 0, 0)
+
+    with engine.begin() as connection:
+        connection.execute(Jewelry.__table__.insert(), {"idj": 1, "descricao": "antiga"})
+        pattern_ids = dict(connection.execute(select(Pattern.idpa, Pattern.id)).all())
+
+    csv_text = (
+        "idj;idpa;descricao;preco0\n"
+        "1;10;Anel atualizado;1.234,50\n"   # já existe: atualizado
+        "2;11;Brinco;10\n"
+        "2;11;Brinco (repetido);12\n"       # mesma chave no lote: vale a última
+        "3;99;Sem padrão;5\n"               # referência inexistente
+        "4;10;Colar;abc\n"                  # valor inválido
+    )
+    report = _import(engine, "jewelry", csv_text, "csv", batch_size=10)
+    assert (report["rows"], report["inserted"], report["updated"], report["failed"]) == (5, 1, 1, 2)
+    assert [(error["line"], error["error"].split(":")[0]) for error in report["errors"]] == [(5, "idpa"), (6, "preco0")]
+
+    with engine.connect() as connection:
+        jewelry = {row.idj: row for row in connection.execute(select(Jewelry.idj, Jewelry.idpa, Jewelry.descricao,
+                                                                     Jewelry.preco0))}
+    assert sorted(jewelry) == [1, 2]
+    assert (jewelry[1].descricao, jewelry[1].preco0, jewelry[1].idpa) == ("Anel atualizado", 1234.5, pattern_ids[10])
+    assert (jewelry[2].descricao, jewelry[2].idpa) == ("Brinco (repetido)", pattern_ids[11])
+
+
+def test_run_import_rebuilds_rollups_after_invalidating(engine):
+    from src.models.caixa import CaixaTransaction
+    from src.models.report_rollup import ReportRollup, ReportRollupState
+
+    jsonl = "".join(
+        f'{{"type": "entrada", "amount": {amount}, "date": "0{day}/03/2025"}}\n'
+        for day, amount in ((3, 100), (4, 50.5), (5, 20))
+    )
+    report = _import(engine, "caixa", jsonl, "jsonl", batch_size=2)
+    assert report["inserted"] == 3
+
+    with engine.connect() as connection:
+        assert connection.execute(select(ReportRollupState.serie)).scalars().all() == ["caixa"]
+        month = connection.execute(select(ReportRollup.count, ReportRollup.total).where(
+            ReportRollup.serie == "caixa", ReportRollup.granularity == "month")).one()
+        raw = connection.execute(select(func.count(), func.sum(CaixaTransaction.amount))).one()
+    assert tuple(month) == tuple(raw) == (3, 170.5)
+
+
+def test_batch_rejected_by_database_fails_its_lines_and_continues(engine):
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TRIGGER recusa BEFORE INSERT ON patterns WHEN NEW.nome = 'falha' "
+            "BEGIN SELECT RAISE(ABORT, 'recusado'); END"
+        ))
+    jsonl = '{"idpa": 1, "nome": "a"}\n{"idpa": 2, "nome": "falha"}\n{"idpa": 3, "nome": "c"}\n{"idpa": 4, "nome": "d"}\n'
+    report = _import(engine, "patterns", jsonl, "jsonl", batch_size=2)
+
+    assert (report["inserted"], report["failed"]) == (2, 2)
+    assert [error["line"] for error in report["errors"]] == [1, 2]
+    assert all("lote recusado pelo banco" in error["error"] for error in report["errors"])
+    with engine.connect() as connection:
+        assert connection.execute(select(Pattern.idpa).order_by(Pattern.idpa)).scalars().all() == [3, 4]
+
+
+def test_bad_number_is_a_line_error_not_an_aborted_import(engine):
+    report = _import(engine, "stones", "idpe;nome\ninf;x\n7;Rubi\n", "csv")
+    assert (report["inserted"], report["failed"]) == (1, 1)
+    assert report["errors"][0]["line"] == 2
+
+
+def test_legacy_encoded_csv_falls_back_to_cp1252(engine):
+    # BOM e 1ª linha em UTF-8, o resto no cp1252 do sistema antigo
+    content = "\ufeffidpa;nome\n1;Solitário\n".encode("utf-8") + "2;Coração\n".encode("cp1252")
+    records = read_records(open_text(io.BytesIO(content)), "csv")
+    report = run_import(engine, "patterns", records).to_dict()
+    assert (report["inserted"], report["failed"]) == (2, 0)
+    with engine.connect() as connection:
+        assert connection.execute(select(Pattern.nome).order_by(Pattern.idpa)).scalars().all() == \
+            ["Solitário", "Coração"]
+
+
+def test_wrong_explicit_encoding_is_reported_not_raised(engine):
+    content = "idpa;nome\n1;Aro\n2;Coração\n".encode("cp1252")
+    records = read_records(open_text(io.BytesIO(content), "utf-8"), "csv")
+    report = run_import(engine, "patterns", records).to_dict()
+    assert report["failed"] == 1
+    assert "utf-8" in report["errors"][0]["error"]
+
+
+def test_catalog_import_reaches_autocomplete(tmp_path):
+    app = Flask(__name__)
+    configure_database(app, f"sqlite:///{tmp_path / 'import.db'}")
+    with app.app_context():
+        db.create_all()
+        mark_stale()  # índice do processo montado a partir deste banco
+        assert suggest("zafira") == []
+
+        # Gravado pelo Core, sem passar pelo after_commit do ORM
+        _import(db.engine, "patterns", '{"idpa": 5, "nome": "Zafira", "tipo": "Anel"}\n', "jsonl")
+        assert [item["valor"] for item in suggest("zafira")] == ["Zafira"]
+
+        db.session.remove()
+        db.engine.dispose()
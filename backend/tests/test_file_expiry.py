@@ -0,0 +1,60 @@
+import os
+import time
+
+from src.utils.file_expiry import FileExpiryIndex
+
+
+def _audio(directory, name, size=100, age=0):
+    path = directory / name
+    path.write_bytes(b"x" * size)
+    if age:
+        stamp = time.time() - age
+        os.utime(path, (stamp, stamp))
+    return path
+
+
+def test_adopts_existing_files_and_sweeps_by_age(tmp_path):
+    _audio(tmp_path, "velho.wav", age=7200)
+    _audio(tmp_path, "novo.wav")
+    _audio(tmp_path, "reference_voice.wav", age=7200)
+
+    index = FileExpiryIndex(tmp_path, max_age=3600, exclude=("reference_voice.wav",))
+    assert len(index) == 2 and index.total_bytes() == 200
+
+    assert index.sweep() == (1, 100)
+    assert sorted(p.name for p in tmp_path.glob("*.wav")) == ["novo.wav", "reference_voice.wav"]
+
+
+def test_size_budget_removes_least_recently_used(tmp_path):
+    index = FileExpiryIndex(tmp_path, max_bytes=250)
+    for name in ("a.wav", "b.wav", "c.wav"):
+        index.touch(_audio(tmp_path, name))
+        time.sleep(0.01)
+    index.touch(tmp_path / "a.wav")  # reutilizado: passa a ser o mais recente
+
+    assert index.sweep() == (1, 100)
+    assert not (tmp_path / "b.wav").exists() and (tmp_path / "a.wav").exists()
+    assert index.total_bytes() == 200
+
+
+def test_index_survives_restart(tmp_path):
+    index = FileExpiryIndex(tmp_path, max_age=60)
+    index.touch(_audio(tmp_path, "a.wav", size=10))
+
+    reopened = FileExpiryIndex(tmp_path, max_age=60)
+    assert reopened.total_bytes() == 10
+    assert reopened.sweep(now=time.time() + 120) == (1, 10)
+
+
+def test_size_budget_counts_files_indexed_by_other_processes(tmp_path):
+    # Dois processos (ex.: worker da API e servidor Kokoro) com o mesmo diretório
+    api = FileExpiryIndex(tmp_path, max_bytes=250)
+    kokoro = FileExpiryIndex(tmp_path, max_bytes=250)
+    for index, name in ((api, "a.wav"), (kokoro, "b.wav"), (kokoro, "c.wav")):
+        index.touch(_audio(tmp_path, name))
+        time.sleep(0.01)
+
+    assert api.total_bytes() == kokoro.total_bytes() == 300
+    assert api.sweep() == (1, 100)
+    assert not (tmp_path / "a.wav").exists()
+    assert kokoro.total_bytes() == 200 and kokoro.sweep() == (0, 0)
@@ -0,0 +1,80 @@
+"""
+Orçamento de tempo de importação do ERP (python -X importtime)
+
+Importar main_flask_old.py não pode carregar as dependências de IA/voz
+(torch, TTS, numpy, pydub): elas são importadas no primeiro uso ou pela
+thread de aquecimento. O tempo total de importação do app tem um teto.
+"""
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+from src.utils.lazy import LazyModule, ModuleProxy, warm_up
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", 1000))
+HEAVY_MODULES = (
+    "torch", "TTS", "numpy", "pydub", "soundfile", "requests",
+    "src.services.voice_engine", "src.services.lua_consciousness",
+)
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+PROBE = f"""
+import sys
+import main_flask_old
+print("HEAVY:" + ",".join(name for name in {HEAVY_MODULES!r} if name in sys.modules))
+"""
+
+
+def _import_app(tmp_path):
+    env = dict(os.environ, ERP_DATABASE_URL=f"sqlite:///{tmp_path / 'import.db'}",
+               PROFILER_SLOW_QUERY_LOG=str(tmp_path / "slow.log"))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2)) / 1000
+    heavy = next(line for line in result.stdout.splitlines() if line.startswith("HEAVY:"))
+    loaded = [name for name in heavy[len("HEAVY:"):].split(",") if name]
+    return cumulative, loaded
+
+
+def test_app_import_skips_heavy_dependencies(tmp_path):
+    _cumulative, loaded = _import_app(tmp_path)
+    assert loaded == []
+
+
+def test_app_import_time_budget(tmp_path):
+    # A primeira execução pode incluir a compilação dos .pyc
+    timings = [_import_app(tmp_path)[0]["main_flask_old"] for _ in range(2)]
+    assert min(timings) < IMPORT_BUDGET_MS, f"main_flask_old: {min(timings):.0f} ms"
+
+
+def test_lazy_module_caches_import_failure():
+    module = LazyModule("modulo_que_nao_existe")
+    assert module.get() is None
+    assert module.attr("qualquer", "padrao") == "padrao"
+    assert isinstance(module.error, ImportError)
+    assert module.status()["loaded"] is True
+
+
+def test_warm_up_loads_in_background():
+    module = LazyModule("json")
+    thread = warm_up([module])
+    thread.join(timeout=10)
+    assert module.loaded and module.available
+    assert warm_up([module]) is None
+
+
+def test_module_proxy_imports_on_first_attribute():
+    proxy = ModuleProxy("json")
+    assert "não carregado" in repr(proxy)
+    assert proxy.dumps([1]) == "[1]"
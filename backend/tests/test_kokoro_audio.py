@@ -0,0 +1,69 @@
+import os
+import sys
+from pathlib import Path
+
+# O servidor Kokoro é uma imagem separada: seus módulos são importados pelo diretório
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "kokoro"))
+
+from audio_files import audio_etag, audio_name, cache_control, is_servable, partial_path  # noqa: E402
+
+
+def test_partial_file_is_hidden_from_audio_route(tmp_path):
+    part = partial_path(tmp_path / "abc123.wav")
+    assert part.parent == tmp_path and part.name == ".abc123.part.wav"
+    assert not is_servable(part.name)
+
+    assert is_servable("abc123.wav")
+    assert not is_servable("abc123.part.wav")
+    assert not is_servable(".expiry.sqlite")
+    assert not is_servable("")
+
+
+def test_names_depend_on_model_and_mock_is_not_cached():
+    real = audio_name("Olá", "pt", None, "xtts_v2", "wav")
+    mock = audio_name("Olá", "pt", None, None, "wav")
+    assert real != mock and mock.startswith("mock-")
+    assert real != audio_name("Olá", "pt", None, "outro_modelo", "wav")
+
+    assert cache_control(mock) == "no-store"
+    assert "immutable" not in cache_control(real)
+
+
+def test_etag_follows_content(tmp_path):
+    path = tmp_path / "abc123.wav"
+    path.write_bytes(b"MOCK_AUDIO_DATA")
+    first = audio_etag(path)
+    assert audio_etag(path) == first
+
+    mtime = path.stat().st_mtime_ns
+    path.write_bytes(b"RIFF regenerado")
+    os.utime(path, ns=(mtime + 10**9, mtime + 10**9))
+    assert audio_etag(path) != first
+
+
+def test_erp_route_serves_shared_audio_with_content_etag(tmp_path, monkeypatch):
+    from flask import Flask
+    from src.routes import kokoro_voice
+
+    (tmp_path / "abc123.wav").write_bytes(b"RIFF audio real")
+    (tmp_path / "mock-abc123.wav").write_bytes(b"MOCK_AUDIO_DATA")
+    (tmp_path / ".abc123.part.wav").write_bytes(b"RIFF pela met")
+    monkeypatch.setattr(kokoro_voice, "KOKORO_AUDIO_DIR", str(tmp_path))
+    app = Flask(__name__)
+    app.register_blueprint(kokoro_voice.kokoro_voice_bp)
+    client = app.test_client()
+
+    response = client.get("/api/voice/audio/abc123.wav")
+    etag = response.headers["ETag"]
+    assert response.status_code == 200 and response.data == b"RIFF audio real"
+    assert etag == audio_etag(tmp_path / "abc123.wav")
+    assert "immutable" not in response.headers["Cache-Control"]
+    assert client.get("/api/voice/audio/abc123.wav", headers={"If-None-Match": etag}).status_code == 304
+
+    assert client.get("/api/voice/audio/mock-abc123.wav").headers["Cache-Control"] == "no-store"
+    assert kokoro_voice._local_audio_path(".abc123.part.wav") is None
+
+    monkeypatch.setattr(kokoro_voice, "KOKORO_AUDIO_ACCEL_PREFIX", "/_kokoro_audio/")
+    response = client.get("/api/voice/audio/mock-abc123.wav")
+    assert response.headers["X-Accel-Redirect"] == "/_kokoro_audio/mock-abc123.wav"
+    assert response.headers["Cache-Control"] == "no-store"
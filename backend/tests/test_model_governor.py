@@ -0,0 +1,58 @@
+import threading
+import time
+
+from src.utils.model_governor import ModelGovernor
+
+
+class FakeModel:
+    pass
+
+
+def test_reload_after_idle_unload():
+    governor = ModelGovernor()
+    loads, unloads = [], []
+    slot = governor.register("fake", loader=lambda: loads.append(1) or FakeModel(),
+                             unloader=unloads.append, idle_ttl=60)
+
+    with governor.use("fake") as model:
+        assert isinstance(model, FakeModel)
+    assert governor.unload_idle(now=time.time() + 30) == []
+    assert governor.unload_idle(now=time.time() + 61) == ["fake"]
+    assert not slot.loaded and len(unloads) == 1
+
+    with governor.use("fake"):
+        pass
+    assert len(loads) == 2 and governor.snapshot()["fake"]["loads"] == 2
+
+
+def test_concurrency_limit_and_no_unload_while_inflight():
+    governor = ModelGovernor()
+    slot = governor.register("busy", loader=FakeModel, max_concurrency=1, idle_ttl=0.01)
+    entered, release = threading.Event(), threading.Event()
+
+    def worker():
+        with governor.use("busy"):
+            entered.set()
+            release.wait(5)
+
+    first = threading.Thread(target=worker)
+    first.start()
+    entered.wait(5)
+    second_entered = threading.Event()
+
+    def waiter():
+        with governor.use("busy"):
+            second_entered.set()
+
+    second = threading.Thread(target=waiter)
+    second.start()
+    time.sleep(0.05)
+
+    assert slot.inflight == 1 and slot.waiting == 1
+    assert not second_entered.is_set()
+    assert not slot.unload()
+    release.set()
+    first.join(5)
+    second.join(5)
+    assert second_entered.is_set()
+    assert slot.inflight == 0 and slot.waiting == 0
@@ -0,0 +1,139 @@
+from datetime import datetime
+
+import pytest
+from flask import Flask
+
+from src.models.employee import Employee
+from src.models.payroll import Payroll
+from src.models.user import db
+from src.models.vale import Vale
+from src.routes.vales import vales_bp
+from src.utils.database import configure_database
+from src.utils.date_ranges import in_month
+
+PERIODS = [(1, 2025, 1), (1, 2025, 2), (2, 2025, 1), (2, 2025, 2)]
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    configure_database(app, f"sqlite:///{tmp_path / 'payroll.db'}")
+    app.register_blueprint(vales_bp, url_prefix="/api")
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            Employee(name='Maria', cpf='000.000.000-01', salary=2000.0),
+            Employee(name='João', cpf='000.000.000-02', salary=1500.0),
+        ])
+        db.session.commit()
+        # Folhas já existentes: daqui em diante só os deltas do flush as mantêm
+        for employee_id, year, month in PERIODS:
+            salary = db.session.get(Employee, employee_id).salary
+            db.session.add(Payroll(employee_id=employee_id, year=year, month=month, base_salary=salary,
+                                   total_vales=0.0, net_salary=salary))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def _assert_payrolls_match():
+    """Total de cada folha igual à soma direta dos vales do (funcionário, mês)"""
+    for payroll in Payroll.query.all():
+        total = db.session.query(db.func.coalesce(db.func.sum(Vale.amount), 0.0)).filter(
+            Vale.employee_id == payroll.employee_id,
+            in_month(Vale.date, payroll.year, payroll.month)
+        ).scalar()
+        period = (payroll.employee_id, payroll.year, payroll.month)
+        assert payroll.total_vales == pytest.approx(total), period
+        assert payroll.net_salary == pytest.approx(payroll.base_salary - total), period
+
+
+def _vale(employee_id, amount, month, day):
+    return Vale(employee_id=employee_id, amount=amount, date=datetime(2025, month, day, 10))
+
+
+def test_flush_deltas_follow_insert_update_and_delete(app):
+    vales = [_vale(1, 100.0, 1, 5), _vale(1, 50.5, 1, 31), _vale(1, 20.0, 2, 1), _vale(2, 75.25, 1, 15)]
+    db.session.add_all(vales)
+    db.session.commit()
+    _assert_payrolls_match()
+    assert Payroll.query.filter_by(employee_id=1, month=1).one().total_vales == 150.5
+
+    vales[0].amount = 130.0
+    db.session.commit()
+    _assert_payrolls_match()
+
+    # Outro mês e outro funcionário (sai de uma folha e entra em outra)
+    vales[1].date = datetime(2025, 2, 1, 9)
+    vales[2].employee_id = 2
+    db.session.commit()
+    _assert_payrolls_match()
+    assert Payroll.query.filter_by(employee_id=1, month=2).one().total_vales == 50.5
+
+    # Valor, data e funcionário de uma vez
+    vales[3].amount = 10.0
+    vales[3].date = datetime(2025, 2, 28, 23)
+    vales[3].employee_id = 1
+    db.session.commit()
+    _assert_payrolls_match()
+
+    db.session.delete(vales[0])
+    db.session.add(_vale(2, 5.0, 1, 2))
+    db.session.commit()
+    _assert_payrolls_match()
+
+
+def test_two_flushes_in_one_transaction_and_rollback(app):
+    vale = _vale(1, 40.0, 1, 10)
+    db.session.add(vale)
+    db.session.commit()
+
+    payroll = Payroll.query.filter_by(employee_id=1, month=1).one()
+    vale.amount = 60.0
+    db.session.flush()
+    vale.date = datetime(2025, 2, 10)
+    db.session.flush()
+    # Folha carregada na sessão relê os totais gravados pelo UPDATE
+    assert (payroll.total_vales, payroll.net_salary) == (0.0, 2000.0)
+    _assert_payrolls_match()
+
+    # Um flush desfeito não deixa deltas para trás
+    db.session.rollback()
+    _assert_payrolls_match()
+    assert Payroll.query.filter_by(employee_id=1, month=1).one().total_vales == 40.0
+
+    db.session.delete(vale)
+    db.session.flush()
+    db.session.rollback()
+    _assert_payrolls_match()
+
+
+def test_vales_batch_keeps_existing_and_new_payrolls(app):
+    db.session.add(_vale(1, 12.0, 1, 3))
+    db.session.commit()
+
+    response = app.test_client().post("/api/vales/batch", json=[
+        {"employee_id": 1, "amount": 10.0, "date": "2025-01-05"},
+        {"employee_id": 2, "amount": 30.0, "date": "2025-02-20"},
+        {"employee_id": 2, "amount": 4.5, "date": "2025-03-01"},  # folha ainda inexistente
+        {"employee_id": 1, "amount": "inf", "date": "2025-01-05"},
+    ])
+    assert response.status_code == 207
+    assert Payroll.query.count() == len(PERIODS) + 1
+    _assert_payrolls_match()
+    assert Payroll.query.filter_by(employee_id=1, month=1).one().total_vales == 22.0
+
+
+@pytest.mark.parametrize("query", ["month=13&year=2025", "month=0&year=2025", "month=-1", "year=0", "year=9999"])
+def test_list_vales_rejects_invalid_period(app, query):
+    response = app.test_client().get(f"/api/vales?{query}")
+    assert response.status_code == 400
+
+
+def test_list_vales_filters_by_month(app):
+    db.session.add_all([_vale(1, 10.0, 1, 31), _vale(1, 20.0, 2, 1)])
+    db.session.commit()
+    response = app.test_client().get("/api/vales?month=1&year=2025")
+    assert response.status_code == 200
+    assert [vale["amount"] for vale in response.get_json()] == [10.0]
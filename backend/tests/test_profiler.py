@@ -0,0 +1,49 @@
+import sqlite3
+
+import pytest
+
+from src.utils.profiler import _explain
+
+
+class FakeCursor:
+    def __init__(self, log):
+        self.log = log
+        self.description = None
+
+    def execute(self, statement, parameters=None):
+        self.log.append(statement.split(" ")[0] if statement.startswith("EXPLAIN") else statement)
+        if statement.startswith("EXPLAIN"):
+            raise RuntimeError("syntax error")
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.log = []
+
+    def cursor(self):
+        return FakeCursor(self.log)
+
+
+def test_failed_explain_is_rolled_back_to_savepoint():
+    connection = FakeConnection()
+    with pytest.raises(RuntimeError):
+        _explain(connection, "postgresql", "SELECT * FROM nota WHERE id = %(id)s", {"id": 1})
+    assert connection.log == [
+        "SAVEPOINT profiler_explain",
+        "EXPLAIN",
+        "ROLLBACK TO SAVEPOINT profiler_explain",
+        "RELEASE SAVEPOINT profiler_explain",
+    ]
+
+
+def test_sqlite_plan_uses_explain_query_plan():
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE nota (id INTEGER PRIMARY KEY, data TEXT)")
+    plan = _explain(connection, "sqlite", "SELECT * FROM nota WHERE id = ?", (1,))
+    assert plan and "nota" in plan[0]
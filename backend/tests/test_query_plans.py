@@ -0,0 +1,164 @@
+"""
+Regressão de planos de consulta (EXPLAIN QUERY PLAN) das consultas por período
+
+Cada teste executa o código real (modelo ou rota), captura o SQL emitido e
+falha se o SQLite passar a varrer a tabela inteira em vez de usar o índice.
+"""
+
+import re
+from datetime import date, datetime
+
+import pytest
+from flask import Flask
+from sqlalchemy import event, func, text
+
+from src.models.user import db
+from src.models.caixa import CaixaTransaction
+from src.models.employee import Employee
+from src.models.jewelry import Jewelry
+from src.models.order import Order
+from src.models.payroll import Payroll
+from src.models.vale import Vale
+from src.routes.caixa import caixa_bp
+from src.routes.vales import vales_bp
+from src.utils.database import configure_database
+from src.utils.date_ranges import in_month, on_day
+
+FULL_SCAN = re.compile(r'^SCAN (\w+)(?! USING)')
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    configure_database(app, f"sqlite:///{tmp_path / 'plans.db'}")
+    app.register_blueprint(vales_bp, url_prefix="/api")
+    app.register_blueprint(caixa_bp, url_prefix="/api")
+    with app.app_context():
+        db.create_all()
+        _seed()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def _seed():
+    employee = Employee(name='Maria', cpf='000.000.000-00', role='Vendedora', salary=2000.0)
+    db.session.add(employee)
+    db.session.flush()
+    for day in range(1, 29):
+        db.session.add(Vale(employee_id=employee.id, amount=10.0, date=datetime(2025, 9, day, 14, 30)))
+        db.session.add(CaixaTransaction(type='entrada', amount=50.0, date=datetime(2025, 9, day)))
+    db.session.add(Payroll(employee_id=employee.id, month=9, year=2025,
+                           base_salary=2000.0, total_vales=0.0, net_salary=2000.0))
+    jewelry = Jewelry(idj=1, descricao='Anel')
+    db.session.add(jewelry)
+    db.session.flush()
+    db.session.add(Order(customer_name='Cliente', jewelry_id=jewelry.id, unit_price=100.0,
+                         total_price=100.0, status='completed', created_at=datetime(2025, 9, 5)))
+    db.session.commit()
+
+
+@pytest.fixture
+def captured(app):
+    """SELECTs executados durante o teste: lista de (sql, parâmetros)"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    yield statements
+    event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def query_plan(statement, parameters=()):
+    raw = db.engine.raw_connection()
+    try:
+        rows = raw.cursor().execute(f'EXPLAIN QUERY PLAN {statement}', parameters).fetchall()
+    finally:
+        raw.close()
+    return [row[3] for row in rows]
+
+
+def assert_uses_index(statements, table, index_name):
+    """Toda consulta que lê a tabela deve buscar pelo índice indicado"""
+    plans = [query_plan(sql, params) for sql, params in statements if f'FROM {table}' in sql.replace('"', '')]
+    assert plans, f'nenhuma consulta em {table} foi capturada'
+    for plan in plans:
+        scans = [line for line in plan if (m := FULL_SCAN.match(line)) and m.group(1) == table]
+        assert not scans, f'varredura completa em {table}: {plan}'
+        assert any(index_name in line for line in plan), f'{index_name} não usado: {plan}'
+
+
+def _compiled(query):
+    compiled = query.statement.compile(dialect=db.engine.dialect, compile_kwargs={"render_postcompile": True})
+    return [(str(compiled), tuple(compiled.params[name] for name in compiled.positiontup))]
+
+
+def test_detector_flags_function_on_indexed_column(app):
+    """Sanidade: func.date() sobre a coluna (o padrão antigo) é varredura completa"""
+    query = Vale.query.filter(func.date(Vale.date) == date(2025, 9, 3))
+    with pytest.raises(AssertionError, match='varredura completa'):
+        assert_uses_index(_compiled(query), 'vale', 'ix_vale_employee_date')
+
+
+def test_payroll_vales_total_uses_employee_date_index(app, captured):
+    payroll = Payroll.query.first()
+    captured.clear()
+    assert payroll.update_vales_total() == pytest.approx(280.0)
+    assert_uses_index(captured, 'vale', 'ix_vale_employee_date')
+
+
+def test_vale_update_payroll_uses_period_index(app, captured):
+    vale = Vale.query.first()
+    captured.clear()
+    vale.update_payroll()
+    assert_uses_index(captured, 'payroll', 'ix_payroll_employee_period')
+
+
+def test_vales_route_month_filter(app, captured):
+    response = app.test_client().get('/api/vales?employee_id=1&month=9&year=2025')
+    assert response.status_code == 200
+    assert len(response.get_json()) == 28
+    assert_uses_index(captured, 'vale', 'ix_vale_employee_date')
+
+
+def test_caixa_period_routes(app, captured):
+    client = app.test_client()
+    response = client.get('/api/caixa/transactions?start_date=2025-09-10&end_date=2025-09-12')
+    assert response.status_code == 200
+    assert len(response.get_json()) == 3
+    summary = client.get('/api/caixa/summary?start_date=2025-09-01&end_date=2025-09-30').get_json()
+    assert summary['total_transacoes'] == 28
+    assert_uses_index(captured, 'caixa_transaction', 'ix_caixa_transaction_date_type')
+
+
+def test_caixa_period_includes_legacy_date_only_rows(app):
+    """Datas importadas do sistema antigo são gravadas sem hora ('AAAA-MM-DD')"""
+    db.session.execute(text(
+        "INSERT INTO caixa_transaction (type, amount, date) VALUES ('saida', 7.5, '2025-10-31')"
+    ))
+    db.session.commit()
+    response = app.test_client().get('/api/caixa/transactions?start_date=2025-10-31&end_date=2025-10-31')
+    assert [t['amount'] for t in response.get_json()] == [7.5]
+
+
+def test_caixa_period_rejects_invalid_date(app):
+    response = app.test_client().get('/api/caixa/summary?start_date=31/10/2025')
+    assert response.status_code == 400
+
+
+def test_orders_by_status_in_period(app):
+    query = Order.query.filter(
+        Order.status.in_(['completed', 'paid']),
+        in_month(Order.created_at, 2025, 9)
+    )
+    assert query.count() == 1
+    assert_uses_index(_compiled(query), 'order', 'ix_order_status_created_at')
+
+
+def test_orders_on_day(app):
+    query = Order.query.filter(on_day(Order.created_at, date(2025, 9, 5)))
+    assert query.count() == 1
+    assert_uses_index(_compiled(query), 'order', 'ix_order_created_at')
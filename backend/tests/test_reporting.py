@@ -0,0 +1,153 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from flask import Flask
+
+from src.models.caixa import CaixaTransaction
+from src.models.financial import FinancialTransaction
+from src.models.report_rollup import ReportRollup, ReportRollupState
+from src.models.user import db
+from src.services.reporting import aggregate, decompose, rebuild
+from src.utils.database import configure_database
+
+PERIODS = [
+    (None, None),
+    (date(2025, 1, 1), date(2025, 1, 31)),
+    (date(2025, 1, 6), date(2025, 1, 12)),
+    (date(2025, 1, 29), date(2025, 2, 16)),
+    (date(2025, 2, 3), date(2025, 2, 3)),
+]
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    configure_database(app, f"sqlite:///{tmp_path / 'rollup.db'}")
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def _live(model, date_attr, value_attr, key, start, end):
+    """Agregado direto das linhas brutas (o que o relatório fazia antes)"""
+    result = {}
+    for row in model.query.all():
+        day = getattr(row, date_attr).date()
+        if start is not None and not start <= day <= end:
+            continue
+        values = result.setdefault(key(row), {'count': 0, 'total': 0.0})
+        values['count'] += 1
+        values['total'] += getattr(row, value_attr)
+    return {k: v for k, v in result.items() if v['count']}
+
+
+def _assert_caixa_matches():
+    for start, end in PERIODS:
+        live = _live(CaixaTransaction, 'date', 'amount', lambda row: row.type, start, end)
+        assert aggregate('caixa', start, end) == live, (start, end)
+
+
+def _caixa(type_, amount, day):
+    return CaixaTransaction(type=type_, amount=amount, date=datetime(2025, 1, day) + timedelta(hours=10))
+
+
+def test_decompose_covers_period_with_disjoint_rollups():
+    start, end = date(2025, 1, 29), date(2025, 4, 16)
+    buckets = decompose(start, end)
+
+    covered = []
+    for granularity, bucket_start in buckets:
+        length = {"day": 1, "week": 7}.get(granularity)
+        if length is None:  # mês inteiro
+            following = (bucket_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+            length = (following - bucket_start).days
+        covered.extend(bucket_start + timedelta(days=i) for i in range(length))
+
+    assert covered == [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    assert ("month", date(2025, 2, 1)) in buckets and ("month", date(2025, 3, 1)) in buckets
+    assert ("week", date(2025, 4, 7)) in buckets
+    assert len(buckets) < 20
+
+
+def test_flush_deltas_follow_insert_update_and_delete(app):
+    rows = [_caixa('entrada', 100.0, day) for day in (2, 8, 15, 29, 31)] + [_caixa('saida', 40.0, 8)]
+    db.session.add_all(rows)
+    db.session.commit()
+    _assert_caixa_matches()
+
+    # Série já construída: daqui em diante só os deltas do flush a mantêm
+    assert db.session.get(ReportRollupState, 'caixa') is not None
+
+    rows[0].amount = 250.0
+    rows[1].type = 'saida'
+    db.session.commit()
+    _assert_caixa_matches()
+
+    # Linha movida de período (janeiro → fevereiro, outra semana e outro dia)
+    rows[3].date = datetime(2025, 2, 3, 9)
+    rows[3].amount = 75.0
+    db.session.commit()
+    _assert_caixa_matches()
+    assert aggregate('caixa', date(2025, 1, 29), date(2025, 1, 29)) == {}
+
+    db.session.delete(rows[2])
+    db.session.add(_caixa('saida', 12.5, 31))
+    db.session.commit()
+    _assert_caixa_matches()
+
+    # Um flush que falha não deixa deltas para trás
+    rows[4].amount = 999.0
+    db.session.flush()
+    db.session.rollback()
+    _assert_caixa_matches()
+
+
+def test_callable_key_moves_rows_between_keys(app):
+    def financial(day, valor):
+        return FinancialTransaction(data=datetime(2025, 1, day), mes=1, ano=2025, valor1=valor,
+                                    descricao='teste', grupo1='g', grupo2='g')
+
+    rows = [financial(5, 300.0), financial(6, -120.0), financial(20, 80.0)]
+    db.session.add_all(rows)
+    db.session.commit()
+    aggregate('financial')
+
+    rows[0].valor1 = -50.0
+    db.session.commit()
+
+    sinal = lambda row: 'entrada' if row.valor1 > 0 else 'saida'
+    for start, end in PERIODS:
+        live = _live(FinancialTransaction, 'data', 'valor1', sinal, start, end)
+        assert aggregate('financial', start, end) == live
+
+
+def test_bulk_writes_mark_serie_stale_and_rebuild_from_rows(app):
+    db.session.add_all([_caixa('entrada', 10.0, day) for day in range(1, 11)])
+    db.session.commit()
+    _assert_caixa_matches()
+
+    # query.update/delete em massa não passam pelo flush: a série é invalidada
+    CaixaTransaction.query.filter(CaixaTransaction.amount == 10.0).update({'amount': 20.0})
+    CaixaTransaction.query.filter(CaixaTransaction.date < datetime(2025, 1, 4)).delete()
+    db.session.commit()
+    assert db.session.get(ReportRollupState, 'caixa') is None
+
+    # Próximo acesso reconstrói das linhas e volta a bater com a consulta direta
+    _assert_caixa_matches()
+    assert db.session.get(ReportRollupState, 'caixa') is not None
+
+
+def test_rebuild_replaces_drifted_rollups(app):
+    db.session.add_all([_caixa('entrada', 30.0, 3), _caixa('saida', 5.0, 17)])
+    db.session.commit()
+    aggregate('caixa')
+
+    # Agregado corrompido fora do ORM (ex.: gravação manual no banco)
+    db.session.execute(ReportRollup.__table__.update().values(total=0.0))
+    db.session.commit()
+    assert aggregate('caixa') != {'entrada': {'count': 1, 'total': 30.0}, 'saida': {'count': 1, 'total': 5.0}}
+
+    assert rebuild('caixa') > 0
+    _assert_caixa_matches()
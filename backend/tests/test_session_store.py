@@ -0,0 +1,70 @@
+import threading
+import time
+from collections import deque
+
+from src.utils.session_store import SessionStore, SQLiteSessionBackend
+
+
+class Counter:
+    def __init__(self):
+        self.turns = 0
+        self.history = deque(maxlen=3)
+
+    def to_dict(self):
+        return {"turns": self.turns, "history": list(self.history)}
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls()
+        state.turns = data["turns"]
+        state.history.extend(data["history"])
+        return state
+
+
+def test_sessions_are_isolated_and_serialized():
+    store = SessionStore("test", Counter)
+
+    def turn(session_id):
+        for _ in range(200):
+            with store.session(session_id) as state:
+                turns = state.turns
+                time.sleep(0)
+                state.turns = turns + 1
+
+    threads = [threading.Thread(target=turn, args=(f"s{i % 2}",)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert store.get("s0")["turns"] == store.get("s1")["turns"] == 600
+
+
+def test_capacity_and_ttl_eviction():
+    store = SessionStore("test", Counter, ttl=0.05, max_sessions=2)
+    for session_id in ("a", "b", "c"):
+        with store.session(session_id) as state:
+            state.turns += 1
+    assert store.session_ids() == ["b", "c"]
+
+    time.sleep(0.06)
+    with store.session("b") as state:
+        assert state.turns == 0  # expirada: recomeça do zero
+    assert store.session_ids() == ["b"]
+
+
+def test_sqlite_backend_restores_evicted_session(tmp_path):
+    backend = SQLiteSessionBackend(tmp_path / "sessions.sqlite3")
+    store = SessionStore("test", Counter, max_sessions=1, backend=backend)
+    with store.session("a") as state:
+        state.turns = 5
+        state.history.extend(range(10))
+    with store.session("b"):
+        pass
+    assert store.session_ids() == ["b"]
+
+    restarted = SessionStore("test", Counter, backend=SQLiteSessionBackend(tmp_path / "sessions.sqlite3"))
+    with restarted.session("a") as state:
+        assert state.turns == 5 and list(state.history) == [7, 8, 9]
+
+    restarted.discard("a")
+    assert restarted.get("a") is None
@@ -0,0 +1,46 @@
+import csv
+import io
+import zipfile
+from datetime import datetime
+
+from src.utils.streaming_writers import csv_chunks, write_pdf, xlsx_chunks
+
+HEADERS = ["ID", "Data", "Descrição", "Valor"]
+
+
+def _rows(count):
+    for i in range(count):
+        yield (i, datetime(2025, 1, 1, 10, 0), f'pagamento "{i}"; <ok> & (pronto)', i * 1.5)
+
+
+def test_csv_is_emitted_in_chunks():
+    chunks = list(csv_chunks(HEADERS, _rows(2500), chunk_rows=1000))
+    assert len(chunks) == 3
+
+    text = b"".join(chunks).decode("utf-8-sig")
+    rows = list(csv.reader(io.StringIO(text), delimiter=";"))
+    assert rows[0] == HEADERS and len(rows) == 2501
+    assert rows[2] == ["1", "2025-01-01 10:00:00", 'pagamento "1"; <ok> & (pronto)', "1.5"]
+
+
+def test_xlsx_stream_is_a_valid_workbook():
+    data = b"".join(xlsx_chunks(HEADERS, _rows(1200), chunk_rows=500))
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.testzip() is None
+        sheet = archive.read("xl/worksheets/sheet1.xml").decode("utf-8")
+    assert sheet.count("<row>") == 1201
+    assert "&lt;ok&gt; &amp; (pronto)" in sheet and "<v>1.5</v>" in sheet
+
+
+def test_pdf_pages_and_cross_reference_table():
+    output = io.BytesIO()
+    assert write_pdf(output, HEADERS, _rows(300), title="Teste") == 300
+    data = output.getvalue()
+
+    offset = int(data[data.rindex(b"startxref") + 10:].split()[0])
+    lines = data[offset:].split(b"\n")
+    count = int(lines[1].split()[1])
+    for number in range(1, count):
+        position = int(lines[2 + number][:10])
+        assert data[position:].startswith(f"{number} 0 obj".encode())
+    assert data.count(b"/Type /Page ") > 1
@@ -0,0 +1,32 @@
+from decimal import Decimal
+
+import pytest
+
+from src.services.taxes import TaxRow, compute, compute_batch, money, parse_amount
+
+
+def test_parse_amount_keeps_decimal_digits():
+    assert parse_amount(100.005) == Decimal("100.005")
+    assert parse_amount("1.234,56") == Decimal("1234.56")
+    assert parse_amount("R$ 10") == Decimal("10")
+    with pytest.raises(ValueError):
+        parse_amount("abc")
+    with pytest.raises(ValueError):
+        parse_amount(True)
+    for value in ("NaN", "Infinity", "-inf", float("inf"), 1e999):
+        with pytest.raises(ValueError):
+            parse_amount(value)
+
+
+def test_compute_batch_reports_bad_amounts_per_item():
+    results, totals = compute_batch([{"valor_base": "NaN"}, {"valor_base": 1e999}, {"quantidade": "abc"}])
+    assert [result["index"] for result in results if "error" in result] == [0, 1, 2]
+    assert totals["valor_total"] == 0
+
+
+def test_compute_rounds_each_tax_half_up_to_cents():
+    taxes = [TaxRow(1, "ICMS", 0.18), TaxRow(2, "ISS", 0.05)]
+    aplicados, total = compute(parse_amount(100.005), taxes)
+    assert [item["valor"] for item in aplicados] == [Decimal("18.00"), Decimal("5.00")]
+    assert total == Decimal("123.01")
+    assert money(Decimal("0.125")) == Decimal("0.13")
@@ -0,0 +1,47 @@
+import pytest
+
+from src.utils.text_normalization import expandir_token, normalizar, normalizar_para_fala, numero_por_extenso
+
+
+@pytest.mark.parametrize("numero, extenso", [
+    (16, "dezesseis"),
+    (100, "cem"),
+    (101, "cento e um"),
+    (1200, "mil e duzentos"),
+    (1250, "mil duzentos e cinquenta"),
+    (2025, "dois mil e vinte e cinco"),
+    (1_500_000, "um milhão e quinhentos mil"),
+])
+def test_numero_por_extenso(numero, extenso):
+    assert numero_por_extenso(numero) == extenso
+
+
+@pytest.mark.parametrize("texto, falado", [
+    ("R$ 1.234,56", "mil duzentos e trinta e quatro reais e cinquenta e seis centavos"),
+    ("R$ 1,00", "um real"),
+    ("R$ 0,50", "cinquenta centavos"),
+    ("R$ 2.000.000", "dois milhões de reais"),
+    ("em 01/03/2025", "em primeiro de março de dois mil e vinte e cinco"),
+    ("3,05 kg", "três vírgula zero cinco quilos"),
+    ("📊 RELATÓRIO DE VENDAS\n====\nTotal: R$ 10", "RELATÓRIO DE VENDAS. Total: dez reais"),
+    ("**Sr. João**, 2ª via às 14h30 (15%)",
+     "senhor João, segunda via às quatorze horas e trinta minutos (quinze por cento)"),
+    ("anel 18k de 3,5g", "anel dezoito quilates de três vírgula cinco gramas"),
+])
+def test_normalizar_para_fala(texto, falado):
+    assert normalizar_para_fala(texto) == falado
+
+
+def test_valores_para_extratores():
+    texto = normalizar("Criar vale de R$ 1.234,56 para o Darvin em 15/03 😊")
+    assert texto.valores("moeda") == [1234.56]
+    assert texto.valores("data") == [(15, 3, None)]
+    assert texto.busca == "criar vale de r$ 1.234,56 para o darvin em 15/03"
+
+
+def test_token_expandido_uma_vez():
+    expandir_token.cache_clear()
+    normalizar.cache_clear()
+    normalizar_para_fala("R$ 10,00 e R$ 10,00 e 10")
+    info = expandir_token.cache_info()
+    assert (info.misses, info.hits) == (2, 1)
@@ -0,0 +1,35 @@
+import io
+import wave
+
+import pytest
+
+from src.utils.wav_audio import join_wav
+
+RATE = 24000
+
+
+def segment(seconds, rate=RATE):
+    """WAV de um trecho (como o motor Kokoro entrega por frase)"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as output:
+        output.setnchannels(1)
+        output.setsampwidth(2)
+        output.setframerate(rate)
+        output.writeframes(b"\x01\x00" * int(seconds * rate))
+    return buffer.getvalue()
+
+
+def test_two_sentence_reply_decodes_to_full_duration():
+    audio = join_wav([segment(1.5), segment(0.75)])
+
+    assert audio.count(b"RIFF") == 1
+    with wave.open(io.BytesIO(audio), "rb") as merged:
+        assert merged.getframerate() == RATE
+        assert merged.getnframes() / merged.getframerate() == pytest.approx(2.25)
+
+
+def test_single_segment_and_mismatched_formats():
+    assert join_wav([b"", segment(0.5)]) == segment(0.5)
+    assert join_wav([]) == b""
+    with pytest.raises(ValueError):
+        join_wav([segment(0.5), segment(0.5, rate=16000)])
@@ -0,0 +1,218 @@
+"""
+Índice de expiração dos arquivos de áudio em cache
+
+A limpeza antiga listava o diretório inteiro (glob + stat de cada arquivo)
+depois de cada síntese. Aqui cada arquivo gerado ou reutilizado é
+registrado numa tabela SQLite (caminho, tamanho, último acesso) indexada
+pelo último acesso, e uma varredura periódica remove:
+
+- os arquivos sem acesso há mais de max_age segundos;
+- os menos usados enquanto o total passar de max_bytes.
+
+O custo da varredura é proporcional aos arquivos removidos, não ao
+diretório. O diretório só é listado uma vez, quando o índice é criado,
+para adotar os arquivos que já existiam. O total em bytes vem sempre de
+SUM(size) da tabela: workers da API e o servidor Kokoro gravam no mesmo
+índice, e um contador em memória só veria os arquivos do próprio processo.
+
+Cópia de backend/src/utils/file_expiry.py: o servidor Kokoro é uma imagem
+separada e não importa o backend. Mantenha os dois arquivos iguais.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+INDEX_NAME = ".expiry.sqlite3"
+SWEEP_BATCH = 500
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+class FileExpiryIndex:
+    """Arquivos de um diretório ordenados por último acesso"""
+
+    def __init__(self, directory, max_age=None, max_bytes=None, patterns=("*",), exclude=()):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.patterns = patterns
+        self.exclude = set(exclude)  # nomes que nunca expiram (ex.: voz de referência)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sweeper = None
+        self._conn = sqlite3.connect(str(self.directory / INDEX_NAME), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                "name TEXT PRIMARY KEY, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS files_last_access ON files (last_access)")
+            empty = self._conn.execute("SELECT 1 FROM files LIMIT 1").fetchone() is None
+        if empty:
+            self.adopt_existing()
+
+    def adopt_existing(self):
+        """Registra os arquivos já presentes (com o mtime como último acesso)"""
+        rows = {}
+        for pattern in self.patterns:
+            for path in self.directory.glob(pattern):
+                if path.is_file() and not path.name.startswith(INDEX_NAME) and path.name not in self.exclude:
+                    stat = path.stat()
+                    rows[path.name] = (path.name, stat.st_size, stat.st_mtime)
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO files VALUES (?, ?, ?)", rows.values())
+        return len(rows)
+
+    def touch(self, path, size=None):
+        """Arquivo criado ou reutilizado agora"""
+        path = Path(path)
+        if size is None:
+            try:
+                size = path.stat().st_size
+            except OSError:
+                return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO files VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET size = excluded.size, last_access = excluded.last_access",
+                (path.name, size, time.time())
+            )
+
+    def forget(self, path):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM files WHERE name = ?", (Path(path).name,))
+
+    def total_bytes(self):
+        """Tamanho de todos os arquivos indexados, por qualquer processo"""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM files").fetchone()[0]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def sweep(self, max_age=None, max_bytes=None, now=None):
+        """Remove expirados e o excesso de tamanho; retorna (arquivos, bytes) removidos"""
+        max_age = self.max_age if max_age is None else max_age
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        now = time.time() if now is None else now
+        removed = freed = 0
+
+        if max_age:
+            while True:
+                with self._lock:
+                    rows = self._conn.execute(
+                        "SELECT name, size, last_access FROM files WHERE last_access < ? ORDER BY last_access LIMIT ?",
+                        (now - max_age, SWEEP_BATCH)
+                    ).fetchall()
+                if not rows:
+                    break
+                removed, freed = self._remove(rows, removed, freed)
+
+        if max_bytes:
+            # Somado de novo a cada lote: outros processos podem ter gravado no índice
+            while (total := self.total_bytes()) > max_bytes:
+                excess = total - max_bytes
+                with self._lock:
+                    rows = self._conn.execute(
+                        "SELECT name, size, last_access FROM files ORDER BY last_access LIMIT ?", (SWEEP_BATCH,)
+                    ).fetchall()
+                batch = []
+                for row in rows:
+                    if excess <= 0:
+                        break
+                    batch.append(row)
+                    excess -= row[1]
+                if not batch:
+                    break
+                removed, freed = self._remove(batch, removed, freed)
+
+        return removed, freed
+
+    def clear(self):
+        """Remove todos os arquivos indexados"""
+        with self._lock:
+            rows = self._conn.execute("SELECT name, size, last_access FROM files").fetchall()
+        return self._remove(rows, 0, 0)
+
+    def _remove(self, rows, removed, freed):
+        with self._lock, self._conn:
+            # Só o que não foi tocado desde a consulta (uma síntese pode ter reaproveitado o arquivo)
+            stale = [
+                (name, size) for name, size, last_access in rows
+                if self._conn.execute(
+                    "DELETE FROM files WHERE name = ? AND last_access = ?", (name, last_access)
+                ).rowcount
+            ]
+        for name, size in stale:
+            try:
+                (self.directory / name).unlink()
+                removed += 1
+                freed += size
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"⚠️ Não foi possível remover {name}: {e}")
+        return removed, freed
+
+    def start_sweeper(self, interval):
+        """Varredura periódica numa thread daemon"""
+        if self._sweeper is not None or not interval:
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    removed, freed = self.sweep()
+                    if removed:
+                        print(f"🗑️ {removed} áudios expirados removidos ({freed / 1e6:.1f} MB) de {self.directory}")
+                except Exception as e:
+                    print(f"⚠️ Erro na varredura de {self.directory}: {e}")
+
+        self._sweeper = threading.Thread(target=run, name=f"expiry-{self.directory.name}", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        self._stop.set()
+        self._sweeper = None
+
+    def stats(self):
+        return {
+            "files": len(self),
+            "bytes": self.total_bytes(),
+            "max_age": self.max_age,
+            "max_bytes": self.max_bytes,
+        }
+
+
+def expiry_index(directory, **kwargs):
+    """Índice compartilhado por diretório (vários motores usam o mesmo cache)"""
+    key = os.path.realpath(directory)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = FileExpiryIndex(directory, **kwargs)
+        return index
+
+
+def index_from_env(prefix, directory, max_age=86400, max_bytes=1 << 30, sweep_interval=600, **kwargs):
+    """
+    Índice compartilhado com varredura já iniciada, configurado por
+    <PREFIX>_MAX_AGE (s), <PREFIX>_MAX_BYTES e <PREFIX>_SWEEP_INTERVAL (s; 0 = sem thread)
+    """
+    index = expiry_index(
+        directory,
+        max_age=float(os.getenv(f"{prefix}_MAX_AGE", max_age)),
+        max_bytes=int(os.getenv(f"{prefix}_MAX_BYTES", max_bytes)),
+        **kwargs
+    )
+    index.start_sweeper(float(os.getenv(f"{prefix}_SWEEP_INTERVAL", sweep_interval)))
+    return index
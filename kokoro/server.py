@@ -3,21 +3,30 @@ Kokoro TTS Server - Sistema de Síntese de Voz
 Sistema LUA - IA Conversacional
 """
 
-from fastapi import FastAPI, HTTPException, File, UploadFile, BackgroundTasks
+from fastapi import FastAPI, HTTPException, File, UploadFile, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
 import os
 import asyncio
+import json
 import logging
-import hashlib
 import tempfile
+import time
 from pathlib import Path
 from datetime import datetime
 import redis.asyncio as redis
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 
+from audio_files import audio_etag, audio_name, cache_control, is_servable, partial_path
+from file_expiry import index_from_env
+from metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE, QUEUE_DEPTH, REGISTRY as METRICS,
+    observe_cache, observe_request, observe_tts, register_process_metrics
+)
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -35,16 +44,144 @@ CACHE_DIR.mkdir(parents=True, exist_ok=True)
 # Configurações
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
 
+# Modelo: TTS_MODEL > manifesto local > padrão (sem listar o catálogo remoto)
+DEFAULT_MODEL_NAME = "tts_models/multilingual/multi-dataset/xtts_v2"
+MODEL_MANIFEST = MODELS_DIR / "manifest.json"
+# Segundos sugeridos ao cliente (Retry-After) enquanto o modelo carrega
+READINESS_RETRY_AFTER = int(os.getenv("READINESS_RETRY_AFTER", 10))
+
+# Nomes, ETag e Cache-Control dos áudios: audio_files.py
+AUDIO_MEDIA_TYPES = {".wav": "audio/wav", ".mp3": "audio/mpeg"}
+AUDIO_CHUNK_SIZE = 64 * 1024
+
+# Síntese fora do event loop: threads dedicadas ao modelo e fila de admissão limitada.
+# Sínteses distintas além de WORKERS + QUEUE_MAX recebem 503 com Retry-After.
+SYNTHESIS_WORKERS = int(os.getenv("SYNTHESIS_WORKERS", 1))
+SYNTHESIS_QUEUE_MAX = int(os.getenv("SYNTHESIS_QUEUE_MAX", 16))
+SYNTHESIS_RETRY_AFTER = int(os.getenv("SYNTHESIS_RETRY_AFTER", 5))
+synthesis_executor = ThreadPoolExecutor(max_workers=SYNTHESIS_WORKERS, thread_name_prefix="synthesis")
+
+# Single-flight: arquivo de saída -> síntese em andamento (requisições iguais aguardam a mesma)
+synthesis_inflight: Dict[str, asyncio.Task] = {}
+
+# Expiração dos áudios por último acesso (AUDIO_CACHE_MAX_AGE, _MAX_BYTES, _SWEEP_INTERVAL)
+audio_index = index_from_env("AUDIO_CACHE", OUTPUT_DIR, max_age=3600, sweep_interval=300)
+REDIS_SCAN_COUNT = 500
+
 # Cliente Redis global
 redis_client: Optional[redis.Redis] = None
 
-# TTS Engine (será inicializado no startup)
+# TTS Engine (carregado em segundo plano depois do startup)
 tts_engine = None
+tts_model_name = None
+
+# Estado do carregamento do modelo (readiness)
+model_state = {
+    "state": "pending",   # pending | loading | ready | failed
+    "stage": "aguardando",
+    "progress": 0.0,
+    "model": None,
+    "error": None,
+    "started_at": None,
+    "ready_at": None,
+}
+
+# Métricas
+register_process_metrics()
+SYNTHESIS_INFLIGHT = QUEUE_DEPTH.labels("synthesis")
+SYNTHESIS_WAITING = QUEUE_DEPTH.labels("synthesis_waiting")
+SYNTHESIS_QUEUE_WAIT = METRICS.histogram(
+    "tts_queue_wait_seconds", "Espera na fila até a síntese começar numa thread")
+SYNTHESIS_REQUESTS = METRICS.counter(
+    "tts_singleflight_total", "Pedidos de síntese: leader executa, follower aguarda o mesmo resultado", ("role",))
+SYNTHESIS_REJECTED = METRICS.counter(
+    "tts_admission_rejected_total", "Sínteses recusadas com a fila de admissão cheia")
+METRICS.gauge("model_loaded", "Modelo de TTS carregado (1) ou mock (0)").set_function(
+    lambda: tts_model_name is not None
+)
+METRICS.gauge("audio_cache_bytes", "Bytes de áudio no diretório de saída").set_function(audio_index.total_bytes)
+
+def read_model_manifest() -> dict:
+    """Manifesto local do modelo (gravado após o primeiro carregamento)"""
+    try:
+        return json.loads(MODEL_MANIFEST.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+def write_model_manifest(model_name: str):
+    try:
+        MODEL_MANIFEST.write_text(json.dumps({
+            "model_name": model_name,
+            "saved_at": datetime.now().isoformat(),
+        }, indent=2), encoding="utf-8")
+    except OSError as e:
+        logger.warning(f"⚠️ Não foi possível gravar o manifesto do modelo: {e}")
+
+def resolve_model_name() -> str:
+    model_name = os.getenv("TTS_MODEL") or read_model_manifest().get("model_name")
+    return model_name or DEFAULT_MODEL_NAME
+
+def set_model_stage(stage: str, progress: float, state: str = "loading"):
+    model_state.update(state=state, stage=stage, progress=progress)
+
+def engine_id() -> Optional[str]:
+    """Modelo que gera (ou vai gerar) o áudio; None para o MockTTS"""
+    if isinstance(tts_engine, MockTTS):
+        return None
+    return tts_model_name or model_state["model"] or resolve_model_name()
+
+def is_model_ready() -> bool:
+    return model_state["state"] == "ready"
+
+def require_model_ready():
+    """503 com Retry-After enquanto o modelo ainda está carregando"""
+    if is_model_ready():
+        return
+    raise HTTPException(
+        status_code=503,
+        detail={"message": "Modelo de voz carregando, tente novamente em instantes", "model": model_state},
+        headers={"Retry-After": str(READINESS_RETRY_AFTER)}
+    )
+
+class MockTTS:
+    """Engine de desenvolvimento quando o TTS não pode ser carregado"""
+    def tts_to_file(self, text, file_path, language=None, speaker=None):
+        # Criar arquivo de áudio vazio para testes
+        with open(file_path, 'wb') as f:
+            f.write(b'MOCK_AUDIO_DATA')
+        return file_path
+
+async def load_tts_model():
+    """Carrega o modelo numa thread; o servidor já responde /health/live"""
+    global tts_engine, tts_model_name
+
+    model_name = resolve_model_name()
+    model_state.update(model=model_name, started_at=datetime.now().isoformat(), error=None)
+    try:
+        set_model_stage("importando TTS", 0.05)
+        from TTS.api import TTS
+
+        # Baixa na primeira execução; depois lê do cache local
+        set_model_stage("carregando modelo", 0.2)
+        logger.info(f"📦 Carregando modelo: {model_name}")
+        tts_engine = await asyncio.to_thread(TTS, model_name=model_name, progress_bar=False, gpu=False)
+        tts_model_name = model_name
+        write_model_manifest(model_name)
+        logger.info("✅ TTS Engine inicializado")
+
+    except Exception as e:
+        logger.error(f"❌ Erro ao inicializar TTS: {e}")
+        model_state["error"] = str(e)
+        tts_engine = MockTTS()
+        logger.warning("⚠️ Usando Mock TTS Engine")
+
+    set_model_stage("pronto", 1.0, state="ready")
+    model_state["ready_at"] = datetime.now().isoformat()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Gerenciar ciclo de vida da aplicação"""
-    global redis_client, tts_engine
+    global redis_client
     
     # Startup
     logger.info("🎙️ Iniciando Kokoro TTS Server...")
@@ -56,47 +193,19 @@ async def lifespan(app: FastAPI):
         logger.info("✅ Redis conectado")
     except Exception as e:
         logger.warning(f"⚠️ Redis não disponível: {e}")
+        redis_client = None
     
-    # Inicializar TTS
-    try:
-        from TTS.api import TTS
-        
-        # Lista de modelos disponíveis
-        available_models = TTS().list_models()
-        logger.info(f"📦 Modelos disponíveis: {len(available_models)}")
-        
-        # Usar modelo multi-idioma
-        model_name = "tts_models/multilingual/multi-dataset/xtts_v2"
-        
-        # Tentar modelo português se disponível
-        pt_models = [m for m in available_models if 'portuguese' in m.lower() or 'pt' in m.lower()]
-        if pt_models:
-            model_name = pt_models[0]
-            logger.info(f"🇧🇷 Usando modelo português: {model_name}")
-        else:
-            logger.info(f"🌍 Usando modelo multilíngue: {model_name}")
-        
-        # Inicializar TTS
-        tts_engine = TTS(model_name=model_name, progress_bar=False, gpu=False)
-        logger.info("✅ TTS Engine inicializado")
-        
-    except Exception as e:
-        logger.error(f"❌ Erro ao inicializar TTS: {e}")
-        # Criar mock engine para desenvolvimento
-        class MockTTS:
-            def tts_to_file(self, text, file_path, language=None, speaker=None):
-                # Criar arquivo de áudio vazio para testes
-                with open(file_path, 'wb') as f:
-                    f.write(b'MOCK_AUDIO_DATA')
-                return file_path
-        
-        tts_engine = MockTTS()
-        logger.warning("⚠️ Usando Mock TTS Engine")
+    # Inicializar TTS em segundo plano (síntese responde 503 até ficar pronto)
+    load_task = asyncio.create_task(load_tts_model())
     
     yield
     
     # Shutdown
     logger.info("🛑 Encerrando Kokoro TTS Server...")
+    if not load_task.done():
+        load_task.cancel()
+    synthesis_executor.shutdown(wait=False, cancel_futures=True)
+    audio_index.stop_sweeper()
     if redis_client:
         await redis_client.close()
 
@@ -117,6 +226,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Latência por rota (modelo da rota, não a URL, para limitar a cardinalidade)"""
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    observe_request(request.method, getattr(route, "path", "<sem rota>"),
+                    response.status_code, time.perf_counter() - start)
+    return response
+
 # Modelos Pydantic
 class TTSRequest(BaseModel):
     text: str
@@ -129,38 +248,63 @@ class TTSResponse(BaseModel):
     success: bool
     audio_url: Optional[str] = None
     cached: bool = False
+    coalesced: bool = False  # aguardou a síntese idêntica de outra requisição
     error: Optional[str] = None
 
 # Rotas
 @app.get("/api/voice/status")
 @app.get("/health")
 async def health_check():
-    """Verificar status do servidor"""
+    """Verificar status do servidor (sempre 200; "ready" indica o modelo)"""
     return {
         "status": "healthy",
         "service": "Kokoro TTS",
         "timestamp": datetime.now().isoformat(),
-        "engine": "TTS" if tts_engine else "Mock"
+        "engine": "Mock" if isinstance(tts_engine, MockTTS) else ("TTS" if tts_engine else None),
+        "ready": is_model_ready(),
+        "model": model_state
     }
 
+@app.get("/health/live")
+async def liveness():
+    """Liveness: processo no ar"""
+    return {"status": "alive", "timestamp": datetime.now().isoformat()}
+
+@app.get("/health/ready")
+async def readiness():
+    """Readiness: modelo carregado (503 + Retry-After enquanto carrega)"""
+    ready = is_model_ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "starting", "model": model_state},
+        headers=None if ready else {"Retry-After": str(READINESS_RETRY_AFTER)}
+    )
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Métricas no formato do Prometheus"""
+    return Response(METRICS.render(), media_type=METRICS_CONTENT_TYPE)
+
 @app.post("/api/voice/synthesize", response_model=TTSResponse)
-async def synthesize_speech(request: TTSRequest, background_tasks: BackgroundTasks):
+async def synthesize_speech(request: TTSRequest):
     """Sintetizar fala a partir de texto"""
     
     if not request.text:
         raise HTTPException(status_code=400, detail="Texto não pode estar vazio")
     
     try:
-        # Gerar hash do texto para cache
-        text_hash = hashlib.md5(f"{request.text}{request.language}{request.voice}".encode()).hexdigest()
-        cache_key = f"tts:{text_hash}"
-        output_filename = f"{text_hash}.{request.format}"
+        # Nome pelo hash de modelo + texto (o mock tem nomes próprios, nunca servidos do cache HTTP)
+        output_filename = audio_name(request.text, request.language, request.voice, engine_id(), request.format)
+        cache_key = f"tts:{Path(output_filename).stem}"
         output_path = OUTPUT_DIR / output_filename
         
         # Verificar cache no Redis
         if redis_client:
             cached_file = await redis_client.get(cache_key)
-            if cached_file and Path(cached_file).exists():
+            hit = bool(cached_file) and Path(cached_file).exists()
+            observe_cache("tts_audio", hit)
+            if hit:
+                audio_index.touch(cached_file)
                 logger.info(f"✅ Áudio encontrado no cache: {cached_file}")
                 return TTSResponse(
                     success=True,
@@ -168,7 +312,8 @@ async def synthesize_speech(request: TTSRequest, background_tasks: BackgroundTas
                     cached=True
                 )
         
-        # Se não está em cache, gerar novo áudio
+        # Se não está em cache, gerar novo áudio (áudio em cache é servido mesmo durante o carregamento)
+        require_model_ready()
         logger.info(f"🎙️ Gerando áudio para: {request.text[:50]}...")
         
         # Mapear idiomas
@@ -189,30 +334,21 @@ async def synthesize_speech(request: TTSRequest, background_tasks: BackgroundTas
         
         # Gerar áudio
         if tts_engine:
-            tts_engine.tts_to_file(
-                text=request.text,
-                file_path=str(output_path),
-                language=language,
-                speaker=request.voice
+            coalesced = await synthesize_once(
+                output_filename, cache_key, request.text, output_path, language, request.voice
             )
             
-            # Salvar no cache Redis
-            if redis_client and output_path.exists():
-                await redis_client.set(cache_key, str(output_path), ex=3600)  # 1 hora de cache
-            
-            logger.info(f"✅ Áudio gerado: {output_path}")
-            
-            # Limpar arquivos antigos em background
-            background_tasks.add_task(cleanup_old_files)
-            
             return TTSResponse(
                 success=True,
                 audio_url=f"/audio/{output_filename}",
-                cached=False
+                cached=False,
+                coalesced=coalesced
             )
         else:
             raise Exception("TTS Engine não disponível")
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Erro ao sintetizar fala: {e}")
         return TTSResponse(
@@ -220,20 +356,153 @@ async def synthesize_speech(request: TTSRequest, background_tasks: BackgroundTas
             error=str(e)
         )
 
+def _synthesize_to_file(text: str, output_path: Path, language: str, speaker: Optional[str], enqueued: float):
+    """Roda numa thread de synthesis_executor"""
+    SYNTHESIS_QUEUE_WAIT.observe(time.perf_counter() - enqueued)
+    SYNTHESIS_WAITING.dec()
+    SYNTHESIS_INFLIGHT.inc()
+    start = time.perf_counter()
+    # Arquivo parcial + rename: /audio nunca serve um WAV pela metade
+    part_path = partial_path(output_path)
+    try:
+        tts_engine.tts_to_file(
+            text=text,
+            file_path=str(part_path),
+            language=language,
+            speaker=speaker
+        )
+        os.replace(part_path, output_path)
+        audio_index.touch(output_path)
+    except Exception:
+        part_path.unlink(missing_ok=True)
+        raise
+    finally:
+        SYNTHESIS_INFLIGHT.dec()
+    observe_tts(tts_model_name or "mock", time.perf_counter() - start, len(text))
+
+async def _run_synthesis(cache_key: str, text: str, output_path: Path, language: str, speaker: Optional[str]):
+    SYNTHESIS_WAITING.inc()
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(
+        synthesis_executor, _synthesize_to_file, text, output_path, language, speaker, time.perf_counter()
+    )
+    
+    # Salvar no cache Redis
+    if redis_client and output_path.exists():
+        await redis_client.set(cache_key, str(output_path), ex=3600)  # 1 hora de cache
+    logger.info(f"✅ Áudio gerado: {output_path}")
+
+async def synthesize_once(key: str, cache_key: str, text: str, output_path: Path,
+                          language: str, speaker: Optional[str]) -> bool:
+    """
+    Sintetiza uma vez por chave: pedidos iguais em andamento aguardam o mesmo
+    resultado. Retorna True quando aguardou a síntese de outra requisição.
+    """
+    task = synthesis_inflight.get(key)
+    coalesced = task is not None
+    if task is None:
+        if len(synthesis_inflight) >= SYNTHESIS_WORKERS + SYNTHESIS_QUEUE_MAX:
+            SYNTHESIS_REJECTED.inc()
+            raise HTTPException(
+                status_code=503,
+                detail="Fila de síntese cheia, tente novamente em instantes",
+                headers={"Retry-After": str(SYNTHESIS_RETRY_AFTER)}
+            )
+        task = asyncio.create_task(_run_synthesis(cache_key, text, output_path, language, speaker))
+        synthesis_inflight[key] = task
+        task.add_done_callback(lambda _: synthesis_inflight.pop(key, None))
+    SYNTHESIS_REQUESTS.labels("follower" if coalesced else "leader").inc()
+    # shield: um cliente que desconecta não cancela a síntese dos demais
+    await asyncio.shield(task)
+    return coalesced
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    """Verifica If-None-Match / If-Range contra o ETag do arquivo"""
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+def _parse_range(header: Optional[str], file_size: int) -> Optional[Tuple[int, int]]:
+    """
+    Interpreta um cabeçalho Range de intervalo único (bytes=início-fim).
+    Retorna None quando o arquivo deve ser servido inteiro.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+
+    start_str, _, end_str = header[len("bytes="):].strip().partition("-")
+    try:
+        if start_str:
+            start = int(start_str)
+            end = int(end_str) if end_str else file_size - 1
+        else:
+            # Sufixo: últimos N bytes
+            length = int(end_str)
+            start = max(file_size - length, 0)
+            end = file_size - 1 if length > 0 else -1
+    except ValueError:
+        return None
+
+    if start >= file_size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Intervalo não satisfatório",
+            headers={"Content-Range": f"bytes */{file_size}"}
+        )
+    return start, min(end, file_size - 1)
+
+def _iter_file_range(file_path: Path, start: int, end: int):
+    """Lê apenas o trecho solicitado do arquivo, em blocos"""
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(AUDIO_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
 @app.get("/audio/{filename}")
-async def get_audio(filename: str):
-    """Servir arquivo de áudio gerado"""
+async def get_audio(filename: str, request: Request):
+    """Servir arquivo de áudio gerado (com ETag, Range e 304)"""
     file_path = OUTPUT_DIR / filename
-    
-    if not file_path.exists():
+
+    # Ocultos (índice de expiração, .part) não são áudio servível
+    if file_path.name != filename or not is_servable(filename) or not file_path.is_file():
         raise HTTPException(status_code=404, detail="Arquivo não encontrado")
-    
-    return FileResponse(
-        path=file_path,
-        media_type="audio/wav",
-        headers={
-            "Cache-Control": "public, max-age=3600",
-        }
+
+    etag = await asyncio.to_thread(audio_etag, file_path)
+    media_type = AUDIO_MEDIA_TYPES.get(file_path.suffix.lower(), "application/octet-stream")
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control(filename),
+        "Accept-Ranges": "bytes",
+    }
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    file_size = file_path.stat().st_size
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if if_range and if_range.strip() != etag:
+        range_header = None
+
+    byte_range = _parse_range(range_header, file_size)
+    if byte_range is None:
+        # Resposta completa: o FileResponse usa pathsend/sendfile quando o servidor suporta
+        return FileResponse(path=file_path, media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        _iter_file_range(file_path, start, end),
+        status_code=206,
+        media_type=media_type,
+        headers=headers
     )
 
 @app.get("/api/voice/languages")
@@ -257,37 +526,26 @@ async def list_languages():
 async def clear_cache():
     """Limpar cache de áudio"""
     try:
-        # Limpar arquivos do disco
-        for file in OUTPUT_DIR.glob("*.wav"):
-            file.unlink()
-        for file in OUTPUT_DIR.glob("*.mp3"):
-            file.unlink()
+        # Limpar arquivos do disco (os registrados no índice)
+        removed, freed = await asyncio.to_thread(audio_index.clear)
         
-        # Limpar cache Redis
+        # Limpar cache Redis: SCAN em lotes não bloqueia o servidor como KEYS
+        deleted = 0
         if redis_client:
-            keys = await redis_client.keys("tts:*")
-            if keys:
-                await redis_client.delete(*keys)
+            batch = []
+            async for key in redis_client.scan_iter(match="tts:*", count=REDIS_SCAN_COUNT):
+                batch.append(key)
+                if len(batch) >= REDIS_SCAN_COUNT:
+                    deleted += await redis_client.unlink(*batch)
+                    batch.clear()
+            if batch:
+                deleted += await redis_client.unlink(*batch)
         
-        return {"message": "Cache limpo com sucesso"}
+        return {"message": "Cache limpo com sucesso", "files": removed, "bytes": freed, "redis_keys": deleted}
     except Exception as e:
         logger.error(f"Erro ao limpar cache: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-async def cleanup_old_files():
-    """Limpar arquivos antigos (mais de 1 hora)"""
-    try:
-        import time
-        current_time = time.time()
-        
-        for file_path in OUTPUT_DIR.glob("*.*"):
-            file_age = current_time - file_path.stat().st_mtime
-            if file_age > 3600:  # 1 hora
-                file_path.unlink()
-                logger.info(f"🗑️ Arquivo antigo removido: {file_path}")
-    except Exception as e:
-        logger.error(f"Erro ao limpar arquivos: {e}")
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file